@@ -1,15 +1,18 @@
 # api/consumers.py
-import json
+import functools
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from ..models import ChatRoom, Message
+from ..utils import TypingThrottle
+from .WireProtocol import WireProtocolMixin, encode_event
 
 
 
-class ChatConsumer(AsyncWebsocketConsumer):
+class ChatConsumer(WireProtocolMixin, AsyncWebsocketConsumer):
     async def connect(self):
-        self.chat_room_id = self.scope['url_route']['kwargs']['room_id']
-        self.room_group_name = f'chat_{self.chat_room_id}'
+        # An int, like the room ids GatewayConsumer sends
+        self.chat_room_id = int(self.scope['url_route']['kwargs']['room_id'])
+        self.room_group_name = self.group_name(self.chat_room_id)
         self.user = self.scope['user']
         
         # Check if user is authenticated
@@ -29,31 +32,24 @@ class ChatConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
         
-        await self.accept()
+        self.typing_throttle = TypingThrottle(
+            functools.partial(self.broadcast_typing, self.chat_room_id)
+        )
+        
+        # JSON text frames by default, MessagePack if negotiated
+        await self.accept_negotiated()
         
         # Send user online status
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'user_status',
-                'user_id': self.user.id,
-                'username': self.user.username,
-                'status': 'online'
-            }
-        )
+        await self.broadcast_status(self.chat_room_id, 'online')
 
     async def disconnect(self, close_code):
+        # Stop showing this user as typing
+        if hasattr(self, 'typing_throttle'):
+            await self.typing_throttle.clear()
+        
         # Send user offline status
         if hasattr(self, 'room_group_name') and hasattr(self, 'user'):
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    'type': 'user_status',
-                    'user_id': self.user.id,
-                    'username': self.user.username,
-                    'status': 'offline'
-                }
-            )
+            await self.broadcast_status(self.chat_room_id, 'offline')
         
         # Leave room group
         if hasattr(self, 'room_group_name'):
@@ -62,29 +58,35 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 self.channel_name
             )
 
-    async def receive(self, text_data):
+    async def receive(self, text_data=None, bytes_data=None):
         try:
-            text_data_json = json.loads(text_data)
-            message_type = text_data_json.get('type', 'message')
-            
-            if message_type == 'message':
-                await self.handle_message(text_data_json)
-            elif message_type == 'typing':
-                await self.handle_typing(text_data_json)
-            elif message_type == 'read_message':
-                await self.handle_read_message(text_data_json)
-                
-        except json.JSONDecodeError:
-            await self.send(text_data=json.dumps({
-                'error': 'Invalid JSON format'
-            }))
+            data = self.decode_frame(text_data, bytes_data)
+        except ValueError:
+            await self.send_payload(self.frame_error(bytes_data))
+            return
+        
+        message_type = data.get('type', 'message')
+        
+        if message_type == 'message':
+            await self.handle_message(self.chat_room_id, data)
+        elif message_type == 'typing':
+            await self.handle_typing(self.chat_room_id, data)
+        elif message_type == 'read_message':
+            await self.handle_read_message(self.chat_room_id, data)
 
-    async def handle_message(self, data):
+    @staticmethod
+    def group_name(room_id):
+        return f'chat_{room_id}'
+
+    def get_typing_throttle(self, room_id):
+        return self.typing_throttle
+
+    async def handle_message(self, room_id, data):
         message_content = data.get('message', '').strip()
         if not message_content:
             return
         
-        chat_room = await self.get_chat_room(self.chat_room_id)
+        chat_room = await self.get_chat_room(room_id)
         if not chat_room:
             return
         
@@ -94,80 +96,95 @@ class ChatConsumer(AsyncWebsocketConsumer):
         )
         
         if message:
+            # Sending a message ends the typing state
+            await self.get_typing_throttle(room_id).clear()
+            
             # Get message data
             message_data = await self.get_message_data(message)
             
-            # Send message to room group
+            # Send message to room group, serialized once for all members
             await self.channel_layer.group_send(
-                self.room_group_name,
+                self.group_name(room_id),
                 {
                     'type': 'chat_message',
-                    'message': message_data
+                    'encoded': encode_event({
+                        'type': 'message',
+                        'room_id': room_id,
+                        'message': message_data
+                    })
                 }
             )
 
-    async def handle_typing(self, data):
-        is_typing = data.get('is_typing', False)
-        
+    async def handle_typing(self, room_id, data):
+        # Throttled: only state changes are sent to the group, at most once per interval
+        await self.get_typing_throttle(room_id).update(data.get('is_typing', False))
+
+    async def broadcast_typing(self, room_id, is_typing):
         await self.channel_layer.group_send(
-            self.room_group_name,
+            self.group_name(room_id),
             {
                 'type': 'typing_indicator',
                 'user_id': self.user.id,
-                'username': self.user.username,
-                'is_typing': is_typing
+                'encoded': encode_event({
+                    'type': 'typing',
+                    'room_id': room_id,
+                    'user_id': self.user.id,
+                    'username': self.user.username,
+                    'is_typing': is_typing
+                })
             }
         )
 
-    async def handle_read_message(self, data):
+    async def broadcast_status(self, room_id, user_status):
+        await self.channel_layer.group_send(
+            self.group_name(room_id),
+            {
+                'type': 'user_status',
+                'user_id': self.user.id,
+                'encoded': encode_event({
+                    'type': 'user_status',
+                    'room_id': room_id,
+                    'user_id': self.user.id,
+                    'username': self.user.username,
+                    'status': user_status
+                })
+            }
+        )
+
+    async def handle_read_message(self, room_id, data):
         message_id = data.get('message_id')
         if message_id:
-            await self.mark_message_read(message_id, self.user)
+            await self.mark_message_read(room_id, message_id, self.user)
             
             await self.channel_layer.group_send(
-                self.room_group_name,
+                self.group_name(room_id),
                 {
                     'type': 'message_read',
-                    'message_id': message_id,
-                    'reader_id': self.user.id
+                    'encoded': encode_event({
+                        'type': 'message_read',
+                        'room_id': room_id,
+                        'message_id': message_id,
+                        'reader_id': self.user.id
+                    })
                 }
             )
 
-    # Receive message from room group
+    # Receive message from room group (payloads arrive already encoded)
     async def chat_message(self, event):
-        message = event['message']
-        
-        await self.send(text_data=json.dumps({
-            'type': 'message',
-            'message': message
-        }))
+        await self.send_encoded(event['encoded'])
 
     async def typing_indicator(self, event):
         # Don't send typing indicator to the user who is typing
         if event['user_id'] != self.user.id:
-            await self.send(text_data=json.dumps({
-                'type': 'typing',
-                'user_id': event['user_id'],
-                'username': event['username'],
-                'is_typing': event['is_typing']
-            }))
+            await self.send_encoded(event['encoded'])
 
     async def user_status(self, event):
         # Don't send status to the user themselves
         if event['user_id'] != self.user.id:
-            await self.send(text_data=json.dumps({
-                'type': 'user_status',
-                'user_id': event['user_id'],
-                'username': event['username'],
-                'status': event['status']
-            }))
+            await self.send_encoded(event['encoded'])
 
     async def message_read(self, event):
-        await self.send(text_data=json.dumps({
-            'type': 'message_read',
-            'message_id': event['message_id'],
-            'reader_id': event['reader_id']
-        }))
+        await self.send_encoded(event['encoded'])
 
     # Database operations
     @database_sync_to_async
@@ -222,13 +239,13 @@ class ChatConsumer(AsyncWebsocketConsumer):
         }
 
     @database_sync_to_async
-    def mark_message_read(self, message_id, reader):
+    def mark_message_read(self, room_id, message_id, reader):
         try:
-            message = Message.objects.get(id=message_id)
+            message = Message.objects.get(id=message_id, chat_room_id=room_id)
             if reader != message.sender:
                 message.mark_as_read(reader)
                 return True
-        except Message.DoesNotExist:
+        except (Message.DoesNotExist, ValueError):
             pass
         return False
 
@@ -0,0 +1,185 @@
+# api/consumers/GatewayConsumer.py
+import functools
+from django.conf import settings
+from django.db.models import Q
+from channels.db import database_sync_to_async
+from ..models import ChatRoom
+from ..utils import TypingThrottle
+from ..services import NotificationService
+from .ChatConsumer import ChatConsumer
+from .NotificationConsumer import NotificationStreamMixin
+
+
+class GatewayConsumer(NotificationStreamMixin, ChatConsumer):
+    """
+    Multiplexed socket: one authenticated connection for any number of chat
+    rooms plus the notification stream.
+
+    Control frames:
+        {"type": "subscribe", "rooms": [1, 2], "notifications": true, "since": 120}
+        {"type": "unsubscribe", "rooms": [2], "notifications": false}
+        {"type": "replay", "since": 120}
+
+    Subscribing to notifications replays those newer than `since` (the last
+    notification id the client saw) and sends the unread-count badge.
+
+    Room frames are the same as on ws/chat/<room_id>/ with an extra room_id:
+        {"type": "message", "room_id": 1, "message": "..."}
+        {"type": "typing", "room_id": 1, "is_typing": true}
+        {"type": "read_message", "room_id": 1, "message_id": 10}
+
+    Every outbound room event carries its room_id, so the client can route it.
+    """
+
+    async def connect(self):
+        self.user = self.scope['user']
+
+        if self.user.is_anonymous:
+            await self.close()
+            return
+
+        self.rooms = {}  # room_id -> TypingThrottle
+        self.notification_group_name = None
+
+        await self.accept_negotiated()
+
+    async def disconnect(self, close_code):
+        for room_id in list(getattr(self, 'rooms', {})):
+            await self.leave_room(room_id)
+
+        if getattr(self, 'notification_group_name', None):
+            await self.channel_layer.group_discard(
+                self.notification_group_name,
+                self.channel_name
+            )
+
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            data = self.decode_frame(text_data, bytes_data)
+        except ValueError:
+            await self.send_payload(self.frame_error(bytes_data))
+            return
+
+        message_type = data.get('type')
+
+        if message_type == 'subscribe':
+            await self.handle_subscribe(data)
+            return
+        if message_type == 'unsubscribe':
+            await self.handle_unsubscribe(data)
+            return
+        if message_type == 'replay':
+            if self.notification_group_name:
+                await self.send_notification_replay(self.parse_cursor(data.get('since')))
+            return
+
+        handlers = {
+            'message': self.handle_message,
+            'typing': self.handle_typing,
+            'read_message': self.handle_read_message,
+        }
+        handler = handlers.get(message_type)
+        if handler is None:
+            await self.send_payload({'type': 'error', 'error': 'Unknown frame type'})
+            return
+
+        room_id = self.parse_room_ids([data.get('room_id')])
+        if not room_id or room_id[0] not in self.rooms:
+            await self.send_payload({
+                'type': 'error',
+                'error': 'Not subscribed to this chat room',
+                'room_id': data.get('room_id')
+            })
+            return
+
+        await handler(room_id[0], data)
+
+    # ---------------- Subscriptions ----------------
+    async def handle_subscribe(self, data):
+        requested = [
+            room_id for room_id in self.parse_room_ids(data.get('rooms', []))
+            if room_id not in self.rooms
+        ]
+
+        max_rooms = getattr(settings, 'CHAT_GATEWAY_MAX_ROOMS', 100)
+        available = max(max_rooms - len(self.rooms), 0)
+        allowed = await self.get_participant_room_ids(requested[:available])
+
+        for room_id in allowed:
+            await self.join_room(room_id)
+
+        replay = data.get('notifications') and not self.notification_group_name
+        if replay:
+            self.notification_group_name = NotificationService.group_name(self.user.id)
+            await self.channel_layer.group_add(
+                self.notification_group_name,
+                self.channel_name
+            )
+
+        await self.send_payload({
+            'type': 'subscribed',
+            'rooms': sorted(allowed),
+            'denied': sorted(set(requested) - set(allowed)),
+            'notifications': bool(self.notification_group_name),
+        })
+
+        if replay:
+            await self.send_notification_replay(self.parse_cursor(data.get('since')))
+
+    async def handle_unsubscribe(self, data):
+        removed = []
+        for room_id in self.parse_room_ids(data.get('rooms', [])):
+            if room_id in self.rooms:
+                await self.leave_room(room_id)
+                removed.append(room_id)
+
+        if data.get('notifications') is False and self.notification_group_name:
+            await self.channel_layer.group_discard(
+                self.notification_group_name,
+                self.channel_name
+            )
+            self.notification_group_name = None
+
+        await self.send_payload({
+            'type': 'unsubscribed',
+            'rooms': sorted(removed),
+            'notifications': bool(self.notification_group_name),
+        })
+
+    async def join_room(self, room_id):
+        await self.channel_layer.group_add(self.group_name(room_id), self.channel_name)
+        self.rooms[room_id] = TypingThrottle(
+            functools.partial(self.broadcast_typing, room_id)
+        )
+        await self.broadcast_status(room_id, 'online')
+
+    async def leave_room(self, room_id):
+        throttle = self.rooms.pop(room_id)
+        await throttle.clear()
+        await self.broadcast_status(room_id, 'offline')
+        await self.channel_layer.group_discard(self.group_name(room_id), self.channel_name)
+
+    def get_typing_throttle(self, room_id):
+        return self.rooms[room_id]
+
+    @staticmethod
+    def parse_room_ids(values):
+        room_ids = []
+        for value in values if isinstance(values, list) else []:
+            try:
+                room_ids.append(int(value))
+            except (TypeError, ValueError):
+                continue
+        return list(dict.fromkeys(room_ids))
+
+    # Database operations
+    @database_sync_to_async
+    def get_participant_room_ids(self, room_ids):
+        """Single query permission check for a batch of rooms"""
+        if not room_ids:
+            return []
+        return list(
+            ChatRoom.objects.filter(id__in=room_ids)
+            .filter(Q(patient=self.user) | Q(doctor=self.user))
+            .values_list('id', flat=True)
+        )
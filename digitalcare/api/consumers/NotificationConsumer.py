@@ -1,24 +1,79 @@
-import json
+from urllib.parse import parse_qs
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from ..services import NotificationService
+from .WireProtocol import WireProtocolMixin
+
+
+class NotificationStreamMixin:
+    """
+    Notification group handler plus reconnect replay, shared by
+    NotificationConsumer and the multiplexed gateway.
+    """
+
+    async def notification_message(self, event):
+        # Senders may pre-encode the payload once for every recipient
+        if 'encoded' in event:
+            await self.send_encoded(event['encoded'])
+        else:
+            await self.send_payload(event['notification'])
+
+    async def send_notification_replay(self, since=None):
+        """
+        Send notifications created after the `since` cursor (id of the last
+        notification the client saw), then the unread-count badge.
+        """
+        payloads, cursor, has_more, unread = await self.get_notification_replay(since)
+
+        await self.send_payload({
+            'type': 'notification_replay',
+            'notifications': payloads,
+            'cursor': cursor,
+            'has_more': has_more,
+        })
+        await self.send_payload(NotificationService.unread_count_event(unread))
+
+    @staticmethod
+    def parse_cursor(value):
+        try:
+            return int(value) if value is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    @database_sync_to_async
+    def get_notification_replay(self, since):
+        payloads, cursor, has_more = NotificationService.replay(self.user.id, since)
+        unread = NotificationService.unread_counts([self.user.id])[self.user.id]
+        return payloads, cursor, has_more, unread
+
+
+class NotificationConsumer(NotificationStreamMixin, WireProtocolMixin, AsyncWebsocketConsumer):
+    """
+    Consumer for real-time notifications
+
+    Reconnecting clients pass the last notification id they saw, either as
+    ws/notifications/?since=<id> or with a {"type": "replay", "since": <id>} frame.
+    """
 
-class NotificationConsumer(AsyncWebsocketConsumer):
-    """Consumer for real-time notifications"""
-    
     async def connect(self):
         self.user = self.scope['user']
-        
+
         if self.user.is_anonymous:
             await self.close()
             return
-        
-        self.notification_group_name = f'notifications_{self.user.id}'
-        
+
+        self.notification_group_name = NotificationService.group_name(self.user.id)
+
         await self.channel_layer.group_add(
             self.notification_group_name,
             self.channel_name
         )
-        
-        await self.accept()
+
+        # JSON text frames by default, MessagePack if negotiated
+        await self.accept_negotiated()
+
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        await self.send_notification_replay(self.parse_cursor(query.get('since', [None])[0]))
 
     async def disconnect(self, close_code):
         if hasattr(self, 'notification_group_name'):
@@ -27,5 +82,12 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                 self.channel_name
             )
 
-    async def notification_message(self, event):
-        await self.send(text_data=json.dumps(event['notification']))
\ No newline at end of file
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            data = self.decode_frame(text_data, bytes_data)
+        except ValueError:
+            await self.send_payload(self.frame_error(bytes_data))
+            return
+
+        if data.get('type') == 'replay':
+            await self.send_notification_replay(self.parse_cursor(data.get('since')))
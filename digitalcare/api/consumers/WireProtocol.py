@@ -0,0 +1,85 @@
+# api/consumers/WireProtocol.py
+import json
+import msgpack
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Clients asking for `Sec-WebSocket-Protocol: dc.msgpack` get binary
+# MessagePack frames, everyone else keeps JSON text frames.
+MSGPACK_SUBPROTOCOL = 'dc.msgpack'
+
+JSON_CODEC = 'json'
+MSGPACK_CODEC = 'msgpack'
+
+
+def _msgpack_default(obj):
+    """Fallback for types msgpack can't pack (datetime, Decimal, UUID...)"""
+    return DjangoJSONEncoder().default(obj)
+
+
+def encode_payload(payload, codec=JSON_CODEC):
+    """Encode a payload for one wire codec"""
+    if codec == MSGPACK_CODEC:
+        return msgpack.packb(payload, default=_msgpack_default, use_bin_type=True)
+    return json.dumps(payload, cls=DjangoJSONEncoder)
+
+
+def encode_event(payload):
+    """
+    Encode an outbound payload once for every supported codec.
+
+    The result is meant to travel inside a channel-layer group event so each
+    group member can forward the ready-made frame instead of re-serializing it.
+    """
+    return {
+        JSON_CODEC: encode_payload(payload, JSON_CODEC),
+        MSGPACK_CODEC: encode_payload(payload, MSGPACK_CODEC),
+    }
+
+
+class WireProtocolMixin:
+    """
+    Subprotocol negotiation and frame (de)serialization for websocket consumers
+    """
+    codec = JSON_CODEC
+
+    async def accept_negotiated(self):
+        """Accept the socket, picking MessagePack if the client offered it"""
+        if MSGPACK_SUBPROTOCOL in self.scope.get('subprotocols', []):
+            self.codec = MSGPACK_CODEC
+            await self.accept(subprotocol=MSGPACK_SUBPROTOCOL)
+        else:
+            await self.accept()
+
+    def decode_frame(self, text_data=None, bytes_data=None):
+        """
+        Decode an inbound frame into a dict. Binary frames are MessagePack,
+        text frames are JSON. Raises ValueError on malformed frames.
+        """
+        if bytes_data is not None:
+            data = msgpack.unpackb(bytes_data, raw=False)
+        else:
+            data = json.loads(text_data)
+
+        if not isinstance(data, dict):
+            raise ValueError("Frame must be an object")
+        return data
+
+    def frame_error(self, bytes_data=None):
+        """Error payload for a frame that could not be decoded"""
+        if bytes_data is not None:
+            return {'error': 'Invalid MessagePack format'}
+        return {'error': 'Invalid JSON format'}
+
+    async def send_payload(self, payload):
+        """Encode and send a payload to this client only"""
+        await self.send_frame(encode_payload(payload, self.codec))
+
+    async def send_encoded(self, encoded):
+        """Send the pre-encoded variant of a group event matching our codec"""
+        await self.send_frame(encoded[self.codec])
+
+    async def send_frame(self, frame):
+        if self.codec == MSGPACK_CODEC:
+            await self.send(bytes_data=frame)
+        else:
+            await self.send(text_data=frame)
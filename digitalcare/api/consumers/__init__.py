@@ -1,2 +1,4 @@
 from .ChatConsumer import *
-from .NotificationConsumer import *
\ No newline at end of file
+from .NotificationConsumer import *
+from .GatewayConsumer import *
+from .WireProtocol import *
\ No newline at end of file
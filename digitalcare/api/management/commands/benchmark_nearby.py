@@ -0,0 +1,120 @@
+# api/management/commands/benchmark_nearby.py
+
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from api.models import Facility
+from api.services import LocationService, ProviderIndexService
+from api.utils.ball_tree import np
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark nearby facility search on generated data: full-table '
+        'haversine scan vs bounding-box prefilter, k-nearest search and '
+        'the in-process ball tree. '
+        'Everything is rolled back.'
+    )
+
+    # Roughly Ghana
+    LAT_RANGE = (4.7, 11.1)
+    LON_RANGE = (-3.2, 1.1)
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100000, help='Facilities to generate')
+        parser.add_argument('--queries', type=int, default=50, help='Searches per strategy')
+        parser.add_argument('--radius', type=float, default=10, help='Search radius in km')
+        parser.add_argument('--k', type=int, default=10, help='Facilities per k-nearest search')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def point(self):
+        return self.random.uniform(*self.LAT_RANGE), self.random.uniform(*self.LON_RANGE)
+
+    def run(self, options):
+        self.stdout.write(f"Generating {options['count']} facilities...")
+        types = [Facility.CLINIC, Facility.PHARMACY, Facility.LABORATORY]
+        facilities = []
+        for index in range(options['count']):
+            lat, lon = self.point()
+            facilities.append(Facility(
+                name=f'Benchmark facility {index}', facility_type=types[index % 3],
+                latitude=lat, longitude=lon, status='Approved',
+            ))
+        Facility.objects.bulk_create(facilities, batch_size=5000)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Facility._meta.db_table}')
+
+        points = [self.point() for _ in range(options['queries'])]
+        radius = options['radius']
+
+        def full_scan(lat, lon):
+            return Facility.objects.filter(status='Approved', facility_type=Facility.CLINIC).annotate(
+                distance_km=LocationService.haversine_distance_expression(lat, lon, 'latitude', 'longitude')
+            ).filter(distance_km__lte=radius).order_by('distance_km')
+
+        def bounding_box(lat, lon):
+            return LocationService.get_nearby_facilities(lat, lon, radius, Facility.CLINIC)
+
+        results = {}
+        for name, search in [('full scan', full_scan), ('bounding box', bounding_box)]:
+            timings = []
+            found = 0
+            for lat, lon in points:
+                started = time.perf_counter()
+                found += len(list(search(lat, lon)))
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            results[name] = found
+            self.stdout.write(
+                f"{name:>13}: median {statistics.median(timings):7.2f} ms, "
+                f"p95 {timings[int(len(timings) * 0.95) - 1]:7.2f} ms, "
+                f"max {timings[-1]:7.2f} ms ({found} results)"
+            )
+
+        if len(set(results.values())) != 1:
+            self.stderr.write(f"Result counts differ: {results}")
+
+        timings = []
+        for lat, lon in points:
+            started = time.perf_counter()
+            LocationService.get_nearest_facilities(lat, lon, options['k'], Facility.CLINIC)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        self.stdout.write(
+            f"{'k nearest':>13}: median {statistics.median(timings):7.2f} ms, "
+            f"p95 {timings[int(len(timings) * 0.95) - 1]:7.2f} ms, "
+            f"max {timings[-1]:7.2f} ms (k={options['k']})"
+        )
+
+        if np is None:
+            self.stdout.write("    ball tree: skipped, numpy is not installed")
+            return
+        started = time.perf_counter()
+        index = ProviderIndexService.build()
+        self.stdout.write(f"Provider index built in {(time.perf_counter() - started) * 1000:.0f} ms")
+        timings = []
+        for lat, lon in points:
+            started = time.perf_counter()
+            index.within([Facility.CLINIC], lat, lon, radius)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        self.stdout.write(
+            f"{'ball tree':>13}: median {statistics.median(timings):7.2f} ms, "
+            f"p95 {timings[int(len(timings) * 0.95) - 1]:7.2f} ms, "
+            f"max {timings[-1]:7.2f} ms (CPU only, ids before hydration)"
+        )
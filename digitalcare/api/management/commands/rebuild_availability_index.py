@@ -0,0 +1,17 @@
+# api/management/commands/rebuild_availability_index.py
+
+from django.core.management.base import BaseCommand
+from api.services import AvailabilityService
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the DoctorAvailability index for every doctor with active '
+        'shifts, as the daily rebuild_availability_index task does. Run it '
+        'once after deploying, so earliest openings are found before the '
+        'first scheduled run.'
+    )
+
+    def handle(self, *args, **options):
+        rows = AvailabilityService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Availability index rebuilt: {rows} doctor days with openings'))
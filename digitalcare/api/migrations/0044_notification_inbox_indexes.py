@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-19 01:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0043_remove_prescription_patient_content_type_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatnotification',
+            index=models.Index(fields=['user', 'is_read', '-created_at'], name='chat_notification_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', '-id'], name='notification_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'is_read', '-id'], name='notification_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['timestamp'], name='notification_timestamp_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.7 on 2026-10-19 01:29
+
+import api.utils.attachment_storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0044_notification_inbox_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='attachment_content_type',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='attachment_size',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='preview',
+            field=models.FileField(blank=True, null=True, storage=api.utils.attachment_storage.AttachmentStorage(), upload_to='chat_attachments/previews/'),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='thumbnail',
+            field=models.FileField(blank=True, null=True, storage=api.utils.attachment_storage.AttachmentStorage(), upload_to='chat_attachments/thumbnails/'),
+        ),
+        migrations.AlterField(
+            model_name='message',
+            name='attachment',
+            field=models.FileField(blank=True, null=True, storage=api.utils.attachment_storage.AttachmentStorage(), upload_to='chat_attachments/'),
+        ),
+    ]
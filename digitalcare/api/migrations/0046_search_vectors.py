@@ -0,0 +1,91 @@
+# Generated by Django 5.1.7 on 2026-10-19 01:36
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Search vectors are maintained by BEFORE triggers so bulk_create, update()
+# and raw SQL writes stay indexed. Each entry: table -> weighted columns.
+SEARCH_VECTORS = {
+    'api_message': [('content', 'A')],
+    'api_consultation': [('diagnosis', 'A'), ('notes', 'B')],
+    'api_prescription': [('diagnosis', 'A')],
+}
+
+
+def vector_sql(columns, row):
+    return ' || '.join(
+        f"setweight(to_tsvector('pg_catalog.english', coalesce({row}{column}, '')), '{weight}')"
+        for column, weight in columns
+    )
+
+
+def create_triggers_sql():
+    statements = []
+    for table, columns in SEARCH_VECTORS.items():
+        watched = ', '.join([column for column, _ in columns] + ['search_vector'])
+        statements.append(f"""
+            CREATE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {vector_sql(columns, 'NEW.')};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql;
+
+            UPDATE {table} SET search_vector = {vector_sql(columns, '')};
+
+            CREATE TRIGGER {table}_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF {watched} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update();
+        """)
+    return statements
+
+
+def drop_triggers_sql():
+    return [
+        f"""
+            DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table};
+            DROP FUNCTION IF EXISTS {table}_search_vector_update();
+        """
+        for table in SEARCH_VECTORS
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0045_message_attachment_upload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='consultation',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='prescription',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # Backfill before the GIN indexes exist so they are built once
+        migrations.RunSQL(create_triggers_sql(), drop_triggers_sql()),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='consultation_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='message_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='prescription_search_idx'),
+        ),
+    ]
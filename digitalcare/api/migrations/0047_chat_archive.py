@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-19 01:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0046_search_vectors'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payload', models.BinaryField()),
+                ('format_version', models.PositiveSmallIntegerField(default=1)),
+                ('message_count', models.PositiveIntegerField(default=0)),
+                ('first_message_at', models.DateTimeField(blank=True, null=True)),
+                ('last_message_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('chat_room', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='archive', to='api.chatroom')),
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.7 on 2026-10-19 09:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0047_chat_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DoctorAvailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('slot_minutes', models.PositiveSmallIntegerField()),
+                ('free_mask', models.BigIntegerField()),
+                ('free_count', models.PositiveSmallIntegerField()),
+                ('first_free_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability', to='api.doctorprofile')),
+                ('facility', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability', to='api.facility')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['first_free_at'], name='availability_first_free_idx')],
+                'unique_together': {('doctor', 'facility', 'date')},
+            },
+        ),
+    ]
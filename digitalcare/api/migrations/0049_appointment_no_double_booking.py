@@ -0,0 +1,76 @@
+# Generated by Django 5.1.7 on 2026-10-19 10:05
+
+import logging
+import api.models.appointment_models.range_functions
+import django.contrib.postgres.constraints
+from django.db import migrations, models
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ['pending', 'confirmed']
+
+# Doctors with at least one pair of overlapping active appointments
+OVERLAPPING_DOCTORS = """
+    SELECT DISTINCT a.doctor_id FROM api_appointment a
+    JOIN api_appointment b ON b.doctor_id = a.doctor_id AND b.id > a.id
+    WHERE a.status IN %s AND b.status IN %s
+      AND a.scheduled_at < b.ends_at AND b.scheduled_at < a.ends_at
+"""
+
+
+def cancel_double_bookings(apps, schema_editor):
+    """
+    Nothing prevented overlapping appointments before this constraint.
+    Per doctor, walk the active appointments in booking order (id) and
+    cancel each one overlapping an appointment kept before it, so the
+    first booking of a slot wins. Every cancellation is logged.
+    """
+    Appointment = apps.get_model('api', 'Appointment')
+    statuses = tuple(ACTIVE_STATUSES)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(OVERLAPPING_DOCTORS, [statuses, statuses])
+        doctor_ids = [row[0] for row in cursor.fetchall()]
+
+    for doctor_id in doctor_ids:
+        kept, cancelled = [], []
+        appointments = Appointment.objects.filter(doctor_id=doctor_id, status__in=ACTIVE_STATUSES).order_by('id')
+        for appointment in appointments.values('id', 'scheduled_at', 'ends_at'):
+            conflict = next(
+                (other for other in kept
+                 if appointment['scheduled_at'] < other['ends_at'] and other['scheduled_at'] < appointment['ends_at']),
+                None
+            )
+            if conflict is None:
+                kept.append(appointment)
+                continue
+            cancelled.append(appointment['id'])
+            logger.warning(
+                f"Cancelling appointment {appointment['id']} of doctor {doctor_id}: "
+                f"it overlaps appointment {conflict['id']}, booked first"
+            )
+        Appointment.objects.filter(id__in=cancelled).update(status='cancelled', updated_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0048_doctor_availability'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='ends_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunSQL(
+            "UPDATE api_appointment SET ends_at = scheduled_at + duration_minutes * interval '1 minute'",
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunPython(cancel_double_bookings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('doctor__isnull', False), ('status__in', ['pending', 'confirmed'])), expressions=[(api.models.appointment_models.range_functions.Int8Range('doctor', 'doctor', models.Value('[]')), '&&'), (api.models.appointment_models.range_functions.TsTzRange('scheduled_at', 'ends_at', models.Value('[)')), '&&')], name='appointment_no_double_booking', violation_error_message='This doctor already has an appointment at that time.'),
+        ),
+    ]
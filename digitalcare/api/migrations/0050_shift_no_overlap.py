@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-19 11:40
+
+import api.models.appointment_models.range_functions
+import django.contrib.postgres.constraints
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0049_appointment_no_double_booking'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='shift',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('doctor__isnull', False), ('is_active', True)), expressions=[(api.models.appointment_models.range_functions.Int8Range('doctor', 'doctor', models.Value('[]')), '&&'), (api.models.appointment_models.range_functions.Int8Range('facility', 'facility', models.Value('[]')), '&&'), (api.models.appointment_models.range_functions.Int8Range('day_of_week', 'day_of_week', models.Value('[]')), '&&'), (api.models.appointment_models.range_functions.TimeRange('start_time', 'end_time'), '&&')], name='shift_no_overlap', violation_error_message='This shift overlaps with another shift of the doctor at this facility.'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0050_shift_no_overlap'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['doctor', 'scheduled_at'], name='appointment_doctor_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['facility', 'scheduled_at'], name='appointment_facility_time_idx'),
+        ),
+    ]
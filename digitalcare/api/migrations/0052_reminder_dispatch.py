@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-19 14:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0051_appointment_calendar_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderDispatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reminder_kind', models.CharField(choices=[('24h', '24 hours before'), ('2h', '2 hours before'), ('15m', '15 minutes before')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('appointment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminder_dispatches', to='api.appointment')),
+                ('notification', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.notification')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('appointment', 'reminder_kind'), name='unique_reminder_dispatch')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-19 14:05
+
+import api.utils.timezone_utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0052_reminder_dispatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctorprofile',
+            name='timezone',
+            field=models.CharField(blank=True, max_length=64, validators=[api.utils.timezone_utils.validate_timezone]),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-19 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0053_doctorprofile_timezone'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='doctorprofile',
+            index=models.Index(fields=['latitude', 'longitude'], name='doctor_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facility',
+            index=models.Index(fields=['latitude', 'longitude'], name='facility_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='labtechprofile',
+            index=models.Index(fields=['latitude', 'longitude'], name='labtech_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pharmacistprofile',
+            index=models.Index(fields=['latitude', 'longitude'], name='pharmacist_location_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0055_geocoded_address'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pharmacyinventory',
+            index=models.Index(condition=models.Q(('quantity__gt', 0)), fields=['drug', 'pharmacy'], name='inventory_in_stock_idx'),
+        ),
+    ]
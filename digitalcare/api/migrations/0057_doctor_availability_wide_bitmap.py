@@ -0,0 +1,37 @@
+# Generated by Django 5.1.7 on 2026-10-19 14:40
+
+from django.db import migrations, models
+
+
+def copy_masks(apps, schema_editor):
+    DoctorAvailability = apps.get_model('api', 'DoctorAvailability')
+    rows = list(DoctorAvailability.objects.only('id', 'free_mask'))
+    for row in rows:
+        row.free_bitmap = row.free_mask.to_bytes((row.free_mask.bit_length() + 7) // 8, 'little')
+    DoctorAvailability.objects.bulk_update(rows, ['free_bitmap'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0056_pharmacy_inventory_in_stock_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctoravailability',
+            name='free_bitmap',
+            field=models.BinaryField(default=b''),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_masks, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='doctoravailability',
+            name='free_mask',
+        ),
+        migrations.RenameField(
+            model_name='doctoravailability',
+            old_name='free_bitmap',
+            new_name='free_mask',
+        ),
+    ]
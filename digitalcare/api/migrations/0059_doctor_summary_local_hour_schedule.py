@@ -0,0 +1,74 @@
+# Generated by Django 5.1.7 on 2026-10-19 15:10
+
+import json
+from django.db import migrations
+from django.utils import timezone
+
+TASK_NAME = 'Send Doctor Appointment Reminders'
+
+
+def run_hourly(apps, schema_editor):
+    """
+    The doctor summary used to run once a day at crontab hour N (UTC) with
+    no arguments. It now runs every hour and takes N as the doctors' local
+    hour, so move an existing schedule over instead of leaving it to send
+    the summary only to doctors for whom it is N o'clock at N UTC.
+    """
+    PeriodicTask = apps.get_model('django_celery_beat', 'PeriodicTask')
+    CrontabSchedule = apps.get_model('django_celery_beat', 'CrontabSchedule')
+
+    for task in PeriodicTask.objects.filter(name=TASK_NAME, crontab__isnull=False).select_related('crontab'):
+        if json.loads(task.args or '[]') or not task.crontab.hour.isdigit():
+            continue
+        hourly, _ = CrontabSchedule.objects.get_or_create(
+            minute=task.crontab.minute,
+            hour='*',
+            day_of_week=task.crontab.day_of_week,
+            day_of_month=task.crontab.day_of_month,
+            month_of_year=task.crontab.month_of_year,
+            timezone=task.crontab.timezone,
+        )
+        task.args = json.dumps([int(task.crontab.hour)])
+        task.crontab = hourly
+        task.save(update_fields=['args', 'crontab'])
+    schedule_changed(apps)
+
+
+def schedule_changed(apps):
+    # Historical models skip PeriodicTask.save(), which tells beat to reload
+    PeriodicTasks = apps.get_model('django_celery_beat', 'PeriodicTasks')
+    PeriodicTasks.objects.update_or_create(ident=1, defaults={'last_update': timezone.now()})
+
+
+def run_daily(apps, schema_editor):
+    PeriodicTask = apps.get_model('django_celery_beat', 'PeriodicTask')
+    CrontabSchedule = apps.get_model('django_celery_beat', 'CrontabSchedule')
+
+    for task in PeriodicTask.objects.filter(name=TASK_NAME, crontab__isnull=False).select_related('crontab'):
+        args = json.loads(task.args or '[]')
+        if not args or task.crontab.hour != '*':
+            continue
+        daily, _ = CrontabSchedule.objects.get_or_create(
+            minute=task.crontab.minute,
+            hour=str(args[0]),
+            day_of_week=task.crontab.day_of_week,
+            day_of_month=task.crontab.day_of_month,
+            month_of_year=task.crontab.month_of_year,
+            timezone=task.crontab.timezone,
+        )
+        task.args = json.dumps([])
+        task.crontab = daily
+        task.save(update_fields=['args', 'crontab'])
+    schedule_changed(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0058_user_calendar_feed_version'),
+        ('django_celery_beat', '0019_alter_periodictasks_options'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_hourly, run_daily),
+    ]
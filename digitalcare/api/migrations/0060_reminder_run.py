@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-19 15:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0059_doctor_summary_local_hour_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(db_index=True)),
+                ('duration_seconds', models.FloatField()),
+                ('slowest_shard_seconds', models.FloatField()),
+                ('shards', models.PositiveIntegerField()),
+                ('sent', models.JSONField(default=dict)),
+            ],
+            options={
+                'ordering': ['-finished_at'],
+            },
+        ),
+    ]
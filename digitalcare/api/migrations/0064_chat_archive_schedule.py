@@ -0,0 +1,49 @@
+# Generated by Django 5.1.7 on 2026-10-19 15:55
+
+from django.db import migrations
+from django.utils import timezone
+
+TASK_NAME = 'Archive Closed Chats'
+TASK_PATH = 'api.tasks_scheduled.ChatArchiveTask.archive_closed_chats'
+
+
+def schedule_changed(apps):
+    # Historical models skip PeriodicTask.save(), which tells beat to reload
+    PeriodicTasks = apps.get_model('django_celery_beat', 'PeriodicTasks')
+    PeriodicTasks.objects.update_or_create(ident=1, defaults={'last_update': timezone.now()})
+
+
+def register(apps, schema_editor):
+    """
+    Archive long-closed chat rooms daily at 02:30 UTC, as
+    set_chat_archive_schedule would. A schedule set from the admin
+    already is left alone.
+    """
+    PeriodicTask = apps.get_model('django_celery_beat', 'PeriodicTask')
+    CrontabSchedule = apps.get_model('django_celery_beat', 'CrontabSchedule')
+
+    if PeriodicTask.objects.filter(name=TASK_NAME).exists():
+        return
+    crontab, _ = CrontabSchedule.objects.get_or_create(
+        minute='30', hour='2', day_of_week='*', day_of_month='*', month_of_year='*', timezone='UTC'
+    )
+    PeriodicTask.objects.create(name=TASK_NAME, task=TASK_PATH, crontab=crontab, args='[]')
+    schedule_changed(apps)
+
+
+def unregister(apps, schema_editor):
+    PeriodicTask = apps.get_model('django_celery_beat', 'PeriodicTask')
+    PeriodicTask.objects.filter(name=TASK_NAME).delete()
+    schedule_changed(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0063_notification_purge_schedule'),
+        ('django_celery_beat', '0019_alter_periodictasks_options'),
+    ]
+
+    operations = [
+        migrations.RunPython(register, unregister),
+    ]
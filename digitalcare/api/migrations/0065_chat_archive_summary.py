@@ -0,0 +1,49 @@
+# Generated by Django 5.1.7 on 2026-10-19 16:00
+
+import json
+import zlib
+from django.db import migrations, models
+
+
+def summarize(apps, schema_editor):
+    """Unpack existing archives once to store what the room list shows"""
+    ChatArchive = apps.get_model('api', 'ChatArchive')
+    User = apps.get_model('api', 'User')
+
+    for archive in ChatArchive.objects.select_related('chat_room').iterator(chunk_size=100):
+        rows = json.loads(zlib.decompress(bytes(archive.payload)))
+        room = archive.chat_room
+        if rows:
+            last = rows[-1]
+            archive.last_message = {
+                'content': last['content'],
+                'sender_username': User.objects.filter(id=last['sender_id']).values_list('username', flat=True).first(),
+                'created_at': last['created_at'],
+                'message_type': last['message_type'],
+            }
+        archive.unread_counts = {
+            str(user_id): sum(1 for row in rows if not row['is_read'] and row['sender_id'] != user_id)
+            for user_id in (room.patient_id, room.doctor_id)
+        }
+        archive.save(update_fields=['last_message', 'unread_counts'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0064_chat_archive_schedule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatarchive',
+            name='last_message',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatarchive',
+            name='unread_counts',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(summarize, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,16 @@
 # api/models/appointment.py
-from django.db import models
+from datetime import timedelta
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import RangeOperators
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, transaction
 from ..facility_models import Facility
 from ..profile_models import DoctorProfile
 from ..authentication_models import User
+from .range_functions import Int8Range, TsTzRange
+
+
+DOUBLE_BOOKING_MESSAGE = "This doctor already has an appointment at that time."
 
 
 class Appointment(models.Model):
@@ -17,12 +25,20 @@ class Appointment(models.Model):
     NO_SHOW = 'no_show'
     STATUS_CHOICES = [(PENDING,'Pending'),(CONFIRMED,'Confirmed'),(CANCELLED,'Cancelled'),(COMPLETED,'Completed'),(NO_SHOW,'No show')]
 
+    # Appointments in these states hold the doctor's time
+    ACTIVE_STATUSES = [PENDING, CONFIRMED]
+    # Changing any of these re-runs shift validation and the overlap check
+    SCHEDULING_FIELDS = ['doctor_id', 'facility_id', 'scheduled_at', 'duration_minutes']
+    DOUBLE_BOOKING_CONSTRAINT = 'appointment_no_double_booking'
+
     patient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='appointments')
     doctor = models.ForeignKey(DoctorProfile, on_delete=models.SET_NULL, null=True, blank=True, related_name='appointments')
     facility = models.ForeignKey(Facility, on_delete=models.SET_NULL, null=True, related_name='appointments')
     appointment_type = models.CharField(max_length=20, choices=APPT_TYPES, default=IN_PERSON)
     scheduled_at = models.DateTimeField()
     duration_minutes = models.PositiveIntegerField(default=30)
+    # scheduled_at + duration_minutes, kept by save() for the exclusion constraint
+    ends_at = models.DateTimeField(null=True, blank=True, editable=False)
     reason = models.TextField(blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -30,9 +46,51 @@ class Appointment(models.Model):
 
     class Meta:  # Fixed indentation
         ordering = ['-scheduled_at']
+        indexes = [
+            # Calendar range queries per doctor and per facility
+            models.Index(fields=['doctor', 'scheduled_at'], name='appointment_doctor_time_idx'),
+            models.Index(fields=['facility', 'scheduled_at'], name='appointment_facility_time_idx'),
+        ]
+        constraints = [
+            # No two active appointments of a doctor may overlap. The doctor id
+            # is compared as a one-value int8range so plain GiST range operators
+            # work without the btree_gist extension.
+            ExclusionConstraint(
+                name='appointment_no_double_booking',
+                index_type='gist',
+                expressions=[
+                    (Int8Range('doctor', 'doctor', models.Value('[]')), RangeOperators.OVERLAPS),
+                    (TsTzRange('scheduled_at', 'ends_at', models.Value('[)')), RangeOperators.OVERLAPS),
+                ],
+                condition=models.Q(status__in=['pending', 'confirmed'], doctor__isnull=False),
+                violation_error_message=DOUBLE_BOOKING_MESSAGE,
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def scheduling_changed(self):
+        """True for new appointments and when doctor, facility or time changed"""
+        loaded = getattr(self, '_loaded_values', None)
+        if self._state.adding or loaded is None:
+            return True
+        return any(
+            field in loaded and getattr(self, field) != loaded[field]
+            for field in self.SCHEDULING_FIELDS
+        )
+
+    def can_double_book(self):
+        """Whether this save may violate the overlap constraint"""
+        if self.status not in self.ACTIVE_STATUSES:
+            return False
+        loaded = getattr(self, '_loaded_values', None) or {}
+        return self.scheduling_changed() or loaded.get('status') not in self.ACTIVE_STATUSES
 
     def clean(self):
-        from django.core.exceptions import ValidationError
         from api.utils.shift_validator import ShiftValidator
         
         if self.doctor and self.facility and self.scheduled_at:
@@ -47,8 +105,31 @@ class Appointment(models.Model):
                 raise ValidationError(message)
 
     def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
+        if self.scheduled_at:
+            self.ends_at = self.scheduled_at + timedelta(minutes=self.duration_minutes)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'scheduled_at', 'duration_minutes'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'ends_at'}
+
+        # Status-only updates (confirm, cancel, complete) skip the shift queries
+        if self.scheduling_changed():
+            self.full_clean()
+
+        if self.can_double_book():
+            # Savepoint so a lost race leaves the caller's transaction usable
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+            except IntegrityError as e:
+                if self.DOUBLE_BOOKING_CONSTRAINT in str(e):
+                    raise ValidationError(DOUBLE_BOOKING_MESSAGE, code='double_booking')
+                raise
+        else:
+            super().save(*args, **kwargs)
+
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields
+        }
 
     def __str__(self):
         return f"Appt {self.id} for {self.patient} at {self.scheduled_at}"
\ No newline at end of file
@@ -1,5 +1,7 @@
 # api/models/consultation.py
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from .Appointment import Appointment
 
 class Consultation(models.Model):
@@ -9,6 +11,13 @@ class Consultation(models.Model):
     started_at = models.DateTimeField(null=True, blank=True)
     ended_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # diagnosis (weight A) + notes (weight B), maintained by a database trigger
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='consultation_search_idx'),
+        ]
 
     def __str__(self):
         return f"Consultation for {self.appointment}"
@@ -0,0 +1,44 @@
+from django.db import models
+from ..notification_models import Notification
+from .Appointment import Appointment
+
+
+class ReminderDispatch(models.Model):
+    """
+    Ledger of appointment reminders already sent: one row per appointment
+    and reminder kind, so reminder runs can be repeated safely.
+    """
+    DAY_BEFORE = '24h'
+    TWO_HOURS = '2h'
+    FIFTEEN_MINUTES = '15m'
+    KIND_CHOICES = [
+        (DAY_BEFORE, '24 hours before'),
+        (TWO_HOURS, '2 hours before'),
+        (FIFTEEN_MINUTES, '15 minutes before'),
+    ]
+
+    appointment = models.ForeignKey(
+        Appointment,
+        on_delete=models.CASCADE,
+        related_name='reminder_dispatches'
+    )
+    reminder_kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    notification = models.ForeignKey(
+        Notification,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['appointment', 'reminder_kind'],
+                name='unique_reminder_dispatch'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.reminder_kind} reminder for appointment {self.appointment_id}"
@@ -0,0 +1,22 @@
+from django.db import models
+
+
+class ReminderRun(models.Model):
+    """
+    Metrics of one sharded appointment reminder run, written by the chord
+    callback so they are visible from any process
+    (AppointmentReminderService.last_run).
+    """
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(db_index=True)
+    duration_seconds = models.FloatField()
+    slowest_shard_seconds = models.FloatField()
+    shards = models.PositiveIntegerField()
+    # {reminder kind: reminders sent}
+    sent = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ['-finished_at']
+
+    def __str__(self):
+        return f"Reminder run at {self.finished_at}: {self.sent}"
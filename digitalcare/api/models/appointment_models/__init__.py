@@ -1,4 +1,6 @@
 from .Appointment import Appointment
 from .Consultation import Consultation
 from .Symptom import Symptom
-from .VideoConsultation import VideoConsultation
\ No newline at end of file
+from .VideoConsultation import VideoConsultation
+from .ReminderDispatch import ReminderDispatch
+from .ReminderRun import ReminderRun
\ No newline at end of file
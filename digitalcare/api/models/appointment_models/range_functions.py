@@ -0,0 +1,19 @@
+from django.contrib.postgres.fields import BigIntegerRangeField, DateTimeRangeField
+from django.db import models
+
+
+class Int8Range(models.Func):
+    function = 'INT8RANGE'
+    output_field = BigIntegerRangeField()
+
+
+class TsTzRange(models.Func):
+    function = 'TSTZRANGE'
+    output_field = DateTimeRangeField()
+
+
+class TimeRange(models.Func):
+    """tsrange of two time columns on a fixed day; Postgres has no time range type"""
+    template = "TSRANGE(DATE '2000-01-01' + %(expressions)s, '[)')"
+    arg_joiner = ", DATE '2000-01-01' + "
+    output_field = DateTimeRangeField()
@@ -61,6 +61,8 @@ class User(AbstractUser):
     )
     role = models.CharField(max_length=50, choices=ROLE_CHOICES, default=STUDENT)
     status = models.CharField(max_length=50, choices=STATUS_CHOICES, default=ACTIVE)
+    # Bumped to revoke every calendar feed URL handed out so far
+    calendar_feed_version = models.PositiveIntegerField(default=0)
     
 
     USERNAME_FIELD = 'email'
@@ -0,0 +1,25 @@
+from django.db import models
+from .ChatRoom import ChatRoom
+
+
+class ChatArchive(models.Model):
+    """
+    Cold storage for an archived chat room: its messages compacted into one
+    zlib-compressed JSON blob, removed from the hot Message table.
+    See ChatArchiveService for packing and rehydration.
+    """
+    chat_room = models.OneToOneField(ChatRoom, on_delete=models.CASCADE, related_name='archive')
+    payload = models.BinaryField()
+    format_version = models.PositiveSmallIntegerField(default=1)
+
+    message_count = models.PositiveIntegerField(default=0)
+    first_message_at = models.DateTimeField(null=True, blank=True)
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    # What the room list shows, so it never unpacks the payload:
+    # the last message's summary and unread counts keyed by participant id
+    last_message = models.JSONField(null=True, blank=True)
+    unread_counts = models.JSONField(default=dict, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archive of chat {self.chat_room_id} ({self.message_count} messages)"
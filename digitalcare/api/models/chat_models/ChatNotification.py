@@ -27,6 +27,9 @@ class ChatNotification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'is_read', '-created_at'], name='chat_notification_inbox_idx'),
+        ]
     
     def __str__(self):
         return f"Notification for {self.user.username}: {self.title}"
\ No newline at end of file
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
 from django.utils import timezone
 from ..authentication_models import User
 
@@ -53,7 +55,14 @@ class ChatRoom(models.Model):
         """Get the other participant in the chat"""
         return self.doctor if current_user == self.patient else self.patient
     
-    def update_last_message_time(self):
-        """Update the last message timestamp"""
-        self.last_message_at = timezone.now()
-        self.save(update_fields=['last_message_at'])
\ No newline at end of file
+    def update_last_message_time(self, at=None):
+        """
+        Move the last message timestamp forward (never backwards).
+        New messages do this after commit through ChatActivityService.
+        """
+        at = at or timezone.now()
+        ChatRoom.objects.filter(pk=self.pk).update(
+            last_message_at=Greatest(Coalesce(F('last_message_at'), Value(at)), Value(at))
+        )
+        if not self.last_message_at or at > self.last_message_at:
+            self.last_message_at = at
\ No newline at end of file
@@ -1,6 +1,9 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 from ..authentication_models import User
+from ...utils import AttachmentStorage
 from .ChatRoom import ChatRoom
 
 class Message(models.Model):
@@ -24,8 +27,13 @@ class Message(models.Model):
     )
     
     # File attachments
-    attachment = models.FileField(upload_to='chat_attachments/', null=True, blank=True)
+    attachment = models.FileField(upload_to='chat_attachments/', storage=AttachmentStorage(), null=True, blank=True)
     attachment_name = models.CharField(max_length=255, null=True, blank=True)
+    attachment_content_type = models.CharField(max_length=100, null=True, blank=True)
+    attachment_size = models.PositiveBigIntegerField(null=True, blank=True)
+    # Generated asynchronously for image attachments
+    thumbnail = models.FileField(upload_to='chat_attachments/thumbnails/', storage=AttachmentStorage(), null=True, blank=True)
+    preview = models.FileField(upload_to='chat_attachments/previews/', storage=AttachmentStorage(), null=True, blank=True)
     
     # Message status
     is_read = models.BooleanField(default=False)
@@ -37,8 +45,14 @@ class Message(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Maintained by a database trigger (see migration 0046)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='message_search_idx'),
+        ]
     
     def __str__(self):
         return f"{self.sender.username}: {self.content[:50]}..."
@@ -49,8 +63,3 @@ class Message(models.Model):
             self.is_read = True
             self.read_at = timezone.now()
             self.save(update_fields=['is_read', 'read_at'])
-    
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # Update the chat room's last message time
-        self.chat_room.update_last_message_time()
\ No newline at end of file
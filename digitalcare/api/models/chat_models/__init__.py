@@ -1,3 +1,4 @@
 from .ChatRoom import ChatRoom
 from .Message import Message
-from .ChatNotification import ChatNotification
\ No newline at end of file
+from .ChatNotification import ChatNotification
+from .ChatArchive import ChatArchive
\ No newline at end of file
@@ -16,6 +16,14 @@ class PharmacyInventory(models.Model):
 
     class Meta:
         unique_together = ('pharmacy', 'drug')
+        indexes = [
+            # Stock searches only ever want pharmacies that have the drug
+            models.Index(
+                fields=['drug', 'pharmacy'],
+                condition=models.Q(quantity__gt=0),
+                name='inventory_in_stock_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.drug.name} - {self.pharmacy.name} ({self.quantity} units)"
@@ -0,0 +1,23 @@
+from django.db import models
+
+
+class GeocodedAddress(models.Model):
+    """
+    Geocoder results keyed by normalized address, so each distinct
+    address is sent to the external geocoder once. Misses are kept too
+    (latitude and longitude null) and only retried after
+    GEOCODING_RETRY_DAYS.
+    """
+    normalized_address = models.CharField(max_length=512, unique=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    provider = models.CharField(max_length=50)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def found(self):
+        return self.latitude is not None and self.longitude is not None
+
+    def __str__(self):
+        return self.normalized_address
@@ -1 +1,2 @@
-from .facility_models import *
\ No newline at end of file
+from .facility_models import *
+from .GeocodedAddress import GeocodedAddress
\ No newline at end of file
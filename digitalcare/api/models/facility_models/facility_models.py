@@ -26,6 +26,10 @@ class Facility(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # Range scans for the bounding-box prefilter in LocationService
+        indexes = [models.Index(fields=['latitude', 'longitude'], name='facility_location_idx')]
+
     def __str__(self):
         return f"{self.name}"
 
@@ -23,4 +23,12 @@ class Notification(models.Model):
     priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='NORMAL')
     metadata = models.JSONField(default=dict, blank=True)
     is_read = models.BooleanField(default=False)
-    timestamp = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    timestamp = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # Inbox reads are keyset-paged on (timestamp, id), newest first
+        indexes = [
+            models.Index(fields=['recipient', '-timestamp', '-id'], name='notification_inbox_idx'),
+            models.Index(fields=['recipient', 'is_read', '-timestamp', '-id'], name='notification_unread_idx'),
+            models.Index(fields=['timestamp'], name='notification_timestamp_idx'),
+        ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from ..profile_models import DoctorProfile
@@ -37,6 +39,8 @@ class Prescription(models.Model):
     diagnosis = models.TextField(blank=True, help_text="Reason for prescription")
     notes = models.TextField(blank=True, help_text="Internal notes for pharmacist")
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='ACTIVE')
+    # diagnosis, maintained by a database trigger
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ['-issued_at']
@@ -44,6 +48,7 @@ class Prescription(models.Model):
             models.Index(fields=['patient', '-issued_at']),
             models.Index(fields=['status', '-issued_at']),
             models.Index(fields=['valid_until', 'status']),
+            GinIndex(fields=['search_vector'], name='prescription_search_idx'),
         ]
 
     def clean(self):
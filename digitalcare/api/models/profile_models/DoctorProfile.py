@@ -1,5 +1,6 @@
 # api/models/doctor.py
 from django.db import models
+from ...utils import validate_timezone
 from ..authentication_models import User
 from ..facility_models import Facility
 
@@ -23,7 +24,13 @@ class DoctorProfile(models.Model):
     )
     is_active = models.BooleanField(default=True)
     license_number = models.CharField(max_length=100, blank=True)
+    # IANA name such as "Africa/Accra"; blank means settings.TIME_ZONE
+    timezone = models.CharField(max_length=64, blank=True, validators=[validate_timezone])
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Range scans for the bounding-box prefilter in LocationService
+        indexes = [models.Index(fields=['latitude', 'longitude'], name='doctor_location_idx')]
+
     def __str__(self):
         return f"{self.id }--- Dr. {self.first_name} {self.last_name}"
@@ -24,5 +24,9 @@ class LabTechProfile(models.Model):
     license_number = models.CharField(max_length=100, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Range scans for the bounding-box prefilter in LocationService
+        indexes = [models.Index(fields=['latitude', 'longitude'], name='labtech_location_idx')]
+
     def __str__(self):
         return f"{self.id}--- Lab Tech {self.first_name} {self.last_name}"
\ No newline at end of file
@@ -22,5 +22,9 @@ class PharmacistProfile(models.Model):
     license_number = models.CharField(max_length=100, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Range scans for the bounding-box prefilter in LocationService
+        indexes = [models.Index(fields=['latitude', 'longitude'], name='pharmacist_location_idx')]
+
     def __str__(self):
         return f"{self.id}--- Pharmacist {self.first_name} {self.last_name}"
@@ -0,0 +1,44 @@
+from django.db import models
+from ..profile_models import DoctorProfile
+from ..facility_models import Facility
+
+
+class DoctorAvailability(models.Model):
+    """
+    Free slots of a doctor at a facility on one day, as a bitmap.
+    Bit i of free_mask (little-endian bytes, as wide as the day's slot
+    grid) is set when the slot starting i * slot_minutes after midnight is
+    open. Rows only exist for days with at least one free slot
+    and are rebuilt from Shift and Appointment changes by AvailabilityService.
+    """
+    doctor = models.ForeignKey(
+        DoctorProfile,
+        on_delete=models.CASCADE,
+        related_name='availability'
+    )
+    facility = models.ForeignKey(
+        Facility,
+        on_delete=models.CASCADE,
+        related_name='availability'
+    )
+    date = models.DateField()
+    slot_minutes = models.PositiveSmallIntegerField()
+    free_mask = models.BinaryField()
+    free_count = models.PositiveSmallIntegerField()
+    first_free_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ['doctor', 'facility', 'date']
+        indexes = [
+            # "Earliest opening" searches walk this index in order
+            models.Index(fields=['first_free_at'], name='availability_first_free_idx'),
+        ]
+
+    @property
+    def mask(self):
+        """free_mask as an integer"""
+        return int.from_bytes(bytes(self.free_mask), 'little')
+
+    def __str__(self):
+        return f"{self.doctor} at {self.facility} on {self.date}: {self.free_count} free"
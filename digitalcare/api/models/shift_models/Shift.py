@@ -1,9 +1,15 @@
-from django.db import models
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import RangeOperators
+from django.db import IntegrityError, models, transaction
 from ..profile_models import DoctorProfile
 from ..facility_models import Facility
+from ..appointment_models.range_functions import Int8Range, TimeRange
 from django.core.exceptions import ValidationError
 
 
+SHIFT_OVERLAP_MESSAGE = "This shift overlaps with another shift of the doctor at this facility."
+
+
 class Shift(models.Model):
     """
     Represents a doctor's working shift at a specific facility.
@@ -46,29 +52,56 @@ class Shift(models.Model):
     class Meta:
         ordering = ['day_of_week', 'start_time']
         unique_together = ['doctor', 'facility', 'day_of_week', 'start_time']
+        constraints = [
+            # Active shifts of a doctor at a facility may not overlap on a day.
+            # Equality columns are one-value int8ranges (no btree_gist needed).
+            ExclusionConstraint(
+                name='shift_no_overlap',
+                index_type='gist',
+                expressions=[
+                    (Int8Range('doctor', 'doctor', models.Value('[]')), RangeOperators.OVERLAPS),
+                    (Int8Range('facility', 'facility', models.Value('[]')), RangeOperators.OVERLAPS),
+                    (Int8Range('day_of_week', 'day_of_week', models.Value('[]')), RangeOperators.OVERLAPS),
+                    (TimeRange('start_time', 'end_time'), RangeOperators.OVERLAPS),
+                ],
+                condition=models.Q(is_active=True, doctor__isnull=False),
+                violation_error_message=SHIFT_OVERLAP_MESSAGE,
+            ),
+        ]
     
     def clean(self):
         """Validate shift times"""
         if self.start_time >= self.end_time:
             raise ValidationError("Start time must be before end time")
         
-        # Check for overlapping shifts for the same doctor at the same facility
+        if not self.is_active or not self.doctor_id:
+            return
+        
+        # Let the database find an overlapping shift instead of looping over all of them
         overlapping = Shift.objects.filter(
-            doctor=self.doctor,
-            facility=self.facility,
+            doctor_id=self.doctor_id,
+            facility_id=self.facility_id,
             day_of_week=self.day_of_week,
-            is_active=True
-        ).exclude(pk=self.pk)
+            is_active=True,
+            start_time__lt=self.end_time,
+            end_time__gt=self.start_time,
+        ).exclude(pk=self.pk).first()
         
-        for shift in overlapping:
-            if (self.start_time < shift.end_time and self.end_time > shift.start_time):
-                raise ValidationError(
-                    f"This shift overlaps with existing shift: {shift.start_time} - {shift.end_time}"
-                )
+        if overlapping:
+            raise ValidationError(
+                f"This shift overlaps with existing shift: {overlapping.start_time} - {overlapping.end_time}"
+            )
     
     def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
+        # clean() already reports overlaps; the exclusion constraint backs it up
+        self.full_clean(validate_constraints=False)
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except IntegrityError as e:
+            if 'shift_no_overlap' in str(e):
+                raise ValidationError(SHIFT_OVERLAP_MESSAGE, code='shift_overlap')
+            raise
     
     def __str__(self):
         return f"{self.doctor.first_name} {self.doctor.last_name} - {self.get_day_of_week_display()} ({self.start_time}-{self.end_time}) @ {self.facility.name}"
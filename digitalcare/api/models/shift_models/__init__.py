@@ -1 +1,2 @@
-from .Shift import Shift
\ No newline at end of file
+from .Shift import Shift
+from .DoctorAvailability import DoctorAvailability
\ No newline at end of file
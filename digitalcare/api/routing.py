@@ -1,8 +1,10 @@
 # api/routing.py
 from django.urls import re_path
-from .consumers import ChatConsumer, NotificationConsumer
+from .consumers import ChatConsumer, NotificationConsumer, GatewayConsumer
 
 websocket_urlpatterns = [
-    re_path(r'ws/chat/(?P<room_id>\w+)/$', ChatConsumer.as_asgi()),
+    re_path(r'ws/chat/(?P<room_id>\d+)/$', ChatConsumer.as_asgi()),
     re_path(r'ws/notifications/$', NotificationConsumer.as_asgi()),
+    # Single socket multiplexing many chat rooms and notifications
+    re_path(r'ws/gateway/$', GatewayConsumer.as_asgi()),
 ]
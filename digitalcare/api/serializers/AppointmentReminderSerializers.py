@@ -5,9 +5,13 @@ class AppointmentReminderSerializer(Serializer):
     every = IntegerField(min_value=1)
     period = ChoiceField(choices=[
         ('days', 'Days'),
+        ('hours', 'Hours'),
+        ('minutes', 'Minutes'),
         ('seconds', 'Seconds')
     ])
     enabled = BooleanField()
+    reminder_window_hours = IntegerField(min_value=1, required=False)
+    shards = IntegerField(min_value=1, max_value=64, required=False)
 
 
 
@@ -1,3 +1,4 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
 from ..models import Appointment, DoctorProfile
 
@@ -47,7 +48,7 @@ class AppointmentSerializer(serializers.ModelSerializer):
                     "Selected facility is not valid for this doctor."
                 )
 
-        return super().create(validated_data)
+        return self.save_model(super().create, validated_data)
 
     def update(self, instance, validated_data):
         request = self.context.get("request")
@@ -57,4 +58,12 @@ class AppointmentSerializer(serializers.ModelSerializer):
         if user and user.role in ["student", "adult", "visitor"] and "status" in validated_data:
             validated_data.pop("status")
 
-        return super().update(instance, validated_data)
+        return self.save_model(super().update, instance, validated_data)
+
+    def save_model(self, save, *args):
+        # Appointment.save() validates shifts and double bookings; surface
+        # those as 400 responses instead of server errors
+        try:
+            return save(*args)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(serializers.as_serializer_error(e))
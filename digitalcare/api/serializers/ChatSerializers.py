@@ -1,6 +1,8 @@
 # api/serializers/chat_serializers.py
+from django.utils.dateparse import parse_datetime
 from rest_framework import serializers
 from ..models import User, ChatRoom, Message, ChatNotification
+from ..services import ChatAttachmentService, ChatArchiveService
 
 class ChatUserSerializer(serializers.ModelSerializer):
     """Simplified user serializer for chat purposes"""
@@ -45,7 +47,8 @@ class MessageSerializer(serializers.ModelSerializer):
         model = Message
         fields = [
             'id', 'content', 'message_type', 'sender', 'attachment', 
-            'attachment_name', 'is_read', 'read_at', 'is_edited', 
+            'attachment_name', 'attachment_content_type', 'attachment_size',
+            'thumbnail', 'preview', 'is_read', 'read_at', 'is_edited', 
             'created_at', 'time_since'
         ]
         read_only_fields = ['sender', 'is_read', 'read_at', 'is_edited']
@@ -74,6 +77,10 @@ class ChatRoomListSerializer(serializers.ModelSerializer):
         return ChatUserSerializer(other_user).data
     
     def get_last_message(self, obj):
+        if obj.status == ChatRoom.ARCHIVED:
+            # Summarized when archiving, so the payload is never unpacked here
+            last_message = obj.archive.last_message
+            return last_message and {**last_message, 'created_at': parse_datetime(last_message['created_at'])}
         last_message = obj.messages.last()
         if last_message:
             return {
@@ -86,13 +93,15 @@ class ChatRoomListSerializer(serializers.ModelSerializer):
     
     def get_unread_count(self, obj):
         request_user = self.context['request'].user
+        if obj.status == ChatRoom.ARCHIVED:
+            return obj.archive.unread_counts.get(str(request_user.id), 0)
         return obj.messages.filter(is_read=False).exclude(sender=request_user).count()
 
 
 class ChatRoomDetailSerializer(serializers.ModelSerializer):
     patient = ChatUserSerializer(read_only=True)
     doctor = ChatUserSerializer(read_only=True)
-    messages = MessageSerializer(many=True, read_only=True)
+    messages = serializers.SerializerMethodField()
     
     class Meta:
         model = ChatRoom
@@ -100,6 +109,12 @@ class ChatRoomDetailSerializer(serializers.ModelSerializer):
             'id', 'patient', 'doctor', 'subject', 'status', 'patient_consent',
             'doctor_accepted', 'created_at', 'last_message_at', 'messages'
         ]
+        # Status moves only through accept/close and the archive service
+        read_only_fields = ['status']
+    
+    def get_messages(self, obj):
+        # Hot rows for live rooms, rehydrated archive for archived ones
+        return MessageSerializer(ChatArchiveService.room_messages(obj), many=True).data
 
 
 class CreateChatRoomSerializer(serializers.ModelSerializer):
@@ -147,18 +162,40 @@ class CreateMessageSerializer(serializers.ModelSerializer):
         validated_data['chat_room'] = self.context['chat_room']
         
         # Handle file attachment name
-        if validated_data.get('attachment'):
-            validated_data['attachment_name'] = validated_data['attachment'].name
+        attachment = validated_data.get('attachment')
+        if attachment:
+            validated_data['attachment_name'] = attachment.name
+            validated_data['attachment_content_type'] = getattr(attachment, 'content_type', None)
+            validated_data['attachment_size'] = attachment.size
+        
+        message = super().create(validated_data)
         
-        return super().create(validated_data)
+        if attachment and (message.attachment_content_type or '').startswith('image/'):
+            ChatAttachmentService.queue_renditions(message)
+        
+        return message
+
+
+class AttachmentTicketSerializer(serializers.Serializer):
+    """File metadata for a direct-to-storage upload ticket"""
+    filename = serializers.CharField(max_length=255)
+    content_type = serializers.CharField(max_length=100)
+    size = serializers.IntegerField(min_value=1)
+
+
+class ConfirmAttachmentSerializer(serializers.Serializer):
+    ticket = serializers.CharField()
+    content = serializers.CharField(required=False, allow_blank=True, default='')
 
 
 class ChatNotificationSerializer(serializers.ModelSerializer):
     chat_room = ChatRoomListSerializer(read_only=True)
+    chat_room_id = serializers.IntegerField(read_only=True)
+    message_id = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = ChatNotification
         fields = [
             'id', 'notification_type', 'title', 'content', 'is_read',
-            'created_at', 'chat_room'
+            'created_at', 'chat_room', 'chat_room_id', 'message_id'
         ]
\ No newline at end of file
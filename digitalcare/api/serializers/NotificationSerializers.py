@@ -0,0 +1,50 @@
+from rest_framework import serializers
+from ..models import Notification, User
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    """Flat inbox row, no nested relations"""
+
+    class Meta:
+        model = Notification
+        fields = [
+            'id', 'message', 'notification_type', 'priority', 'metadata',
+            'is_read', 'timestamp'
+        ]
+        read_only_fields = fields
+
+
+class NotificationMarkReadSerializer(serializers.Serializer):
+    """Mark read by explicit ids, or everything up to a watermark id, per inbox source"""
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=1000)
+    up_to = serializers.IntegerField(required=False)
+    chat_ids = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=1000)
+    chat_up_to = serializers.IntegerField(required=False)
+
+    def validate(self, data):
+        if not {'ids', 'up_to', 'chat_ids', 'chat_up_to'} & set(data):
+            raise serializers.ValidationError("Specify ids, up_to, chat_ids or chat_up_to.")
+        return data
+
+
+class NotificationBroadcastSerializer(serializers.Serializer):
+    """Target a notification at explicit users, roles and/or a facility"""
+    message = serializers.CharField()
+    notification_type = serializers.ChoiceField(choices=Notification.NOTIFICATION_TYPES, default='GENERAL')
+    priority = serializers.ChoiceField(choices=Notification.PRIORITY_CHOICES, default='NORMAL')
+    metadata = serializers.JSONField(required=False, default=dict)
+
+    user_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    roles = serializers.ListField(child=serializers.ChoiceField(choices=User.ROLE_CHOICES), required=False)
+    facility_id = serializers.IntegerField(required=False)
+
+    def validate(self, data):
+        if not any([data.get('user_ids'), data.get('roles'), data.get('facility_id')]):
+            raise serializers.ValidationError(
+                "Specify user_ids, roles or facility_id to target the notification."
+            )
+        if data.get('user_ids') and (data.get('roles') or data.get('facility_id')):
+            raise serializers.ValidationError(
+                "user_ids cannot be combined with roles or facility_id."
+            )
+        return data
@@ -20,7 +20,8 @@ class BaseProfileSerializer(serializers.ModelSerializer):
     
     def get_profile_picture_url(self, obj):
         """Return full Cloudinary URL for profile picture"""
-        if obj.profile_picture:
+        # Provider profiles have no picture field
+        if getattr(obj, 'profile_picture', None):
             request = self.context.get('request')
             if request:
                 return request.build_absolute_uri(obj.profile_picture.url)
@@ -29,7 +30,7 @@ class BaseProfileSerializer(serializers.ModelSerializer):
     
     def get_profile_picture_thumbnail(self, obj):
         """Return thumbnail version of profile picture"""
-        if obj.profile_picture:
+        if getattr(obj, 'profile_picture', None):
             # Cloudinary automatically handles transformations
             # You can append transformations to the URL
             url = obj.profile_picture.url
@@ -1,5 +1,6 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
-from ..models import Shift, DoctorProfile
+from ..models import Shift, DoctorProfile, Facility
 
 
 class ShiftSerializer(serializers.ModelSerializer):
@@ -62,4 +63,78 @@ class ShiftSerializer(serializers.ModelSerializer):
                     {"facility": "You are not associated with this facility"}
                 )
         
-        return data
\ No newline at end of file
+        return data
+    
+    def create(self, validated_data):
+        return self.save_model(super().create, validated_data)
+    
+    def update(self, instance, validated_data):
+        return self.save_model(super().update, instance, validated_data)
+    
+    def save_model(self, save, *args):
+        # Shift.save() reports overlaps as Django ValidationErrors
+        try:
+            return save(*args)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(serializers.as_serializer_error(e))
+
+class ShiftPatternSerializer(serializers.Serializer):
+    """One recurring line of a rota: a doctor's hours on some weekdays"""
+    doctor = serializers.PrimaryKeyRelatedField(queryset=DoctorProfile.objects.all())
+    days = serializers.ListField(
+        child=serializers.ChoiceField(choices=Shift.DAY_CHOICES),
+        required=False
+    )
+    rule = serializers.ChoiceField(choices=['daily', 'weekdays', 'weekends'], required=False)
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+
+    def validate(self, data):
+        if not data.get('days') and not data.get('rule'):
+            raise serializers.ValidationError("Provide days and/or a rule")
+        if data['start_time'] >= data['end_time']:
+            raise serializers.ValidationError("Start time must be before end time")
+        return data
+
+
+class ShiftExceptionSerializer(serializers.Serializer):
+    """A weekday left out of the expanded patterns, for one doctor or all"""
+    doctor = serializers.PrimaryKeyRelatedField(queryset=DoctorProfile.objects.all(), required=False)
+    day_of_week = serializers.ChoiceField(choices=Shift.DAY_CHOICES)
+
+
+class ShiftTemplateSerializer(serializers.Serializer):
+    facility = serializers.PrimaryKeyRelatedField(queryset=Facility.objects.all())
+    patterns = ShiftPatternSerializer(many=True)
+    exceptions = ShiftExceptionSerializer(many=True, required=False)
+    replace = serializers.BooleanField(default=False)
+
+    def validate_patterns(self, patterns):
+        if not patterns:
+            raise serializers.ValidationError("At least one pattern is required")
+        if len(patterns) > 1000:
+            raise serializers.ValidationError("At most 1000 patterns per request")
+        return patterns
+
+    def validate(self, data):
+        request = self.context.get('request')
+        user = request.user if request else None
+        facility = data['facility']
+        doctors = {pattern['doctor'] for pattern in data['patterns']}
+
+        if user and not user.is_superuser:
+            if hasattr(user, 'facility'):
+                if facility != user.facility:
+                    raise serializers.ValidationError(
+                        "You can only manage shifts for your own facility"
+                    )
+            elif hasattr(user, 'doctorprofile'):
+                if doctors != {user.doctorprofile}:
+                    raise serializers.ValidationError(
+                        {"patterns": "You can only manage your own shifts"}
+                    )
+                if not user.doctorprofile.clinics.filter(id=facility.id).exists():
+                    raise serializers.ValidationError(
+                        {"facility": "You are not associated with this facility"}
+                    )
+        return data
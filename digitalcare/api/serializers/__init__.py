@@ -9,6 +9,7 @@ from .AppointmentSerializers import *
 from .AppointmentReminderSerializers import *
 
 from .ChatSerializers import *
+from .NotificationSerializers import *
 from .ConsultationSerializers import *
 from .DrugSerializers import *
 from .PrescriptionSerializers import *
@@ -0,0 +1,292 @@
+# api/services/AppointmentReminderService.py
+import logging
+import time
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from ..models import Appointment, ReminderDispatch, ReminderRun
+from .NotificationService import NotificationService
+
+logger = logging.getLogger(__name__)
+
+
+class AppointmentReminderService:
+    """
+    Sends each confirmed appointment at most one reminder per kind.
+
+    Every kind owns the window between its offset and the next shorter
+    one, so an appointment booked 90 minutes ahead gets only the 2h
+    reminder. Each batch selects due appointments with an anti-join on the
+    ReminderDispatch ledger, locks them (SKIP LOCKED, so parallel runs
+    split the work) and inserts ledger rows and notifications together.
+    Scheduled runs split the windows into time shards that workers
+    process in parallel (send_sharded).
+    """
+
+    OFFSETS = {
+        ReminderDispatch.DAY_BEFORE: timedelta(hours=24),
+        ReminderDispatch.TWO_HOURS: timedelta(hours=2),
+        ReminderDispatch.FIFTEEN_MINUTES: timedelta(minutes=15),
+    }
+
+    @staticmethod
+    def batch_size():
+        return getattr(settings, 'APPOINTMENT_REMINDER_BATCH_SIZE', 500)
+
+    @classmethod
+    def kinds(cls, max_offset=None):
+        """Enabled kinds, shortest offset first"""
+        enabled = getattr(settings, 'APPOINTMENT_REMINDER_KINDS', list(cls.OFFSETS))
+        kinds = sorted((kind for kind in enabled if kind in cls.OFFSETS), key=cls.OFFSETS.get)
+        if max_offset is not None:
+            kinds = [kind for kind in kinds if cls.OFFSETS[kind] <= max_offset]
+        return kinds
+
+    @classmethod
+    def windows(cls, max_offset=None):
+        """(kind, lower offset, upper offset) with non-overlapping windows"""
+        windows = []
+        lower = timedelta(0)
+        for kind in cls.kinds(max_offset):
+            windows.append((kind, lower, cls.OFFSETS[kind]))
+            lower = cls.OFFSETS[kind]
+        return windows
+
+    @staticmethod
+    def due(kind, start, end):
+        """Confirmed appointments in (start, end] without a `kind` reminder yet"""
+        already_sent = ReminderDispatch.objects.filter(
+            appointment=OuterRef('pk'), reminder_kind=kind
+        )
+        return Appointment.objects.filter(
+            status=Appointment.CONFIRMED,
+            scheduled_at__gt=start,
+            scheduled_at__lte=end,
+        ).filter(~Exists(already_sent))
+
+    @staticmethod
+    def lead_time(scheduled_at, now):
+        """
+        How far off the appointment is, from the time it actually starts
+        rather than the reminder kind: a 24h reminder for an appointment
+        booked 3 hours ahead must not say "tomorrow".
+        """
+        minutes = max(1, int((scheduled_at - now).total_seconds() // 60))
+        if minutes < 60:
+            return f"in {minutes} minute{'s' if minutes != 1 else ''}"
+        if minutes < 4 * 60:
+            hours = (minutes + 30) // 60
+            return f"in {hours} hour{'s' if hours != 1 else ''}"
+
+        local = timezone.localtime(scheduled_at)
+        days = (local.date() - timezone.localtime(now).date()).days
+        if days == 0:
+            return f"today at {local:%H:%M}"
+        if days == 1:
+            return f"tomorrow at {local:%H:%M}"
+        return f"on {local:%Y-%m-%d} at {local:%H:%M}"
+
+    @classmethod
+    def message(cls, row, now):
+        doctor_name = (
+            f"{row['doctor__user__first_name']} {row['doctor__user__last_name']}".strip()
+            or row['doctor__user__username']
+            or "your doctor"
+        )
+        scheduled_local = timezone.localtime(row['scheduled_at']).strftime("%Y-%m-%d %H:%M %Z")
+        return (
+            f"Reminder: Your appointment with Dr. {doctor_name} is {cls.lead_time(row['scheduled_at'], now)} "
+            f"({scheduled_local}). Please arrive 15 minutes early."
+        )
+
+    @classmethod
+    def send_batch(cls, kind, start, end, now=None):
+        """
+        Remind one batch of due appointments. Returns (appointments
+        selected, reminders sent); they differ when another run got there
+        first.
+        """
+        now = now or timezone.now()
+        with transaction.atomic():
+            rows = list(
+                cls.due(kind, start, end)
+                .order_by('scheduled_at', 'id')
+                .select_for_update(skip_locked=True, of=('self',))
+                .values(
+                    'id', 'patient_id', 'scheduled_at', 'doctor__user__first_name',
+                    'doctor__user__last_name', 'doctor__user__username',
+                )[:cls.batch_size()]
+            )
+            if not rows:
+                return 0, 0
+            selected = len(rows)
+
+            # Ledger first: only appointments this run claimed are notified
+            dispatches = cls.claim(kind, rows)
+            claimed = {dispatch.appointment_id for dispatch in dispatches}
+            rows = [row for row in rows if row['id'] in claimed]
+
+            notifications = NotificationService.dispatch([
+                {
+                    'recipient_id': row['patient_id'],
+                    'message': cls.message(row, now),
+                    'notification_type': 'APPOINTMENT',
+                    'metadata': {'appointment_id': row['id'], 'reminder_kind': kind},
+                }
+                for row in rows
+            ], push=False)
+
+            by_appointment = {n.metadata['appointment_id']: n for n in notifications}
+            for dispatch in dispatches:
+                dispatch.notification = by_appointment.get(dispatch.appointment_id)
+            ReminderDispatch.objects.bulk_update(dispatches, ['notification'])
+
+            transaction.on_commit(lambda: NotificationService.push(notifications))
+
+        return selected, len(rows)
+
+    @staticmethod
+    def claim(kind, rows):
+        """
+        Insert the ledger rows of a batch. The anti-join in due() can miss a
+        reminder another run committed after it started, which the unique
+        constraint then rejects: those appointments are dropped and the rest
+        inserted again. Returns the inserted ReminderDispatch rows.
+        """
+        dispatches = [ReminderDispatch(appointment_id=row['id'], reminder_kind=kind) for row in rows]
+        while dispatches:
+            try:
+                with transaction.atomic():
+                    return ReminderDispatch.objects.bulk_create(dispatches)
+            except IntegrityError:
+                sent = set(
+                    ReminderDispatch.objects.filter(
+                        appointment_id__in=[dispatch.appointment_id for dispatch in dispatches],
+                        reminder_kind=kind,
+                    ).values_list('appointment_id', flat=True)
+                )
+                dispatches = [dispatch for dispatch in dispatches if dispatch.appointment_id not in sent]
+        return []
+
+    @classmethod
+    def send_due(cls, max_offset=None, now=None):
+        """
+        Send every due reminder, batch by batch. Safe to run as often as
+        needed. Returns {kind: reminders sent}.
+        """
+        now = now or timezone.now()
+        return {
+            kind: cls.send_range(kind, now + lower, now + upper, now)
+            for kind, lower, upper in cls.windows(max_offset)
+        }
+
+    @classmethod
+    def send_range(cls, kind, start, end, now=None):
+        """Send every due `kind` reminder in (start, end]. Returns the number sent."""
+        sent = 0
+        while True:
+            selected, count = cls.send_batch(kind, start, end, now)
+            sent += count
+            if selected < cls.batch_size():
+                return sent
+
+    # ---------------- SHARDING ----------------
+    @staticmethod
+    def shard_count():
+        return getattr(settings, 'APPOINTMENT_REMINDER_SHARDS', 4)
+
+    @classmethod
+    def shards(cls, max_offset=None, now=None, count=None):
+        """
+        (kind, start, end) time slices: every kind window split into `count`
+        equal, contiguous (start, end] ranges
+        """
+        now = now or timezone.now()
+        count = max(1, count or cls.shard_count())
+        shards = []
+        for kind, lower, upper in cls.windows(max_offset):
+            step = (upper - lower) / count
+            for index in range(count):
+                start = now + lower + step * index
+                end = now + upper if index == count - 1 else start + step
+                shards.append((kind, start, end))
+        return shards
+
+    @classmethod
+    def send_shard(cls, kind, start, end):
+        """
+        Run one shard; start and end are ISO strings when called from a
+        task. A shard that starts late skips the part of its range that is
+        already in the past: those appointments have begun.
+        """
+        if isinstance(start, str):
+            start, end = datetime.fromisoformat(start), datetime.fromisoformat(end)
+        start = max(start, timezone.now())
+        started = time.monotonic()
+        sent = cls.send_range(kind, start, end) if start < end else 0
+        return {'kind': kind, 'sent': sent, 'seconds': round(time.monotonic() - started, 3)}
+
+    @classmethod
+    def send_sharded(cls, max_offset=None, now=None, count=None):
+        """
+        Queue the shards as a chord, so they run in parallel on any worker,
+        with record_run as the callback. Overlapping runs are safe: the
+        batches lock their rows with SKIP LOCKED. Returns the chord result.
+        """
+        from celery import chord
+        from ..tasks import send_reminder_shard_task, record_reminder_run_task
+
+        shards = cls.shards(max_offset, now, count)
+        header = [
+            send_reminder_shard_task.s(kind, start.isoformat(), end.isoformat())
+            for kind, start, end in shards
+        ]
+        return chord(header)(record_reminder_run_task.s(timezone.now().isoformat()))
+
+    @classmethod
+    def record_run(cls, results, started_at):
+        """Summarise the shard results of one run and store them as a ReminderRun"""
+        if isinstance(started_at, str):
+            started_at = datetime.fromisoformat(started_at)
+        finished_at = timezone.now()
+
+        sent = {}
+        for result in results:
+            sent[result['kind']] = sent.get(result['kind'], 0) + result['sent']
+
+        run = ReminderRun.objects.create(
+            started_at=started_at,
+            finished_at=finished_at,
+            duration_seconds=round((finished_at - started_at).total_seconds(), 3),
+            slowest_shard_seconds=max((result['seconds'] for result in results), default=0),
+            shards=len(results),
+            sent=sent,
+        )
+        ReminderRun.objects.filter(finished_at__lt=finished_at - timedelta(days=cls.run_retention_days())).delete()
+
+        metrics = cls.run_metrics(run)
+        logger.info(f"Appointment reminder run finished: {metrics}")
+        return metrics
+
+    @staticmethod
+    def run_retention_days():
+        return getattr(settings, 'APPOINTMENT_REMINDER_RUN_RETENTION_DAYS', 30)
+
+    @staticmethod
+    def run_metrics(run):
+        return {
+            'started_at': run.started_at.isoformat(),
+            'finished_at': run.finished_at.isoformat(),
+            'duration_seconds': run.duration_seconds,
+            'slowest_shard_seconds': run.slowest_shard_seconds,
+            'shards': run.shards,
+            'sent': run.sent,
+        }
+
+    @classmethod
+    def last_run(cls):
+        """Metrics of the latest sharded run, or None"""
+        run = ReminderRun.objects.first()
+        return cls.run_metrics(run) if run else None
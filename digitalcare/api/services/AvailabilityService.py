@@ -0,0 +1,235 @@
+# api/services/AvailabilityService.py
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
+from ..models import DoctorAvailability, Shift
+from ..utils import ShiftValidator
+from .LocationService import LocationService
+
+
+class AvailabilityService:
+    """
+    Maintains the DoctorAvailability index (one free-slot bitmap per doctor,
+    facility and day over the next AVAILABILITY_HORIZON_DAYS) and answers
+    "earliest openings" searches from it, so a search reads a handful of
+    index rows instead of computing slots for every doctor.
+    """
+
+    REFRESH_KEY = 'availability_refresh:{}'
+    # Seconds to wait before rebuilding after a shift change
+    REFRESH_DELAY = 2
+
+    @staticmethod
+    def slot_minutes():
+        minutes = getattr(settings, 'AVAILABILITY_SLOT_MINUTES', 30)
+        if minutes < 5:
+            raise ImproperlyConfigured("AVAILABILITY_SLOT_MINUTES must be at least 5.")
+        return minutes
+
+    @staticmethod
+    def horizon_days():
+        return getattr(settings, 'AVAILABILITY_HORIZON_DAYS', 28)
+
+    @classmethod
+    def horizon(cls):
+        today = timezone.localdate()
+        return [today + timedelta(days=offset) for offset in range(cls.horizon_days())]
+
+    # ---------------- BITMAPS ----------------
+    @staticmethod
+    def midnight(date):
+        return timezone.make_aware(datetime.combine(date, datetime.min.time()))
+
+    @classmethod
+    def slot_starts(cls, row, slots_needed=1, not_before=None):
+        """Start times encoded in a row's bitmap with slots_needed free slots in a row"""
+        mask = free = row.mask
+        for shift in range(1, slots_needed):
+            mask &= free >> shift
+
+        midnight = cls.midnight(row.date)
+        step = timedelta(minutes=row.slot_minutes)
+        index = 0
+        while mask:
+            if mask & 1:
+                start = midnight + index * step
+                if not not_before or start >= not_before:
+                    yield start
+            mask >>= 1
+            index += 1
+
+    # ---------------- MAINTENANCE ----------------
+    @classmethod
+    def refresh(cls, doctor_ids, dates=None):
+        """
+        Rebuild the rows of these doctors on these dates (default: the
+        whole horizon). Dates outside the horizon are ignored.
+        Returns the number of rows written.
+        """
+        horizon = cls.horizon()
+        dates = sorted(set(dates or horizon) & set(horizon))
+        doctor_ids = list(doctor_ids)
+        if not dates or not doctor_ids:
+            return 0
+
+        minutes = cls.slot_minutes()
+        openings = ShiftValidator.get_openings(
+            doctor_ids, dates[0], days=(dates[-1] - dates[0]).days + 1,
+            slot_duration=minutes, align_to_day=True
+        )
+
+        wanted = set(dates)
+        rows, masks = {}, {}
+        for opening in openings:
+            date = timezone.localtime(opening['start']).date()
+            if date not in wanted:
+                continue
+            key = (opening['doctor_id'], opening['facility_id'], date)
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = DoctorAvailability(
+                    doctor_id=key[0], facility_id=key[1], date=date,
+                    slot_minutes=minutes, free_count=0,
+                    first_free_at=opening['start'],
+                )
+            index = int((opening['start'] - cls.midnight(date)) / timedelta(minutes=minutes))
+            masks[key] = masks.get(key, 0) | 1 << index
+            row.free_count += 1
+            row.first_free_at = min(row.first_free_at, opening['start'])
+
+        refreshed_at = timezone.now()
+        for key, row in rows.items():
+            row.free_mask = masks[key].to_bytes((masks[key].bit_length() + 7) // 8, 'little')
+            row.updated_at = refreshed_at
+
+        with transaction.atomic():
+            DoctorAvailability.objects.bulk_create(
+                rows.values(),
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=['doctor', 'facility', 'date'],
+                update_fields=['slot_minutes', 'free_mask', 'free_count', 'first_free_at', 'updated_at'],
+            )
+            # Whatever this refresh did not rewrite is fully booked or off shift
+            DoctorAvailability.objects.filter(
+                doctor_id__in=doctor_ids, date__in=dates, updated_at__lt=refreshed_at
+            ).delete()
+
+        return len(rows)
+
+    @classmethod
+    def rebuild(cls, chunk_size=200):
+        """Drop past days and rebuild the horizon for every doctor with shifts"""
+        DoctorAvailability.objects.filter(date__lt=timezone.localdate()).delete()
+
+        doctor_ids = list(
+            Shift.objects.filter(is_active=True, doctor__isnull=False)
+            .values_list('doctor_id', flat=True).distinct().order_by('doctor_id')
+        )
+        DoctorAvailability.objects.exclude(doctor_id__in=doctor_ids).delete()
+
+        rows = 0
+        for offset in range(0, len(doctor_ids), chunk_size):
+            rows += cls.refresh(doctor_ids[offset:offset + chunk_size])
+        return rows
+
+    @classmethod
+    def record_shift_change(cls, *doctor_ids):
+        """A shift changed: rebuild its doctors' horizon in the background"""
+        for doctor_id in {doctor_id for doctor_id in doctor_ids if doctor_id}:
+            transaction.on_commit(lambda doctor_id=doctor_id: cls.queue_refresh(doctor_id))
+
+    @classmethod
+    def queue_refresh(cls, doctor_id):
+        """
+        Queue one delayed refresh per doctor, so a burst of shift changes
+        (a rota upload, a cascade delete) rebuilds the horizon only once.
+        The key lives no longer than the task's countdown: every change
+        deduplicated by it committed before the queued task starts reading,
+        even when the worker cannot clear it (a per-process cache).
+        """
+        from ..tasks import refresh_doctor_availability_task
+
+        if cache.add(cls.REFRESH_KEY.format(doctor_id), 1, timeout=cls.REFRESH_DELAY):
+            refresh_doctor_availability_task.apply_async((doctor_id,), countdown=cls.REFRESH_DELAY)
+
+    @classmethod
+    def refresh_doctor(cls, doctor_id, dates=None):
+        """Rebuild one doctor's horizon, or only `dates` (ISO strings)"""
+        if dates is None:
+            cache.delete(cls.REFRESH_KEY.format(doctor_id))
+            return cls.refresh([doctor_id])
+        return cls.refresh([doctor_id], [datetime.fromisoformat(value).date() for value in dates])
+
+    @classmethod
+    def record_appointment_change(cls, *bookings):
+        """
+        An appointment was booked, moved or released: queue a rebuild of
+        the affected doctor days once the transaction commits, without the
+        shift-change delay so the next search soon sees it.
+        bookings are (doctor_id, scheduled_at, duration_minutes) tuples.
+        """
+        from ..tasks import refresh_doctor_availability_task
+
+        days = {}
+        for doctor_id, scheduled_at, duration in bookings:
+            if not doctor_id or not scheduled_at:
+                continue
+            end = scheduled_at + timedelta(minutes=duration or 0)
+            days.setdefault(doctor_id, set()).update({
+                timezone.localtime(scheduled_at).date(), timezone.localtime(end).date()
+            })
+
+        for doctor_id, dates in days.items():
+            dates = sorted(value.isoformat() for value in dates)
+            transaction.on_commit(
+                lambda doctor_id=doctor_id, dates=dates: refresh_doctor_availability_task.delay(doctor_id, dates)
+            )
+
+    # ---------------- SEARCH ----------------
+    @classmethod
+    def earliest_openings(cls, limit=10, specialty=None, facility_id=None, latitude=None,
+                          longitude=None, radius_km=10, duration=None, not_before=None):
+        """
+        The earliest `limit` openings across doctors, optionally filtered by
+        specialty, facility and distance from (latitude, longitude).
+
+        Rows are read in first_free_at order: every opening of a row starts
+        at or after its first_free_at, so reading stops once the collected
+        openings all come before the next row's first_free_at.
+        """
+        not_before = not_before or timezone.now()
+        rows = DoctorAvailability.objects.filter(
+            date__gte=timezone.localtime(not_before).date(),
+            doctor__is_active=True,
+        ).select_related('doctor', 'facility').order_by('first_free_at', 'id')
+
+        if specialty:
+            rows = rows.filter(doctor__specialty__icontains=specialty)
+        if facility_id:
+            rows = rows.filter(facility_id=facility_id)
+        if latitude is not None and longitude is not None:
+            nearby = LocationService.get_nearby_facilities(latitude, longitude, radius_km, 'clinic')
+            rows = rows.filter(facility_id__in=nearby.values('id'))
+
+        openings = []
+        for row in rows.iterator(chunk_size=max(limit, 20)):
+            if len(openings) >= limit and row.first_free_at >= openings[limit - 1]['start']:
+                break
+
+            slots_needed = -(-(duration or row.slot_minutes) // row.slot_minutes)
+            step = timedelta(minutes=row.slot_minutes)
+            for start in cls.slot_starts(row, slots_needed, not_before):
+                openings.append({
+                    'doctor': row.doctor,
+                    'facility': row.facility,
+                    'start': start,
+                    'end': start + (timedelta(minutes=duration) if duration else step),
+                })
+            openings.sort(key=lambda opening: (opening['start'], opening['doctor'].id))
+            del openings[limit:]
+
+        return openings
@@ -0,0 +1,256 @@
+# api/services/CalendarService.py
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core import signing
+from django.db.models import Count, F, Max
+from django.utils import timezone
+from ..models import Appointment, Shift, User
+
+
+class CalendarService:
+    """
+    Schedules of a doctor or a facility over a date range: appointments
+    from one indexed range query plus weekly shifts expanded into concrete
+    occurrences, as JSON events or an iCalendar stream.
+    """
+
+    MAX_RANGE_DAYS = 92
+    FEED_SALT = 'calendar-feed'
+
+    # ---------------- ACCESS ----------------
+    @staticmethod
+    def can_view(user, doctor=None, facility=None):
+        """Admins see everything, facility admins their facility, doctors themselves"""
+        if not user or not user.is_active:
+            return False
+        if user.is_superuser or user.role == 'admin':
+            return True
+        if facility is not None:
+            return user.role == 'facility_admin' and facility.admin_id == user.id
+        if doctor is not None:
+            return doctor.user_id == user.id
+        return False
+
+    @staticmethod
+    def feed_max_age():
+        """Seconds a feed URL stays valid"""
+        return getattr(settings, 'CALENDAR_FEED_TOKEN_MAX_AGE', 180 * 24 * 3600)
+
+    @classmethod
+    def feed_token(cls, user, doctor=None, facility=None):
+        """
+        Signed token for subscribing calendar apps, which cannot send a JWT.
+        Expires after CALENDAR_FEED_TOKEN_MAX_AGE and is revoked, with every
+        other feed token of the user, by revoke_feed_tokens.
+        """
+        return signing.dumps({
+            'user': user.id,
+            'version': user.calendar_feed_version,
+            'doctor': doctor.id if doctor else None,
+            'facility': facility.id if facility else None,
+        }, salt=cls.FEED_SALT)
+
+    @classmethod
+    def read_feed_token(cls, token):
+        """(user, token data) of a valid feed token; raises ValueError otherwise"""
+        try:
+            data = signing.loads(token, salt=cls.FEED_SALT, max_age=cls.feed_max_age())
+        except signing.SignatureExpired:
+            raise ValueError("Calendar feed token has expired.")
+        except signing.BadSignature:
+            raise ValueError("Invalid calendar feed token.")
+
+        user = User.objects.filter(id=data['user']).first()
+        if user is None or data.get('version') != user.calendar_feed_version:
+            raise ValueError("Calendar feed token has been revoked.")
+        return user, data
+
+    @staticmethod
+    def revoke_feed_tokens(user):
+        User.objects.filter(id=user.id).update(calendar_feed_version=F('calendar_feed_version') + 1)
+        user.refresh_from_db(fields=['calendar_feed_version'])
+
+    # ---------------- QUERIES ----------------
+    @staticmethod
+    def bounds(start_date, end_date):
+        """Aware datetimes for the inclusive date range"""
+        start = timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
+        return start, start + timedelta(days=(end_date - start_date).days + 1)
+
+    @classmethod
+    def appointments(cls, start_date, end_date, doctor=None, facility=None):
+        start, end = cls.bounds(start_date, end_date)
+        # Served by the (doctor, scheduled_at) / (facility, scheduled_at) indexes
+        appointments = Appointment.objects.filter(scheduled_at__gte=start, scheduled_at__lt=end)
+        if doctor is not None:
+            appointments = appointments.filter(doctor=doctor)
+        if facility is not None:
+            appointments = appointments.filter(facility=facility)
+        return appointments.select_related('patient', 'doctor', 'facility').order_by('scheduled_at', 'id')
+
+    @classmethod
+    def shifts(cls, doctor=None, facility=None):
+        shifts = Shift.objects.filter(is_active=True, doctor__isnull=False)
+        if doctor is not None:
+            shifts = shifts.filter(doctor=doctor)
+        if facility is not None:
+            shifts = shifts.filter(facility=facility)
+        return shifts.select_related('doctor', 'facility')
+
+    @classmethod
+    def shift_occurrences(cls, start_date, end_date, doctor=None, facility=None):
+        """(shift, start, end) for every day in the range, in time order"""
+        by_day = {}
+        for shift in cls.shifts(doctor, facility):
+            by_day.setdefault(shift.day_of_week, []).append(shift)
+
+        occurrences = []
+        for offset in range((end_date - start_date).days + 1):
+            date = start_date + timedelta(days=offset)
+            for shift in by_day.get(date.weekday(), []):
+                occurrences.append((
+                    shift,
+                    timezone.make_aware(datetime.combine(date, shift.start_time)),
+                    timezone.make_aware(datetime.combine(date, shift.end_time)),
+                ))
+        occurrences.sort(key=lambda occurrence: (occurrence[1], occurrence[0].id))
+        return occurrences
+
+    @staticmethod
+    def doctor_name(doctor):
+        return f"Dr. {doctor.first_name} {doctor.last_name}" if doctor else None
+
+    @staticmethod
+    def patient_name(patient):
+        return patient.get_full_name() or patient.username
+
+    @classmethod
+    def events(cls, start_date, end_date, doctor=None, facility=None):
+        """JSON-ready appointments and shift occurrences, in start time order"""
+        events = [
+            {
+                'type': 'appointment',
+                'id': appointment.id,
+                'start': appointment.scheduled_at,
+                'end': appointment.ends_at or appointment.scheduled_at + timedelta(minutes=appointment.duration_minutes),
+                'status': appointment.status,
+                'appointment_type': appointment.appointment_type,
+                'doctor_id': appointment.doctor_id,
+                'doctor': cls.doctor_name(appointment.doctor),
+                'facility_id': appointment.facility_id,
+                'facility': appointment.facility.name if appointment.facility else None,
+                'patient_id': appointment.patient_id,
+                'patient': cls.patient_name(appointment.patient),
+            }
+            for appointment in cls.appointments(start_date, end_date, doctor, facility)
+        ]
+        events += [
+            {
+                'type': 'shift',
+                'id': shift.id,
+                'start': start,
+                'end': end,
+                'doctor_id': shift.doctor_id,
+                'doctor': cls.doctor_name(shift.doctor),
+                'facility_id': shift.facility_id,
+                'facility': shift.facility.name,
+            }
+            for shift, start, end in cls.shift_occurrences(start_date, end_date, doctor, facility)
+        ]
+        events.sort(key=lambda event: (event['start'], event['type'], event['id']))
+        return events
+
+    @classmethod
+    def etag(cls, start_date, end_date, doctor=None, facility=None):
+        """Changes whenever an appointment or shift in scope is added, edited or removed"""
+        appointments = cls.appointments(start_date, end_date, doctor, facility).order_by()
+        state = [
+            start_date, end_date,
+            doctor.id if doctor else None, facility.id if facility else None,
+            *appointments.aggregate(count=Count('id'), changed=Max('updated_at')).values(),
+            *cls.shifts(doctor, facility).order_by().aggregate(count=Count('id'), changed=Max('updated_at')).values(),
+        ]
+        return hashlib.md5(repr(state).encode()).hexdigest()
+
+    # ---------------- ICALENDAR ----------------
+    @staticmethod
+    def ics_escape(text):
+        return (
+            str(text).replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\n', '\\n')
+        )
+
+    @staticmethod
+    def ics_time(value):
+        return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+    @staticmethod
+    def ics_line(line):
+        """Fold content lines longer than 75 octets (RFC 5545 3.1)"""
+        data = line.encode()
+        chunks = []
+        while len(data) > (74 if chunks else 75):
+            # Continuation lines start with a space
+            cut = 74 if chunks else 75
+            # Do not split a multi-byte character
+            while cut and (data[cut] & 0xC0) == 0x80:
+                cut -= 1
+            chunks.append(data[:cut])
+            data = data[cut:]
+        chunks.append(data)
+        return b'\r\n '.join(chunks) + b'\r\n'
+
+    @classmethod
+    def ics_event(cls, uid, start, end, summary, stamp, status=None, location=None):
+        lines = [
+            'BEGIN:VEVENT',
+            f'UID:{uid}',
+            f'DTSTAMP:{cls.ics_time(stamp)}',
+            f'DTSTART:{cls.ics_time(start)}',
+            f'DTEND:{cls.ics_time(end)}',
+            f'SUMMARY:{cls.ics_escape(summary)}',
+        ]
+        if location:
+            lines.append(f'LOCATION:{cls.ics_escape(location)}')
+        if status:
+            lines.append(f'STATUS:{status}')
+        lines.append('END:VEVENT')
+        return b''.join(cls.ics_line(line) for line in lines)
+
+    @classmethod
+    def ics_stream(cls, start_date, end_date, doctor=None, facility=None):
+        """Yield the calendar piece by piece; appointments are read in chunks"""
+        yield cls.ics_line('BEGIN:VCALENDAR')
+        yield cls.ics_line('VERSION:2.0')
+        yield cls.ics_line('PRODID:-//DigitalCare//Schedule//EN')
+        yield cls.ics_line('CALSCALE:GREGORIAN')
+
+        statuses = {
+            Appointment.PENDING: 'TENTATIVE',
+            Appointment.CONFIRMED: 'CONFIRMED',
+            Appointment.CANCELLED: 'CANCELLED',
+        }
+        for appointment in cls.appointments(start_date, end_date, doctor, facility).iterator(chunk_size=500):
+            who = cls.patient_name(appointment.patient) if doctor else cls.doctor_name(appointment.doctor)
+            yield cls.ics_event(
+                uid=f'appointment-{appointment.id}@digitalcare',
+                start=appointment.scheduled_at,
+                end=appointment.ends_at or appointment.scheduled_at + timedelta(minutes=appointment.duration_minutes),
+                summary=f'Appointment: {who}',
+                stamp=appointment.updated_at,
+                status=statuses.get(appointment.status),
+                location=appointment.facility.name if appointment.facility else None,
+            )
+
+        for shift, start, end in cls.shift_occurrences(start_date, end_date, doctor, facility):
+            yield cls.ics_event(
+                uid=f'shift-{shift.id}-{start.date().isoformat()}@digitalcare',
+                start=start,
+                end=end,
+                summary=f'Shift: {cls.doctor_name(shift.doctor)}',
+                stamp=shift.updated_at,
+                location=shift.facility.name,
+            )
+
+        yield cls.ics_line('END:VCALENDAR')
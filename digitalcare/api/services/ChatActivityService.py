@@ -0,0 +1,98 @@
+# api/services/ChatActivityService.py
+import logging
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
+from ..models import ChatRoom
+
+logger = logging.getLogger(__name__)
+
+
+class ChatActivityService:
+    """
+    Moves ChatRoom.last_message_at forward when messages are created,
+    without locking the room row on every message.
+
+    Writes are monotonic (GREATEST), run after the message transaction
+    commits, and with CHAT_ROOM_ACTIVITY_REDIS_URL set are coalesced to at
+    most one room UPDATE per CHAT_ROOM_ACTIVITY_INTERVAL seconds.
+    """
+
+    VALUE_KEY = 'chat_room_activity:{}'
+    LOCK_KEY = 'chat_room_activity_lock:{}'
+
+    # SET that only ever moves the stored timestamp forward: commits of
+    # concurrent messages reach schedule() in no particular order.
+    SET_MAX_SCRIPT = """
+    local current = tonumber(redis.call('GET', KEYS[1]))
+    if current and current >= tonumber(ARGV[1]) then
+        redis.call('EXPIRE', KEYS[1], ARGV[2])
+        return 0
+    end
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    return 1
+    """
+
+    _redis = None
+
+    @staticmethod
+    def interval():
+        return getattr(settings, 'CHAT_ROOM_ACTIVITY_INTERVAL', 1)
+
+    @classmethod
+    def redis(cls):
+        url = getattr(settings, 'CHAT_ROOM_ACTIVITY_REDIS_URL', None)
+        if not url:
+            return None
+        if cls._redis is None:
+            import redis
+            cls._redis = redis.Redis.from_url(url)
+        return cls._redis
+
+    @classmethod
+    def record(cls, room_id, at):
+        """Register activity in a room at `at`, applied after commit"""
+        transaction.on_commit(lambda: cls.schedule(room_id, at))
+
+    @classmethod
+    def schedule(cls, room_id, at):
+        client = cls.redis()
+        if client is None:
+            cls.apply(room_id, at)
+            return
+
+        from ..tasks import flush_chat_room_activity_task
+
+        try:
+            # Store the value first, then try to own the flush: the flusher
+            # releases the lock before reading, so no update falls in between.
+            client.eval(cls.SET_MAX_SCRIPT, 1, cls.VALUE_KEY.format(room_id), at.timestamp(), cls.interval() * 60)
+            if client.set(cls.LOCK_KEY.format(room_id), 1, nx=True, ex=cls.interval() * 5):
+                flush_chat_room_activity_task.apply_async((room_id,), countdown=cls.interval())
+        except Exception as e:
+            logger.warning(f"Coalescing unavailable for room {room_id}, writing directly: {str(e)}")
+            cls.apply(room_id, at)
+
+    @classmethod
+    def flush(cls, room_id):
+        """Apply the latest coalesced activity time for a room"""
+        client = cls.redis()
+        if client is None:
+            return False
+
+        client.delete(cls.LOCK_KEY.format(room_id))
+        value = client.getdel(cls.VALUE_KEY.format(room_id))
+        if value is None:
+            return False
+
+        cls.apply(room_id, datetime.fromtimestamp(float(value), tz=dt_timezone.utc))
+        return True
+
+    @staticmethod
+    def apply(room_id, at):
+        """Monotonic update: never moves last_message_at backwards"""
+        return ChatRoom.objects.filter(id=room_id).update(
+            last_message_at=Greatest(Coalesce(F('last_message_at'), Value(at)), Value(at))
+        )
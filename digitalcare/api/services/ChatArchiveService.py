@@ -0,0 +1,169 @@
+# api/services/ChatArchiveService.py
+import json
+import zlib
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from ..models import ChatRoom, ChatArchive, ChatNotification, Message, User
+
+logger = logging.getLogger(__name__)
+
+
+class ChatArchiveService:
+    """
+    Moves the messages of long-closed rooms out of the hot Message table into
+    one compressed ChatArchive row, and rehydrates them for history reads.
+    """
+
+    # Message columns kept in the archive (search_vector is rebuilt on restore)
+    FIELDS = [
+        'id', 'sender_id', 'content', 'message_type',
+        'attachment', 'attachment_name', 'attachment_content_type', 'attachment_size',
+        'thumbnail', 'preview',
+        'is_read', 'read_at', 'is_edited', 'edited_at', 'created_at', 'updated_at',
+    ]
+    DATETIME_FIELDS = ['read_at', 'edited_at', 'created_at', 'updated_at']
+
+    @staticmethod
+    def archive_after_days():
+        return getattr(settings, 'CHAT_ARCHIVE_AFTER_DAYS', 30)
+
+    # ---------------- PACKING ----------------
+    @classmethod
+    def pack(cls, rows):
+        # isoformat() rather than DjangoJSONEncoder, which drops microseconds
+        return zlib.compress(json.dumps(rows, default=lambda value: value.isoformat()).encode(), 9)
+
+    @classmethod
+    def unpack(cls, payload):
+        rows = json.loads(zlib.decompress(bytes(payload)))
+        for row in rows:
+            for field in cls.DATETIME_FIELDS:
+                if row.get(field):
+                    row[field] = parse_datetime(row[field])
+        return rows
+
+    @staticmethod
+    def summary(rows, participant_ids, usernames):
+        """
+        (last_message, unread_counts) of archived rows for the room list:
+        unread counts are per participant, of messages the others sent
+        """
+        last = rows[-1] if rows else None
+        last_message = last and {
+            'content': last['content'],
+            'sender_username': usernames.get(last['sender_id']),
+            'created_at': last['created_at'].isoformat(),
+            'message_type': last['message_type'],
+        }
+        unread_counts = {
+            str(user_id): sum(1 for row in rows if not row['is_read'] and row['sender_id'] != user_id)
+            for user_id in participant_ids
+        }
+        return last_message, unread_counts
+
+    # ---------------- ARCHIVAL ----------------
+    @classmethod
+    def eligible_rooms(cls, days=None):
+        cutoff = timezone.now() - timedelta(days=days or cls.archive_after_days())
+        return ChatRoom.objects.annotate(
+            last_activity=Coalesce('last_message_at', 'updated_at')
+        ).filter(status=ChatRoom.CLOSED, last_activity__lt=cutoff)
+
+    @classmethod
+    def archive_room(cls, room_id):
+        """Compact one closed room. Returns the number of archived messages."""
+        with transaction.atomic():
+            room = ChatRoom.objects.select_for_update().get(id=room_id)
+            if room.status != ChatRoom.CLOSED:
+                return 0
+
+            messages = Message.objects.filter(chat_room=room).order_by('id')
+            rows = list(messages.values(*cls.FIELDS))
+            usernames = dict(
+                User.objects.filter(id__in={row['sender_id'] for row in rows[-1:]}).values_list('id', 'username')
+            )
+            last_message, unread_counts = cls.summary(rows, [room.patient_id, room.doctor_id], usernames)
+
+            ChatArchive.objects.create(
+                chat_room=room,
+                payload=cls.pack(rows),
+                message_count=len(rows),
+                first_message_at=rows[0]['created_at'] if rows else None,
+                last_message_at=rows[-1]['created_at'] if rows else None,
+                last_message=last_message,
+                unread_counts=unread_counts,
+            )
+
+            # Keep chat notifications, only drop their link to the hot row
+            ChatNotification.objects.filter(message__chat_room=room).update(message=None)
+            messages.delete()
+
+            ChatRoom.objects.filter(id=room.id).update(status=ChatRoom.ARCHIVED)
+
+        return len(rows)
+
+    @classmethod
+    def archive_closed_rooms(cls, days=None, limit=None):
+        """Archive up to `limit` eligible rooms. Returns (rooms, messages)."""
+        limit = limit or getattr(settings, 'CHAT_ARCHIVE_BATCH_ROOMS', 100)
+        room_ids = list(cls.eligible_rooms(days).order_by('id').values_list('id', flat=True)[:limit])
+
+        archived_messages = 0
+        for room_id in room_ids:
+            try:
+                archived_messages += cls.archive_room(room_id)
+            except Exception as e:
+                logger.error(f"Error archiving chat room {room_id}: {str(e)}")
+        return len(room_ids), archived_messages
+
+    # ---------------- REHYDRATION ----------------
+    @classmethod
+    def archived_messages(cls, room):
+        """
+        Unsaved Message instances rebuilt from the archive, oldest first,
+        with senders attached in one query so serializers work unchanged.
+        """
+        try:
+            archive = room.archive
+        except ChatArchive.DoesNotExist:
+            return []
+
+        rows = cls.unpack(archive.payload)
+        senders = User.objects.in_bulk({row['sender_id'] for row in rows})
+
+        messages = []
+        for row in rows:
+            message = Message(chat_room=room, **row)
+            message._state.adding = False
+            message.sender = senders.get(row['sender_id'])
+            messages.append(message)
+        return messages
+
+    @classmethod
+    def room_messages(cls, room):
+        """History for a room, from the hot table or its archive"""
+        if room.status == ChatRoom.ARCHIVED:
+            return cls.archived_messages(room)
+        return room.messages.all()
+
+    @classmethod
+    def restore_room(cls, room_id):
+        """Move an archive back into the Message table (e.g. to reopen a chat)"""
+        with transaction.atomic():
+            room = ChatRoom.objects.select_for_update().get(id=room_id)
+            messages = cls.archived_messages(room)
+            timestamps = [(m.created_at, m.updated_at) for m in messages]
+            Message.objects.bulk_create(messages, batch_size=1000)
+
+            # bulk_create applies auto_now(_add); put the original times back
+            for message, (created_at, updated_at) in zip(messages, timestamps):
+                message.created_at, message.updated_at = created_at, updated_at
+            Message.objects.bulk_update(messages, ['created_at', 'updated_at'], batch_size=1000)
+            ChatArchive.objects.filter(chat_room=room).delete()
+            ChatRoom.objects.filter(id=room.id).update(status=ChatRoom.CLOSED)
+        return len(messages)
@@ -0,0 +1,211 @@
+# api/services/ChatAttachmentService.py
+import io
+import os
+import uuid
+import logging
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.db import transaction
+from ..models import ChatRoom, Message
+from ..utils import get_attachment_provider
+
+logger = logging.getLogger(__name__)
+
+
+class ChatAttachmentService:
+    """
+    Direct-to-storage chat attachments.
+
+    1. issue_ticket: validate the file metadata and return a signed ticket
+       plus provider-specific upload instructions.
+    2. The client uploads the bytes straight to storage.
+    3. confirm: verify the ticket and the stored object's real size and
+       type, create the Message and queue thumbnail/preview generation for
+       images.
+    """
+
+    TICKET_SALT = 'chat-attachment-upload'
+
+    # Rendition field -> (setting, default longest side in px)
+    RENDITIONS = {
+        'thumbnail': ('CHAT_THUMBNAIL_SIZE', 320),
+        'preview': ('CHAT_PREVIEW_SIZE', 1280),
+    }
+
+    @staticmethod
+    def ticket_ttl():
+        return getattr(settings, 'CHAT_ATTACHMENT_TICKET_TTL', 900)
+
+    @staticmethod
+    def max_size():
+        return getattr(settings, 'CHAT_ATTACHMENT_MAX_SIZE', 25 * 1024 * 1024)
+
+    # ---------------- TICKETS ----------------
+    @classmethod
+    def issue_ticket(cls, user, chat_room, filename, content_type, size):
+        if size > cls.max_size():
+            raise ValueError(f"Attachments are limited to {cls.max_size() // (1024 * 1024)} MB.")
+
+        provider = get_attachment_provider()
+        extension = os.path.splitext(filename)[1].lower()
+        name = provider.storage_name(
+            f'chat_attachments/{chat_room.id}/{uuid.uuid4().hex}{extension}', content_type
+        )
+
+        ticket = signing.dumps({
+            'user': user.id,
+            'room': chat_room.id,
+            'name': name,
+            'filename': filename,
+            'content_type': content_type,
+            'size': size,
+        }, salt=cls.TICKET_SALT)
+
+        return {
+            'ticket': ticket,
+            'expires_in': cls.ticket_ttl(),
+            'upload': provider.upload_instructions(name, content_type, cls.ticket_ttl()),
+        }
+
+    @classmethod
+    def read_ticket(cls, ticket, user, chat_room):
+        try:
+            data = signing.loads(ticket, salt=cls.TICKET_SALT, max_age=cls.ticket_ttl())
+        except signing.SignatureExpired:
+            raise ValueError("Upload ticket has expired.")
+        except signing.BadSignature:
+            raise ValueError("Invalid upload ticket.")
+
+        if data['user'] != user.id or data['room'] != chat_room.id:
+            raise ValueError("Upload ticket does not belong to this chat.")
+        return data
+
+    @classmethod
+    def verify_upload(cls, provider, data):
+        """
+        Metadata of the stored object, checked against the ticket: the
+        client declared size and type when asking for it, but uploaded
+        whatever it liked.
+        """
+        if not provider.exists(data['name']):
+            raise ValueError("Attachment has not been uploaded yet.")
+
+        stored = provider.metadata(data['name'])
+        if stored['size'] is None or stored['size'] > cls.max_size() or stored['size'] != data['size']:
+            raise ValueError("Uploaded file does not match the declared size.")
+        if stored['content_type'] and stored['content_type'] != data['content_type']:
+            raise ValueError("Uploaded file does not match the declared type.")
+        return stored
+
+    @classmethod
+    def confirm(cls, ticket, user, chat_room, content=''):
+        """
+        Create the attachment message once the upload is in storage.
+        Returns (message, created): retried confirmations of a ticket return
+        the message created the first time, with created False.
+        """
+        data = cls.read_ticket(ticket, user, chat_room)
+        provider = get_attachment_provider()
+
+        with transaction.atomic():
+            # Serializes concurrent confirmations of the same ticket
+            ChatRoom.objects.select_for_update().filter(id=chat_room.id).first()
+            existing = Message.objects.filter(chat_room=chat_room, attachment=data['name']).first()
+            if existing:
+                return existing, False
+
+            try:
+                stored = cls.verify_upload(provider, data)
+            except ValueError:
+                # Nothing will point at a rejected upload: remove it
+                if provider.exists(data['name']):
+                    provider.delete(data['name'])
+                raise
+            content_type = stored['content_type'] or data['content_type']
+            is_image = content_type.startswith('image/')
+            message = Message.objects.create(
+                chat_room=chat_room,
+                sender=user,
+                content=content or '',
+                message_type='image' if is_image else 'file',
+                attachment=data['name'],
+                attachment_name=data['filename'],
+                attachment_content_type=content_type,
+                attachment_size=stored['size'],
+            )
+
+        if is_image:
+            cls.queue_renditions(message)
+        return message, True
+
+    # ---------------- RENDITIONS ----------------
+    @staticmethod
+    def queue_renditions(message):
+        from ..tasks import generate_attachment_renditions_task
+
+        transaction.on_commit(lambda: generate_attachment_renditions_task.delay(message.id))
+
+    @classmethod
+    def generate_renditions(cls, message):
+        """
+        Write JPEG thumbnail and preview renditions of an image attachment and
+        notify the chat room. Returns the updated field names.
+        """
+        from PIL import Image, ImageOps
+
+        with message.attachment.open('rb') as source:
+            original = Image.open(source)
+            largest = max(getattr(settings, s, d) for s, d in cls.RENDITIONS.values())
+            # Let the JPEG decoder downscale while reading instead of decoding full size
+            original.draft('RGB', (largest, largest))
+            original = ImageOps.exif_transpose(original)
+            if original.mode not in ('RGB', 'L'):
+                original = original.convert('RGB')
+
+            updated = {}
+            for field, (setting, default) in cls.RENDITIONS.items():
+                size = getattr(settings, setting, default)
+                image = original.copy()
+                image.thumbnail((size, size))
+
+                buffer = io.BytesIO()
+                image.save(buffer, format='JPEG', quality=80, optimize=True)
+                getattr(message, field).save(
+                    f'{message.chat_room_id}/{message.id}.jpg',
+                    ContentFile(buffer.getvalue()),
+                    save=False
+                )
+                updated[field] = getattr(message, field).name
+
+        # update() rather than save(): no auto_now bump or room timestamp update
+        Message.objects.filter(id=message.id).update(**updated)
+        cls.push_renditions(message)
+        return list(updated)
+
+    @staticmethod
+    def push_renditions(message):
+        from ..consumers import ChatConsumer, encode_event
+
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+
+        try:
+            async_to_sync(channel_layer.group_send)(
+                ChatConsumer.group_name(message.chat_room_id),
+                {
+                    'type': 'chat_message',
+                    'encoded': encode_event({
+                        'type': 'attachment_ready',
+                        'room_id': message.chat_room_id,
+                        'message_id': message.id,
+                        'thumbnail': message.thumbnail.url,
+                        'preview': message.preview.url,
+                    })
+                }
+            )
+        except Exception as e:
+            logger.error(f"Error pushing renditions for message {message.id}: {str(e)}")
@@ -0,0 +1,124 @@
+# api/services/DoctorSummaryService.py
+import logging
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+from ..models import Appointment, DoctorProfile
+from ..utils import get_zone
+from .NotificationService import NotificationService
+
+logger = logging.getLogger(__name__)
+
+
+class DoctorSummaryService:
+    """
+    Morning summary of the day's confirmed and pending appointments.
+
+    The job runs hourly and each run only covers doctors whose local time
+    is in the summary hour, so every time zone gets its summary in its own
+    morning and the work is spread over the day. Doctors are grouped by
+    local day, and each group is counted with one grouped query.
+    """
+
+    STATUSES = [Appointment.CONFIRMED, Appointment.PENDING]
+
+    @staticmethod
+    def summary_hour():
+        return getattr(settings, 'DOCTOR_SUMMARY_HOUR', 7)
+
+    @staticmethod
+    def day_bounds(zone, now):
+        """Aware start and end of the local day containing `now`"""
+        local_date = now.astimezone(zone).date()
+        start = datetime.combine(local_date, datetime.min.time(), tzinfo=zone)
+        end = datetime.combine(local_date + timedelta(days=1), datetime.min.time(), tzinfo=zone)
+        return start, end
+
+    @classmethod
+    def due_days(cls, now=None, hour=None):
+        """
+        {(start, end): [timezone names]} for the time zones that are in the
+        summary hour at `now`. The blank name stands for settings.TIME_ZONE.
+        """
+        now = now or timezone.now()
+        hour = cls.summary_hour() if hour is None else hour
+
+        names = (
+            DoctorProfile.objects.filter(is_active=True)
+            .values_list('timezone', flat=True).distinct().order_by()
+        )
+        days = {}
+        for name in names:
+            zone = get_zone(name)
+            if now.astimezone(zone).hour == hour:
+                days.setdefault(cls.day_bounds(zone, now), []).append(name)
+        return days
+
+    @classmethod
+    def counts(cls, start, end, timezones=None):
+        """
+        One row per doctor with appointments in [start, end): the doctor's
+        user fields plus total, confirmed and pending, from a single
+        grouped query
+        """
+        appointments = Appointment.objects.filter(
+            doctor__is_active=True,
+            status__in=cls.STATUSES,
+            scheduled_at__gte=start,
+            scheduled_at__lt=end,
+        )
+        if timezones is not None:
+            appointments = appointments.filter(doctor__timezone__in=timezones)
+
+        return (
+            appointments
+            .values(
+                'doctor_id', 'doctor__user_id', 'doctor__user__first_name',
+                'doctor__user__last_name', 'doctor__user__username',
+            )
+            .annotate(
+                total=Count('id'),
+                confirmed=Count('id', filter=Q(status=Appointment.CONFIRMED)),
+                pending=Count('id', filter=Q(status=Appointment.PENDING)),
+            )
+            .order_by('doctor_id')
+        )
+
+    @staticmethod
+    def message(row):
+        name = (
+            f"{row['doctor__user__first_name']} {row['doctor__user__last_name']}".strip()
+            or row['doctor__user__username']
+        )
+        return (
+            f"Good morning Dr. {name}, "
+            f"you have {row['total']} appointments scheduled for today: "
+            f"{row['confirmed']} confirmed and {row['pending']} pending."
+        )
+
+    @classmethod
+    def items(cls, start, end, timezones=None):
+        return [
+            {
+                'recipient_id': row['doctor__user_id'],
+                'message': cls.message(row),
+                'notification_type': 'APPOINTMENT',
+                'metadata': {'date': start.date().isoformat()},
+            }
+            for row in cls.counts(start, end, timezones)
+        ]
+
+    @classmethod
+    def send(cls, now=None, hour=None):
+        """
+        Queue the summaries due at `now` through NotificationService.enqueue.
+        Returns the number of doctors summarised.
+        """
+        sent = 0
+        for (start, end), timezones in cls.due_days(now, hour).items():
+            items = cls.items(start, end, timezones)
+            tasks = NotificationService.enqueue(items)
+            logger.info(f"Queued {len(items)} doctor summaries for {start.date()} ({', '.join(t or 'default' for t in timezones)}) in {tasks} tasks")
+            sent += len(items)
+        return sent
@@ -0,0 +1,243 @@
+# api/services/GeocodingService.py
+import logging
+import math
+import time
+from datetime import timedelta
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from ..models import Facility, GeocodedAddress, StudentProfile, AdultProfile, VisitorProfile
+from ..utils import normalize_address, get_geocoder
+from .NearbyCacheService import NearbyCacheService
+from .PharmacyStockService import PharmacyStockService
+from .ProviderIndexService import ProviderIndexService
+
+logger = logging.getLogger(__name__)
+
+
+class GeocodingService:
+    """
+    Fills in missing coordinates of facilities and patient profiles from
+    their address. Every distinct normalized address goes to the geocoder
+    (GEOCODING_PROVIDER) at most once: results, including misses, are kept
+    in GeocodedAddress. Saves are answered from that table when possible,
+    otherwise geocoded in the background; backfill catches up on the rest.
+    Every request to the geocoder, from any worker or process, first
+    claims a slot of the shared GEOCODING_RATE_LIMIT in the cache.
+    """
+
+    SLOT_KEY = 'geocoding:slot:{}'
+
+    MODELS = [Facility, StudentProfile, AdultProfile, VisitorProfile]
+    KEY_LENGTH = GeocodedAddress._meta.get_field('normalized_address').max_length
+
+    @staticmethod
+    def rate_limit():
+        """External geocoder requests per second"""
+        return getattr(settings, 'GEOCODING_RATE_LIMIT', 1)
+
+    @staticmethod
+    def batch_size():
+        return getattr(settings, 'GEOCODING_BATCH_SIZE', 500)
+
+    @staticmethod
+    def retry_days():
+        return getattr(settings, 'GEOCODING_RETRY_DAYS', 30)
+
+    @classmethod
+    def throttle(cls):
+        """
+        Wait for a free geocoder slot: time is cut into 1 / rate_limit
+        second slots and cache.add hands each to a single caller, so the
+        limit holds across Celery workers sharing the cache.
+        """
+        rate = cls.rate_limit()
+        timeout = math.ceil(2 / rate) + 1
+        while True:
+            now = time.time()
+            slot = math.floor(now * rate)
+            if cache.add(cls.SLOT_KEY.format(slot), 1, timeout=timeout):
+                return
+            time.sleep((slot + 1) / rate - now)
+
+    @classmethod
+    def key(cls, address):
+        return normalize_address(address)[:cls.KEY_LENGTH]
+
+    # ---------------- ADDRESS CACHE ----------------
+    @classmethod
+    def known(cls, keys):
+        """{key: GeocodedAddress} for keys with a usable result; misses expire after retry_days"""
+        retry_before = timezone.now() - timedelta(days=cls.retry_days())
+        return {
+            row.normalized_address: row
+            for row in GeocodedAddress.objects.filter(normalized_address__in=keys)
+            .filter(Q(latitude__isnull=False) | Q(updated_at__gte=retry_before))
+        }
+
+    @classmethod
+    def lookup(cls, address):
+        """The cached result for an address, or None when it still has to be geocoded"""
+        return cls.known([cls.key(address)]).get(cls.key(address))
+
+    @classmethod
+    def store(cls, key, coordinates, provider):
+        latitude, longitude = coordinates or (None, None)
+        row, _ = GeocodedAddress.objects.update_or_create(
+            normalized_address=key,
+            defaults={'latitude': latitude, 'longitude': longitude, 'provider': provider},
+        )
+        return row
+
+    @classmethod
+    def geocode(cls, address, geocoder=None):
+        """
+        (latitude, longitude) of an address, or None when it cannot be
+        found. Only addresses missing from the cache reach the geocoder.
+        """
+        key = cls.key(address)
+        if not key:
+            return None
+        row = cls.known([key]).get(key)
+        if row is None:
+            geocoder = geocoder or get_geocoder()
+            cls.throttle()
+            row = cls.store(key, geocoder.geocode(address), geocoder.name)
+        return (row.latitude, row.longitude) if row.found else None
+
+    # ---------------- RECORDS ----------------
+    @staticmethod
+    def missing(model):
+        """Rows with an address but no coordinates"""
+        return (
+            model.objects.filter(Q(latitude__isnull=True) | Q(longitude__isnull=True))
+            .exclude(address__isnull=True).exclude(address='')
+        )
+
+    @staticmethod
+    def located(model, rows, coordinates):
+        """
+        Set the coordinates of `rows` (a queryset of model) with one UPDATE.
+        QuerySet.update sends no signals, so the provider caches are told here.
+        """
+        ids = list(rows.values_list('pk', flat=True))
+        if not ids:
+            return 0
+        latitude, longitude = coordinates
+        updated = model.objects.filter(pk__in=ids).update(latitude=latitude, longitude=longitude)
+        if model in NearbyCacheService.MODEL_KINDS:
+            NearbyCacheService.record_location_change(model, coordinates)
+            for pk in ids:
+                ProviderIndexService.record_change(model, pk)
+        if model is Facility:
+            PharmacyStockService.record_pharmacy_change()
+        return updated
+
+    @classmethod
+    def resolve(cls, instance, previous):
+        """
+        Called before an instance is saved, with its stored
+        address/latitude/longitude (None when new). Fills in coordinates
+        from the cache and returns True when the address still has to be
+        geocoded after the save. Coordinates sent by the client always win.
+        """
+        key = cls.key(instance.address)
+        coordinates = (instance.latitude, instance.longitude)
+        if not key:
+            return False
+        if previous is not None:
+            if coordinates != (previous['latitude'], previous['longitude']):
+                return False
+            if None not in coordinates and key == cls.key(previous['address']):
+                return False
+        elif None not in coordinates:
+            return False
+
+        row = cls.lookup(instance.address)
+        if row is None:
+            return True
+        if row.found:
+            instance.latitude, instance.longitude = row.latitude, row.longitude
+        return False
+
+    @staticmethod
+    def queue(model, pk, coordinates):
+        """Geocode a saved record after commit; coordinates are the ones it was saved with"""
+        from ..tasks import geocode_location_task
+
+        latitude, longitude = coordinates
+        transaction.on_commit(lambda: geocode_location_task.delay(model._meta.label, pk, latitude, longitude))
+
+    @classmethod
+    def geocode_location(cls, label, pk, latitude=None, longitude=None):
+        """
+        Geocode one saved record's address. Skipped if the address or the
+        coordinates (latitude, longitude as queued) have changed since, so
+        coordinates a client sets in the meantime win.
+        """
+        model = apps.get_model(label)
+        address = model.objects.filter(pk=pk).values_list('address', flat=True).first()
+        if not address:
+            return False
+        coordinates = cls.geocode(address)
+        if coordinates is None:
+            return False
+        rows = model.objects.filter(pk=pk, address=address, latitude=latitude, longitude=longitude)
+        return bool(cls.located(model, rows, coordinates))
+
+    # ---------------- BACKFILL ----------------
+    @classmethod
+    def backfill(cls, limit=None, geocoder=None):
+        """
+        Geocode the addresses of every record missing coordinates, grouped
+        by normalized address. Cached addresses are applied straight away;
+        at most `limit` (default GEOCODING_BATCH_SIZE) new addresses are
+        sent to the geocoder, within GEOCODING_RATE_LIMIT. A geocoder
+        error ends the run; the next run picks up where it stopped.
+        Returns counts of the work done.
+        """
+        limit = cls.batch_size() if limit is None else limit
+
+        pending = {}
+        for model in cls.MODELS:
+            for pk, address in cls.missing(model).values_list('pk', 'address').iterator(chunk_size=2000):
+                key = cls.key(address)
+                if key:
+                    entry = pending.setdefault(key, {'address': address, 'rows': {}})
+                    entry['rows'].setdefault(model, []).append(pk)
+
+        known = {}
+        keys = list(pending)
+        for offset in range(0, len(keys), 1000):
+            known.update(cls.known(keys[offset:offset + 1000]))
+
+        stats = {'addresses': len(pending), 'requests': 0, 'updated': 0, 'not_found': 0, 'remaining': 0}
+        for index, (key, entry) in enumerate(pending.items()):
+            row = known.get(key)
+            if row is None:
+                if stats['requests'] >= limit:
+                    stats['remaining'] += 1
+                    continue
+                geocoder = geocoder or get_geocoder()
+                cls.throttle()
+                try:
+                    coordinates = geocoder.geocode(entry['address'])
+                except Exception as e:
+                    logger.error(f"Geocoding stopped at {key!r}: {str(e)}")
+                    stats['remaining'] += len(pending) - index
+                    break
+                finally:
+                    stats['requests'] += 1
+                row = cls.store(key, coordinates, geocoder.name)
+
+            if not row.found:
+                stats['not_found'] += 1
+                continue
+            for model, ids in entry['rows'].items():
+                rows = cls.missing(model).filter(pk__in=ids)
+                stats['updated'] += cls.located(model, rows, (row.latitude, row.longitude))
+
+        return stats
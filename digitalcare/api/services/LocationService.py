@@ -1,12 +1,24 @@
 # api/services/location_service.py
+import base64
+import json
 import math
 from typing import Optional
-from django.db.models import Q, F, Value, FloatField
-from django.db.models.functions import ACos, Cos, Radians, Sin
+from django.conf import settings
+from django.db.models import Q, F, Value, CharField, FloatField, IntegerField
+from django.db.models.functions import ASin, Coalesce, Concat, Cos, Least, Power, Radians, Sin, Sqrt, Trim
 from ..models import DoctorProfile, Facility, PharmacistProfile, LabTechProfile
+from .ProviderIndexService import ProviderIndexService
 
 
 class LocationService:
+    """
+    Radius searches over latitude/longitude columns. A bounding box around
+    the search circle is matched first, as plain range conditions served
+    by the (latitude, longitude) indexes; only the rows inside the box get
+    the exact haversine distance. With PROVIDER_INDEX_ENABLED, radius
+    searches take their candidates from ProviderIndexService instead.
+    """
+
     EARTH_RADIUS_KM = 6371
 
     @staticmethod
@@ -15,15 +27,106 @@ class LocationService:
         Build a Django ORM expression for Haversine distance in kilometers
         between (lat1, lon1) and model fields (lat2_field, lon2_field).
         """
-        return (
-            LocationService.EARTH_RADIUS_KM *
-            ACos(
-                Cos(Radians(Value(lat1))) *
-                Cos(Radians(F(lat2_field))) *
-                Cos(Radians(F(lon2_field)) - Radians(Value(lon1))) +
-                Sin(Radians(Value(lat1))) * Sin(Radians(F(lat2_field)))
-            )
+        half_dlat = (Radians(F(lat2_field)) - Radians(Value(lat1))) / 2
+        half_dlon = (Radians(F(lon2_field)) - Radians(Value(lon1))) / 2
+        a = (
+            Power(Sin(half_dlat), 2) +
+            Cos(Radians(Value(lat1))) * Cos(Radians(F(lat2_field))) * Power(Sin(half_dlon), 2)
+        )
+        # Least() keeps rounding errors out of ASin's domain
+        return 2 * LocationService.EARTH_RADIUS_KM * ASin(Sqrt(Least(a, Value(1.0), output_field=FloatField())))
+
+    @classmethod
+    def haversine_km(cls, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+        """Haversine distance in kilometers, in Python"""
+        phi1, phi2 = math.radians(lat1), math.radians(lat2)
+        a = (
+            math.sin((phi2 - phi1) / 2) ** 2 +
+            math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
         )
+        return 2 * cls.EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+    @classmethod
+    def bounding_box(cls, lat: float, lon: float, radius_km: float):
+        """
+        (min_lat, max_lat, min_lon, max_lon) enclosing every point within
+        radius_km of (lat, lon). The longitude bounds are None when the
+        circle reaches a pole; min_lon > max_lon when it crosses the
+        antimeridian.
+        """
+        angular = radius_km / cls.EARTH_RADIUS_KM
+        dlat = math.degrees(angular)
+        min_lat, max_lat = lat - dlat, lat + dlat
+        if min_lat <= -90 or max_lat >= 90:
+            return max(min_lat, -90), min(max_lat, 90), None, None
+
+        dlon = math.degrees(math.asin(min(1.0, math.sin(angular) / math.cos(math.radians(lat)))))
+        if dlon >= 180:
+            return min_lat, max_lat, None, None
+
+        min_lon, max_lon = lon - dlon, lon + dlon
+        if min_lon < -180:
+            min_lon += 360
+        if max_lon > 180:
+            max_lon -= 360
+        return min_lat, max_lat, min_lon, max_lon
+
+    @classmethod
+    def bounding_box_filter(cls, lat: float, lon: float, radius_km: float,
+                            lat_field: str = 'latitude', lon_field: str = 'longitude'):
+        """Q object matching the bounding box of the search circle"""
+        min_lat, max_lat, min_lon, max_lon = cls.bounding_box(lat, lon, radius_km)
+        condition = Q(**{f'{lat_field}__gte': min_lat, f'{lat_field}__lte': max_lat})
+        if min_lon is None:
+            return condition
+        if min_lon <= max_lon:
+            return condition & Q(**{f'{lon_field}__gte': min_lon, f'{lon_field}__lte': max_lon})
+        return condition & (Q(**{f'{lon_field}__gte': min_lon}) | Q(**{f'{lon_field}__lte': max_lon}))
+
+    @classmethod
+    def within_radius(cls, queryset, lat: float, lon: float, radius_km: float,
+                      lat_field: str = 'latitude', lon_field: str = 'longitude'):
+        """
+        Rows of `queryset` within radius_km, annotated with distance_km and
+        ordered nearest first
+        """
+        return queryset.filter(
+            cls.bounding_box_filter(lat, lon, radius_km, lat_field, lon_field)
+        ).annotate(
+            distance_km=cls.haversine_distance_expression(lat, lon, lat_field, lon_field)
+        ).filter(distance_km__lte=radius_km).order_by("distance_km")
+
+    @classmethod
+    def nearby_rows(cls, kinds, queryset, lat: float, lon: float, radius_km: float, specialty=None):
+        """
+        within_radius for provider searches: with the in-process provider
+        index enabled, the candidates come from it and the database only
+        hydrates (and re-checks) the matching ids
+        """
+        ids = ProviderIndexService.within(kinds, lat, lon, radius_km, specialty)
+        if ids is None:
+            return cls.within_radius(queryset, lat, lon, radius_km)
+        return queryset.filter(pk__in=ids).annotate(
+            distance_km=cls.haversine_distance_expression(lat, lon, 'latitude', 'longitude')
+        ).filter(distance_km__lte=radius_km).order_by("distance_km")
+
+    @staticmethod
+    def base_queryset(kind=None, specialty=None):
+        """
+        Located providers that searches may return: approved facilities
+        (of one type, or every type when kind is None) or active doctors,
+        pharmacists or lab technicians
+        """
+        if kind is None or kind in dict(Facility.TYPE_CHOICES):
+            providers = Facility.objects.filter(status="Approved")
+            if kind:
+                providers = providers.filter(facility_type=kind)
+        else:
+            model = {'doctor': DoctorProfile, 'pharmacist': PharmacistProfile, 'lab_tech': LabTechProfile}[kind]
+            providers = model.objects.filter(is_active=True)
+            if kind == 'doctor' and specialty:
+                providers = providers.filter(specialty__icontains=specialty)
+        return providers.filter(latitude__isnull=False, longitude__isnull=False)
 
     # ---------------- FACILITIES ----------------
     @classmethod
@@ -37,20 +140,9 @@ class LocationService:
         """
         Return a queryset of nearby facilities annotated with distance_km.
         """
-        facilities = Facility.objects.filter(
-            latitude__isnull=False,
-            longitude__isnull=False,
-            status="Approved"
-        )
-
-        if facility_type:
-            facilities = facilities.filter(facility_type=facility_type)
-
-        facilities = facilities.annotate(
-            distance_km=cls.haversine_distance_expression(
-                patient_lat, patient_lon, "latitude", "longitude"
-            )
-        ).filter(distance_km__lte=radius_km).order_by("distance_km")
+        facilities = cls.base_queryset(facility_type)
+        kinds = [facility_type] if facility_type else cls.TYPE_KINDS.keys()
+        facilities = cls.nearby_rows(list(kinds), facilities, patient_lat, patient_lon, radius_km)
 
         return facilities
 
@@ -66,22 +158,8 @@ class LocationService:
         """
         Return nearby active doctors, optionally filtered by specialty.
         """
-        doctors = DoctorProfile.objects.filter(
-            is_active=True,
-            latitude__isnull=False,
-            longitude__isnull=False,
-        )
-
-        if specialty:
-            doctors = doctors.filter(specialty__icontains=specialty)
-
-        doctors = doctors.annotate(
-            distance_km=cls.haversine_distance_expression(
-                patient_lat, patient_lon,
-                "latitude",
-                "longitude"
-            )
-        ).filter(distance_km__lte=radius_km).order_by("distance_km")
+        doctors = cls.base_queryset('doctor', specialty)
+        doctors = cls.nearby_rows(['doctor'], doctors, patient_lat, patient_lon, radius_km, specialty)
 
         return doctors
 
@@ -96,19 +174,8 @@ class LocationService:
         """
         Return nearby active pharmacists (no specialty filter).
         """
-        pharmacists = PharmacistProfile.objects.filter(
-            is_active=True,
-            latitude__isnull=False,
-            longitude__isnull=False,
-        )
-
-        pharmacists = pharmacists.annotate(
-            distance_km=cls.haversine_distance_expression(
-                patient_lat, patient_lon,
-                "latitude",
-                "longitude"
-            )
-        ).filter(distance_km__lte=radius_km).order_by("distance_km")
+        pharmacists = cls.base_queryset('pharmacist')
+        pharmacists = cls.nearby_rows(['pharmacist'], pharmacists, patient_lat, patient_lon, radius_km)
 
         return pharmacists
 
@@ -123,18 +190,203 @@ class LocationService:
         """
         Return nearby active laboratory technicians (no specialty filter).
         """
-        lab_techs = LabTechProfile.objects.filter(
-            is_active=True,
+        lab_techs = cls.base_queryset('lab_tech')
+        lab_techs = cls.nearby_rows(['lab_tech'], lab_techs, patient_lat, patient_lon, radius_km)
+
+        return lab_techs
+
+    # ---------------- NEAREST ----------------
+    @classmethod
+    def nearest(cls, queryset, lat: float, lon: float, k: int = 10, after=None,
+                max_radius_km: Optional[float] = None, initial_radius_km: Optional[float] = None):
+        """
+        The k rows of `queryset` nearest to (lat, lon), annotated with
+        distance_km, nearest first; no radius needed.
+
+        Each round is an indexed bounding-box search; the radius grows
+        until it holds k rows, which are then the true nearest ones.
+        `after` is a (distance_km, id) keyset position to continue from.
+        """
+        radius = initial_radius_km or getattr(settings, 'NEAREST_INITIAL_RADIUS_KM', 5)
+        if after is not None:
+            radius += after[0]
+        # Half the circumference reaches every point
+        half_circumference = math.pi * cls.EARTH_RADIUS_KM
+        limit = half_circumference if max_radius_km is None else min(max_radius_km, half_circumference)
+
+        while True:
+            radius = min(radius, limit)
+            rows = cls.within_radius(queryset, lat, lon, radius).order_by('distance_km', 'id')
+            if after is not None:
+                rows = rows.filter(Q(distance_km__gt=after[0]) | Q(distance_km=after[0], id__gt=after[1]))
+            found = list(rows[:k])
+            # `not <` also ends the search when a NaN radius or cursor got this far
+            if len(found) >= k or not radius < limit or radius >= half_circumference:
+                return found
+            radius *= 4
+
+    @classmethod
+    def get_nearest_facilities(
+        cls,
+        patient_lat: float,
+        patient_lon: float,
+        k: int = 10,
+        facility_type: Optional[str] = None,
+        after=None,
+        max_radius_km: Optional[float] = None,
+    ):
+        """The k approved facilities nearest to the patient, optionally of one type"""
+        facilities = Facility.objects.filter(
             latitude__isnull=False,
             longitude__isnull=False,
+            status="Approved"
+        ).select_related('admin').prefetch_related('doctors')
+        if facility_type:
+            facilities = facilities.filter(facility_type=facility_type)
+        return cls.nearest(facilities, patient_lat, patient_lon, k, after, max_radius_km)
+
+    # ---------------- ALL PROVIDERS ----------------
+    # Result types per nearby_providers `type` filter
+    TYPE_KINDS = {
+        'clinic': ['clinic', 'doctor'],
+        'pharmacy': ['pharmacy', 'pharmacist'],
+        'laboratory': ['laboratory', 'lab_tech'],
+    }
+    # Tie-break order of kinds at equal distance: an integer, so the database
+    # and the cursor comparison below agree whatever the collation
+    KIND_RANKS = {
+        kind: rank for rank, kind in enumerate(kind for kinds in TYPE_KINDS.values() for kind in kinds)
+    }
+    RESULT_FIELDS = [
+        'result_kind', 'result_rank', 'result_id', 'result_name', 'result_specialty',
+        'result_address', 'result_phone', 'result_latitude', 'result_longitude', 'distance_km',
+    ]
+
+    @staticmethod
+    def encode_cursor(*position):
+        """Opaque cursor for a keyset position such as (distance, id)"""
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor, *types):
+        """The position of a cursor, each part cast with `types`. Raises ValueError."""
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(position) != len(types):
+                raise ValueError
+            return tuple(cast(part) for cast, part in zip(types, position))
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor.")
+
+    @classmethod
+    def kind_rows(cls, kind, lat, lon, radius_km, specialty=None, after=None):
+        """
+        One provider kind as rows with the common RESULT_FIELDS, within
+        radius_km and, with a cursor, after its (distance, kind rank, id) position
+        """
+        if kind in cls.TYPE_KINDS:
+            queryset = Facility.objects.filter(status="Approved", facility_type=kind)
+            name = F('name')
+            address, phone = F('address'), F('phone')
+        else:
+            model = {'doctor': DoctorProfile, 'pharmacist': PharmacistProfile, 'lab_tech': LabTechProfile}[kind]
+            queryset = model.objects.filter(is_active=True)
+            if kind == 'doctor' and specialty:
+                queryset = queryset.filter(specialty__icontains=specialty)
+            name = Trim(Concat(
+                Coalesce('first_name', Value('')), Value(' '), Coalesce('last_name', Value('')),
+                output_field=CharField(),
+            ))
+            address = phone = Value('', output_field=CharField())
+
+        rows = cls.within_radius(
+            queryset.filter(latitude__isnull=False, longitude__isnull=False), lat, lon, radius_km
         )
+        rank = cls.KIND_RANKS[kind]
+        if after is not None:
+            distance, after_rank, after_id = after
+            later = Q(distance_km__gt=distance)
+            if rank > after_rank:
+                later |= Q(distance_km=distance)
+            elif rank == after_rank:
+                later |= Q(distance_km=distance, id__gt=after_id)
+            rows = rows.filter(later)
 
-        lab_techs = lab_techs.annotate(
-            distance_km=cls.haversine_distance_expression(
-                patient_lat, patient_lon,
-                "latitude",
-                "longitude"
-            )
-        ).filter(distance_km__lte=radius_km).order_by("distance_km")
+        specialty_field = F('specialty') if kind in ('doctor', 'lab_tech') else Value('', output_field=CharField())
+        return rows.annotate(
+            result_kind=Value(kind, output_field=CharField()),
+            result_rank=Value(rank, output_field=IntegerField()),
+            result_id=F('id'),
+            result_name=name,
+            result_specialty=specialty_field,
+            result_address=address,
+            result_phone=phone,
+            result_latitude=F('latitude'),
+            result_longitude=F('longitude'),
+        ).order_by().values(*cls.RESULT_FIELDS)
 
-        return lab_techs
+    @classmethod
+    def search_all(
+        cls,
+        patient_lat: float,
+        patient_lon: float,
+        radius_km: float = 10,
+        provider_type: str = 'both',
+        specialty: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ):
+        """
+        Facilities and providers of every kind in one distance-sorted page,
+        from a single UNION ALL query, plus one query for the doctors of
+        the clinics on the page.
+        Returns (results, next cursor or None). Raises ValueError for a bad cursor.
+        """
+        if provider_type == 'both':
+            kinds = [kind for kinds in cls.TYPE_KINDS.values() for kind in kinds]
+        else:
+            kinds = cls.TYPE_KINDS[provider_type]
+        after = cls.decode_cursor(cursor, float, int, int) if cursor else None
+
+        parts = [cls.kind_rows(kind, patient_lat, patient_lon, radius_km, specialty, after) for kind in kinds]
+        rows = list(
+            parts[0].union(*parts[1:], all=True)
+            .order_by('distance_km', 'result_rank', 'result_id')[:limit + 1]
+        )
+        last = rows[limit - 1] if len(rows) > limit else None
+        next_cursor = last and cls.encode_cursor(last['distance_km'], last['result_rank'], last['result_id'])
+        rows = rows[:limit]
+
+        clinic_ids = [row['result_id'] for row in rows if row['result_kind'] == Facility.CLINIC]
+        doctors = {}
+        if clinic_ids:
+            for doctor in (
+                DoctorProfile.clinics.through.objects.filter(facility_id__in=clinic_ids)
+                .values('facility_id', 'doctorprofile__id', 'doctorprofile__first_name',
+                        'doctorprofile__last_name', 'doctorprofile__specialty')
+                .order_by('facility_id', 'doctorprofile__id')
+            ):
+                doctors.setdefault(doctor['facility_id'], []).append({
+                    'id': doctor['doctorprofile__id'],
+                    'first_name': doctor['doctorprofile__first_name'],
+                    'last_name': doctor['doctorprofile__last_name'],
+                    'specialty': doctor['doctorprofile__specialty'],
+                })
+
+        results = []
+        for row in rows:
+            result = {
+                'type': row['result_kind'],
+                'id': row['result_id'],
+                'name': row['result_name'],
+                'specialty': row['result_specialty'] or None,
+                'address': row['result_address'] or None,
+                'phone': row['result_phone'] or None,
+                'latitude': row['result_latitude'],
+                'longitude': row['result_longitude'],
+                'distance_km': row['distance_km'],
+            }
+            if row['result_kind'] == Facility.CLINIC:
+                result['doctors'] = doctors.get(row['result_id'], [])
+            results.append(result)
+        return results, next_cursor
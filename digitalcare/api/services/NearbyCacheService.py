@@ -0,0 +1,189 @@
+# api/services/NearbyCacheService.py
+import math
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from ..models import DoctorProfile, Facility, PharmacistProfile, LabTechProfile
+from ..utils import geohash_encode, geohash_bounds, geohash_neighbours
+from .LocationService import LocationService
+
+
+class NearbyCacheService:
+    """
+    Caches nearby-provider searches per geohash cell.
+
+    A cached entry holds every provider of one kind within the radius
+    bucket of anywhere in the cell, as (id, latitude, longitude) sorted by
+    distance from the cell centre. A search reads the entry for the
+    patient's cell and computes exact distances from the patient's point,
+    so everyone in the same neighbourhood shares one database query.
+
+    Entries are versioned by a generation counter per kind and coarse
+    cell (COARSE_PRECISION). A location change bumps the counters of the
+    coarse cells around it, which drops every entry that could contain the
+    provider and leaves the rest of the country cached.
+    """
+
+    COARSE_PRECISION = 3
+    KEY = 'nearby:{kind}:{specialty}:{cell}:{bucket}:{generation}'
+    GENERATION_KEY = 'nearby:generation:{kind}:{cell}'
+
+    FACILITY_KINDS = [Facility.CLINIC, Facility.PHARMACY, Facility.LABORATORY]
+    # Model fields whose change can move a provider in or out of a result
+    TRACKED_FIELDS = {
+        Facility: ('latitude', 'longitude', 'status', 'facility_type'),
+        DoctorProfile: ('latitude', 'longitude', 'is_active', 'specialty'),
+        PharmacistProfile: ('latitude', 'longitude', 'is_active'),
+        LabTechProfile: ('latitude', 'longitude', 'is_active'),
+    }
+    # Related fields the provider serializers include
+    PREFETCH = {
+        Facility: ('admin', 'doctors'),
+        DoctorProfile: ('clinics',),
+        PharmacistProfile: ('pharmacies',),
+        LabTechProfile: ('laboratories',),
+    }
+    MODEL_KINDS = {
+        Facility: FACILITY_KINDS,
+        DoctorProfile: ['doctor'],
+        PharmacistProfile: ['pharmacist'],
+        LabTechProfile: ['lab_tech'],
+    }
+
+    @staticmethod
+    def precision():
+        return getattr(settings, 'NEARBY_CACHE_PRECISION', 6)
+
+    @staticmethod
+    def timeout():
+        return getattr(settings, 'NEARBY_CACHE_TIMEOUT', 600)
+
+    @staticmethod
+    def radius_bucket(radius_km):
+        """Smallest configured bucket covering radius_km, None if it is larger than all"""
+        buckets = getattr(settings, 'NEARBY_RADIUS_BUCKETS', [1, 2, 5, 10, 20, 50])
+        return next((bucket for bucket in sorted(buckets) if bucket >= radius_km), None)
+
+    @staticmethod
+    def model_for(kind):
+        if kind in NearbyCacheService.FACILITY_KINDS:
+            return Facility
+        return {'doctor': DoctorProfile, 'pharmacist': PharmacistProfile, 'lab_tech': LabTechProfile}[kind]
+
+    @staticmethod
+    def search(kind, lat, lon, radius_km, specialty=None):
+        """Uncached LocationService search for one provider kind"""
+        if kind in NearbyCacheService.FACILITY_KINDS:
+            return LocationService.get_nearby_facilities(lat, lon, radius_km, kind)
+        if kind == 'doctor':
+            return LocationService.get_nearby_doctors(lat, lon, radius_km, specialty)
+        if kind == 'pharmacist':
+            return LocationService.get_nearby_pharmacists(lat, lon, radius_km)
+        return LocationService.get_nearby_lab_techs(lat, lon, radius_km)
+
+    # ---------------- CELLS ----------------
+    @classmethod
+    def cell_cover(cls, cell):
+        """(centre lat, centre lon, km from the centre to the farthest corner)"""
+        min_lat, max_lat, min_lon, max_lon = geohash_bounds(cell)
+        center_lat, center_lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+        corner = max(
+            LocationService.haversine_km(center_lat, center_lon, corner_lat, corner_lon)
+            for corner_lat in (min_lat, max_lat) for corner_lon in (min_lon, max_lon)
+        )
+        return center_lat, center_lon, corner
+
+    @classmethod
+    def cacheable(cls, cell, reach_km):
+        """
+        Whether every provider an entry of this cell can contain lies in
+        the coarse cells that a change at the provider's location bumps
+        """
+        min_lat, max_lat, min_lon, max_lon = geohash_bounds(cell[:cls.COARSE_PRECISION])
+        widest_lat = max(abs(min_lat), abs(max_lat))
+        width_km = math.radians(max_lon - min_lon) * LocationService.EARTH_RADIUS_KM * math.cos(math.radians(widest_lat))
+        height_km = math.radians(max_lat - min_lat) * LocationService.EARTH_RADIUS_KM
+        return reach_km < min(width_km, height_km)
+
+    @classmethod
+    def generation(cls, kind, cell):
+        return cache.get(cls.GENERATION_KEY.format(kind=kind, cell=cell[:cls.COARSE_PRECISION]), 0)
+
+    # ---------------- READ ----------------
+    @classmethod
+    def candidates(cls, kind, cell, bucket, specialty=None):
+        """Cached (id, lat, lon) of every `kind` provider within `bucket` km of any point in the cell"""
+        specialty = (specialty or '').strip().lower()
+        key = cls.KEY.format(
+            kind=kind, specialty=specialty, cell=cell, bucket=bucket,
+            generation=cls.generation(kind, cell),
+        )
+        entry = cache.get(key)
+        if entry is None:
+            center_lat, center_lon, corner = cls.cell_cover(cell)
+            entry = list(
+                cls.search(kind, center_lat, center_lon, bucket + corner, specialty or None)
+                .values_list('id', 'latitude', 'longitude')
+            )
+            cache.set(key, entry, timeout=cls.timeout())
+        return entry
+
+    @classmethod
+    def nearby(cls, kind, lat, lon, radius_km, specialty=None):
+        """
+        Providers of `kind` within radius_km of (lat, lon), nearest first,
+        annotated with distance_km like the LocationService searches.
+        Radii above the largest bucket are searched directly.
+        """
+        bucket = cls.radius_bucket(radius_km)
+        cell = geohash_encode(lat, lon, cls.precision())
+        model = cls.model_for(kind)
+        if bucket is None or not cls.cacheable(cell, bucket + cls.cell_cover(cell)[2]):
+            return list(cls.search(kind, lat, lon, radius_km, specialty).prefetch_related(*cls.PREFETCH[model]))
+
+        matches = []
+        for provider_id, provider_lat, provider_lon in cls.candidates(kind, cell, bucket, specialty):
+            distance = LocationService.haversine_km(lat, lon, provider_lat, provider_lon)
+            if distance <= radius_km:
+                matches.append((distance, provider_id))
+        matches.sort()
+
+        # Entries may be stale: hydrating through the search filters drops
+        # providers deactivated or unapproved since the entry was cached
+        instances = (
+            LocationService.base_queryset(kind, specialty or None)
+            .prefetch_related(*cls.PREFETCH[model])
+            .in_bulk([provider_id for _, provider_id in matches])
+        )
+        providers = []
+        for distance, provider_id in matches:
+            provider = instances.get(provider_id)
+            if provider is not None:
+                provider.distance_km = distance
+                providers.append(provider)
+        return providers
+
+    # ---------------- INVALIDATION ----------------
+    @classmethod
+    def invalidate(cls, kinds, *points):
+        """Drop the cached entries of `kinds` that may contain any of these (lat, lon) points"""
+        cells = set()
+        for lat, lon in points:
+            if lat is not None and lon is not None:
+                cells |= geohash_neighbours(geohash_encode(lat, lon, cls.COARSE_PRECISION))
+
+        for kind in kinds:
+            for cell in cells:
+                key = cls.GENERATION_KEY.format(kind=kind, cell=cell)
+                cache.add(key, 0, timeout=None)
+                try:
+                    cache.incr(key)
+                except ValueError:
+                    # Evicted between add and incr
+                    cache.set(key, 1, timeout=None)
+
+    @classmethod
+    def record_location_change(cls, model, *points):
+        """A provider moved or changed status: invalidate once the transaction commits"""
+        kinds = cls.MODEL_KINDS[model]
+        transaction.on_commit(lambda: cls.invalidate(kinds, *points))
@@ -0,0 +1,424 @@
+# api/services/NotificationService.py
+import logging
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.core import signing
+from django.db.models import Count, Q
+from django.utils import timezone
+from ..models import ChatNotification, Notification, User
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationService:
+    """
+    Persist Notification rows in batches and push them to the recipients'
+    `notifications_{user_id}` channel groups (NotificationConsumer / gateway).
+
+    A notification item is a dict:
+        {'recipient_id': 1, 'message': '...', 'notification_type': 'GENERAL',
+         'priority': 'NORMAL', 'metadata': {...}}
+    or a (user_id, message, notification_type, metadata) tuple.
+    Only recipient_id and message are required.
+    """
+
+    @staticmethod
+    def group_name(user_id):
+        return f'notifications_{user_id}'
+
+    @staticmethod
+    def batch_size():
+        return getattr(settings, 'NOTIFICATION_BATCH_SIZE', 500)
+
+    @staticmethod
+    def fanout_chunk_size():
+        return getattr(settings, 'NOTIFICATION_FANOUT_CHUNK_SIZE', 2000)
+
+    @staticmethod
+    def chunked(values, size):
+        chunk = []
+        for value in values:
+            chunk.append(value)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def normalize(item):
+        """Accept an item dict or a (user_id, message, type, metadata) tuple"""
+        if isinstance(item, dict):
+            return item
+
+        user_id, message, *rest = item
+        return {
+            'recipient_id': user_id,
+            'message': message,
+            'notification_type': rest[0] if len(rest) > 0 else None,
+            'metadata': rest[1] if len(rest) > 1 else None,
+        }
+
+    # ---------------- PAYLOADS ----------------
+    @staticmethod
+    def serialize(notification):
+        """Flat websocket representation of a notification"""
+        return {
+            'id': notification.id,
+            'message': notification.message,
+            'notification_type': notification.notification_type,
+            'priority': notification.priority,
+            'metadata': notification.metadata,
+            'is_read': notification.is_read,
+            'timestamp': notification.timestamp,
+        }
+
+    @classmethod
+    def notification_event(cls, notification):
+        return {'type': 'notification', 'notification': cls.serialize(notification)}
+
+    @staticmethod
+    def unread_count_event(count):
+        return {'type': 'unread_count', 'count': count}
+
+    # ---------------- PERSISTENCE ----------------
+    @classmethod
+    def build(cls, items):
+        """Build unsaved Notification instances, skipping unknown recipients"""
+        items = [cls.normalize(item) for item in items]
+        recipient_ids = {item['recipient_id'] for item in items}
+        existing = set(
+            User.objects.filter(id__in=recipient_ids).values_list('id', flat=True)
+        )
+
+        missing = recipient_ids - existing
+        if missing:
+            logger.warning(f"Skipping notifications for missing users: {sorted(missing)}")
+
+        return [
+            Notification(
+                recipient_id=item['recipient_id'],
+                message=item['message'],
+                notification_type=item.get('notification_type') or 'GENERAL',
+                priority=item.get('priority') or 'NORMAL',
+                metadata=item.get('metadata') or {},
+            )
+            for item in items
+            if item['recipient_id'] in existing
+        ]
+
+    @classmethod
+    def dispatch(cls, items, push=True):
+        """
+        Insert notifications with bulk_create in chunks and push each chunk
+        in real time. Returns the created notifications.
+        """
+        notifications = cls.build(items)
+        created = []
+        size = cls.batch_size()
+
+        for start in range(0, len(notifications), size):
+            chunk = Notification.objects.bulk_create(notifications[start:start + size])
+            created.extend(chunk)
+            if push:
+                cls.push(chunk)
+
+        return created
+
+    @classmethod
+    def notify(cls, user_id, message, notification_type='GENERAL', priority='NORMAL', metadata=None):
+        """Create and push a single notification"""
+        created = cls.dispatch([{
+            'recipient_id': user_id,
+            'message': message,
+            'notification_type': notification_type,
+            'priority': priority,
+            'metadata': metadata,
+        }])
+        return created[0] if created else None
+
+    # ---------------- FAN-OUT ----------------
+    @classmethod
+    def enqueue(cls, items):
+        """
+        Queue notifications for many recipients: one dispatch task per
+        NOTIFICATION_FANOUT_CHUNK_SIZE items instead of one task per recipient.
+        Returns the number of queued tasks.
+        """
+        from ..tasks import dispatch_notifications_task
+
+        tasks = 0
+        for chunk in cls.chunked((cls.normalize(item) for item in items), cls.fanout_chunk_size()):
+            dispatch_notifications_task.delay(chunk)
+            tasks += 1
+        return tasks
+
+    @staticmethod
+    def recipients(roles=None, facility_id=None):
+        """
+        Ids of active users matching the role and/or facility filters. A facility
+        matches its admin, its doctors, pharmacists and lab techs, and patients
+        with appointments there.
+        """
+        users = User.objects.filter(is_active=True, status=User.ACTIVE)
+
+        if roles:
+            users = users.filter(role__in=roles)
+
+        if facility_id:
+            users = users.filter(
+                Q(facility__id=facility_id) |
+                Q(doctorprofile__clinics__id=facility_id) |
+                Q(pharmacistprofile__pharmacies__id=facility_id) |
+                Q(labtechprofile__laboratories__id=facility_id) |
+                Q(appointments__facility_id=facility_id)
+            ).distinct()
+
+        return users.order_by('id').values_list('id', flat=True)
+
+    @classmethod
+    def broadcast(cls, message, roles=None, facility_id=None, notification_type='GENERAL',
+                  priority='NORMAL', metadata=None):
+        """
+        Send the same notification to every user matching the filters, one
+        task per chunk of recipient ids. Returns (recipient_count, task_count).
+        """
+        from ..tasks import broadcast_notification_task
+
+        recipient_ids = cls.recipients(roles, facility_id).iterator(chunk_size=cls.fanout_chunk_size())
+        recipients = tasks = 0
+
+        for chunk in cls.chunked(recipient_ids, cls.fanout_chunk_size()):
+            broadcast_notification_task.delay(chunk, message, notification_type, priority, metadata)
+            recipients += len(chunk)
+            tasks += 1
+
+        return recipients, tasks
+
+    # ---------------- REAL-TIME PUSH ----------------
+    @staticmethod
+    def unread_counts(user_ids):
+        """Unread inbox count (notifications and chat notifications) per user, one grouped query each"""
+        counts = {user_id: 0 for user_id in user_ids}
+        for user_id, count in (
+            Notification.objects.filter(recipient_id__in=user_ids, is_read=False)
+            .values('recipient_id')
+            .annotate(count=Count('id'))
+            .values_list('recipient_id', 'count')
+        ):
+            counts[user_id] += count
+        for user_id, count in (
+            ChatNotification.objects.filter(user_id__in=user_ids, is_read=False)
+            .values('user_id')
+            .annotate(count=Count('id'))
+            .values_list('user_id', 'count')
+        ):
+            counts[user_id] += count
+        return counts
+
+    @classmethod
+    def push(cls, notifications):
+        """
+        Send already-saved notifications to their recipients' groups, then one
+        unread-count badge per recipient. Push failures are logged, never raised:
+        the rows are persisted and clients catch up through replay.
+        """
+        from ..consumers import encode_event
+
+        channel_layer = get_channel_layer()
+        if channel_layer is None or not notifications:
+            return
+
+        events = []
+        for notification in notifications:
+            events.append((
+                notification.recipient_id,
+                encode_event(cls.notification_event(notification)),
+            ))
+        for user_id, count in cls.unread_counts({n.recipient_id for n in notifications}).items():
+            events.append((user_id, encode_event(cls.unread_count_event(count))))
+
+        async def send_all():
+            for user_id, encoded in events:
+                await channel_layer.group_send(
+                    cls.group_name(user_id),
+                    {'type': 'notification_message', 'encoded': encoded}
+                )
+
+        try:
+            async_to_sync(send_all)()
+        except Exception as e:
+            logger.error(f"Error pushing {len(notifications)} notifications: {str(e)}")
+
+    # ---------------- INBOX ----------------
+    # Inbox sources in tie-break order: (model, user field, time field)
+    INBOX_SOURCES = {
+        'notification': (Notification, 'recipient_id', 'timestamp'),
+        'chat': (ChatNotification, 'user_id', 'created_at'),
+    }
+    INBOX_CURSOR_SALT = 'notification-inbox'
+
+    @staticmethod
+    def inbox_row(source, item):
+        """Common inbox shape; chat notifications keep their room and message in metadata"""
+        if source == 'notification':
+            return {
+                'source': source,
+                'id': item.id,
+                'message': item.message,
+                'notification_type': item.notification_type,
+                'priority': item.priority,
+                'metadata': item.metadata,
+                'is_read': item.is_read,
+                'timestamp': item.timestamp,
+            }
+        return {
+            'source': source,
+            'id': item.id,
+            'message': item.content,
+            'notification_type': item.notification_type,
+            'priority': 'NORMAL',
+            'metadata': {'title': item.title, 'chat_room_id': item.chat_room_id, 'message_id': item.message_id},
+            'is_read': item.is_read,
+            'timestamp': item.created_at,
+        }
+
+    @classmethod
+    def inbox(cls, user_id, limit=20, cursor=None, unread=False, notification_type=None):
+        """
+        One page of a user's notifications and chat notifications, newest
+        first, ordered by (time, source, id). Each source is read with one
+        keyset query of at most limit + 1 rows and the two are merged.
+        Returns (rows, next cursor or None). Raises ValueError for a bad cursor.
+        """
+        after = None
+        if cursor:
+            try:
+                created, after_rank, after_id = signing.loads(cursor, salt=cls.INBOX_CURSOR_SALT)
+                after = (datetime.fromisoformat(created), int(after_rank), int(after_id))
+            except (signing.BadSignature, TypeError, ValueError):
+                raise ValueError("Invalid cursor.")
+
+        rows = []
+        for rank, (source, (model, user_field, time_field)) in enumerate(cls.INBOX_SOURCES.items()):
+            queryset = model.objects.filter(**{user_field: user_id})
+            if unread:
+                queryset = queryset.filter(is_read=False)
+            if notification_type:
+                queryset = queryset.filter(notification_type=notification_type)
+            if after is not None:
+                created, after_rank, after_id = after
+                later = Q(**{f'{time_field}__lt': created})
+                if rank > after_rank:
+                    later |= Q(**{time_field: created})
+                elif rank == after_rank:
+                    later |= Q(**{time_field: created, 'id__lt': after_id})
+                queryset = queryset.filter(later)
+            rows += [
+                (rank, cls.inbox_row(source, item))
+                for item in queryset.order_by(f'-{time_field}', '-id')[:limit + 1]
+            ]
+
+        rows.sort(key=lambda entry: (entry[1]['timestamp'], -entry[0], entry[1]['id']), reverse=True)
+        next_cursor = None
+        if len(rows) > limit:
+            rank, last = rows[limit - 1]
+            next_cursor = signing.dumps(
+                [last['timestamp'].isoformat(), rank, last['id']], salt=cls.INBOX_CURSOR_SALT
+            )
+        return [row for _, row in rows[:limit]], next_cursor
+
+    @classmethod
+    def mark_read(cls, user_id, ids=None, up_to=None, chat_ids=None, chat_up_to=None):
+        """
+        Mark a user's inbox read with one UPDATE per source, by explicit id
+        lists or everything up to and including a watermark id (ids/up_to
+        for notifications, chat_ids/chat_up_to for chat notifications).
+        Pushes the new unread badge and returns the number of updated rows.
+        """
+        updated = 0
+        for model, user_field, row_ids, watermark in (
+            (Notification, 'recipient_id', ids, up_to),
+            (ChatNotification, 'user_id', chat_ids, chat_up_to),
+        ):
+            if row_ids is None and watermark is None:
+                continue
+            queryset = model.objects.filter(**{user_field: user_id, 'is_read': False})
+            if row_ids is not None:
+                queryset = queryset.filter(id__in=row_ids)
+            if watermark is not None:
+                queryset = queryset.filter(id__lte=watermark)
+            updated += queryset.update(is_read=True)
+
+        if updated:
+            cls.push_unread_count(user_id)
+        return updated
+
+    @classmethod
+    def push_unread_count(cls, user_id):
+        from ..consumers import encode_event
+
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+
+        count = cls.unread_counts([user_id])[user_id]
+        try:
+            async_to_sync(channel_layer.group_send)(
+                cls.group_name(user_id),
+                {'type': 'notification_message', 'encoded': encode_event(cls.unread_count_event(count))}
+            )
+        except Exception as e:
+            logger.error(f"Error pushing unread count to user {user_id}: {str(e)}")
+
+    @staticmethod
+    def purge(read_days=None, unread_days=None, batch_size=None):
+        """
+        Delete read notifications and chat notifications older than
+        read_days and any older than unread_days, in id batches to keep
+        each DELETE short. Returns the number of deleted rows.
+        """
+        if read_days is None:
+            read_days = getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 90)
+        if unread_days is None:
+            unread_days = getattr(settings, 'NOTIFICATION_UNREAD_RETENTION_DAYS', 365)
+        if batch_size is None:
+            batch_size = getattr(settings, 'NOTIFICATION_PURGE_BATCH_SIZE', 5000)
+
+        now = timezone.now()
+        deleted = 0
+        for model, time_field in ((Notification, 'timestamp'), (ChatNotification, 'created_at')):
+            expired = model.objects.filter(
+                Q(is_read=True, **{f'{time_field}__lt': now - timedelta(days=read_days)}) |
+                Q(**{f'{time_field}__lt': now - timedelta(days=unread_days)})
+            )
+            while True:
+                ids = list(expired.values_list('id', flat=True)[:batch_size])
+                if not ids:
+                    break
+                deleted += model.objects.filter(id__in=ids).delete()[0]
+        return deleted
+
+    # ---------------- REPLAY ----------------
+    @classmethod
+    def replay(cls, user_id, since=None, limit=None):
+        """
+        Notifications for a reconnecting client, oldest first, with id > since.
+        Returns (payloads, cursor, has_more); pass cursor back as `since`.
+        Without a cursor nothing is replayed, only the current cursor returned.
+        """
+        limit = limit or getattr(settings, 'NOTIFICATION_REPLAY_LIMIT', 100)
+        queryset = Notification.objects.filter(recipient_id=user_id)
+
+        if since is None:
+            latest = queryset.order_by('-id').values_list('id', flat=True).first()
+            return [], latest, False
+
+        rows = list(queryset.filter(id__gt=since).order_by('id')[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        cursor = rows[-1].id if rows else since
+        return [cls.serialize(n) for n in rows], cursor, has_more
@@ -0,0 +1,183 @@
+# api/services/PharmacyStockService.py
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from ..models import Facility, PharmacyInventory
+from ..utils import geohash_encode
+from .LocationService import LocationService
+from .NearbyCacheService import NearbyCacheService
+
+
+class PharmacyStockService:
+    """
+    "Which pharmacies near me have these drugs in stock": one query over
+    the in-stock partial index of PharmacyInventory, joined with the
+    pharmacies and narrowed by LocationService's bounding box, sorted by
+    distance or price.
+
+    Hot drugs (searched PHARMACY_STOCK_HOT_THRESHOLD times within
+    PHARMACY_STOCK_HOT_WINDOW seconds) are answered from cached lists of
+    the pharmacies stocking them, one per geohash cell and radius bucket
+    as in NearbyCacheService, so a search only scans its neighbourhood.
+    Lists are versioned by a generation counter per drug and one for all
+    pharmacies, which inventory and pharmacy changes bump. Radii above
+    the largest bucket always query the database.
+    """
+
+    KEY = 'drug_stock:{drug}:{cell}:{bucket}:{generation}:{pharmacies}'
+    HITS_KEY = 'drug_stock:hits:{drug}'
+    GENERATION_KEY = 'drug_stock:generation:{drug}'
+    PHARMACIES_KEY = 'drug_stock:generation:pharmacies'
+
+    SORTS = ('distance', 'price')
+    FIELDS = [
+        'id', 'quantity', 'unit_price', 'drug_id', 'drug__name', 'drug__strength', 'drug__form',
+        'pharmacy_id', 'pharmacy__name', 'pharmacy__address', 'pharmacy__phone',
+        'pharmacy__latitude', 'pharmacy__longitude',
+    ]
+
+    @staticmethod
+    def hot_threshold():
+        return getattr(settings, 'PHARMACY_STOCK_HOT_THRESHOLD', 10)
+
+    @staticmethod
+    def hot_window():
+        return getattr(settings, 'PHARMACY_STOCK_HOT_WINDOW', 300)
+
+    @staticmethod
+    def timeout():
+        return getattr(settings, 'PHARMACY_STOCK_CACHE_TIMEOUT', 600)
+
+    @staticmethod
+    def in_stock(drug_ids):
+        """In-stock inventory rows of these drugs at approved, located pharmacies"""
+        return PharmacyInventory.objects.filter(
+            drug_id__in=drug_ids,
+            quantity__gt=0,
+            pharmacy__facility_type=Facility.PHARMACY,
+            pharmacy__status='Approved',
+            pharmacy__latitude__isnull=False,
+            pharmacy__longitude__isnull=False,
+        )
+
+    @staticmethod
+    def sort_key(sort):
+        """Python ordering matching the database one; unpriced stock goes last"""
+        if sort == 'price':
+            return lambda row: (row['unit_price'] is None, row['unit_price'] or 0, row['distance_km'], row['id'])
+        return lambda row: (row['distance_km'], row['unit_price'] is None, row['unit_price'] or 0, row['id'])
+
+    # ---------------- SEARCH ----------------
+    @classmethod
+    def query(cls, drug_ids, lat, lon, radius_km, sort='distance', limit=20):
+        """One database query for the in-stock rows within radius_km"""
+        rows = LocationService.within_radius(
+            cls.in_stock(drug_ids), lat, lon, radius_km, 'pharmacy__latitude', 'pharmacy__longitude'
+        )
+        if sort == 'price':
+            rows = rows.order_by(F('unit_price').asc(nulls_last=True), 'distance_km', 'id')
+        else:
+            rows = rows.order_by('distance_km', F('unit_price').asc(nulls_last=True), 'id')
+        return list(rows.values(*cls.FIELDS, 'distance_km')[:limit])
+
+    @classmethod
+    def search(cls, drug_ids, lat, lon, radius_km=10, sort='distance', limit=20):
+        """
+        In-stock offers of these drugs within radius_km of (lat, lon), at
+        most `limit`, sorted by `sort` ('distance' or 'price'). Hot drugs
+        come from the cache of the patient's cell; the rest take a single query.
+        """
+        drug_ids = sorted(set(drug_ids))
+        bucket = NearbyCacheService.radius_bucket(radius_km)
+        hot = [drug_id for drug_id in drug_ids if cls.record_hit(drug_id) and bucket is not None]
+        cold = [drug_id for drug_id in drug_ids if drug_id not in hot]
+
+        rows = cls.query(cold, lat, lon, radius_km, sort, limit) if cold else []
+        if hot:
+            cell = geohash_encode(lat, lon, NearbyCacheService.precision())
+        for drug_id in hot:
+            for row in cls.cached_rows(drug_id, cell, bucket):
+                distance = LocationService.haversine_km(lat, lon, row['pharmacy__latitude'], row['pharmacy__longitude'])
+                if distance <= radius_km:
+                    rows.append({**row, 'distance_km': distance})
+
+        if hot:
+            rows.sort(key=cls.sort_key(sort))
+        return [cls.result(row) for row in rows[:limit]]
+
+    @staticmethod
+    def result(row):
+        return {
+            'inventory_id': row['id'],
+            'drug': {
+                'id': row['drug_id'],
+                'name': row['drug__name'],
+                'strength': row['drug__strength'],
+                'form': row['drug__form'],
+            },
+            'pharmacy': {
+                'id': row['pharmacy_id'],
+                'name': row['pharmacy__name'],
+                'address': row['pharmacy__address'] or None,
+                'phone': row['pharmacy__phone'] or None,
+                'latitude': row['pharmacy__latitude'],
+                'longitude': row['pharmacy__longitude'],
+            },
+            'quantity': row['quantity'],
+            'unit_price': str(row['unit_price']) if row['unit_price'] is not None else None,
+            'distance_km': row['distance_km'],
+        }
+
+    # ---------------- HOT DRUG CACHE ----------------
+    @classmethod
+    def record_hit(cls, drug_id):
+        """Count a search for the drug; True once it is hot"""
+        key = cls.HITS_KEY.format(drug=drug_id)
+        cache.add(key, 0, timeout=cls.hot_window())
+        try:
+            hits = cache.incr(key)
+        except ValueError:
+            # Expired between add and incr
+            cache.set(key, 1, timeout=cls.hot_window())
+            hits = 1
+        return hits >= cls.hot_threshold()
+
+    @classmethod
+    def cached_rows(cls, drug_id, cell, bucket):
+        """In-stock rows of one drug within `bucket` km of anywhere in the cell, from the cache"""
+        key = cls.KEY.format(
+            drug=drug_id, cell=cell, bucket=bucket,
+            generation=cache.get(cls.GENERATION_KEY.format(drug=drug_id), 0),
+            pharmacies=cache.get(cls.PHARMACIES_KEY, 0),
+        )
+        rows = cache.get(key)
+        if rows is None:
+            center_lat, center_lon, corner = NearbyCacheService.cell_cover(cell)
+            rows = list(
+                LocationService.within_radius(
+                    cls.in_stock([drug_id]), center_lat, center_lon, bucket + corner,
+                    'pharmacy__latitude', 'pharmacy__longitude'
+                ).values(*cls.FIELDS)
+            )
+            cache.set(key, rows, timeout=cls.timeout())
+        return rows
+
+    @staticmethod
+    def bump(key):
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted between add and incr
+            cache.set(key, 1, timeout=None)
+
+    @classmethod
+    def record_stock_change(cls, drug_id):
+        """Inventory of a drug changed: drop its cached list once the transaction commits"""
+        transaction.on_commit(lambda: cls.bump(cls.GENERATION_KEY.format(drug=drug_id)))
+
+    @classmethod
+    def record_pharmacy_change(cls):
+        """A pharmacy moved, was renamed or changed status: drop every cached list"""
+        transaction.on_commit(lambda: cls.bump(cls.PHARMACIES_KEY))
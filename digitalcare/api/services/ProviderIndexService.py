@@ -0,0 +1,226 @@
+# api/services/ProviderIndexService.py
+import logging
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from ..models import DoctorProfile, Facility, PharmacistProfile, LabTechProfile
+from ..utils import BallTree
+from ..utils.ball_tree import np, unit_vectors, chord_for_km, km_for_chord
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderIndex:
+    """
+    One process's snapshot of every located provider: compact arrays of
+    (source, id, kind, active, specialty) plus a ball tree over their
+    positions. Rows changed after the build are kept in a small overflow
+    table that is scanned linearly and that masks their stale tree rows.
+    """
+
+    def __init__(self, rows):
+        self.vocabulary = sorted({row[5] for row in rows})
+        codes = {specialty: code for code, specialty in enumerate(self.vocabulary)}
+        self.sources = np.array([ProviderIndexService.SOURCES.index(row[0]) for row in rows], dtype=np.int8)
+        self.ids = np.array([row[1] for row in rows], dtype=np.int64)
+        self.kinds = np.array([ProviderIndexService.KINDS.index(row[2]) for row in rows], dtype=np.int8)
+        self.active = np.array([row[3] for row in rows], dtype=bool)
+        self.specialties = np.array([codes[row[5]] for row in rows], dtype=np.int32)
+        latitudes = np.array([row[4][0] for row in rows], dtype=np.float64)
+        longitudes = np.array([row[4][1] for row in rows], dtype=np.float64)
+        self.points = unit_vectors(latitudes, longitudes)
+        self.tree = BallTree(self.points)
+        self.positions = {(row[0], row[1]): index for index, row in enumerate(rows)}
+        # (source, id) -> row or None (deleted / no longer located)
+        self.overflow = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def apply(self, changes):
+        """changes: {(source, id): row or None} read from the database"""
+        for key, row in changes.items():
+            index = self.positions.get(key)
+            if index is not None:
+                self.active[index] = False
+            self.overflow[key] = row
+
+    def within(self, kinds, lat, lon, radius_km, specialty=None):
+        """(ids, distances in km) of active rows of `kinds` within radius_km"""
+        kind_codes = [ProviderIndexService.KINDS.index(kind) for kind in kinds]
+        point = unit_vectors(np.array([lat]), np.array([lon]))[0]
+        chord = chord_for_km(radius_km)
+
+        candidates = self.tree.query_radius(point, chord)
+        mask = self.active[candidates] & np.isin(self.kinds[candidates], kind_codes)
+        if specialty:
+            needle = specialty.lower()
+            matching = [code for code, value in enumerate(self.vocabulary) if needle in value]
+            mask &= np.isin(self.specialties[candidates], matching)
+        candidates = candidates[mask]
+        chords = np.sqrt(((self.points[candidates] - point) ** 2).sum(axis=1))
+        ids, distances = self.ids[candidates].tolist(), km_for_chord(chords).tolist()
+
+        for (source, provider_id), row in self.overflow.items():
+            if row is None or not row[3] or row[2] not in kinds:
+                continue
+            if specialty and specialty.lower() not in row[5]:
+                continue
+            row_point = unit_vectors(np.array([row[4][0]]), np.array([row[4][1]]))[0]
+            row_chord = np.sqrt(((row_point - point) ** 2).sum())
+            if row_chord <= chord:
+                ids.append(provider_id)
+                distances.append(float(km_for_chord(row_chord)))
+        return ids, distances
+
+
+class ProviderIndexService:
+    """
+    Optional in-process spatial index of providers (PROVIDER_INDEX_ENABLED,
+    needs numpy) that LocationService asks for candidate ids before the
+    database, so radius searches hydrate only matching rows.
+
+    Every process keeps its own ProviderIndex. Saves and deletes append
+    (source, id) to a change feed in the cache; before answering, a
+    process replays the entries it has not seen, re-reading only those
+    rows. A gap in the feed or a large overflow triggers a full rebuild,
+    and so does an index older than PROVIDER_INDEX_MAX_AGE seconds: the
+    feed only reaches other processes through a shared cache, so with a
+    per-process one (LocMemCache) this bounds how stale an index can get.
+    """
+
+    SOURCES = ['facility', 'doctor', 'pharmacist', 'lab_tech']
+    KINDS = [Facility.CLINIC, Facility.PHARMACY, Facility.LABORATORY, 'doctor', 'pharmacist', 'lab_tech']
+    MODEL_SOURCES = {
+        Facility: 'facility',
+        DoctorProfile: 'doctor',
+        PharmacistProfile: 'pharmacist',
+        LabTechProfile: 'lab_tech',
+    }
+    SEQUENCE_KEY = 'provider_index:sequence'
+    FEED_KEY = 'provider_index:feed:{}'
+    FEED_TIMEOUT = 60 * 60 * 24
+    # Replaying more entries than this, or collecting more overflow rows, rebuilds instead
+    MAX_REPLAY = 5000
+    MAX_OVERFLOW = 2000
+
+    _index = None
+    _sequence = 0
+    _built_at = 0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def enabled():
+        return getattr(settings, 'PROVIDER_INDEX_ENABLED', False) and np is not None
+
+    @staticmethod
+    def max_age():
+        return getattr(settings, 'PROVIDER_INDEX_MAX_AGE', 600)
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._index = None
+            cls._sequence = 0
+            cls._built_at = 0
+
+    # ---------------- LOADING ----------------
+    @classmethod
+    def rows(cls, source, ids=None):
+        """(source, id, kind, active, (lat, lon), specialty) rows of one source"""
+        if source == 'facility':
+            queryset = Facility.objects.values_list('id', 'facility_type', 'status', 'latitude', 'longitude')
+            convert = lambda pk, kind, status, lat, lon: (source, pk, kind, status == 'Approved', (lat, lon), '')
+        else:
+            model = {'doctor': DoctorProfile, 'pharmacist': PharmacistProfile, 'lab_tech': LabTechProfile}[source]
+            fields = ['id', 'is_active', 'latitude', 'longitude']
+            if source != 'pharmacist':
+                fields.append('specialty')
+            queryset = model.objects.values_list(*fields)
+            convert = lambda pk, active, lat, lon, specialty='': (source, pk, source, active, (lat, lon), (specialty or '').lower())
+
+        queryset = queryset.filter(latitude__isnull=False, longitude__isnull=False)
+        if ids is not None:
+            queryset = queryset.filter(id__in=ids)
+        return [convert(*values) for values in queryset.iterator(chunk_size=5000)]
+
+    @classmethod
+    def build(cls):
+        rows = []
+        for source in cls.SOURCES:
+            rows.extend(cls.rows(source))
+        return ProviderIndex(rows)
+
+    @classmethod
+    def changes(cls, keys):
+        """Current rows of the changed (source, id) keys; None for the ones gone or unlocated"""
+        changes = dict.fromkeys(keys)
+        by_source = {}
+        for source, provider_id in keys:
+            by_source.setdefault(source, []).append(provider_id)
+        for source, ids in by_source.items():
+            for row in cls.rows(source, ids):
+                changes[(source, row[1])] = row
+        return changes
+
+    @classmethod
+    def sync(cls):
+        """Bring this process's index up to date with the change feed"""
+        with cls._lock:
+            current = cache.get(cls.SEQUENCE_KEY, 0)
+            if time.monotonic() - cls._built_at > cls.max_age():
+                cls._index = None
+            if cls._index is not None and current == cls._sequence:
+                return cls._index
+
+            keys = None
+            if cls._index is not None and cls._sequence < current <= cls._sequence + cls.MAX_REPLAY:
+                feed = cache.get_many([cls.FEED_KEY.format(seq) for seq in range(cls._sequence + 1, current + 1)])
+                if len(feed) == current - cls._sequence:
+                    keys = {tuple(entry) for entry in feed.values()}
+
+            if keys is None or len(cls._index.overflow) + len(keys) > cls.MAX_OVERFLOW:
+                cls._index = cls.build()
+                cls._built_at = time.monotonic()
+                logger.info(f"Provider index rebuilt: {len(cls._index)} providers")
+            else:
+                cls._index.apply(cls.changes(keys))
+            cls._sequence = current
+            return cls._index
+
+    # ---------------- CHANGE FEED ----------------
+    @classmethod
+    def publish(cls, source, provider_id):
+        cache.add(cls.SEQUENCE_KEY, 0, timeout=None)
+        try:
+            sequence = cache.incr(cls.SEQUENCE_KEY)
+        except ValueError:
+            # Evicted between add and incr: every process rebuilds
+            cache.set(cls.SEQUENCE_KEY, 1, timeout=None)
+            sequence = 1
+        cache.set(cls.FEED_KEY.format(sequence), (source, provider_id), timeout=cls.FEED_TIMEOUT)
+
+    @classmethod
+    def record_change(cls, model, provider_id):
+        """A provider was saved or deleted: publish it once the transaction commits"""
+        if cls.enabled():
+            source = cls.MODEL_SOURCES[model]
+            transaction.on_commit(lambda: cls.publish(source, provider_id))
+
+    # ---------------- QUERIES ----------------
+    @classmethod
+    def within(cls, kinds, lat, lon, radius_km, specialty=None):
+        """
+        Ids of active providers of `kinds` within radius_km, or None when
+        the index is disabled or unavailable
+        """
+        if not cls.enabled():
+            return None
+        try:
+            ids, _ = cls.sync().within(kinds, lat, lon, radius_km, specialty)
+        except Exception as e:
+            logger.error(f"Provider index unavailable, searching the database: {str(e)}")
+            return None
+        return ids
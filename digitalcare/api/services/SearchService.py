@@ -0,0 +1,131 @@
+# api/services/SearchService.py
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchHeadline
+from django.db.models import F, Q
+from ..models import Message, Consultation, Prescription
+
+
+class SearchService:
+    """
+    Ranked full-text search over chat messages and clinical text, backed by
+    the trigger-maintained `search_vector` columns and their GIN indexes.
+
+    Every scope is filtered with the same visibility rules as its API:
+    chat participants for messages, ConsultationViewSet / PrescriptionViewSet
+    rules for clinical records.
+    """
+
+    CONFIG = 'english'
+    HEADLINE_OPTIONS = {
+        'start_sel': '<mark>',
+        'stop_sel': '</mark>',
+        'max_words': 30,
+        'min_words': 10,
+        'max_fragments': 2,
+    }
+
+    # scope -> (model, text columns for headlines, extra payload fields)
+    SCOPES = {
+        'messages': (Message, ['content'], ['chat_room_id', 'sender_id', 'created_at']),
+        'consultations': (Consultation, ['diagnosis', 'notes'], ['appointment_id', 'created_at']),
+        'prescriptions': (Prescription, ['diagnosis'], ['patient_id', 'issued_at']),
+    }
+
+    @staticmethod
+    def default_limit():
+        return getattr(settings, 'SEARCH_RESULT_LIMIT', 20)
+
+    # ---------------- VISIBILITY ----------------
+    @staticmethod
+    def visible_messages(user):
+        return Message.objects.filter(
+            Q(chat_room__patient=user) | Q(chat_room__doctor=user)
+        )
+
+    @staticmethod
+    def visible_consultations(user):
+        if user.is_superuser or user.role == 'admin':
+            return Consultation.objects.all()
+        if user.role == 'facility_admin':
+            return Consultation.objects.filter(appointment__facility__admin=user)
+        if user.role == 'doctor':
+            return Consultation.objects.filter(appointment__doctor__user=user)
+        return Consultation.objects.filter(appointment__patient=user)
+
+    @staticmethod
+    def visible_prescriptions(user):
+        role = getattr(user, 'role', None)
+        if user.is_superuser or role == 'admin':
+            return Prescription.objects.all()
+        if role == 'doctor':
+            return Prescription.objects.filter(doctor__user=user)
+        if role == 'facility_admin':
+            return Prescription.objects.filter(doctor__facility__admin=user)
+        if role == 'pharmacist':
+            return Prescription.objects.filter(
+                id__in=Prescription.objects.filter(
+                    items__drug__pharmacy_stocks__pharmacy__pharmacists__user=user
+                ).values('id')
+            )
+        if role in ['student', 'adult', 'visitor']:
+            return Prescription.objects.filter(patient=user)
+        return Prescription.objects.none()
+
+    # ---------------- SEARCH ----------------
+    @classmethod
+    def search(cls, user, text, scopes=None, limit=None):
+        """
+        Returns {scope: [results]} ordered by rank. Each result carries an id,
+        rank, highlighted snippets per text column and a few context fields.
+        """
+        query = SearchQuery(text, search_type='websearch', config=cls.CONFIG)
+        limit = min(limit or cls.default_limit(), 100)
+        scopes = [scope for scope in (scopes or cls.SCOPES) if scope in cls.SCOPES]
+
+        return {
+            scope: cls.search_scope(scope, user, query, limit)
+            for scope in scopes
+        }
+
+    @classmethod
+    def search_scope(cls, scope, user, query, limit):
+        model, columns, fields = cls.SCOPES[scope]
+        visible = getattr(cls, f'visible_{scope}')(user)
+
+        # Rank on the index first; headlines are costly, so only build them
+        # for the rows on this page.
+        ranked = list(
+            visible.filter(search_vector=query)
+            .annotate(rank=SearchRank(F('search_vector'), query))
+            .order_by('-rank', '-id')
+            .values_list('id', 'rank')[:limit]
+        )
+        if not ranked:
+            return []
+
+        headlines = {
+            f'{column}_headline': SearchHeadline(
+                column, query, config=cls.CONFIG, **cls.HEADLINE_OPTIONS
+            )
+            for column in columns
+        }
+        rows = {
+            row['id']: row
+            for row in model.objects.filter(id__in=[pk for pk, _ in ranked])
+            .annotate(**headlines)
+            .values('id', *fields, *headlines)
+        }
+
+        results = []
+        for pk, rank in ranked:
+            row = rows[pk]
+            row['rank'] = round(rank, 4)
+            row['highlights'] = {
+                column: row[f'{column}_headline']
+                for column in columns
+                if '<mark>' in (row.get(f'{column}_headline') or '')
+            }
+            for column in columns:
+                row.pop(f'{column}_headline')
+            results.append(row)
+        return results
@@ -0,0 +1,130 @@
+# api/services/ShiftTemplateService.py
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from ..models import Shift
+from .AvailabilityService import AvailabilityService
+
+
+class ShiftTemplateService:
+    """
+    Loads weekly rotas in one go: recurring patterns are expanded into
+    Shift rows, checked for overlaps with one sort-and-sweep pass over the
+    batch and the facility's existing shifts, then written with bulk_create.
+    """
+
+    RULES = {
+        'daily': [0, 1, 2, 3, 4, 5, 6],
+        'weekdays': [0, 1, 2, 3, 4],
+        'weekends': [5, 6],
+    }
+
+    @classmethod
+    def expand(cls, facility, patterns, exceptions=()):
+        """
+        Unsaved shifts for every (pattern, day). A pattern has doctor,
+        start_time, end_time and days and/or a rule; an exception drops one
+        day_of_week, for one doctor or for everyone.
+        """
+        skipped = {(exception.get('doctor'), exception['day_of_week']) for exception in exceptions}
+
+        shifts = []
+        for pattern in patterns:
+            doctor = pattern['doctor']
+            days = set(pattern.get('days') or []) | set(cls.RULES.get(pattern.get('rule'), []))
+            for day in sorted(days):
+                if (None, day) in skipped or (doctor, day) in skipped:
+                    continue
+                shifts.append(Shift(
+                    doctor=doctor,
+                    facility=facility,
+                    day_of_week=day,
+                    start_time=pattern['start_time'],
+                    end_time=pattern['end_time'],
+                ))
+        return shifts
+
+    @staticmethod
+    def find_overlaps(shifts):
+        """
+        Pairs of overlapping active shifts of the same doctor, facility and
+        day, found by sorting once and sweeping with the latest end so far.
+        """
+        ordered = sorted(
+            (s for s in shifts if s.is_active and s.doctor_id),
+            key=lambda s: (s.doctor_id, s.facility_id, s.day_of_week, s.start_time, s.end_time)
+        )
+
+        overlaps = []
+        latest = None
+        for shift in ordered:
+            same_day = latest is not None and (
+                (latest.doctor_id, latest.facility_id, latest.day_of_week)
+                == (shift.doctor_id, shift.facility_id, shift.day_of_week)
+            )
+            if same_day and shift.start_time < latest.end_time:
+                overlaps.append((latest, shift))
+            if not same_day or shift.end_time > latest.end_time:
+                latest = shift
+        return overlaps
+
+    @staticmethod
+    def reactivate(inactive, shifts):
+        """
+        Split shifts into inactive rows taking their place (same doctor,
+        day and start time, which the unique constraint would reject as a
+        new row) and shifts still to insert.
+        """
+        rows = {(s.doctor_id, s.day_of_week, s.start_time): s for s in inactive}
+
+        reactivated, new = [], []
+        for shift in shifts:
+            row = rows.pop((shift.doctor_id, shift.day_of_week, shift.start_time), None)
+            if row is None:
+                new.append(shift)
+                continue
+            row.end_time, row.is_active = shift.end_time, True
+            reactivated.append(row)
+        return reactivated, new
+
+    @classmethod
+    def apply(cls, facility, shifts, replace=False):
+        """
+        Save a batch of shifts for one facility in a single transaction.
+        With replace, the doctors' current shifts at the facility are
+        removed first; otherwise an inactive shift with the same doctor,
+        day and start time is reactivated rather than duplicated.
+        Raises ValidationError listing every overlap.
+        Returns (saved shifts, number of replaced shifts).
+        """
+        for shift in shifts:
+            if shift.start_time >= shift.end_time:
+                raise ValidationError(
+                    f"Start time must be before end time ({shift.start_time}-{shift.end_time})"
+                )
+
+        doctor_ids = {shift.doctor_id for shift in shifts}
+        existing = Shift.objects.filter(facility=facility, doctor_id__in=doctor_ids)
+
+        with transaction.atomic():
+            kept = [] if replace else list(existing.filter(is_active=True))
+            overlaps = cls.find_overlaps(kept + shifts)
+            if overlaps:
+                raise ValidationError([
+                    f"Doctor {first.doctor_id} on {first.get_day_of_week_display()}: "
+                    f"{first.start_time}-{first.end_time} overlaps {second.start_time}-{second.end_time}"
+                    for first, second in overlaps
+                ], code='shift_overlap')
+
+            replaced = existing.delete()[0] if replace else 0
+            reactivated, new = cls.reactivate([] if replace else existing.filter(is_active=False), shifts)
+            try:
+                with transaction.atomic():
+                    Shift.objects.bulk_update(reactivated, ['end_time', 'is_active'])
+                    created = reactivated + Shift.objects.bulk_create(new)
+            except IntegrityError:
+                # A concurrent edit slipped in between the check and the insert
+                raise ValidationError("Shifts changed while saving, please retry.", code='shift_overlap')
+
+        # bulk_create sends no post_save signals
+        AvailabilityService.record_shift_change(*doctor_ids)
+        return created, replaced
@@ -1,2 +1,16 @@
 from .LocationService import *
-from .RTCProviders import *
\ No newline at end of file
+from .RTCProviders import *
+from .NotificationService import *
+from .ChatAttachmentService import *
+from .SearchService import *
+from .ChatActivityService import *
+from .ChatArchiveService import *
+from .AvailabilityService import *
+from .ShiftTemplateService import *
+from .CalendarService import *
+from .AppointmentReminderService import *
+from .DoctorSummaryService import *
+from .NearbyCacheService import *
+from .ProviderIndexService import *
+from .GeocodingService import *
+from .PharmacyStockService import *
\ No newline at end of file
@@ -0,0 +1,30 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from ..models import Shift, Appointment
+from ..services import AvailabilityService
+
+
+@receiver(pre_save, sender=Shift)
+def remember_previous_shift(sender, instance, **kwargs):
+    """Keep the stored row so a shift moved to another doctor also frees the old one"""
+    instance._previous = sender.objects.filter(pk=instance.pk).first() if instance.pk else None
+
+
+@receiver(post_save, sender=Shift)
+@receiver(post_delete, sender=Shift)
+def refresh_shift_availability(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous', None)
+    AvailabilityService.record_shift_change(instance.doctor_id, previous and previous.doctor_id)
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def refresh_appointment_availability(sender, instance, **kwargs):
+    bookings = [(instance.doctor_id, instance.scheduled_at, instance.duration_minutes)]
+
+    # Values as loaded from the database (Appointment.from_db), to free a moved slot
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    previous = tuple(loaded.get(field) for field in ('doctor_id', 'scheduled_at', 'duration_minutes'))
+    if all(previous) and previous != bookings[0]:
+        bookings.append(previous)
+    AvailabilityService.record_appointment_change(*bookings)
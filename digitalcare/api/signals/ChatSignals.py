@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from ..models import Message
+from ..services import ChatActivityService
+
+
+@receiver(post_save, sender=Message)
+def record_room_activity(sender, instance, created, **kwargs):
+    """Only new messages move the room's activity time; edits and read receipts don't"""
+    if created:
+        ChatActivityService.record(instance.chat_room_id, instance.created_at)
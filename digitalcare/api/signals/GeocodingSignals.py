@@ -0,0 +1,29 @@
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import receiver
+from ..models import Facility, StudentProfile, AdultProfile, VisitorProfile
+from ..services import GeocodingService
+
+
+@receiver(pre_save, sender=Facility)
+@receiver(pre_save, sender=StudentProfile)
+@receiver(pre_save, sender=AdultProfile)
+@receiver(pre_save, sender=VisitorProfile)
+def geocode_address_on_save(sender, instance, update_fields=None, **kwargs):
+    """Fill in coordinates from the address cache, or mark the address for geocoding"""
+    instance._geocode_pending = False
+    if not instance.address or (update_fields is not None and 'address' not in update_fields):
+        return
+    previous = (
+        sender.objects.filter(pk=instance.pk).values('address', 'latitude', 'longitude').first()
+        if instance.pk else None
+    )
+    instance._geocode_pending = GeocodingService.resolve(instance, previous)
+
+
+@receiver(post_save, sender=Facility)
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_save, sender=AdultProfile)
+@receiver(post_save, sender=VisitorProfile)
+def queue_geocoding(sender, instance, **kwargs):
+    if getattr(instance, '_geocode_pending', False):
+        GeocodingService.queue(sender, instance.pk, (instance.latitude, instance.longitude))
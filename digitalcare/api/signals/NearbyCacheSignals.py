@@ -0,0 +1,40 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from ..models import Facility, DoctorProfile, PharmacistProfile, LabTechProfile
+from ..services import NearbyCacheService
+
+
+@receiver(pre_save, sender=Facility)
+@receiver(pre_save, sender=DoctorProfile)
+@receiver(pre_save, sender=PharmacistProfile)
+@receiver(pre_save, sender=LabTechProfile)
+def remember_previous_location(sender, instance, **kwargs):
+    """Keep the stored location so a provider that moved leaves its old cells too"""
+    fields = NearbyCacheService.TRACKED_FIELDS[sender]
+    instance._previous_location = (
+        sender.objects.filter(pk=instance.pk).values(*fields).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Facility)
+@receiver(post_save, sender=DoctorProfile)
+@receiver(post_save, sender=PharmacistProfile)
+@receiver(post_save, sender=LabTechProfile)
+def invalidate_nearby_on_save(sender, instance, **kwargs):
+    current = {field: getattr(instance, field) for field in NearbyCacheService.TRACKED_FIELDS[sender]}
+    previous = getattr(instance, '_previous_location', None)
+    if previous == current:
+        return
+
+    points = [(current['latitude'], current['longitude'])]
+    if previous:
+        points.append((previous['latitude'], previous['longitude']))
+    NearbyCacheService.record_location_change(sender, *points)
+
+
+@receiver(post_delete, sender=Facility)
+@receiver(post_delete, sender=DoctorProfile)
+@receiver(post_delete, sender=PharmacistProfile)
+@receiver(post_delete, sender=LabTechProfile)
+def invalidate_nearby_on_delete(sender, instance, **kwargs):
+    NearbyCacheService.record_location_change(sender, (instance.latitude, instance.longitude))
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from ..models import Facility, PharmacyInventory
+from ..services import PharmacyStockService
+
+
+@receiver(post_save, sender=PharmacyInventory)
+@receiver(post_delete, sender=PharmacyInventory)
+def invalidate_stock_on_inventory_change(sender, instance, **kwargs):
+    PharmacyStockService.record_stock_change(instance.drug_id)
+
+
+@receiver(post_save, sender=Facility)
+@receiver(post_delete, sender=Facility)
+def invalidate_stock_on_pharmacy_change(sender, instance, **kwargs):
+    # _previous_location is kept by the nearby cache's pre_save handler
+    previous = getattr(instance, '_previous_location', None) or {}
+    if Facility.PHARMACY in (instance.facility_type, previous.get('facility_type')):
+        PharmacyStockService.record_pharmacy_change()
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from ..models import Facility, DoctorProfile, PharmacistProfile, LabTechProfile
+from ..services import ProviderIndexService
+
+
+@receiver(post_save, sender=Facility)
+@receiver(post_save, sender=DoctorProfile)
+@receiver(post_save, sender=PharmacistProfile)
+@receiver(post_save, sender=LabTechProfile)
+@receiver(post_delete, sender=Facility)
+@receiver(post_delete, sender=DoctorProfile)
+@receiver(post_delete, sender=PharmacistProfile)
+@receiver(post_delete, sender=LabTechProfile)
+def publish_provider_change(sender, instance, **kwargs):
+    ProviderIndexService.record_change(sender, instance.pk)
@@ -1,3 +1,9 @@
 from .ProfileSignals import *
 from .OTPVerificationSignal import *
-from .HealthCardSignals import *
\ No newline at end of file
+from .HealthCardSignals import *
+from .ChatSignals import *
+from .AvailabilitySignals import *
+from .NearbyCacheSignals import *
+from .ProviderIndexSignals import *
+from .GeocodingSignals import *
+from .PharmacyStockSignals import *
\ No newline at end of file
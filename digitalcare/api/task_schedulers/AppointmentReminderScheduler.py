@@ -7,7 +7,8 @@ logger = logging.getLogger(__name__)
 
 VALID_PERIODS = {
     'days': IntervalSchedule.DAYS,
-    
+    'hours': IntervalSchedule.HOURS,
+    'minutes': IntervalSchedule.MINUTES,
     'seconds': IntervalSchedule.SECONDS
 }
 
@@ -43,21 +44,26 @@ def _validate_time(hour: int, minute: int) -> tuple:
     return hour, minute
 
 
-def set_appointment_reminder_schedule(every: int, period: str, enabled: bool = True, reminder_window_hours: int = 24):
+def set_appointment_reminder_schedule(every: int, period: str, enabled: bool = True, reminder_window_hours: int = 24,
+                                      shards: int = None):
     """
     Set or update appointment reminder schedule.
     
     Args:
         every: Frequency (e.g., 1, 2, 3)
-        period: Time period ('days')
+        period: Time period ('days', 'hours', 'minutes', 'seconds'); run at least
+            every few minutes so 15 minute reminders go out on time
         enabled: Whether the task is enabled
         reminder_window_hours: Hours ahead to check for appointments
+        shards: Parallel shard tasks per reminder kind (default: settings.APPOINTMENT_REMINDER_SHARDS)
     """
     try:
         _validate_period(period)
         
         if every < 1:
             raise ValidationError("'every' must be at least 1")
+        if shards is not None and shards < 1:
+            raise ValidationError("'shards' must be at least 1")
         
         interval, _ = IntervalSchedule.objects.get_or_create(
             every=every,
@@ -69,7 +75,7 @@ def set_appointment_reminder_schedule(every: int, period: str, enabled: bool = T
             defaults={
                 'interval': interval,
                 'task': TASK_PATHS['appointment_reminder'],
-                'args': json.dumps([reminder_window_hours]),
+                'args': json.dumps([reminder_window_hours, shards]),
                 'enabled': enabled,
                 'one_off': False,
                 'clocked': None,
@@ -92,12 +98,14 @@ def get_appointment_reminder_schedule() -> dict:
         task = PeriodicTask.objects.get(name=TASK_NAMES['appointment_reminder'])
         args = json.loads(task.args or '[]')
         reminder_window = args[0] if args else 24
+        shards = args[1] if len(args) > 1 else None
         
         return {
             'every': task.interval.every,
             'period': task.interval.get_period_display(),
             'enabled': task.enabled,
             'reminder_window_hours': reminder_window,
+            'shards': shards,
         }
     except PeriodicTask.DoesNotExist:
         logger.warning("Appointment reminder schedule not found")
@@ -110,9 +118,11 @@ def get_appointment_reminder_schedule() -> dict:
 def set_doctor_appointment_reminder_schedule(hour: int, minute: int, enabled: bool = True):
     """
     Set or update doctor appointment reminder schedule (cron-based).
+    The task runs hourly at `minute` and each doctor gets the summary
+    when it is `hour` in their own time zone.
     
     Args:
-        hour: Hour of day (0-23)
+        hour: Local hour of day (0-23)
         minute: Minute of hour (0-59)
         enabled: Whether the task is enabled
     """
@@ -121,7 +131,7 @@ def set_doctor_appointment_reminder_schedule(hour: int, minute: int, enabled: bo
         
         crontab, _ = CrontabSchedule.objects.get_or_create(
             minute=minute,
-            hour=hour,
+            hour='*',
             day_of_week='*',
             day_of_month='*',
             month_of_year='*',
@@ -133,14 +143,14 @@ def set_doctor_appointment_reminder_schedule(hour: int, minute: int, enabled: bo
             defaults={
                 'crontab': crontab,
                 'task': TASK_PATHS['doctor_reminder'],
-                'args': json.dumps([]),
+                'args': json.dumps([hour]),
                 'enabled': enabled,
                 'interval': None,
                 'one_off': False,
             }
         )
         
-        logger.info(f"Doctor appointment reminder scheduled: daily at {hour:02d}:{minute:02d} UTC, enabled={enabled}")
+        logger.info(f"Doctor appointment reminder scheduled: daily at {hour:02d}:{minute:02d} doctor local time, enabled={enabled}")
         
     except ValidationError as e:
         logger.error(f"Validation error setting doctor reminder: {str(e)}")
@@ -154,9 +164,10 @@ def get_doctor_appointment_reminder_schedule() -> dict:
     """Get current doctor appointment reminder schedule"""
     try:
         task = PeriodicTask.objects.get(name=TASK_NAMES['doctor_reminder'])
+        args = json.loads(task.args or '[]')
         
         return {
-            'hour': int(task.crontab.hour),
+            'hour': args[0] if args else int(task.crontab.hour),
             'minute': int(task.crontab.minute),
             'enabled': task.enabled,
         }
@@ -0,0 +1,54 @@
+from django_celery_beat.models import PeriodicTask, CrontabSchedule
+from django.core.exceptions import ValidationError
+import json
+import logging
+
+from .AppointmentReminderScheduler import SchedulerError, _validate_time
+
+logger = logging.getLogger(__name__)
+
+AVAILABILITY_INDEX_TASK_NAME = 'Rebuild Availability Index'
+AVAILABILITY_INDEX_TASK_PATH = 'api.tasks_scheduled.AvailabilityIndexTask.rebuild_availability_index'
+
+
+def set_availability_index_schedule(hour: int = 0, minute: int = 5, enabled: bool = True):
+    """
+    Rebuild the doctor availability index daily (cron-based).
+    
+    Args:
+        hour: Hour of day (0-23)
+        minute: Minute of hour (0-59)
+        enabled: Whether the task is enabled
+    """
+    try:
+        _validate_time(hour, minute)
+        
+        crontab, _ = CrontabSchedule.objects.get_or_create(
+            minute=minute,
+            hour=hour,
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+            timezone='UTC'
+        )
+        
+        PeriodicTask.objects.update_or_create(
+            name=AVAILABILITY_INDEX_TASK_NAME,
+            defaults={
+                'crontab': crontab,
+                'task': AVAILABILITY_INDEX_TASK_PATH,
+                'args': json.dumps([]),
+                'enabled': enabled,
+                'interval': None,
+                'one_off': False,
+            }
+        )
+        
+        logger.info(f"Availability index rebuild scheduled: daily at {hour:02d}:{minute:02d} UTC, enabled={enabled}")
+        
+    except ValidationError as e:
+        logger.error(f"Validation error setting availability index rebuild: {str(e)}")
+        raise SchedulerError(str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error setting availability index rebuild: {str(e)}")
+        raise SchedulerError(f"Failed to set availability index schedule: {str(e)}")
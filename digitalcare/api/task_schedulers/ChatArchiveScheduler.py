@@ -0,0 +1,54 @@
+from django_celery_beat.models import PeriodicTask, CrontabSchedule
+from django.core.exceptions import ValidationError
+import json
+import logging
+
+from .AppointmentReminderScheduler import SchedulerError, _validate_time
+
+logger = logging.getLogger(__name__)
+
+CHAT_ARCHIVE_TASK_NAME = 'Archive Closed Chats'
+CHAT_ARCHIVE_TASK_PATH = 'api.tasks_scheduled.ChatArchiveTask.archive_closed_chats'
+
+
+def set_chat_archive_schedule(hour: int = 2, minute: int = 30, enabled: bool = True):
+    """
+    Archive long-closed chat rooms daily (cron-based).
+    
+    Args:
+        hour: Hour of day (0-23)
+        minute: Minute of hour (0-59)
+        enabled: Whether the task is enabled
+    """
+    try:
+        _validate_time(hour, minute)
+        
+        crontab, _ = CrontabSchedule.objects.get_or_create(
+            minute=minute,
+            hour=hour,
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+            timezone='UTC'
+        )
+        
+        PeriodicTask.objects.update_or_create(
+            name=CHAT_ARCHIVE_TASK_NAME,
+            defaults={
+                'crontab': crontab,
+                'task': CHAT_ARCHIVE_TASK_PATH,
+                'args': json.dumps([]),
+                'enabled': enabled,
+                'interval': None,
+                'one_off': False,
+            }
+        )
+        
+        logger.info(f"Chat archive scheduled: daily at {hour:02d}:{minute:02d} UTC, enabled={enabled}")
+        
+    except ValidationError as e:
+        logger.error(f"Validation error setting chat archive: {str(e)}")
+        raise SchedulerError(str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error setting chat archive: {str(e)}")
+        raise SchedulerError(f"Failed to set chat archive schedule: {str(e)}")
@@ -0,0 +1,56 @@
+from django_celery_beat.models import PeriodicTask, CrontabSchedule
+from django.core.exceptions import ValidationError
+import json
+import logging
+
+from .AppointmentReminderScheduler import SchedulerError, _validate_time
+
+logger = logging.getLogger(__name__)
+
+GEOCODING_BACKFILL_TASK_NAME = 'Backfill Missing Coordinates'
+GEOCODING_BACKFILL_TASK_PATH = 'api.tasks.GeocodingTask.geocode_missing_coordinates_task'
+
+
+def set_geocoding_backfill_schedule(minute: int = 15, enabled: bool = True, limit: int = None):
+    """
+    Geocode records missing coordinates every hour (cron-based).
+    
+    Args:
+        minute: Minute of the hour (0-59)
+        enabled: Whether the task is enabled
+        limit: New addresses sent to the geocoder per run (default: settings.GEOCODING_BATCH_SIZE)
+    """
+    try:
+        _validate_time(0, minute)
+        if limit is not None and limit < 1:
+            raise ValidationError("'limit' must be at least 1")
+        
+        crontab, _ = CrontabSchedule.objects.get_or_create(
+            minute=minute,
+            hour='*',
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+            timezone='UTC'
+        )
+        
+        PeriodicTask.objects.update_or_create(
+            name=GEOCODING_BACKFILL_TASK_NAME,
+            defaults={
+                'crontab': crontab,
+                'task': GEOCODING_BACKFILL_TASK_PATH,
+                'args': json.dumps([limit] if limit else []),
+                'enabled': enabled,
+                'interval': None,
+                'one_off': False,
+            }
+        )
+        
+        logger.info(f"Geocoding backfill scheduled: hourly at minute {minute:02d}, enabled={enabled}")
+        
+    except ValidationError as e:
+        logger.error(f"Validation error setting geocoding backfill: {str(e)}")
+        raise SchedulerError(str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error setting geocoding backfill: {str(e)}")
+        raise SchedulerError(f"Failed to set geocoding backfill schedule: {str(e)}")
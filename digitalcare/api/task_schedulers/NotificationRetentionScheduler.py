@@ -0,0 +1,54 @@
+from django_celery_beat.models import PeriodicTask, CrontabSchedule
+from django.core.exceptions import ValidationError
+import json
+import logging
+
+from .AppointmentReminderScheduler import SchedulerError, _validate_time
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_PURGE_TASK_NAME = 'Purge Expired Notifications'
+NOTIFICATION_PURGE_TASK_PATH = 'api.tasks_scheduled.NotificationRetentionTask.purge_expired_notifications'
+
+
+def set_notification_purge_schedule(hour: int = 3, minute: int = 0, enabled: bool = True):
+    """
+    Run the notification retention purge daily (cron-based).
+    
+    Args:
+        hour: Hour of day (0-23)
+        minute: Minute of hour (0-59)
+        enabled: Whether the task is enabled
+    """
+    try:
+        _validate_time(hour, minute)
+        
+        crontab, _ = CrontabSchedule.objects.get_or_create(
+            minute=minute,
+            hour=hour,
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+            timezone='UTC'
+        )
+        
+        PeriodicTask.objects.update_or_create(
+            name=NOTIFICATION_PURGE_TASK_NAME,
+            defaults={
+                'crontab': crontab,
+                'task': NOTIFICATION_PURGE_TASK_PATH,
+                'args': json.dumps([]),
+                'enabled': enabled,
+                'interval': None,
+                'one_off': False,
+            }
+        )
+        
+        logger.info(f"Notification purge scheduled: daily at {hour:02d}:{minute:02d} UTC, enabled={enabled}")
+        
+    except ValidationError as e:
+        logger.error(f"Validation error setting notification purge: {str(e)}")
+        raise SchedulerError(str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error setting notification purge: {str(e)}")
+        raise SchedulerError(f"Failed to set notification purge schedule: {str(e)}")
@@ -1 +1,5 @@
-from .AppointmentReminderScheduler import *
\ No newline at end of file
+from .AppointmentReminderScheduler import *
+from .NotificationRetentionScheduler import *
+from .AvailabilityIndexScheduler import *
+from .ChatArchiveScheduler import *
+from .GeocodingScheduler import *
\ No newline at end of file
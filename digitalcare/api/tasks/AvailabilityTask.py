@@ -0,0 +1,10 @@
+from celery import shared_task
+from ..services import AvailabilityService
+
+
+@shared_task
+def refresh_doctor_availability_task(doctor_id, dates=None):
+    """Rebuild one doctor's availability index over the horizon or on some dates (see AvailabilityService)"""
+    rows = AvailabilityService.refresh_doctor(doctor_id, dates)
+    print(f"Availability refreshed for doctor {doctor_id}: {rows} days open")
+    return rows
@@ -2,7 +2,8 @@
 from celery import shared_task
 from django.utils import timezone
 from datetime import datetime
-from ..models import Notification, User
+from ..models import User
+from ..services import NotificationService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -32,11 +33,11 @@ def send_scan_notification(user_id, ip_address, scanned_at):
             f"If this wasn't you, please contact support immediately."
         )
         
-        # Create notification
-        Notification.objects.create(
-            recipient=user,
-            message=message,
-            notification_type='HEALTH_CARD_SCAN',  # Add this field to your Notification model
+        # Create notification and push it to the owner's open sockets
+        NotificationService.notify(
+            user.id,
+            message,
+            notification_type='HEALTH_CARD_SCAN',
             metadata={
                 'ip_address': ip_address,
                 'scanned_at': scanned_at,
@@ -84,11 +85,11 @@ def send_suspicious_activity_alert(user_id, activity_type, details):
         message = f"{base_message} If this wasn't you, please secure your account immediately and contact support."
         
         # Create high-priority notification
-        Notification.objects.create(
-            recipient=user,
-            message=message,
+        NotificationService.notify(
+            user.id,
+            message,
             notification_type='SECURITY_ALERT',
-            priority='HIGH',  # Add priority field to your model
+            priority='HIGH',
             metadata={
                 'activity_type': activity_type,
                 'details': details,
@@ -133,9 +134,9 @@ def send_card_expiry_reminder(user_id, days_until_expiry):
             f"Please renew your card to avoid service interruption."
         )
         
-        Notification.objects.create(
-            recipient=user,
-            message=message,
+        NotificationService.notify(
+            user.id,
+            message,
             notification_type='CARD_EXPIRY_REMINDER',
             metadata={
                 'days_until_expiry': days_until_expiry,
@@ -0,0 +1,8 @@
+from celery import shared_task
+from ..services import ChatActivityService
+
+
+@shared_task
+def flush_chat_room_activity_task(room_id):
+    """Write a room's coalesced last_message_at (see ChatActivityService)"""
+    return ChatActivityService.flush(room_id)
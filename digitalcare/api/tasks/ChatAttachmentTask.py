@@ -0,0 +1,23 @@
+from celery import shared_task
+from PIL import UnidentifiedImageError
+from ..models import Message
+from ..services import ChatAttachmentService
+
+
+@shared_task
+def generate_attachment_renditions_task(message_id):
+    """Build thumbnail/preview images for an uploaded chat image off the request path"""
+    try:
+        message = Message.objects.get(id=message_id)
+    except Message.DoesNotExist:
+        print(f"Message with ID {message_id} does not exist")
+        return []
+
+    if not message.attachment:
+        return []
+
+    try:
+        return ChatAttachmentService.generate_renditions(message)
+    except (UnidentifiedImageError, OSError) as e:
+        print(f"Could not build renditions for message {message_id}: {str(e)}")
+        return []
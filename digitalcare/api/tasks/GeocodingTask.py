@@ -0,0 +1,22 @@
+from celery import shared_task
+from ..services import GeocodingService
+
+
+@shared_task
+def geocode_location_task(label, pk, latitude=None, longitude=None):
+    """
+    Geocode the address of one saved facility or patient profile (see
+    GeocodingService). The rate limit is enforced there, across workers:
+    Celery's rate_limit only applies per worker.
+    """
+    located = GeocodingService.geocode_location(label, pk, latitude, longitude)
+    print(f"Geocoded {label} {pk}: {'located' if located else 'not located'}")
+    return located
+
+
+@shared_task
+def geocode_missing_coordinates_task(limit=None):
+    """Backfill coordinates of records that have an address but no location"""
+    stats = GeocodingService.backfill(limit)
+    print(f"Geocoding backfill finished: {stats}")
+    return stats
@@ -1,13 +1,43 @@
 from celery import shared_task
-from ..models import Notification, User
+from ..services import NotificationService
 
 @shared_task
 def create_notification_task(user_id, message):
-    
-    try:
-        user = User.objects.get(id=user_id)
-        Notification.objects.create(recipient=user, message=message)
+    # Persisted and pushed to the user's open notification sockets
+    notification = NotificationService.notify(user_id, message)
+    if notification:
         print(f"Notification created for user {user_id}")
-    except User.DoesNotExist:
+    else:
         print(f"User with ID {user_id} does not exist")
 
+
+@shared_task
+def dispatch_notifications_task(items):
+    """
+    Persist a batch of notifications with bulk_create and push them in real time.
+
+    Args:
+        items: list of dicts with recipient_id, message and optional
+            notification_type, priority and metadata, or
+            (user_id, message, notification_type, metadata) lists
+    """
+    created = NotificationService.dispatch(items)
+    print(f"{len(created)} notifications dispatched")
+    return len(created)
+
+
+@shared_task
+def broadcast_notification_task(user_ids, message, notification_type='GENERAL', priority='NORMAL', metadata=None):
+    """Send the same notification to one chunk of a broadcast's recipients"""
+    created = NotificationService.dispatch([
+        {
+            'recipient_id': user_id,
+            'message': message,
+            'notification_type': notification_type,
+            'priority': priority,
+            'metadata': metadata,
+        }
+        for user_id in user_ids
+    ])
+    print(f"Broadcast notification sent to {len(created)} users")
+    return len(created)
@@ -0,0 +1,16 @@
+from celery import shared_task
+from ..services import AppointmentReminderService
+
+
+@shared_task
+def send_reminder_shard_task(kind, start, end):
+    """Send the due `kind` reminders of one (start, end] time shard"""
+    result = AppointmentReminderService.send_shard(kind, start, end)
+    print(f"Reminder shard {kind} {start} - {end}: {result['sent']} sent")
+    return result
+
+
+@shared_task
+def record_reminder_run_task(results, started_at):
+    """Chord callback: record the metrics of a sharded reminder run"""
+    return AppointmentReminderService.record_run(results, started_at)
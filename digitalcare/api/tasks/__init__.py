@@ -1,3 +1,8 @@
 from .EmailTask import *
 from .NotificationTask import *
 from .CardNotificationTask import *
+from .ChatAttachmentTask import *
+from .ChatActivityTask import *
+from .AvailabilityTask import *
+from .ReminderShardTask import *
+from .GeocodingTask import *
\ No newline at end of file
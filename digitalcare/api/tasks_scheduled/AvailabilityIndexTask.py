@@ -0,0 +1,26 @@
+# api/tasks_scheduled/AvailabilityIndexTask.py
+from celery import shared_task
+import logging
+
+from ..services import AvailabilityService
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def rebuild_availability_index():
+    """
+    Roll the DoctorAvailability index forward: drop past days, add the new
+    last day of the horizon and repair any row missed by the signals.
+    """
+    logger.info("=== AVAILABILITY INDEX TASK STARTED ===")
+
+    try:
+        rows = AvailabilityService.rebuild()
+        logger.info(f"Availability index rebuilt: {rows} doctor days with openings")
+        logger.info("=== AVAILABILITY INDEX TASK COMPLETED ===")
+        return rows
+
+    except Exception as e:
+        logger.error(f"Unexpected error in availability index task: {str(e)}")
+        raise
@@ -0,0 +1,30 @@
+# api/tasks_scheduled/ChatArchiveTask.py
+from celery import shared_task
+import logging
+
+from ..services import ChatArchiveService
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def archive_closed_chats(days=None, limit=None):
+    """
+    Move messages of rooms closed for more than N days into compressed
+    ChatArchive rows, keeping the Message table and its indexes small.
+
+    Args:
+        days: Days since the last activity (default: CHAT_ARCHIVE_AFTER_DAYS)
+        limit: Max rooms per run (default: CHAT_ARCHIVE_BATCH_ROOMS)
+    """
+    logger.info("=== CHAT ARCHIVE TASK STARTED ===")
+
+    try:
+        rooms, messages = ChatArchiveService.archive_closed_rooms(days, limit)
+        logger.info(f"Archived {messages} messages from {rooms} chat rooms")
+        logger.info("=== CHAT ARCHIVE TASK COMPLETED ===")
+        return rooms
+
+    except Exception as e:
+        logger.error(f"Unexpected error in chat archive task: {str(e)}")
+        raise
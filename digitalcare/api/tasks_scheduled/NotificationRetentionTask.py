@@ -0,0 +1,31 @@
+# api/tasks_scheduled/NotificationRetentionTask.py
+from celery import shared_task
+import logging
+
+from ..services import NotificationService
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def purge_expired_notifications(read_days=None, unread_days=None):
+    """
+    Retention job: delete notifications and chat notifications past their TTL so inbox queries
+    stay proportional to recent activity.
+
+    Args:
+        read_days: Days to keep read notifications (default: NOTIFICATION_RETENTION_DAYS)
+        unread_days: Days to keep unread notifications (default: NOTIFICATION_UNREAD_RETENTION_DAYS)
+    """
+    logger.info("=== NOTIFICATION PURGE TASK STARTED ===")
+
+    try:
+        deleted = NotificationService.purge(read_days, unread_days)
+
+        logger.info(f"Purged {deleted} notifications and chat notifications")
+        logger.info("=== NOTIFICATION PURGE TASK COMPLETED ===")
+        return deleted
+
+    except Exception as e:
+        logger.error(f"Unexpected error in notification purge task: {str(e)}")
+        raise
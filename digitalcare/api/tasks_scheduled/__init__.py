@@ -1 +1,4 @@
-from .AppointmentReminderTask import *
\ No newline at end of file
+from .AppointmentReminderTask import *
+from .NotificationRetentionTask import *
+from .ChatArchiveTask import *
+from .AvailabilityIndexTask import *
\ No newline at end of file
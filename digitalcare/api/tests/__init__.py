@@ -1 +1,6 @@
-from .health_card_tests import *
\ No newline at end of file
+from .health_card_tests import *
+from .chat_tests import *
+from .notification_tests import *
+from .search_tests import *
+from .shift_tests import *
+from .appointment_tests import *
\ No newline at end of file
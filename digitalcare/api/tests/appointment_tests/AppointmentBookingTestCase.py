@@ -0,0 +1,153 @@
+# api/tests/appointment_tests/AppointmentBookingTestCase.py
+
+import importlib
+from datetime import datetime, time, timedelta
+from unittest import mock
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from ...models import User, Facility, Shift, Appointment
+
+
+class AppointmentBookingTestCase(TestCase):
+    """Test the double-booking exclusion constraint and save() validation"""
+
+    # A Monday
+    DAY = datetime(2030, 1, 7).date()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.doctor_user = User.objects.create_user(
+            username='booking_doctor',
+            email='booking_doctor@example.com',
+            password='testpass123',
+            role=User.DOCTOR,
+            phone_number='+233200000077'
+        )
+        self.patient = User.objects.create_user(
+            username='booking_patient',
+            email='booking_patient@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000078'
+        )
+        self.doctor = self.doctor_user.doctorprofile
+        self.facility = Facility.objects.create(name='Booking Clinic', facility_type=Facility.CLINIC)
+        Shift.objects.create(
+            doctor=self.doctor, facility=self.facility,
+            day_of_week=Shift.MONDAY, start_time=time(9, 0), end_time=time(17, 0)
+        )
+
+    def at(self, hour, minute=0):
+        return timezone.make_aware(datetime.combine(self.DAY, time(hour, minute)))
+
+    def book(self, start, minutes=30, **kwargs):
+        return Appointment.objects.create(
+            patient=self.patient, doctor=self.doctor, facility=self.facility,
+            scheduled_at=start, duration_minutes=minutes, **kwargs
+        )
+
+    def test_overlapping_booking_is_rejected(self):
+        first = self.book(self.at(10), 60)
+        self.assertEqual(first.ends_at, self.at(11))
+
+        with self.assertRaises(ValidationError):
+            self.book(self.at(10, 30))
+
+        # Back-to-back slots and cancelled appointments do not conflict
+        self.book(self.at(11))
+        first.status = Appointment.CANCELLED
+        first.save()
+        self.book(self.at(10, 30))
+
+    def test_constraint_holds_when_validation_races(self):
+        self.book(self.at(10))
+
+        # Both requests passed full_clean before either committed
+        with mock.patch.object(Appointment, 'full_clean'):
+            with self.assertRaises(ValidationError) as raised:
+                self.book(self.at(10, 15))
+        self.assertEqual(raised.exception.code, 'double_booking')
+
+        with self.assertRaises(IntegrityError):
+            Appointment.objects.bulk_create([Appointment(
+                patient=self.patient, doctor=self.doctor, facility=self.facility,
+                scheduled_at=self.at(9, 45), ends_at=self.at(10, 15), status=Appointment.PENDING
+            )])
+
+    def test_status_only_save_skips_validation(self):
+        appointment = Appointment.objects.get(id=self.book(self.at(10)).id)
+        appointment.status = Appointment.CONFIRMED
+
+        with CaptureQueriesContext(connection) as queries:
+            appointment.save()
+
+        self.assertTrue(queries[0]['sql'].startswith('UPDATE "api_appointment"'))
+        self.assertFalse([q for q in queries if 'api_shift' in q['sql']])
+
+        appointment.scheduled_at = self.at(8)
+        with self.assertRaises(ValidationError):
+            appointment.save()
+
+    def test_api_reports_double_booking(self):
+        self.book(self.at(10))
+        other = self.book(self.at(11))
+        admin = User.objects.create_user(
+            username='booking_admin',
+            email='booking_admin@example.com',
+            password='testpass123',
+            role=User.ADMIN,
+            phone_number='+233200000079'
+        )
+        self.client.force_authenticate(user=admin)
+
+        response = self.client.patch(
+            f'/api/appointments/{other.id}/',
+            {'scheduled_at': self.at(10, 15).isoformat()},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('already has an appointment', str(response.data))
+
+    def test_migration_cancels_existing_double_bookings(self):
+        migration = importlib.import_module('api.migrations.0049_appointment_no_double_booking')
+        constraint = next(c for c in Appointment._meta.constraints if c.name == Appointment.DOUBLE_BOOKING_CONSTRAINT)
+        # Rows booked before the constraint existed
+        with connection.schema_editor() as editor:
+            editor.remove_constraint(Appointment, constraint)
+        first, overlapping, later, confirmed, done = Appointment.objects.bulk_create([
+            Appointment(
+                patient=self.patient, doctor=self.doctor, facility=self.facility,
+                scheduled_at=start, ends_at=start + timedelta(minutes=minutes), duration_minutes=minutes, status=status
+            )
+            for start, minutes, status in [
+                (self.at(10), 60, Appointment.PENDING),
+                (self.at(10, 30), 30, Appointment.PENDING),
+                (self.at(11), 30, Appointment.PENDING),
+                (self.at(10, 45), 30, Appointment.CONFIRMED),
+                (self.at(10), 30, Appointment.COMPLETED),
+            ]
+        ])
+
+        with self.assertLogs(migration.logger, 'WARNING') as logs:
+            with connection.schema_editor() as editor:
+                migration.cancel_double_bookings(apps, editor)
+
+        statuses = dict(Appointment.objects.values_list('id', 'status'))
+        self.assertEqual(
+            [statuses[a.id] for a in (first, overlapping, later, confirmed, done)],
+            [Appointment.PENDING, Appointment.CANCELLED, Appointment.PENDING, Appointment.CANCELLED, Appointment.COMPLETED]
+        )
+        self.assertIn(f'appointment {overlapping.id}', logs.output[0])
+
+        # The constraint can now be added; ALTER TABLE needs the deferred FK checks run first
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        with connection.schema_editor() as editor:
+            editor.add_constraint(Appointment, constraint)
@@ -0,0 +1,192 @@
+# api/tests/appointment_tests/AppointmentReminderTestCase.py
+
+from datetime import datetime, time, timedelta
+from unittest import mock
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from ...models import User, Facility, Shift, Appointment, Notification, ReminderDispatch
+from ...services import AppointmentReminderService
+from ...tasks_scheduled import send_appointment_reminder
+
+
+class AppointmentReminderTestCase(TestCase):
+    """Test the ledger-backed 24h / 2h / 15m reminder pipeline"""
+
+    # A Monday morning
+    NOW = timezone.make_aware(datetime(2030, 1, 7, 8, 0))
+
+    def setUp(self):
+        doctor_user = User.objects.create_user(
+            username='reminder_doctor',
+            email='reminder_doctor@example.com',
+            password='testpass123',
+            first_name='Kofi',
+            last_name='Boateng',
+            role=User.DOCTOR,
+            phone_number='+233200000087'
+        )
+        self.patient = User.objects.create_user(
+            username='reminder_patient',
+            email='reminder_patient@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000088'
+        )
+        self.doctor = doctor_user.doctorprofile
+        self.facility = Facility.objects.create(name='Reminder Clinic', facility_type=Facility.CLINIC)
+        for day in [Shift.MONDAY, Shift.TUESDAY, Shift.WEDNESDAY]:
+            Shift.objects.create(
+                doctor=self.doctor, facility=self.facility,
+                day_of_week=day, start_time=time(6, 0), end_time=time(20, 0)
+            )
+
+    def book(self, delta, status=Appointment.CONFIRMED):
+        return Appointment.objects.create(
+            patient=self.patient, doctor=self.doctor, facility=self.facility,
+            scheduled_at=self.NOW + delta, duration_minutes=10, status=status
+        )
+
+    def kinds(self, appointment):
+        return set(appointment.reminder_dispatches.values_list('reminder_kind', flat=True))
+
+    def test_each_appointment_gets_the_reminder_of_its_window_once(self):
+        soon = self.book(timedelta(minutes=10))
+        later = self.book(timedelta(minutes=90))
+        tomorrow = self.book(timedelta(hours=23))
+        self.book(timedelta(hours=30))
+        self.book(timedelta(hours=3), status=Appointment.PENDING)
+
+        sent = AppointmentReminderService.send_due(now=self.NOW)
+
+        self.assertEqual(sent, {'15m': 1, '2h': 1, '24h': 1})
+        self.assertEqual(self.kinds(soon), {'15m'})
+        self.assertEqual(self.kinds(later), {'2h'})
+        self.assertEqual(self.kinds(tomorrow), {'24h'})
+        notification = ReminderDispatch.objects.get(appointment=later).notification
+        self.assertIn('Dr. Kofi Boateng is in 2 hours', notification.message)
+
+        # Running again sends nothing
+        self.assertEqual(AppointmentReminderService.send_due(now=self.NOW), {'15m': 0, '2h': 0, '24h': 0})
+        self.assertEqual(Notification.objects.filter(notification_type='APPOINTMENT').count(), 3)
+
+    def test_later_runs_send_the_next_kind(self):
+        appointment = self.book(timedelta(hours=3))
+
+        for minutes in range(0, 180, 5):
+            AppointmentReminderService.send_due(now=self.NOW + timedelta(minutes=minutes))
+
+        self.assertEqual(self.kinds(appointment), {'24h', '2h', '15m'})
+        self.assertEqual(Notification.objects.filter(recipient=self.patient, notification_type='APPOINTMENT').count(), 3)
+
+    @override_settings(APPOINTMENT_REMINDER_BATCH_SIZE=2)
+    def test_lead_time_follows_the_appointment_not_the_kind(self):
+        appointment = self.book(timedelta(hours=3))
+        AppointmentReminderService.send_due(now=self.NOW)
+
+        # The 24h reminder of an appointment 3 hours away
+        message = ReminderDispatch.objects.get(appointment=appointment).notification.message
+        self.assertIn('is in 3 hours', message)
+        self.assertNotIn('tomorrow', message)
+
+        lead_time = AppointmentReminderService.lead_time
+        self.assertEqual(lead_time(self.NOW + timedelta(hours=6), self.NOW), 'today at 14:00')
+        self.assertEqual(lead_time(self.NOW + timedelta(hours=23), self.NOW), 'tomorrow at 07:00')
+        self.assertEqual(lead_time(self.NOW + timedelta(minutes=14, seconds=30), self.NOW), 'in 14 minutes')
+
+    def test_reminders_claimed_by_another_run_are_skipped(self):
+        first = self.book(timedelta(hours=5))
+        second = self.book(timedelta(hours=6))
+        due = AppointmentReminderService.due
+
+        def due_then_raced(kind, start, end):
+            # Another run commits its reminder after this run's anti-join was planned
+            rows = due(kind, start, end)
+            if kind == '24h':
+                rows = Appointment.objects.filter(id__in=list(rows.values_list('id', flat=True)))
+                ReminderDispatch.objects.create(appointment=first, reminder_kind=kind)
+            return rows
+
+        with mock.patch.object(AppointmentReminderService, 'due', side_effect=due_then_raced):
+            sent = AppointmentReminderService.send_due(now=self.NOW)
+
+        self.assertEqual(sent['24h'], 1)
+        self.assertEqual(self.kinds(second), {'24h'})
+        self.assertFalse(Notification.objects.filter(metadata__appointment_id=first.id).exists())
+
+    @override_settings(APPOINTMENT_REMINDER_BATCH_SIZE=2)
+    def test_due_appointments_are_sent_in_batches(self):
+        for hour in range(5):
+            self.book(timedelta(hours=3 + hour))
+
+        sent = AppointmentReminderService.send_due(now=self.NOW)
+
+        self.assertEqual(sent['24h'], 5)
+        self.assertEqual(ReminderDispatch.objects.count(), 5)
+
+    @override_settings(APPOINTMENT_REMINDER_KINDS=['24h', '2h'])
+    def test_kinds_and_window_are_configurable(self):
+        self.book(timedelta(minutes=10))
+        self.book(timedelta(hours=9))
+
+        self.assertEqual(AppointmentReminderService.send_due(max_offset=timedelta(hours=2), now=self.NOW), {'2h': 1})
+
+    def test_ledger_is_unique_per_kind(self):
+        appointment = self.book(timedelta(hours=5))
+        ReminderDispatch.objects.create(appointment=appointment, reminder_kind='24h')
+
+        with self.assertRaises(IntegrityError):
+            ReminderDispatch.objects.create(appointment=appointment, reminder_kind='24h')
+
+    def test_task_reports_counts(self):
+        self.assertEqual(send_appointment_reminder(24, 1), {'15m': 0, '2h': 0, '24h': 0})
+
+    def test_shards_split_each_window_without_gaps(self):
+        shards = AppointmentReminderService.shards(now=self.NOW, count=4)
+
+        self.assertEqual(len(shards), 12)
+        for kind, lower, upper in AppointmentReminderService.windows():
+            ranges = [(start, end) for shard_kind, start, end in shards if shard_kind == kind]
+            self.assertEqual(ranges[0][0], self.NOW + lower)
+            self.assertEqual(ranges[-1][1], self.NOW + upper)
+            for (_, end), (start, _) in zip(ranges, ranges[1:]):
+                self.assertEqual(end, start)
+
+    def test_sharded_run_sends_everything_and_records_metrics(self):
+        for delta in [timedelta(minutes=10), timedelta(minutes=50), timedelta(hours=3), timedelta(hours=9)]:
+            self.book(delta)
+
+        AppointmentReminderService.send_sharded(now=self.NOW, count=3)
+
+        self.assertEqual(ReminderDispatch.objects.count(), 4)
+        metrics = AppointmentReminderService.last_run()
+        self.assertEqual(metrics['shards'], 9)
+        self.assertEqual(metrics['sent'], {'15m': 1, '2h': 1, '24h': 2})
+
+        admin = User.objects.create_user(
+            username='reminder_admin',
+            email='reminder_admin@example.com',
+            password='testpass123',
+            role=User.ADMIN,
+            phone_number='+233200000106'
+        )
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        response = client.get('/api/reminders/last_run/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['sent'], {'15m': 1, '2h': 1, '24h': 2})
+
+    def test_late_shards_skip_appointments_already_started(self):
+        started = self.book(timedelta(minutes=10))
+
+        # The NOW..NOW+15m shard is only picked up 12 minutes later
+        with mock.patch('api.services.AppointmentReminderService.timezone.now',
+                        return_value=self.NOW + timedelta(minutes=12)):
+            result = AppointmentReminderService.send_shard(
+                '15m', self.NOW.isoformat(), (self.NOW + timedelta(minutes=15)).isoformat()
+            )
+
+        self.assertEqual(result['sent'], 0)
+        self.assertEqual(self.kinds(started), set())
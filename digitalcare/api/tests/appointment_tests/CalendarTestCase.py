@@ -0,0 +1,146 @@
+# api/tests/appointment_tests/CalendarTestCase.py
+
+from datetime import datetime, time
+from urllib.parse import urlparse
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from ...models import User, Facility, Shift, Appointment
+from ...services import CalendarService
+
+
+class CalendarTestCase(TestCase):
+    """Test the calendar range API, the .ics export and ETags"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.doctor_user = User.objects.create_user(
+            username='calendar_doctor',
+            email='calendar_doctor@example.com',
+            password='testpass123',
+            role=User.DOCTOR,
+            phone_number='+233200000084'
+        )
+        self.other_doctor_user = User.objects.create_user(
+            username='calendar_other',
+            email='calendar_other@example.com',
+            password='testpass123',
+            role=User.DOCTOR,
+            phone_number='+233200000085'
+        )
+        self.patient = User.objects.create_user(
+            username='calendar_patient',
+            email='calendar_patient@example.com',
+            password='testpass123',
+            first_name='Ama',
+            last_name='Mensah',
+            role=User.ADULT,
+            phone_number='+233200000086'
+        )
+        self.doctor = self.doctor_user.doctorprofile
+        self.facility = Facility.objects.create(name='Calendar Clinic', facility_type=Facility.CLINIC)
+        Shift.objects.create(
+            doctor=self.doctor, facility=self.facility,
+            day_of_week=Shift.MONDAY, start_time=time(9, 0), end_time=time(17, 0)
+        )
+        self.appointment = self.book(datetime(2030, 1, 7, 10, 0))
+        self.book(datetime(2030, 1, 21, 10, 0))
+        self.client.force_authenticate(user=self.doctor_user)
+
+    def book(self, when):
+        return Appointment.objects.create(
+            patient=self.patient, doctor=self.doctor, facility=self.facility,
+            scheduled_at=timezone.make_aware(when), duration_minutes=30
+        )
+
+    def get_calendar(self, **params):
+        return self.client.get('/api/calendar/', {'from': '2030-01-06', 'to': '2030-01-14', **params})
+
+    def test_range_returns_appointments_and_shift_occurrences(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_calendar()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        events = response.data['events']
+        # In start order: Monday's 9:00 shift comes before its 10:00 appointment
+        self.assertEqual([e['type'] for e in events], ['shift', 'appointment', 'shift'])
+        self.assertEqual(events[1]['patient'], 'Ama Mensah')
+        self.assertEqual(events[2]['start'], timezone.make_aware(datetime(2030, 1, 14, 9, 0)))
+        self.assertLess(len(queries), 10)
+
+    def test_etag_short_circuits_unchanged_calendars(self):
+        etag = self.get_calendar()['ETag']
+
+        response = self.client.get(
+            '/api/calendar/', {'from': '2030-01-06', 'to': '2030-01-14'}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.appointment.reason = 'Follow-up'
+        self.appointment.save()
+        response = self.client.get(
+            '/api/calendar/', {'from': '2030-01-06', 'to': '2030-01-14'}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_other_doctors_cannot_read_the_calendar(self):
+        self.client.force_authenticate(user=self.other_doctor_user)
+
+        response = self.get_calendar(doctor_id=self.doctor.id)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_ics_export_through_feed_token(self):
+        url = self.client.get('/api/calendar/feed/').data['url']
+        self.client.force_authenticate(user=None)
+
+        parsed = urlparse(url)
+        response = self.client.get(f'{parsed.path}?{parsed.query}&from=2030-01-01&to=2030-01-31')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        # 2 appointments and 4 Monday shifts in January 2030
+        self.assertEqual(body.count('BEGIN:VEVENT'), 6)
+        self.assertIn('SUMMARY:Appointment: Ama Mensah', body)
+
+        response = self.client.get('/api/calendar.ics', {'token': 'forged'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_feed_tokens_expire_and_can_be_revoked(self):
+        token = CalendarService.feed_token(self.doctor_user)
+        user, _ = CalendarService.read_feed_token(token)
+        self.assertEqual(user, self.doctor_user)
+
+        with override_settings(CALENDAR_FEED_TOKEN_MAX_AGE=-1):
+            with self.assertRaisesMessage(ValueError, 'expired'):
+                CalendarService.read_feed_token(token)
+
+        response = self.client.delete('/api/calendar/feed/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        with self.assertRaisesMessage(ValueError, 'revoked'):
+            CalendarService.read_feed_token(token)
+
+        # URLs handed out after the revocation work
+        self.doctor_user.refresh_from_db()
+        CalendarService.read_feed_token(CalendarService.feed_token(self.doctor_user))
+
+    def test_ics_lines_are_folded(self):
+        line = CalendarService.ics_line('SUMMARY:' + 'é' * 60)
+
+        parts = line.rstrip(b'\r\n').split(b'\r\n ')
+        self.assertGreater(len(parts), 1)
+        self.assertTrue(all(len(part) <= 75 for part in parts))
+        self.assertEqual(b''.join(parts).decode(), 'SUMMARY:' + 'é' * 60)
+
+    def test_appointment_list_filters_by_range(self):
+        response = self.client.get('/api/appointments/', {'from': '2030-01-15', 'to': '2030-01-31'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
+        response = self.client.get('/api/appointments/', {'from': 'soon'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,125 @@
+# api/tests/appointment_tests/DoctorSummaryTestCase.py
+
+import importlib
+import json
+from datetime import datetime, time, timedelta
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.utils import timezone
+from django_celery_beat.models import CrontabSchedule, PeriodicTask
+from ...models import User, Facility, Shift, Appointment, Notification
+from ...services import DoctorSummaryService
+
+
+class DoctorSummaryTestCase(TestCase):
+    """Test the grouped, time-zone aware doctor morning summary"""
+
+    # A Monday, 07:00 UTC
+    NOW = timezone.make_aware(datetime(2030, 1, 7, 7, 0))
+
+    def setUp(self):
+        self.facility = Facility.objects.create(name='Summary Clinic', facility_type=Facility.CLINIC)
+        self.patient = User.objects.create_user(
+            username='summary_patient',
+            email='summary_patient@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000089'
+        )
+        self.local_doctor = self.create_doctor('summary_local', 'Ama', 'Owusu', '+233200000090')
+        self.remote_doctor = self.create_doctor('summary_remote', 'Yaw', 'Darko', '+233200000091')
+        self.remote_doctor.timezone = 'America/New_York'
+        self.remote_doctor.save()
+
+    def create_doctor(self, username, first_name, last_name, phone_number):
+        user = User.objects.create_user(
+            username=username,
+            email=f'{username}@example.com',
+            password='testpass123',
+            first_name=first_name,
+            last_name=last_name,
+            role=User.DOCTOR,
+            phone_number=phone_number
+        )
+        for day in [Shift.MONDAY, Shift.TUESDAY]:
+            Shift.objects.create(
+                doctor=user.doctorprofile, facility=self.facility,
+                day_of_week=day, start_time=time(6, 0), end_time=time(20, 0)
+            )
+        return user.doctorprofile
+
+    def book(self, doctor, delta, status=Appointment.CONFIRMED):
+        return Appointment.objects.create(
+            patient=self.patient, doctor=doctor, facility=self.facility,
+            scheduled_at=self.NOW + delta, duration_minutes=20, status=status
+        )
+
+    def summaries(self, doctor):
+        return list(
+            Notification.objects.filter(recipient=doctor.user, notification_type='APPOINTMENT')
+            .values_list('message', flat=True)
+        )
+
+    def test_counts_come_from_one_grouped_query(self):
+        self.book(self.local_doctor, timedelta(hours=1))
+        self.book(self.local_doctor, timedelta(hours=2))
+        self.book(self.local_doctor, timedelta(hours=3), status=Appointment.PENDING)
+        self.book(self.local_doctor, timedelta(hours=4), status=Appointment.CANCELLED)
+        self.book(self.local_doctor, timedelta(days=1))
+        self.book(self.remote_doctor, timedelta(hours=8), status=Appointment.PENDING)
+
+        start = self.NOW.replace(hour=0)
+        with self.assertNumQueries(1):
+            rows = list(DoctorSummaryService.counts(start, start + timedelta(days=1)))
+
+        totals = {row['doctor_id']: (row['total'], row['confirmed'], row['pending']) for row in rows}
+        self.assertEqual(totals, {self.local_doctor.id: (3, 2, 1), self.remote_doctor.id: (1, 0, 1)})
+
+    def test_each_doctor_is_summarised_in_their_local_morning(self):
+        self.book(self.local_doctor, timedelta(hours=1))
+        self.book(self.local_doctor, timedelta(hours=2), status=Appointment.PENDING)
+        # 10:00 in New York
+        self.book(self.remote_doctor, timedelta(hours=8))
+
+        self.assertEqual(DoctorSummaryService.send(now=self.NOW, hour=7), 1)
+        self.assertEqual(self.summaries(self.local_doctor), [
+            "Good morning Dr. Ama Owusu, you have 2 appointments scheduled for today: "
+            "1 confirmed and 1 pending."
+        ])
+        self.assertEqual(self.summaries(self.remote_doctor), [])
+
+        # 07:00 in New York
+        self.assertEqual(DoctorSummaryService.send(now=self.NOW + timedelta(hours=5), hour=7), 1)
+        self.assertEqual(self.summaries(self.remote_doctor), [
+            "Good morning Dr. Yaw Darko, you have 1 appointments scheduled for today: "
+            "1 confirmed and 0 pending."
+        ])
+        self.assertEqual(len(self.summaries(self.local_doctor)), 1)
+
+    def test_doctors_without_appointments_get_no_summary(self):
+        self.assertEqual(DoctorSummaryService.send(now=self.NOW, hour=7), 0)
+        self.assertFalse(Notification.objects.filter(notification_type='APPOINTMENT').exists())
+
+    def test_unknown_time_zone_is_rejected(self):
+        self.local_doctor.timezone = 'Mars/Olympus_Mons'
+
+        with self.assertRaises(ValidationError):
+            self.local_doctor.full_clean()
+
+    def test_migration_moves_the_daily_schedule_to_local_hours(self):
+        migration = importlib.import_module('api.migrations.0059_doctor_summary_local_hour_schedule')
+        daily = CrontabSchedule.objects.create(minute='30', hour='7', timezone='UTC')
+        task = PeriodicTask.objects.create(
+            name=migration.TASK_NAME, task='api.tasks.send_doctor_appointment_reminder_summary',
+            crontab=daily, args='[]'
+        )
+
+        migration.run_hourly(apps, None)
+        task.refresh_from_db()
+        self.assertEqual((task.crontab.hour, task.crontab.minute), ('*', '30'))
+        self.assertEqual(json.loads(task.args), [7])
+
+        migration.run_daily(apps, None)
+        task.refresh_from_db()
+        self.assertEqual((task.crontab.hour, json.loads(task.args)), ('7', []))
@@ -0,0 +1,4 @@
+from .AppointmentBookingTestCase import *
+from .CalendarTestCase import *
+from .AppointmentReminderTestCase import *
+from .DoctorSummaryTestCase import *
\ No newline at end of file
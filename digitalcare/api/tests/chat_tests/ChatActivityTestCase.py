@@ -0,0 +1,108 @@
+# api/tests/chat_tests/ChatActivityTestCase.py
+
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase
+from ...models import User, ChatRoom, Message
+from ...services import ChatActivityService
+
+
+class FakeRedis:
+    """Just the commands ChatActivityService uses"""
+
+    def __init__(self):
+        self.data = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = str(value).encode()
+        return True
+
+    def eval(self, script, numkeys, key, value, ex):
+        # SET_MAX_SCRIPT
+        current = self.data.get(key)
+        if current is not None and float(current) >= float(value):
+            return 0
+        return self.set(key, value, ex=ex)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def getdel(self, key):
+        return self.data.pop(key, None)
+
+
+class ChatActivityTestCase(TestCase):
+    """Test deferred, monotonic and coalesced last_message_at updates"""
+
+    def setUp(self):
+        self.doctor = User.objects.create_user(
+            username='activity_doctor',
+            email='activity_doctor@example.com',
+            password='testpass123',
+            role=User.DOCTOR,
+            phone_number='+233200000060'
+        )
+        self.patient = User.objects.create_user(
+            username='activity_patient',
+            email='activity_patient@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000061'
+        )
+        self.room = ChatRoom.objects.create(patient=self.patient, doctor=self.doctor)
+
+    def test_only_new_messages_touch_the_room_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            message = Message.objects.create(chat_room=self.room, sender=self.patient, content='hi')
+        self.assertEqual(len(callbacks), 1)
+
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.last_message_at, message.created_at)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            message.mark_as_read(self.doctor)
+            message.content = 'edited'
+            message.save()
+        self.assertEqual(callbacks, [])
+
+    def test_updates_never_move_backwards(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            message = Message.objects.create(chat_room=self.room, sender=self.patient, content='hi')
+
+        ChatActivityService.apply(self.room.id, message.created_at - timedelta(minutes=5))
+
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.last_message_at, message.created_at)
+
+    def test_redis_coalesces_room_writes(self):
+        fake = FakeRedis()
+        with mock.patch.object(ChatActivityService, 'redis', return_value=fake), \
+                mock.patch('api.tasks.flush_chat_room_activity_task.apply_async') as flush:
+            with self.captureOnCommitCallbacks(execute=True):
+                Message.objects.create(chat_room=self.room, sender=self.patient, content='one')
+                last = Message.objects.create(chat_room=self.room, sender=self.doctor, content='two')
+
+            # One flush scheduled for the burst, nothing written yet
+            self.assertEqual(flush.call_count, 1)
+            self.room.refresh_from_db()
+            self.assertIsNone(self.room.last_message_at)
+
+            self.assertTrue(ChatActivityService.flush(self.room.id))
+
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.last_message_at, last.created_at)
+
+    def test_coalesced_value_never_moves_backwards(self):
+        fake = FakeRedis()
+        now = self.room.created_at
+        with mock.patch.object(ChatActivityService, 'redis', return_value=fake), \
+                mock.patch('api.tasks.flush_chat_room_activity_task.apply_async'):
+            # The later message commits first
+            ChatActivityService.schedule(self.room.id, now + timedelta(seconds=5))
+            ChatActivityService.schedule(self.room.id, now + timedelta(seconds=2))
+            ChatActivityService.flush(self.room.id)
+
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.last_message_at, now + timedelta(seconds=5))
@@ -0,0 +1,143 @@
+# api/tests/chat_tests/ChatArchiveTestCase.py
+
+import importlib
+from datetime import timedelta
+from unittest import mock
+from django.apps import apps
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from django_celery_beat.models import PeriodicTask
+from ...models import User, ChatRoom, ChatArchive, Message
+from ...services import ChatArchiveService
+from ...task_schedulers import CHAT_ARCHIVE_TASK_NAME, CHAT_ARCHIVE_TASK_PATH, set_chat_archive_schedule
+
+
+class ChatArchiveTestCase(TestCase):
+    """Test compaction of closed rooms and rehydration on read"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.doctor = User.objects.create_user(
+            username='archive_doctor',
+            email='archive_doctor@example.com',
+            password='testpass123',
+            role=User.DOCTOR,
+            phone_number='+233200000070'
+        )
+        self.patient = User.objects.create_user(
+            username='archive_patient',
+            email='archive_patient@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000071'
+        )
+        self.room = ChatRoom.objects.create(
+            patient=self.patient, doctor=self.doctor, status=ChatRoom.CLOSED
+        )
+        self.messages = [
+            Message.objects.create(chat_room=self.room, sender=self.patient, content='hello'),
+            Message.objects.create(chat_room=self.room, sender=self.doctor, content='hi there'),
+        ]
+        ChatRoom.objects.filter(id=self.room.id).update(
+            last_message_at=timezone.now() - timedelta(days=40)
+        )
+
+    def test_archive_moves_messages_out_of_hot_table(self):
+        rooms, messages = ChatArchiveService.archive_closed_rooms(days=30)
+
+        self.assertEqual((rooms, messages), (1, 2))
+        self.assertFalse(Message.objects.filter(chat_room=self.room).exists())
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.status, ChatRoom.ARCHIVED)
+        self.assertEqual(ChatArchive.objects.get(chat_room=self.room).message_count, 2)
+
+    def test_recently_closed_rooms_are_kept(self):
+        self.assertEqual(ChatArchiveService.archive_closed_rooms(days=60), (0, 0))
+
+    def test_history_endpoint_rehydrates_archive(self):
+        ChatArchiveService.archive_room(self.room.id)
+        self.client.force_authenticate(user=self.patient)
+
+        response = self.client.get(f'/api/chat-rooms/{self.room.id}/messages/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([m['content'] for m in response.data], ['hello', 'hi there'])
+        self.assertEqual(response.data[1]['sender']['username'], 'archive_doctor')
+
+    def test_restore_keeps_ids_and_timestamps(self):
+        ChatArchiveService.archive_room(self.room.id)
+        self.assertEqual(ChatArchiveService.restore_room(self.room.id), 2)
+
+        restored = list(Message.objects.filter(chat_room=self.room).order_by('id'))
+        self.assertEqual([m.id for m in restored], [m.id for m in self.messages])
+        self.assertEqual(restored[0].created_at, self.messages[0].created_at)
+        self.assertFalse(ChatArchive.objects.filter(chat_room=self.room).exists())
+
+    def test_archived_room_status_is_kept(self):
+        ChatArchiveService.archive_room(self.room.id)
+        self.client.force_authenticate(user=self.patient)
+
+        response = self.client.post(f'/api/chat-rooms/{self.room.id}/close_chat/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.patch(f'/api/chat-rooms/{self.room.id}/', {'status': ChatRoom.ACTIVE}, format='json')
+
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.status, ChatRoom.ARCHIVED)
+
+    def test_restore_endpoint(self):
+        ChatArchiveService.archive_room(self.room.id)
+        self.client.force_authenticate(user=self.patient)
+        url = f'/api/chat-rooms/{self.room.id}/restore_chat/'
+
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['restored_messages'], 2)
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.status, ChatRoom.CLOSED)
+        self.assertEqual(Message.objects.filter(chat_room=self.room).count(), 2)
+
+        # Only archived rooms can be restored
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_room_list_reads_archive(self):
+        ChatArchiveService.archive_room(self.room.id)
+        self.client.force_authenticate(user=self.patient)
+
+        # The list reads the summary stored when archiving, not the payload
+        with mock.patch.object(ChatArchiveService, 'unpack', side_effect=AssertionError), \
+                CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/chat-rooms/')
+
+        room, = response.data
+        self.assertEqual(room['last_message']['content'], 'hi there')
+        self.assertEqual(room['last_message']['sender_username'], 'archive_doctor')
+        self.assertEqual(room['last_message']['created_at'], self.messages[1].created_at)
+        self.assertEqual(room['unread_count'], 1)
+        self.assertFalse(any('"payload"' in query['sql'] for query in queries))
+
+        self.client.force_authenticate(user=self.doctor)
+        self.assertEqual(self.client.get('/api/chat-rooms/').data[0]['unread_count'], 1)
+
+    def test_migration_summarizes_existing_archives(self):
+        migration = importlib.import_module('api.migrations.0065_chat_archive_summary')
+        ChatArchiveService.archive_room(self.room.id)
+        ChatArchive.objects.update(last_message=None, unread_counts={})
+
+        migration.summarize(apps, None)
+
+        archive = ChatArchive.objects.get(chat_room=self.room)
+        self.assertEqual(archive.last_message['sender_username'], 'archive_doctor')
+        self.assertEqual(archive.unread_counts, {str(self.patient.id): 1, str(self.doctor.id): 1})
+
+    def test_archive_is_scheduled(self):
+        # Registered by the migrations, then moved from the admin side
+        task = PeriodicTask.objects.get(name=CHAT_ARCHIVE_TASK_NAME)
+        self.assertEqual((task.task, task.crontab.hour, task.crontab.minute), (CHAT_ARCHIVE_TASK_PATH, '2', '30'))
+
+        set_chat_archive_schedule(hour=4, minute=0, enabled=False)
+        task.refresh_from_db()
+        self.assertEqual((task.crontab.hour, task.crontab.minute, task.enabled), ('4', '0', False))
@@ -0,0 +1,162 @@
+# api/tests/chat_tests/ChatAttachmentTestCase.py
+
+import io
+import shutil
+import tempfile
+from PIL import Image
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework import status
+from ...models import User, ChatRoom, Message, ChatNotification
+from ...utils import get_attachment_provider
+
+
+IN_MEMORY_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+class ChatAttachmentTestCase(TestCase):
+    """Test the ticket -> direct upload -> confirm flow and image renditions"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        settings_override = override_settings(
+            CHAT_ATTACHMENT_PROVIDER='api.utils.attachment_storage.FileSystemUploadProvider',
+            CHAT_ATTACHMENT_ROOT=self.root,
+            CHANNEL_LAYERS=IN_MEMORY_LAYERS,
+            CHAT_THUMBNAIL_SIZE=32,
+            CHAT_PREVIEW_SIZE=64,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = APIClient()
+        self.doctor = User.objects.create_user(
+            username='attach_doctor',
+            email='attach_doctor@example.com',
+            password='testpass123',
+            role=User.DOCTOR,
+            phone_number='+233200000040'
+        )
+        self.patient = User.objects.create_user(
+            username='attach_patient',
+            email='attach_patient@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000041'
+        )
+        self.room = ChatRoom.objects.create(
+            patient=self.patient, doctor=self.doctor, doctor_accepted=True
+        )
+        self.url = f'/api/chat-rooms/{self.room.id}/messages/'
+
+    def make_image(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (200, 100), 'red').save(buffer, format='JPEG')
+        return buffer.getvalue()
+
+    def request_ticket(self, size=1024, filename='scan.jpg', content_type='image/jpeg'):
+        return self.client.post(f'{self.url}attachment_ticket/', {
+            'filename': filename, 'content_type': content_type, 'size': size
+        }, format='json')
+
+    def upload(self, ticket, data):
+        name = signing.loads(ticket, salt='chat-attachment-upload')['name']
+        get_attachment_provider().save(name, ContentFile(data))
+        return name
+
+    def confirm(self, ticket):
+        return self.client.post(f'{self.url}confirm_attachment/', {'ticket': ticket}, format='json')
+
+    def test_direct_upload_creates_message_with_renditions(self):
+        self.client.force_authenticate(user=self.patient)
+        image = self.make_image()
+        response = self.request_ticket(size=len(image))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['upload']['method'], 'PUT')
+
+        # Client uploads straight to storage, bypassing the app server
+        ticket = response.data['ticket']
+        name = self.upload(ticket, image)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.confirm(ticket)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        message = Message.objects.get(id=response.data['id'])
+        self.assertEqual(message.message_type, 'image')
+        self.assertEqual(message.attachment.name, name)
+        with message.thumbnail.open('rb') as thumbnail:
+            self.assertEqual(Image.open(thumbnail).size, (32, 16))
+        with message.preview.open('rb') as preview:
+            self.assertEqual(Image.open(preview).size, (64, 32))
+
+    def test_confirm_before_upload_fails(self):
+        self.client.force_authenticate(user=self.patient)
+        ticket = self.request_ticket().data['ticket']
+
+        response = self.client.post(f'{self.url}confirm_attachment/', {'ticket': ticket}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ticket_is_bound_to_user(self):
+        self.client.force_authenticate(user=self.patient)
+        ticket = self.request_ticket().data['ticket']
+
+        self.client.force_authenticate(user=self.doctor)
+        response = self.client.post(f'{self.url}confirm_attachment/', {'ticket': ticket}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_oversized_attachment_rejected(self):
+        self.client.force_authenticate(user=self.patient)
+        response = self.request_ticket(size=10 ** 10)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_retried_confirm_notifies_once(self):
+        self.client.force_authenticate(user=self.patient)
+        image = self.make_image()
+        ticket = self.request_ticket(size=len(image)).data['ticket']
+        self.upload(ticket, image)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.confirm(ticket)
+        second = self.confirm(ticket)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data['id'], first.data['id'])
+        self.assertEqual(Message.objects.filter(chat_room=self.room).count(), 1)
+        self.assertEqual(ChatNotification.objects.filter(user=self.doctor).count(), 1)
+
+    def test_upload_must_match_ticket(self):
+        self.client.force_authenticate(user=self.patient)
+        image = self.make_image()
+
+        # Larger than declared
+        ticket = self.request_ticket(size=100).data['ticket']
+        name = self.upload(ticket, image)
+        self.assertEqual(self.confirm(ticket).status_code, status.HTTP_400_BAD_REQUEST)
+        # Rejected uploads are removed from storage
+        self.assertFalse(get_attachment_provider().exists(name))
+
+        # Declared as an image, stored under another type
+        ticket = self.request_ticket(size=len(image), filename='scan.pdf').data['ticket']
+        name = self.upload(ticket, image)
+        self.assertEqual(self.confirm(ticket).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(get_attachment_provider().exists(name))
+        self.assertFalse(Message.objects.filter(chat_room=self.room).exists())
+
+    def test_documents_are_stored_as_files(self):
+        self.client.force_authenticate(user=self.patient)
+        document = b'%PDF-1.4 lab results'
+        ticket = self.request_ticket(
+            size=len(document), filename='results.pdf', content_type='application/pdf'
+        ).data['ticket']
+        self.upload(ticket, document)
+
+        response = self.confirm(ticket)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        message = Message.objects.get(id=response.data['id'])
+        self.assertEqual(message.message_type, 'file')
+        self.assertEqual((message.attachment_content_type, message.attachment_size), ('application/pdf', len(document)))
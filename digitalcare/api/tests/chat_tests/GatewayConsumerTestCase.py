@@ -0,0 +1,151 @@
+# api/tests/chat_tests/GatewayConsumerTestCase.py
+
+import json
+from asgiref.testing import ApplicationCommunicator
+from channels.layers import get_channel_layer
+from django.test import TransactionTestCase, override_settings
+from ...consumers import ChatConsumer, GatewayConsumer
+from ...models import User, ChatRoom
+
+
+IN_MEMORY_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS)
+class GatewayConsumerTestCase(TransactionTestCase):
+    """
+    Test room/notification subscriptions over the multiplexed gateway socket.
+    TransactionTestCase: database_sync_to_async closes the test connection.
+    """
+
+    def setUp(self):
+        self.doctor = User.objects.create_user(
+            username='gateway_doctor',
+            email='gateway_doctor@example.com',
+            password='testpass123',
+            role=User.DOCTOR,
+            phone_number='+233200000001'
+        )
+        self.other_doctor = User.objects.create_user(
+            username='gateway_other',
+            email='gateway_other@example.com',
+            password='testpass123',
+            role=User.DOCTOR,
+            phone_number='+233200000002'
+        )
+        self.patient = User.objects.create_user(
+            username='gateway_patient',
+            email='gateway_patient@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000003'
+        )
+        self.room = ChatRoom.objects.create(patient=self.patient, doctor=self.doctor)
+        self.foreign_room = ChatRoom.objects.create(patient=self.patient, doctor=self.other_doctor)
+
+    async def open_socket(self, user):
+        communicator = ApplicationCommunicator(GatewayConsumer.as_asgi(), {
+            'type': 'websocket',
+            'path': '/ws/gateway/',
+            'subprotocols': [],
+            'user': user,
+        })
+        await communicator.send_input({'type': 'websocket.connect'})
+        accept = await communicator.receive_output(1)
+        self.assertEqual(accept['type'], 'websocket.accept')
+        return communicator
+
+    async def send_frame(self, communicator, payload):
+        await communicator.send_input({'type': 'websocket.receive', 'text': json.dumps(payload)})
+
+    async def receive_frame(self, communicator):
+        frame = await communicator.receive_output(1)
+        return json.loads(frame['text'])
+
+    async def close(self, communicator):
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait(1)
+
+    async def test_subscribe_only_to_own_rooms(self):
+        """Rooms the user does not participate in are denied"""
+        communicator = await self.open_socket(self.doctor)
+        await self.send_frame(communicator, {
+            'type': 'subscribe',
+            'rooms': [self.room.id, self.foreign_room.id],
+            'notifications': True,
+        })
+
+        ack = await self.receive_frame(communicator)
+        self.assertEqual(ack['type'], 'subscribed')
+        self.assertEqual(ack['rooms'], [self.room.id])
+        self.assertEqual(ack['denied'], [self.foreign_room.id])
+        self.assertTrue(ack['notifications'])
+        await self.close(communicator)
+
+    async def test_room_frames_require_subscription(self):
+        """Typing in a room that was not subscribed returns an error"""
+        communicator = await self.open_socket(self.doctor)
+        await self.send_frame(communicator, {
+            'type': 'typing', 'room_id': self.room.id, 'is_typing': True
+        })
+
+        error = await self.receive_frame(communicator)
+        self.assertEqual(error['type'], 'error')
+        await self.close(communicator)
+
+    async def test_events_are_routed_by_room_and_notifications(self):
+        """Room events carry room_id and notifications share the same socket"""
+        doctor_socket = await self.open_socket(self.doctor)
+        await self.send_frame(doctor_socket, {
+            'type': 'subscribe', 'rooms': [self.room.id], 'notifications': True
+        })
+        await self.receive_frame(doctor_socket)
+        replay = await self.receive_frame(doctor_socket)
+        self.assertEqual(replay['type'], 'notification_replay')
+        badge = await self.receive_frame(doctor_socket)
+        self.assertEqual(badge, {'type': 'unread_count', 'count': 0})
+
+        patient_socket = await self.open_socket(self.patient)
+        await self.send_frame(patient_socket, {'type': 'subscribe', 'rooms': [self.room.id]})
+        await self.receive_frame(patient_socket)
+
+        # Doctor sees the patient coming online in that room
+        status_event = await self.receive_frame(doctor_socket)
+        self.assertEqual(status_event['type'], 'user_status')
+        self.assertEqual(status_event['room_id'], self.room.id)
+
+        await self.send_frame(patient_socket, {
+            'type': 'typing', 'room_id': self.room.id, 'is_typing': True
+        })
+        typing_event = await self.receive_frame(doctor_socket)
+        self.assertEqual(typing_event['type'], 'typing')
+        self.assertEqual(typing_event['room_id'], self.room.id)
+
+        await get_channel_layer().group_send(f'notifications_{self.doctor.id}', {
+            'type': 'notification_message',
+            'notification': {'type': 'notification', 'message': 'hello'},
+        })
+        notification = await self.receive_frame(doctor_socket)
+        self.assertEqual(notification['message'], 'hello')
+
+        await self.close(patient_socket)
+        await self.close(doctor_socket)
+
+    async def test_chat_socket_sends_the_same_room_id(self):
+        """/ws/chat/ takes the room id from the URL but sends it as an int too"""
+        communicator = ApplicationCommunicator(ChatConsumer.as_asgi(), {
+            'type': 'websocket',
+            'path': f'/ws/chat/{self.room.id}/',
+            'subprotocols': [],
+            'user': self.doctor,
+            'url_route': {'args': (), 'kwargs': {'room_id': str(self.room.id)}},
+        })
+        await communicator.send_input({'type': 'websocket.connect'})
+        self.assertEqual((await communicator.receive_output(1))['type'], 'websocket.accept')
+
+        await self.send_frame(communicator, {'type': 'message', 'message': 'Hello'})
+        frame = await self.receive_frame(communicator)
+        self.assertEqual(frame['type'], 'message')
+        self.assertEqual(frame['room_id'], self.room.id)
+
+        await self.close(communicator)
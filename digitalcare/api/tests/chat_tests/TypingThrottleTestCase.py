@@ -0,0 +1,72 @@
+# api/tests/chat_tests/TypingThrottleTestCase.py
+
+import asyncio
+from django.test import SimpleTestCase
+from ...utils import TypingThrottle
+
+
+class TypingThrottleTestCase(SimpleTestCase):
+    """Test leading/trailing edge throttling and expiry of typing events"""
+
+    def make_throttle(self, interval=0.05, expiry=0.2):
+        self.published = []
+
+        async def publish(is_typing):
+            self.published.append(is_typing)
+
+        return TypingThrottle(publish, interval=interval, expiry=expiry)
+
+    async def test_leading_edge_published_immediately(self):
+        """First typing frame is broadcast without delay"""
+        throttle = self.make_throttle()
+        await throttle.update(True)
+        self.assertEqual(self.published, [True])
+        await throttle.clear()
+
+    async def test_repeated_keystrokes_are_coalesced(self):
+        """Many typing frames in a row produce a single event"""
+        throttle = self.make_throttle()
+        for _ in range(50):
+            await throttle.update(True)
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.published, [True])
+        await throttle.clear()
+
+    async def test_trailing_edge_publishes_latest_state(self):
+        """A stop inside the window is sent when the window closes"""
+        throttle = self.make_throttle()
+        await throttle.update(True)
+        await throttle.update(False)
+        self.assertEqual(self.published, [True])
+
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.published, [True, False])
+
+    async def test_flapping_inside_window_is_dropped(self):
+        """Start/stop/start inside one window does not emit anything extra"""
+        throttle = self.make_throttle()
+        await throttle.update(True)
+        await throttle.update(False)
+        await throttle.update(True)
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.published, [True])
+        await throttle.clear()
+
+    async def test_typing_expires_without_frames(self):
+        """Typing state is cleared automatically after the expiry"""
+        throttle = self.make_throttle(expiry=0.1)
+        await throttle.update(True)
+        await asyncio.sleep(0.2)
+        self.assertEqual(self.published, [True, False])
+        self.assertFalse(throttle.is_typing)
+
+    async def test_clear_sends_stop_only_when_typing(self):
+        """clear() publishes a stop once, and nothing when idle"""
+        throttle = self.make_throttle()
+        await throttle.clear()
+        self.assertEqual(self.published, [])
+
+        await throttle.update(True)
+        await throttle.clear()
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.published, [True, False])
@@ -0,0 +1,93 @@
+# api/tests/chat_tests/WireProtocolTestCase.py
+
+import json
+import msgpack
+from asgiref.testing import ApplicationCommunicator
+from channels.layers import get_channel_layer
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+from ...consumers import NotificationConsumer, MSGPACK_SUBPROTOCOL, encode_event
+from ...models import User
+
+
+IN_MEMORY_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS)
+class WireProtocolTestCase(TransactionTestCase):
+    """Test JSON / MessagePack negotiation for websocket consumers"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='wire_doctor',
+            email='wire_doctor@example.com',
+            password='testpass123',
+            role=User.DOCTOR,
+            phone_number='+233200000010'
+        )
+        self.group = f'notifications_{self.user.id}'
+
+    def make_communicator(self, subprotocols=()):
+        scope = {
+            'type': 'websocket',
+            'path': '/ws/notifications/',
+            'subprotocols': list(subprotocols),
+            'user': self.user,
+        }
+        return ApplicationCommunicator(NotificationConsumer.as_asgi(), scope)
+
+    async def connect(self, communicator):
+        await communicator.send_input({'type': 'websocket.connect'})
+        accept = await communicator.receive_output(1)
+        # Replay and unread badge are sent right after accepting
+        replay = await communicator.receive_output(1)
+        badge = await communicator.receive_output(1)
+        return accept, replay, badge
+
+    def test_encode_event_produces_both_codecs(self):
+        """Group payloads are serialized once per codec, with datetime support"""
+        now = timezone.now()
+        encoded = encode_event({'type': 'notification', 'at': now})
+
+        self.assertEqual(json.loads(encoded['json'])['type'], 'notification')
+        decoded = msgpack.unpackb(encoded['msgpack'], raw=False)
+        self.assertEqual(decoded['at'], json.loads(encoded['json'])['at'])
+
+    async def test_json_is_default(self):
+        """Clients that don't negotiate get JSON text frames"""
+        communicator = self.make_communicator()
+        accept, replay, _ = await self.connect(communicator)
+        self.assertEqual(accept['type'], 'websocket.accept')
+        self.assertIsNone(accept.get('subprotocol'))
+        self.assertEqual(json.loads(replay['text'])['type'], 'notification_replay')
+
+        await get_channel_layer().group_send(self.group, {
+            'type': 'notification_message',
+            'notification': {'message': 'hello'},
+        })
+        frame = await communicator.receive_output(1)
+        self.assertEqual(json.loads(frame['text']), {'message': 'hello'})
+
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait(1)
+
+    async def test_msgpack_subprotocol_sends_binary_frames(self):
+        """Negotiated clients receive the pre-encoded MessagePack bytes"""
+        communicator = self.make_communicator([MSGPACK_SUBPROTOCOL])
+        accept, _, badge = await self.connect(communicator)
+        self.assertEqual(accept['subprotocol'], MSGPACK_SUBPROTOCOL)
+        self.assertEqual(
+            msgpack.unpackb(badge['bytes'], raw=False),
+            {'type': 'unread_count', 'count': 0}
+        )
+
+        await get_channel_layer().group_send(self.group, {
+            'type': 'notification_message',
+            'encoded': encode_event({'message': 'hello'}),
+        })
+        frame = await communicator.receive_output(1)
+        self.assertNotIn('text', frame)
+        self.assertEqual(msgpack.unpackb(frame['bytes'], raw=False), {'message': 'hello'})
+
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait(1)
@@ -0,0 +1,6 @@
+from .TypingThrottleTestCase import *
+from .WireProtocolTestCase import *
+from .GatewayConsumerTestCase import *
+from .ChatAttachmentTestCase import *
+from .ChatActivityTestCase import *
+from .ChatArchiveTestCase import *
\ No newline at end of file
@@ -0,0 +1,143 @@
+# api/tests/notification_tests/NotificationInboxTestCase.py
+
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from django_celery_beat.models import PeriodicTask
+from ...models import User, Notification, ChatRoom, ChatNotification
+from ...services import NotificationService
+from ...task_schedulers import NOTIFICATION_PURGE_TASK_NAME, NOTIFICATION_PURGE_TASK_PATH
+
+
+IN_MEMORY_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS)
+class NotificationInboxTestCase(TestCase):
+    """Test the unified inbox: keyset paging, bulk mark-read and retention purge"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='inbox_patient',
+            email='inbox_patient@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000030'
+        )
+        self.notifications = NotificationService.dispatch([
+            {'recipient_id': self.user.id, 'message': f'n{i}'} for i in range(5)
+        ], push=False)
+        self.url = '/api/inbox/'
+
+    def test_inbox_requires_authentication(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def chat_notification(self, title):
+        doctor = User.objects.filter(username='inbox_doctor').first() or User.objects.create_user(
+            username='inbox_doctor',
+            email='inbox_doctor@example.com',
+            password='testpass123',
+            role=User.DOCTOR,
+            phone_number='+233200000105'
+        )
+        room, _ = ChatRoom.objects.get_or_create(patient=self.user, doctor=doctor, defaults={'doctor_accepted': True})
+        return ChatNotification.objects.create(
+            user=self.user, chat_room=room, notification_type='new_message', title=title, content=title
+        )
+
+    def test_inbox_pages_with_cursor(self):
+        """Pages are newest first and follow the next cursor"""
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(self.url, {'limit': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([n['message'] for n in response.data['results']], ['n4', 'n3', 'n2'])
+        self.assertNotIn('recipient', response.data['results'][0])
+
+        response = self.client.get(self.url, {'limit': 3, 'cursor': response.data['next_cursor']})
+        self.assertEqual([n['message'] for n in response.data['results']], ['n1', 'n0'])
+        self.assertIsNone(response.data['next_cursor'])
+
+        response = self.client.get(self.url, {'cursor': 'nonsense'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_inbox_merges_chat_notifications(self):
+        self.client.force_authenticate(user=self.user)
+        chat = self.chat_notification('c0')
+        same_time = Notification.objects.get(id=self.notifications[1].id).timestamp
+        ChatNotification.objects.filter(id=chat.id).update(created_at=same_time)
+
+        seen = []
+        cursor = None
+        while True:
+            response = self.client.get(self.url, {'limit': 2, **({'cursor': cursor} if cursor else {})})
+            seen += [(row['source'], row['message']) for row in response.data['results']]
+            cursor = response.data['next_cursor']
+            if not cursor:
+                break
+
+        # Ties on time go notification first, then chat
+        self.assertEqual(seen, [
+            ('notification', 'n4'), ('notification', 'n3'), ('notification', 'n2'),
+            ('notification', 'n1'), ('chat', 'c0'), ('notification', 'n0'),
+        ])
+        self.assertEqual(self.client.get(f'{self.url}unread_count/').data['count'], 6)
+
+    def test_mark_read_by_ids_and_watermark(self):
+        self.client.force_authenticate(user=self.user)
+        url = f'{self.url}mark_read/'
+
+        response = self.client.post(url, {'ids': [self.notifications[0].id]}, format='json')
+        self.assertEqual(response.data['updated'], 1)
+
+        response = self.client.post(url, {'up_to': self.notifications[2].id}, format='json')
+        self.assertEqual(response.data['updated'], 2)
+
+        response = self.client.get(f'{self.url}unread_count/')
+        self.assertEqual(response.data['count'], 2)
+
+        chat = self.chat_notification('c0')
+        response = self.client.post(url, {'chat_ids': [chat.id]}, format='json')
+        self.assertEqual(response.data['updated'], 1)
+
+        response = self.client.post(url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_purge_expired_notifications(self):
+        """Old read rows and very old unread rows are deleted"""
+        now = timezone.now()
+        Notification.objects.filter(id=self.notifications[0].id).update(
+            is_read=True, timestamp=now - timedelta(days=100)
+        )
+        Notification.objects.filter(id=self.notifications[1].id).update(
+            timestamp=now - timedelta(days=100)
+        )
+        Notification.objects.filter(id=self.notifications[2].id).update(
+            timestamp=now - timedelta(days=400)
+        )
+
+        old_chat = self.chat_notification('old')
+        ChatNotification.objects.filter(id=old_chat.id).update(
+            is_read=True, created_at=now - timedelta(days=100)
+        )
+        self.chat_notification('new')
+
+        deleted = NotificationService.purge(read_days=90, unread_days=365, batch_size=1)
+
+        self.assertEqual(deleted, 3)
+        self.assertEqual(Notification.objects.filter(recipient=self.user).count(), 3)
+        self.assertEqual(ChatNotification.objects.filter(user=self.user).count(), 1)
+
+        # An explicit 0 keeps nothing that has been read
+        Notification.objects.filter(recipient=self.user).update(is_read=True)
+        self.assertEqual(NotificationService.purge(read_days=0), 3)
+
+    def test_purge_is_scheduled_by_the_migrations(self):
+        task = PeriodicTask.objects.get(name=NOTIFICATION_PURGE_TASK_NAME)
+        self.assertEqual(task.task, NOTIFICATION_PURGE_TASK_PATH)
+        self.assertEqual((task.crontab.hour, task.crontab.minute), ('3', '0'))
+        self.assertTrue(task.enabled)
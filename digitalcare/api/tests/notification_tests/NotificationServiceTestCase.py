@@ -0,0 +1,100 @@
+# api/tests/notification_tests/NotificationServiceTestCase.py
+
+import json
+from unittest import mock
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.test import TestCase, override_settings
+from ...models import User, Notification
+from ...services import NotificationService
+
+
+IN_MEMORY_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS, NOTIFICATION_BATCH_SIZE=2,
+                   NOTIFICATION_FANOUT_CHUNK_SIZE=2)
+class NotificationServiceTestCase(TestCase):
+    """Test batched persistence, real-time push and replay of notifications"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='notify_doctor',
+            email='notify_doctor@example.com',
+            password='testpass123',
+            role=User.DOCTOR,
+            phone_number='+233200000020'
+        )
+        self.layer = get_channel_layer()
+        self.channel = async_to_sync(self.layer.new_channel)()
+        async_to_sync(self.layer.group_add)(
+            NotificationService.group_name(self.user.id), self.channel
+        )
+
+    def receive(self):
+        event = async_to_sync(self.layer.receive)(self.channel)
+        return json.loads(event['encoded']['json'])
+
+    def test_dispatch_persists_and_pushes(self):
+        """Notifications are saved, pushed, and followed by an unread badge"""
+        created = NotificationService.dispatch([
+            {'recipient_id': self.user.id, 'message': 'first'},
+            {'recipient_id': self.user.id, 'message': 'second', 'priority': 'HIGH'},
+        ])
+
+        self.assertEqual(len(created), 2)
+        self.assertEqual(Notification.objects.filter(recipient=self.user).count(), 2)
+
+        first = self.receive()
+        self.assertEqual(first['type'], 'notification')
+        self.assertEqual(first['notification']['message'], 'first')
+        self.assertEqual(self.receive()['notification']['priority'], 'HIGH')
+        self.assertEqual(self.receive(), {'type': 'unread_count', 'count': 2})
+
+    def test_dispatch_skips_missing_recipients(self):
+        """Unknown users don't break the batch"""
+        created = NotificationService.dispatch([
+            {'recipient_id': self.user.id, 'message': 'kept'},
+            {'recipient_id': 999999, 'message': 'dropped'},
+        ], push=False)
+
+        self.assertEqual([n.message for n in created], ['kept'])
+
+    def test_replay_since_cursor(self):
+        """Only notifications after the cursor are replayed, oldest first"""
+        created = NotificationService.dispatch([
+            {'recipient_id': self.user.id, 'message': f'n{i}'} for i in range(3)
+        ], push=False)
+
+        payloads, cursor, has_more = NotificationService.replay(self.user.id, since=created[0].id)
+        self.assertEqual([p['message'] for p in payloads], ['n1', 'n2'])
+        self.assertEqual(cursor, created[2].id)
+        self.assertFalse(has_more)
+
+        payloads, cursor, _ = NotificationService.replay(self.user.id)
+        self.assertEqual(payloads, [])
+        self.assertEqual(cursor, created[2].id)
+
+    def test_enqueue_chunks_items(self):
+        """Fan-out queues one task per chunk, accepting tuple items"""
+        with mock.patch('api.tasks.dispatch_notifications_task.delay') as delay:
+            tasks = NotificationService.enqueue(
+                [(self.user.id, f'n{i}', 'APPOINTMENT') for i in range(3)]
+            )
+
+        self.assertEqual(tasks, 2)
+        self.assertEqual(len(delay.call_args_list[0].args[0]), 2)
+        self.assertEqual(delay.call_args_list[1].args[0][0]['notification_type'], 'APPOINTMENT')
+
+    def test_recipients_filters_by_role(self):
+        """Role broadcasts only target active users with those roles"""
+        User.objects.create_user(
+            username='notify_patient',
+            email='notify_patient@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000021'
+        )
+
+        recipients = list(NotificationService.recipients(roles=[User.DOCTOR]))
+        self.assertEqual(recipients, [self.user.id])
@@ -0,0 +1,2 @@
+from .NotificationServiceTestCase import *
+from .NotificationInboxTestCase import *
\ No newline at end of file
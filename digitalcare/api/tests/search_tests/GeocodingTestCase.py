@@ -0,0 +1,222 @@
+# api/tests/search_tests/GeocodingTestCase.py
+
+import json
+import os
+import tempfile
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django_celery_beat.models import PeriodicTask
+from ...models import User, Facility, GeocodedAddress, AdultProfile
+from ...services import GeocodingService
+from ...task_schedulers import (
+    GEOCODING_BACKFILL_TASK_NAME, GEOCODING_BACKFILL_TASK_PATH, SchedulerError, set_geocoding_backfill_schedule,
+)
+from ...utils import normalize_address
+from ...utils.geocoding_utils import GazetteerGeocoder
+
+
+class CountingGeocoder(GazetteerGeocoder):
+    """Gazetteer that records every address it is asked about"""
+
+    requests = []
+
+    def geocode(self, address):
+        CountingGeocoder.requests.append(address)
+        return super().geocode(address)
+
+
+class FakeClock:
+    """time.time / time.sleep pair where sleeping moves the clock forward"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def patch(self):
+        return mock.patch.multiple('api.services.GeocodingService.time', time=self.time, sleep=self.sleep)
+
+
+class GeocodingTestCase(TestCase):
+    """Test address geocoding through the gazetteer provider and the address cache"""
+
+    LEGON = (5.6505, -0.1962)
+    OSU = (5.5560, -0.1820)
+
+    def setUp(self):
+        handle, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(handle, 'w') as gazetteer:
+            json.dump({
+                'University of Ghana, Legon, Accra': self.LEGON,
+                '12 Oxford Street, Osu, Accra': self.OSU,
+            }, gazetteer)
+        self.addCleanup(os.remove, path)
+
+        settings_override = override_settings(
+            GEOCODING_PROVIDER='api.tests.search_tests.GeocodingTestCase.CountingGeocoder',
+            GEOCODING_GAZETTEER_PATH=path,
+            GEOCODING_RATE_LIMIT=4,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(cache.clear)
+        cache.clear()
+        CountingGeocoder.requests = []
+
+    def facility(self, address, **fields):
+        return Facility.objects.create(
+            name=f'Facility at {address}', facility_type=Facility.CLINIC,
+            address=address, status='Approved', **fields
+        )
+
+    def test_normalize_address(self):
+        self.assertEqual(normalize_address('  12 Oxford St.,  Osu , ACCRA,, '), '12 oxford st, osu, accra')
+        self.assertEqual(normalize_address('12 oxford st, osu, accra'), '12 oxford st, osu, accra')
+        self.assertEqual(normalize_address(None), '')
+
+    def test_saved_facility_is_geocoded_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            facility = self.facility('12 Oxford Street, Osu, Accra')
+
+        facility.refresh_from_db()
+        self.assertEqual((facility.latitude, facility.longitude), self.OSU)
+        self.assertTrue(GeocodedAddress.objects.get(normalized_address='12 oxford street, osu, accra').found)
+
+    def test_same_address_is_geocoded_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.facility('12 Oxford Street, Osu, Accra')
+
+        # Different spelling of the same address: answered from the cache before the save
+        with mock.patch('api.services.GeocodingService.GeocodingService.queue') as queue:
+            second = self.facility('12 oxford street,  OSU, Accra.')
+
+        self.assertEqual((second.latitude, second.longitude), self.OSU)
+        queue.assert_not_called()
+        self.assertEqual(CountingGeocoder.requests, ['12 Oxford Street, Osu, Accra'])
+
+    def test_client_coordinates_win(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            facility = self.facility('12 Oxford Street, Osu, Accra', latitude=5.0, longitude=-1.0)
+
+        facility.refresh_from_db()
+        self.assertEqual((facility.latitude, facility.longitude), (5.0, -1.0))
+        self.assertEqual(CountingGeocoder.requests, [])
+
+    def test_client_coordinates_set_before_the_task_runs_win(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            facility = self.facility('12 Oxford Street, Osu, Accra')
+        facility.latitude, facility.longitude = 5.0, -1.0
+        facility.save()
+
+        # The geocoding queued by the first save runs late
+        for callback in callbacks:
+            callback()
+
+        facility.refresh_from_db()
+        self.assertEqual((facility.latitude, facility.longitude), (5.0, -1.0))
+
+    def test_address_change_relocates_profile(self):
+        patient = User.objects.create_user(
+            username='geocoded_patient',
+            email='geocoded_patient@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000100'
+        )
+        profile = patient.adultprofile
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.address = 'University of Ghana, Legon, Accra'
+            profile.save()
+        profile.refresh_from_db()
+        self.assertEqual((profile.latitude, profile.longitude), self.LEGON)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.address = '12 Oxford Street, Osu, Accra'
+            profile.save()
+        profile.refresh_from_db()
+        self.assertEqual((profile.latitude, profile.longitude), self.OSU)
+
+    def test_backfill_geocodes_each_address_once(self):
+        # bulk_create sends no signals, like rows imported before geocoding existed
+        Facility.objects.bulk_create([
+            Facility(name='A', facility_type=Facility.CLINIC, address='12 Oxford Street, Osu, Accra'),
+            Facility(name='B', facility_type=Facility.PHARMACY, address='12 OXFORD STREET, Osu, Accra'),
+            Facility(name='C', facility_type=Facility.CLINIC, address='Nowhere Road, Atlantis'),
+            Facility(name='D', facility_type=Facility.CLINIC, address=''),
+        ])
+        patient = User.objects.create_user(
+            username='backfill_patient',
+            email='backfill_patient@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000101'
+        )
+        AdultProfile.objects.filter(user=patient).update(address='University of Ghana, Legon, Accra')
+
+        clock = FakeClock()
+        with clock.patch():
+            stats = GeocodingService.backfill()
+
+        self.assertEqual(stats['addresses'], 3)
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['updated'], 3)
+        self.assertEqual(stats['not_found'], 1)
+        # Requests are spaced by 1 / GEOCODING_RATE_LIMIT
+        self.assertEqual(clock.sleeps, [0.25] * 2)
+        self.assertEqual(
+            set(Facility.objects.filter(name__in=['A', 'B']).values_list('latitude', 'longitude')), {self.OSU}
+        )
+        self.assertEqual(
+            AdultProfile.objects.values_list('latitude', 'longitude').get(user=patient), self.LEGON
+        )
+
+        # The miss is cached too: nothing left to ask the geocoder
+        stats = GeocodingService.backfill()
+        self.assertEqual(stats['requests'], 0)
+        self.assertEqual(len(CountingGeocoder.requests), 3)
+
+    def test_backfill_limit_and_geocoder_errors(self):
+        Facility.objects.bulk_create([
+            Facility(name='A', facility_type=Facility.CLINIC, address='12 Oxford Street, Osu, Accra'),
+            Facility(name='B', facility_type=Facility.CLINIC, address='University of Ghana, Legon, Accra'),
+        ])
+
+        with FakeClock().patch():
+            stats = GeocodingService.backfill(limit=1)
+        self.assertEqual((stats['requests'], stats['remaining']), (1, 1))
+
+        with mock.patch.object(CountingGeocoder, 'geocode', side_effect=OSError('offline')):
+            stats = GeocodingService.backfill()
+        self.assertEqual((stats['requests'], stats['remaining']), (1, 1))
+        self.assertEqual(GeocodedAddress.objects.count(), 1)
+        self.assertEqual(Facility.objects.filter(latitude__isnull=True).count(), 1)
+
+    def test_rate_limit_is_shared_through_the_cache(self):
+        clock = FakeClock(1000.1)
+        with clock.patch():
+            # Another worker sharing the cache takes the current slot
+            GeocodingService.throttle()
+            GeocodingService.geocode('12 Oxford Street, Osu, Accra')
+            GeocodingService.geocode('University of Ghana, Legon, Accra')
+
+        # 4 requests per second: each waits for the next quarter second
+        self.assertEqual([round(seconds, 6) for seconds in clock.sleeps], [0.15, 0.25])
+        self.assertEqual(len(CountingGeocoder.requests), 2)
+
+    def test_backfill_is_scheduled(self):
+        # Registered hourly by the migrations
+        task = PeriodicTask.objects.get(name=GEOCODING_BACKFILL_TASK_NAME)
+        self.assertEqual((task.task, task.crontab.hour, task.crontab.minute), (GEOCODING_BACKFILL_TASK_PATH, '*', '15'))
+
+        set_geocoding_backfill_schedule(minute=45, limit=100)
+        task.refresh_from_db()
+        self.assertEqual((task.crontab.minute, json.loads(task.args)), ('45', [100]))
+        with self.assertRaises(SchedulerError):
+            set_geocoding_backfill_schedule(limit=0)
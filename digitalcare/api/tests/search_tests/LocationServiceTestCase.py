@@ -0,0 +1,102 @@
+# api/tests/search_tests/LocationServiceTestCase.py
+
+import math
+import random
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from ...models import User, Facility
+from ...services import LocationService
+
+
+class LocationServiceTestCase(TestCase):
+    """Test bounding-box prefiltered radius searches"""
+
+    # Accra
+    LAT, LON = 5.6037, -0.1870
+
+    def facility(self, name, lat, lon, facility_type=Facility.CLINIC, status='Approved'):
+        return Facility.objects.create(
+            name=name, facility_type=facility_type, latitude=lat, longitude=lon, status=status
+        )
+
+    def test_database_and_python_distances_agree(self):
+        self.facility('Kumasi Clinic', 6.6885, -1.6244)
+
+        facility = LocationService.get_nearby_facilities(self.LAT, self.LON, 300).get()
+
+        expected = LocationService.haversine_km(self.LAT, self.LON, 6.6885, -1.6244)
+        self.assertAlmostEqual(facility.distance_km, expected, places=3)
+        self.assertAlmostEqual(expected, 200, delta=5)
+
+    def test_bounding_box_encloses_the_search_circle(self):
+        rng = random.Random(7)
+        for lat, lon, radius in [(self.LAT, self.LON, 10), (60.0, 10.0, 500), (-33.9, 18.4, 50), (0.0, 179.9, 30)]:
+            min_lat, max_lat, min_lon, max_lon = LocationService.bounding_box(lat, lon, radius)
+            for _ in range(200):
+                # A random point on the circle's edge
+                bearing = rng.uniform(0, 2 * math.pi)
+                angular = radius / LocationService.EARTH_RADIUS_KM
+                phi1, lambda1 = math.radians(lat), math.radians(lon)
+                phi2 = math.asin(math.sin(phi1) * math.cos(angular) + math.cos(phi1) * math.sin(angular) * math.cos(bearing))
+                lambda2 = lambda1 + math.atan2(
+                    math.sin(bearing) * math.sin(angular) * math.cos(phi1),
+                    math.cos(angular) - math.sin(phi1) * math.sin(phi2)
+                )
+                point_lat = math.degrees(phi2)
+                point_lon = (math.degrees(lambda2) + 540) % 360 - 180
+
+                self.assertTrue(min_lat - 1e-9 <= point_lat <= max_lat + 1e-9)
+                if min_lon <= max_lon:
+                    self.assertTrue(min_lon - 1e-9 <= point_lon <= max_lon + 1e-9)
+                else:
+                    self.assertTrue(point_lon >= min_lon - 1e-9 or point_lon <= max_lon + 1e-9)
+
+    def test_nearby_facilities_are_filtered_and_ordered(self):
+        far = self.facility('Far Clinic', self.LAT + 0.08, self.LON)
+        near = self.facility('Near Clinic', self.LAT + 0.01, self.LON)
+        self.facility('Outside Clinic', self.LAT + 0.2, self.LON)
+        self.facility('Pending Clinic', self.LAT, self.LON, status='Pending')
+        self.facility('Near Pharmacy', self.LAT, self.LON + 0.01, facility_type=Facility.PHARMACY)
+
+        facilities = LocationService.get_nearby_facilities(self.LAT, self.LON, 10, Facility.CLINIC)
+
+        self.assertEqual(list(facilities), [near, far])
+        self.assertIn('"latitude" >=', str(facilities.query))
+
+    def test_search_across_the_antimeridian(self):
+        east = self.facility('Taveuni Clinic', -16.8, 179.98)
+        self.facility('Far West Clinic', -16.8, 170.0)
+
+        self.assertEqual(list(LocationService.get_nearby_facilities(-16.8, -179.98, 20)), [east])
+
+    def test_near_the_pole_only_latitude_is_bounded(self):
+        station = self.facility('Polar Clinic', 89.95, 100.0)
+
+        self.assertEqual(LocationService.bounding_box(89.9, -80.0, 30)[2:], (None, None))
+        self.assertEqual(list(LocationService.get_nearby_facilities(89.9, -80.0, 30)), [station])
+
+    def test_nearby_doctors(self):
+        user = User.objects.create_user(
+            username='nearby_doctor',
+            email='nearby_doctor@example.com',
+            password='testpass123',
+            role=User.DOCTOR,
+            phone_number='+233200000092'
+        )
+        user.doctorprofile.latitude = self.LAT + 0.01
+        user.doctorprofile.longitude = self.LON
+        user.doctorprofile.save()
+
+        doctors = LocationService.get_nearby_doctors(self.LAT, self.LON, 5)
+
+        self.assertEqual(list(doctors), [user.doctorprofile])
+        self.assertAlmostEqual(doctors[0].distance_km, 1.11, places=2)
+
+    def test_benchmark_command_runs_and_rolls_back(self):
+        out = StringIO()
+
+        call_command('benchmark_nearby', count=300, queries=3, radius=50, stdout=out)
+
+        self.assertIn('bounding box', out.getvalue())
+        self.assertFalse(Facility.objects.exists())
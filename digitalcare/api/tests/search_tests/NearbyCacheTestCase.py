@@ -0,0 +1,132 @@
+# api/tests/search_tests/NearbyCacheTestCase.py
+
+import random
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework import status
+from ...models import User, Facility
+from ...services import LocationService, NearbyCacheService
+from ...utils import geohash_encode
+
+
+class NearbyCacheTestCase(TestCase):
+    """Test the geohash-cell cache of nearby provider searches"""
+
+    # University of Ghana, Legon
+    LAT, LON = 5.6505, -0.1962
+
+    def setUp(self):
+        cache.clear()
+        rng = random.Random(3)
+        self.facilities = [
+            Facility.objects.create(
+                name=f'Legon Facility {index}',
+                facility_type=[Facility.CLINIC, Facility.PHARMACY][index % 2],
+                latitude=self.LAT + rng.uniform(-0.15, 0.15),
+                longitude=self.LON + rng.uniform(-0.15, 0.15),
+                status='Approved',
+            )
+            for index in range(60)
+        ]
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_cached_results_match_direct_search(self):
+        rng = random.Random(11)
+        for _ in range(20):
+            lat, lon = self.LAT + rng.uniform(-0.05, 0.05), self.LON + rng.uniform(-0.05, 0.05)
+            radius = rng.choice([1.5, 4, 10])
+
+            cached = NearbyCacheService.nearby(Facility.CLINIC, lat, lon, radius)
+            direct = list(LocationService.get_nearby_facilities(lat, lon, radius, Facility.CLINIC))
+
+            self.assertEqual([f.id for f in cached], [f.id for f in direct])
+            for cached_facility, direct_facility in zip(cached, direct):
+                self.assertAlmostEqual(cached_facility.distance_km, direct_facility.distance_km, places=6)
+
+    def test_neighbours_in_the_same_cell_hit_the_cache(self):
+        NearbyCacheService.nearby(Facility.CLINIC, self.LAT, self.LON, 10)
+
+        # A few metres away: same cell, only the primary key lookup and the doctors prefetch
+        with self.assertNumQueries(2):
+            NearbyCacheService.nearby(Facility.CLINIC, self.LAT + 0.0001, self.LON + 0.0001, 8)
+
+    def test_moving_a_facility_invalidates_nearby_cells(self):
+        self.assertEqual(NearbyCacheService.nearby(Facility.CLINIC, 5.9, -0.5, 1), [])
+        moved = self.facilities[0]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            moved.latitude, moved.longitude = 5.9, -0.5
+            moved.save()
+
+        self.assertEqual(NearbyCacheService.nearby(Facility.CLINIC, 5.9, -0.5, 1), [moved])
+
+    def test_approval_and_deletion_invalidate(self):
+        pending = Facility.objects.create(
+            name='New Clinic', facility_type=Facility.CLINIC,
+            latitude=self.LAT, longitude=self.LON, status='Pending'
+        )
+        self.assertNotIn(pending, NearbyCacheService.nearby(Facility.CLINIC, self.LAT, self.LON, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            pending.status = 'Approved'
+            pending.save()
+        self.assertIn(pending, NearbyCacheService.nearby(Facility.CLINIC, self.LAT, self.LON, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            pending.delete()
+        self.assertNotIn(pending, NearbyCacheService.nearby(Facility.CLINIC, self.LAT, self.LON, 1))
+
+    def test_stale_entries_skip_unapproved_facilities(self):
+        nearby = NearbyCacheService.nearby(Facility.CLINIC, self.LAT, self.LON, 10)
+        # QuerySet.update sends no signal, as when another process missed the bump
+        Facility.objects.filter(pk=nearby[0].pk).update(status='Rejected')
+
+        again = NearbyCacheService.nearby(Facility.CLINIC, self.LAT, self.LON, 10)
+        self.assertEqual([f.id for f in again], [f.id for f in nearby[1:]])
+
+    def test_distant_changes_keep_the_cache(self):
+        cell = geohash_encode(self.LAT, self.LON, NearbyCacheService.precision())
+        generation = NearbyCacheService.generation(Facility.CLINIC, cell)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            # Tamale, about 420 km north
+            Facility.objects.create(
+                name='Tamale Clinic', facility_type=Facility.CLINIC,
+                latitude=9.4008, longitude=-0.8393, status='Approved'
+            )
+            # A name change does not move the facility
+            self.facilities[0].name = 'Renamed'
+            self.facilities[0].save()
+
+        self.assertEqual(NearbyCacheService.generation(Facility.CLINIC, cell), generation)
+
+    def test_large_radius_is_not_cached(self):
+        NearbyCacheService.nearby(Facility.CLINIC, self.LAT, self.LON, 200)
+
+        # The search and the doctors prefetch; admins are joined or absent
+        with self.assertNumQueries(2):
+            NearbyCacheService.nearby(Facility.CLINIC, self.LAT, self.LON, 200)
+
+    def test_nearby_providers_endpoint(self):
+        patient = User.objects.create_user(
+            username='nearby_patient',
+            email='nearby_patient@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000093'
+        )
+        patient.adultprofile.latitude = self.LAT
+        patient.adultprofile.longitude = self.LON
+        patient.adultprofile.save()
+        client = APIClient()
+        client.force_authenticate(user=patient)
+
+        response = client.get('/api/providers/nearby/', {'radius': 5, 'type': 'both'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = list(LocationService.get_nearby_facilities(self.LAT, self.LON, 5, Facility.CLINIC))
+        self.assertEqual([clinic['id'] for clinic in response.data['clinics']], [f.id for f in expected])
+        self.assertIn('doctors', response.data)
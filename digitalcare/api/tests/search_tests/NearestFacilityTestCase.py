@@ -0,0 +1,105 @@
+# api/tests/search_tests/NearestFacilityTestCase.py
+
+import random
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework import status
+from ...models import User, Facility
+from ...services import LocationService
+
+
+class NearestFacilityTestCase(TestCase):
+    """Test k-nearest facility search and the paginated FacilityViewSet.nearby"""
+
+    LAT, LON = 5.6505, -0.1962
+
+    def setUp(self):
+        rng = random.Random(5)
+        # Dense around Accra, sparse across the rest of the country
+        points = [(self.LAT + rng.gauss(0, 0.05), self.LON + rng.gauss(0, 0.05)) for _ in range(30)]
+        points += [(rng.uniform(4.7, 11.1), rng.uniform(-3.2, 1.1)) for _ in range(30)]
+        self.facilities = [
+            Facility.objects.create(
+                name=f'Facility {index}', facility_type=Facility.CLINIC,
+                latitude=lat, longitude=lon, status='Approved'
+            )
+            for index, (lat, lon) in enumerate(points)
+        ]
+        Facility.objects.create(name='Pending', facility_type=Facility.CLINIC, latitude=self.LAT, longitude=self.LON)
+
+    def brute_force(self, lat, lon):
+        return sorted(
+            self.facilities,
+            key=lambda facility: (LocationService.haversine_km(lat, lon, facility.latitude, facility.longitude), facility.id)
+        )
+
+    def test_nearest_matches_brute_force(self):
+        rng = random.Random(9)
+        for _ in range(10):
+            lat, lon = rng.uniform(4.7, 11.1), rng.uniform(-3.2, 1.1)
+            k = rng.choice([1, 5, 20])
+
+            nearest = LocationService.get_nearest_facilities(lat, lon, k)
+
+            self.assertEqual([f.id for f in nearest], [f.id for f in self.brute_force(lat, lon)[:k]])
+
+    def test_dense_areas_finish_in_one_round(self):
+        # One search round, plus the doctors prefetch; admins are joined
+        with self.assertNumQueries(2):
+            nearest = LocationService.get_nearest_facilities(self.LAT, self.LON, 5)
+        with self.assertNumQueries(0):
+            [(facility.admin, list(facility.doctors.all())) for facility in nearest]
+
+    def test_k_larger_than_the_table_returns_everything(self):
+        self.assertEqual(len(LocationService.get_nearest_facilities(self.LAT, self.LON, 500)), 60)
+
+    def test_max_radius_and_cursor(self):
+        within = LocationService.get_nearest_facilities(self.LAT, self.LON, 500, max_radius_km=10)
+        self.assertTrue(all(f.distance_km <= 10 for f in within))
+
+        first = LocationService.get_nearest_facilities(self.LAT, self.LON, 3)
+        after = (first[-1].distance_km, first[-1].id)
+        second = LocationService.get_nearest_facilities(self.LAT, self.LON, 3, after=after)
+        self.assertEqual([f.id for f in first + second], [f.id for f in self.brute_force(self.LAT, self.LON)[:6]])
+
+        # 0 km is a radius, not "unlimited"
+        self.assertTrue(all(
+            f.distance_km == 0 for f in LocationService.get_nearest_facilities(self.LAT, self.LON, 5, max_radius_km=0)
+        ))
+
+    def test_nan_radius_and_cursor_end_the_search(self):
+        # Fewer facilities than k: the search used to grow a NaN radius forever
+        with self.assertNumQueries(2):
+            LocationService.get_nearest_facilities(self.LAT, self.LON, 500, max_radius_km=float('nan'))
+        with self.assertNumQueries(1):
+            LocationService.get_nearest_facilities(self.LAT, self.LON, 500, after=(float('nan'), 0))
+
+    def test_facility_viewset_nearby_pages(self):
+        patient = User.objects.create_user(
+            username='nearest_patient',
+            email='nearest_patient@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000098'
+        )
+        patient.adultprofile.latitude = self.LAT
+        patient.adultprofile.longitude = self.LON
+        patient.adultprofile.save()
+        client = APIClient()
+        client.force_authenticate(user=patient)
+
+        ids, cursor = [], None
+        for _ in range(3):
+            params = {'limit': 4, **({'cursor': cursor} if cursor else {})}
+            response = client.get('/api/facilities/nearby/', params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [facility['id'] for facility in response.data['results']]
+            cursor = response.data['next_cursor']
+
+        self.assertEqual(ids, [f.id for f in self.brute_force(self.LAT, self.LON)[:12]])
+        self.assertIn('distance_km', response.data['results'][0])
+        for params in ({'cursor': 'bad'}, {'radius': 'nan'}, {'radius': 'inf'}, {'radius': 0},
+                       {'cursor': LocationService.encode_cursor(float('nan'), 1)}):
+            self.assertEqual(
+                client.get('/api/facilities/nearby/', params).status_code, status.HTTP_400_BAD_REQUEST
+            )
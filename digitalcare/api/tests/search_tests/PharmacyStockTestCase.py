@@ -0,0 +1,165 @@
+# api/tests/search_tests/PharmacyStockTestCase.py
+
+from decimal import Decimal
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework import status
+from ...models import User, Facility, Drug, PharmacyInventory, Prescription, PrescriptionItem
+from ...services import PharmacyStockService, NearbyCacheService
+from ...utils import geohash_encode
+
+
+class PharmacyStockTestCase(TestCase):
+    """Test the nearby in-stock pharmacy search and its hot drug cache"""
+
+    LAT, LON = 5.6505, -0.1962
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.patient = User.objects.create_user(
+            username='stock_patient',
+            email='stock_patient@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000102'
+        )
+        self.patient.adultprofile.latitude = self.LAT
+        self.patient.adultprofile.longitude = self.LON
+        self.patient.adultprofile.save()
+        self.client.force_authenticate(user=self.patient)
+
+        self.paracetamol = Drug.objects.create(name='Paracetamol', strength='500mg', form='tablet')
+        self.amoxicillin = Drug.objects.create(name='Amoxicillin', strength='250mg', form='capsule')
+
+        self.near = self.pharmacy('Legon Pharmacy', 0.002)
+        self.middle = self.pharmacy('Madina Pharmacy', 0.03)
+        self.far = self.pharmacy('Kumasi Pharmacy', 1.0)
+        self.pending = self.pharmacy('Pending Pharmacy', 0.001, status='Pending')
+
+        self.stock(self.near, self.paracetamol, 20, '5.00')
+        self.stock(self.middle, self.paracetamol, 5, '3.50')
+        self.stock(self.far, self.paracetamol, 100, '1.00')
+        self.stock(self.pending, self.paracetamol, 10, '1.00')
+        self.stock(self.near, self.amoxicillin, 0, '8.00')
+        self.stock(self.middle, self.amoxicillin, 3, None)
+
+    def tearDown(self):
+        cache.clear()
+
+    def pharmacy(self, name, offset, status='Approved'):
+        return Facility.objects.create(
+            name=name, facility_type=Facility.PHARMACY, status=status,
+            latitude=self.LAT + offset, longitude=self.LON
+        )
+
+    def stock(self, pharmacy, drug, quantity, price):
+        return PharmacyInventory.objects.create(
+            pharmacy=pharmacy, drug=drug, quantity=quantity,
+            unit_price=Decimal(price) if price else None
+        )
+
+    def offers(self, response):
+        return [(result['pharmacy']['name'], result['drug']['name']) for result in response.data['results']]
+
+    def test_sorted_by_distance_in_one_query(self):
+        with self.assertNumQueries(1):
+            results = PharmacyStockService.search([self.paracetamol.id], self.LAT, self.LON, radius_km=10)
+
+        self.assertEqual([r['pharmacy']['name'] for r in results], ['Legon Pharmacy', 'Madina Pharmacy'])
+        self.assertEqual(results[0]['unit_price'], '5.00')
+        self.assertEqual(results[0]['quantity'], 20)
+        self.assertLess(results[0]['distance_km'], results[1]['distance_km'])
+
+    def test_sorted_by_price(self):
+        response = self.client.get(
+            '/api/pharmacies/stock/',
+            {'drug': f'{self.paracetamol.id},{self.amoxicillin.id}', 'sort': 'price'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Out of stock and unapproved pharmacies are left out; unpriced stock comes last
+        self.assertEqual(self.offers(response), [
+            ('Madina Pharmacy', 'Paracetamol'),
+            ('Legon Pharmacy', 'Paracetamol'),
+            ('Madina Pharmacy', 'Amoxicillin'),
+        ])
+
+    def test_prescription_drugs(self):
+        doctor = User.objects.create_user(
+            username='stock_doctor',
+            email='stock_doctor@example.com',
+            password='testpass123',
+            role=User.DOCTOR,
+            phone_number='+233200000103'
+        )
+        prescription = Prescription.objects.create(doctor=doctor.doctorprofile, patient=self.patient)
+        PrescriptionItem.objects.create(
+            prescription=prescription, drug=self.amoxicillin, dosage='1 capsule', frequency='TID'
+        )
+
+        response = self.client.get('/api/pharmacies/stock/', {'prescription': prescription.id})
+        self.assertEqual(self.offers(response), [('Madina Pharmacy', 'Amoxicillin')])
+
+        # Someone else's prescription finds no drugs
+        other = User.objects.create_user(
+            username='stock_other',
+            email='stock_other@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000104'
+        )
+        other.adultprofile.latitude, other.adultprofile.longitude = self.LAT, self.LON
+        other.adultprofile.save()
+        self.client.force_authenticate(user=other)
+        response = self.client.get('/api/pharmacies/stock/', {'prescription': prescription.id})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get('/api/pharmacies/stock/').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.client.get('/api/pharmacies/stock/', {'drug': 'x'}).status_code, status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self.client.get('/api/pharmacies/stock/', {'drug': self.paracetamol.id, 'sort': 'rating'}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+
+    @override_settings(PHARMACY_STOCK_HOT_THRESHOLD=2)
+    def test_hot_drug_is_cached_and_invalidated(self):
+        cold = PharmacyStockService.search([self.paracetamol.id], self.LAT, self.LON)
+        hot = PharmacyStockService.search([self.paracetamol.id], self.LAT, self.LON)
+        self.assertEqual(hot, cold)
+
+        with self.assertNumQueries(0):
+            again = PharmacyStockService.search([self.paracetamol.id], self.LAT + 0.0001, self.LON)
+        self.assertEqual([r['pharmacy']['id'] for r in again], [self.near.id, self.middle.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PharmacyInventory.objects.filter(pharmacy=self.near, drug=self.paracetamol).get().delete()
+        results = PharmacyStockService.search([self.paracetamol.id], self.LAT, self.LON)
+        self.assertEqual([r['pharmacy']['id'] for r in results], [self.middle.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.middle.status = 'Rejected'
+            self.middle.save()
+        self.assertEqual(PharmacyStockService.search([self.paracetamol.id], self.LAT, self.LON), [])
+
+    @override_settings(PHARMACY_STOCK_HOT_THRESHOLD=1)
+    def test_hot_drug_cache_is_bounded_to_the_cell(self):
+        PharmacyStockService.search([self.paracetamol.id], self.LAT, self.LON)
+        cell = geohash_encode(self.LAT, self.LON, NearbyCacheService.precision())
+        with self.assertNumQueries(0):
+            rows = PharmacyStockService.cached_rows(self.paracetamol.id, cell, 10)
+        self.assertEqual(
+            sorted(row['pharmacy_id'] for row in rows),
+            sorted([self.near.id, self.middle.id])
+        )
+
+        with self.assertNumQueries(1):
+            results = PharmacyStockService.search([self.paracetamol.id], self.LAT, self.LON, radius_km=200)
+        self.assertEqual(
+            [r['pharmacy']['id'] for r in results],
+            [self.near.id, self.middle.id, self.far.id]
+        )
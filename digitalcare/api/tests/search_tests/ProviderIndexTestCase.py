@@ -0,0 +1,134 @@
+# api/tests/search_tests/ProviderIndexTestCase.py
+
+import random
+from unittest import mock, skipUnless
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from ...models import User, Facility
+from ...services import LocationService, ProviderIndexService
+from ...utils import BallTree
+from ...utils.ball_tree import np, unit_vectors, chord_for_km
+
+
+@skipUnless(np is not None, "numpy is not installed")
+@override_settings(PROVIDER_INDEX_ENABLED=True)
+class ProviderIndexTestCase(TestCase):
+    """Test the in-process ball tree provider index and its change feed"""
+
+    LAT, LON = 5.6505, -0.1962
+
+    def setUp(self):
+        cache.clear()
+        ProviderIndexService.reset()
+        rng = random.Random(21)
+        self.facilities = [
+            Facility.objects.create(
+                name=f'Indexed Facility {index}',
+                facility_type=[Facility.CLINIC, Facility.PHARMACY, Facility.LABORATORY][index % 3],
+                latitude=self.LAT + rng.gauss(0, 0.1), longitude=self.LON + rng.gauss(0, 0.1),
+                status='Approved' if index % 7 else 'Pending',
+            )
+            for index in range(120)
+        ]
+        user = User.objects.create_user(
+            username='indexed_doctor',
+            email='indexed_doctor@example.com',
+            password='testpass123',
+            role=User.DOCTOR,
+            phone_number='+233200000099'
+        )
+        self.doctor = user.doctorprofile
+        self.doctor.latitude, self.doctor.longitude = self.LAT + 0.01, self.LON
+        self.doctor.specialty = 'Dermatology'
+        self.doctor.save()
+
+    def tearDown(self):
+        ProviderIndexService.reset()
+        cache.clear()
+
+    def direct(self, lat, lon, radius, facility_type=None):
+        facilities = Facility.objects.filter(status='Approved', latitude__isnull=False)
+        if facility_type:
+            facilities = facilities.filter(facility_type=facility_type)
+        return [f.id for f in LocationService.within_radius(facilities, lat, lon, radius)]
+
+    def test_ball_tree_matches_brute_force(self):
+        rng = np.random.default_rng(4)
+        latitudes, longitudes = rng.uniform(-80, 80, 2000), rng.uniform(-180, 180, 2000)
+        points = unit_vectors(latitudes, longitudes)
+        tree = BallTree(points, leaf_size=16)
+
+        for center in points[:20]:
+            chord = chord_for_km(1500)
+            expected = np.flatnonzero(np.sqrt(((points - center) ** 2).sum(axis=1)) <= chord)
+            self.assertEqual(sorted(tree.query_radius(center, chord).tolist()), expected.tolist())
+
+    def test_index_results_match_the_database(self):
+        rng = random.Random(8)
+        for _ in range(15):
+            lat, lon = self.LAT + rng.uniform(-0.1, 0.1), self.LON + rng.uniform(-0.1, 0.1)
+            radius = rng.choice([2, 5, 15])
+            facility_type = rng.choice([None, Facility.CLINIC, Facility.LABORATORY])
+
+            found = LocationService.get_nearby_facilities(lat, lon, radius, facility_type)
+
+            self.assertEqual([f.id for f in found], self.direct(lat, lon, radius, facility_type))
+
+    def test_searches_only_hydrate_matching_ids(self):
+        ProviderIndexService.sync()
+
+        with self.assertNumQueries(1) as context:
+            list(LocationService.get_nearby_facilities(self.LAT, self.LON, 5, Facility.CLINIC))
+
+        self.assertIn('"id" IN', context.captured_queries[0]['sql'])
+
+    def test_changes_are_replayed_without_a_rebuild(self):
+        index = ProviderIndexService.sync()
+        moved = self.facilities[1]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            moved.latitude, moved.longitude = 7.0, -1.0
+            moved.save()
+            self.doctor.is_active = False
+            self.doctor.save()
+
+        self.assertEqual([f.id for f in LocationService.get_nearby_facilities(7.0, -1.0, 1)], [moved.id])
+        self.assertEqual(list(LocationService.get_nearby_doctors(self.LAT, self.LON, 5)), [])
+        self.assertIs(ProviderIndexService.sync(), index)
+        self.assertIn(('facility', moved.id), index.overflow)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            moved.delete()
+        self.assertEqual(list(LocationService.get_nearby_facilities(7.0, -1.0, 1)), [])
+
+    def test_specialty_filter(self):
+        self.assertEqual(list(LocationService.get_nearby_doctors(self.LAT, self.LON, 5, 'derma')), [self.doctor])
+        self.assertEqual(list(LocationService.get_nearby_doctors(self.LAT, self.LON, 5, 'cardio')), [])
+
+    def test_a_gap_in_the_feed_rebuilds(self):
+        index = ProviderIndexService.sync()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.facilities[2].name = 'Renamed'
+            self.facilities[2].save()
+        cache.delete(ProviderIndexService.FEED_KEY.format(1))
+
+        self.assertIsNot(ProviderIndexService.sync(), index)
+
+    @override_settings(PROVIDER_INDEX_MAX_AGE=60)
+    def test_old_index_rebuilds_without_a_feed(self):
+        # Another process's change never reaches a per-process cache
+        with mock.patch('api.services.ProviderIndexService.time.monotonic', return_value=1000):
+            index = ProviderIndexService.sync()
+        with mock.patch('api.services.ProviderIndexService.time.monotonic', return_value=1059):
+            self.assertIs(ProviderIndexService.sync(), index)
+        with mock.patch('api.services.ProviderIndexService.time.monotonic', return_value=1061):
+            self.assertIsNot(ProviderIndexService.sync(), index)
+
+    @override_settings(PROVIDER_INDEX_ENABLED=False)
+    def test_disabled_index_falls_back_to_the_database(self):
+        self.assertIsNone(ProviderIndexService.within([Facility.CLINIC], self.LAT, self.LON, 5))
+        self.assertEqual(
+            [f.id for f in LocationService.get_nearby_facilities(self.LAT, self.LON, 5)],
+            self.direct(self.LAT, self.LON, 5)
+        )
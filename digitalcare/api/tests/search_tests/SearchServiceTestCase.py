@@ -0,0 +1,67 @@
+# api/tests/search_tests/SearchServiceTestCase.py
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework import status
+from ...models import User, ChatRoom, Message
+from ...services import SearchService
+
+
+class SearchServiceTestCase(TestCase):
+    """Test trigger-maintained search vectors, ranking, scoping and highlights"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.doctor = User.objects.create_user(
+            username='search_doctor',
+            email='search_doctor@example.com',
+            password='testpass123',
+            role=User.DOCTOR,
+            phone_number='+233200000050'
+        )
+        self.patient = User.objects.create_user(
+            username='search_patient',
+            email='search_patient@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000051'
+        )
+        self.outsider = User.objects.create_user(
+            username='search_outsider',
+            email='search_outsider@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000052'
+        )
+        room = ChatRoom.objects.create(patient=self.patient, doctor=self.doctor)
+        self.headache = Message.objects.create(
+            chat_room=room, sender=self.patient,
+            content='I have had a severe headache and migraines since Monday'
+        )
+        Message.objects.create(chat_room=room, sender=self.doctor, content='Please drink more water')
+
+    def test_search_matches_stemmed_words_with_highlight(self):
+        results = SearchService.search(self.doctor, 'migraine', ['messages'])['messages']
+
+        self.assertEqual([r['id'] for r in results], [self.headache.id])
+        self.assertIn('<mark>migraines</mark>', results[0]['highlights']['content'])
+
+    def test_vector_follows_updates(self):
+        Message.objects.filter(id=self.headache.id).update(content='Rash on the left arm')
+
+        self.assertEqual(SearchService.search(self.doctor, 'headache', ['messages'])['messages'], [])
+        self.assertEqual(len(SearchService.search(self.doctor, 'rash', ['messages'])['messages']), 1)
+
+    def test_search_is_scoped_to_participants(self):
+        results = SearchService.search(self.outsider, 'headache')
+        self.assertEqual(results['messages'], [])
+
+    def test_search_endpoint_validates_input(self):
+        self.client.force_authenticate(user=self.patient)
+
+        response = self.client.get('/api/search/', {'q': 'headache', 'scope': 'messages'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']['messages']), 1)
+
+        response = self.client.get('/api/search/', {'q': 'headache', 'scope': 'emails'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
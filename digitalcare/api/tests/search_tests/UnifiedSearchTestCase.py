@@ -0,0 +1,147 @@
+# api/tests/search_tests/UnifiedSearchTestCase.py
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework import status
+from ...models import User, Facility
+from ...services import LocationService
+
+
+class UnifiedSearchTestCase(TestCase):
+    """Test the single-query, cursor-paginated search across all provider types"""
+
+    LAT, LON = 5.6505, -0.1962
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.patient = User.objects.create_user(
+            username='unified_patient',
+            email='unified_patient@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000094'
+        )
+        self.patient.adultprofile.latitude = self.LAT
+        self.patient.adultprofile.longitude = self.LON
+        self.patient.adultprofile.save()
+
+        self.clinic = self.facility('Legon Clinic', Facility.CLINIC, 0.001)
+        self.pharmacy = self.facility('Legon Pharmacy', Facility.PHARMACY, 0.002)
+        self.laboratory = self.facility('Legon Lab', Facility.LABORATORY, 0.004)
+        self.far_clinic = self.facility('Madina Clinic', Facility.CLINIC, 0.03)
+        self.facility('Kumasi Clinic', Facility.CLINIC, 1.0)
+
+        self.cardiologist = self.provider('unified_cardio', User.DOCTOR, '+233200000095', 0.003, specialty='Cardiology')
+        self.pediatrician = self.provider('unified_pedia', User.DOCTOR, '+233200000096', 0.005, specialty='Pediatrics')
+        self.pharmacist = self.provider('unified_pharm', User.PHARMACIST, '+233200000097', 0.006)
+        self.clinic.doctors.add(self.cardiologist, self.pediatrician)
+
+    def facility(self, name, facility_type, offset):
+        return Facility.objects.create(
+            name=name, facility_type=facility_type, status='Approved',
+            latitude=self.LAT + offset, longitude=self.LON
+        )
+
+    def provider(self, username, role, phone_number, offset, specialty=None):
+        user = User.objects.create_user(
+            username=username,
+            email=f'{username}@example.com',
+            password='testpass123',
+            first_name=username.split('_')[1].title(),
+            last_name='Mensah',
+            role=role,
+            phone_number=phone_number
+        )
+        profile = user.doctorprofile if role == User.DOCTOR else user.pharmacistprofile
+        profile.first_name, profile.last_name = user.first_name, user.last_name
+        profile.latitude, profile.longitude = self.LAT + offset, self.LON
+        if specialty:
+            profile.specialty = specialty
+        profile.save()
+        return profile
+
+    def test_one_union_query_plus_clinic_doctors(self):
+        with self.assertNumQueries(2):
+            results, next_cursor = LocationService.search_all(self.LAT, self.LON, 10)
+
+        self.assertEqual(
+            [(result['type'], result['id']) for result in results],
+            [
+                ('clinic', self.clinic.id), ('pharmacy', self.pharmacy.id),
+                ('doctor', self.cardiologist.id), ('laboratory', self.laboratory.id),
+                ('doctor', self.pediatrician.id), ('pharmacist', self.pharmacist.id),
+                ('clinic', self.far_clinic.id),
+            ]
+        )
+        self.assertIsNone(next_cursor)
+        self.assertEqual([doctor['specialty'] for doctor in results[0]['doctors']], ['Cardiology', 'Pediatrics'])
+        self.assertEqual(results[0]['name'], 'Legon Clinic')
+        self.assertEqual(results[2]['name'], 'Cardio Mensah')
+        distances = [result['distance_km'] for result in results]
+        self.assertEqual(distances, sorted(distances))
+
+    def test_cursor_pages_cover_every_result_once(self):
+        everything, _ = LocationService.search_all(self.LAT, self.LON, 10, limit=100)
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = LocationService.search_all(self.LAT, self.LON, 10, limit=2, cursor=cursor)
+            seen.extend(page)
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, everything)
+
+    def test_ties_are_paged_in_kind_rank_order(self):
+        twin = self.facility('Twin Pharmacy', Facility.PHARMACY, 0.006)
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = LocationService.search_all(self.LAT, self.LON, 10, 'pharmacy', limit=1, cursor=cursor)
+            seen.extend((result['type'], result['id']) for result in page)
+            if cursor is None:
+                break
+
+        # Same distance: pharmacies rank before pharmacists, whatever the string order
+        self.assertEqual(
+            seen, [('pharmacy', self.pharmacy.id), ('pharmacy', twin.id), ('pharmacist', self.pharmacist.id)]
+        )
+
+    def test_type_and_specialty_filters(self):
+        results, _ = LocationService.search_all(self.LAT, self.LON, 10, 'clinic', specialty='pedia')
+
+        self.assertEqual(
+            [(result['type'], result['id']) for result in results],
+            [('clinic', self.clinic.id), ('doctor', self.pediatrician.id), ('clinic', self.far_clinic.id)]
+        )
+
+    def test_endpoint(self):
+        self.client.force_authenticate(user=self.patient)
+
+        first = self.client.get('/api/providers/nearby/all/', {'limit': 4})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(first.data['results']), 4)
+
+        second = self.client.get('/api/providers/nearby/all/', {'limit': 4, 'cursor': first.data['next_cursor']})
+        self.assertEqual(len(second.data['results']), 3)
+        self.assertIsNone(second.data['next_cursor'])
+
+        self.assertEqual(
+            self.client.get('/api/providers/nearby/all/', {'cursor': 'nonsense'}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self.client.get('/api/providers/nearby/all/', {'type': 'spa'}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_nearby_providers_serializes_doctors(self):
+        self.client.force_authenticate(user=self.patient)
+
+        response = self.client.get('/api/providers/nearby/', {'radius': 10})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([doctor['id'] for doctor in response.data['doctors']], [self.cardiologist.id, self.pediatrician.id])
+        self.assertEqual(response.data['doctors'][0]['clinics'], [self.clinic.id])
@@ -0,0 +1,8 @@
+from .SearchServiceTestCase import *
+from .LocationServiceTestCase import *
+from .NearbyCacheTestCase import *
+from .UnifiedSearchTestCase import *
+from .NearestFacilityTestCase import *
+from .ProviderIndexTestCase import *
+from .GeocodingTestCase import *
+from .PharmacyStockTestCase import *
\ No newline at end of file
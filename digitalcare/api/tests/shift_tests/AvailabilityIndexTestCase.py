@@ -0,0 +1,168 @@
+# api/tests/shift_tests/AvailabilityIndexTestCase.py
+
+import importlib
+from datetime import datetime, time, timedelta
+from io import StringIO
+from django.apps import apps
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from django_celery_beat.models import PeriodicTask
+from ...models import User, Facility, Shift, Appointment, DoctorAvailability
+from ...services import AvailabilityService
+
+
+class AvailabilityIndexTestCase(TestCase):
+    """Test the free-slot bitmap index and the earliest openings search"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.day = timezone.localdate() + timedelta(days=1)
+        self.patient = User.objects.create_user(
+            username='index_patient',
+            email='index_patient@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000074'
+        )
+        self.facility = Facility.objects.create(
+            name='Index Clinic', facility_type=Facility.CLINIC, status='Approved',
+            latitude=5.6037, longitude=-0.1870
+        )
+        self.far_facility = Facility.objects.create(
+            name='Far Clinic', facility_type=Facility.CLINIC, status='Approved',
+            latitude=6.6885, longitude=-1.6244
+        )
+        self.cardiologist = self.create_doctor('index_cardio', '+233200000075', 'Cardiology')
+        self.dermatologist = self.create_doctor('index_derm', '+233200000076', 'Dermatology')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_shift(self.cardiologist, self.facility, time(10, 0), time(12, 0))
+            self.add_shift(self.dermatologist, self.far_facility, time(9, 0), time(10, 0))
+
+    def create_doctor(self, username, phone, specialty):
+        user = User.objects.create_user(
+            username=username,
+            email=f'{username}@example.com',
+            password='testpass123',
+            role=User.DOCTOR,
+            phone_number=phone
+        )
+        doctor = user.doctorprofile
+        doctor.specialty = specialty
+        doctor.save()
+        return doctor
+
+    def add_shift(self, doctor, facility, start, end):
+        return Shift.objects.create(
+            doctor=doctor, facility=facility,
+            day_of_week=self.day.weekday(), start_time=start, end_time=end
+        )
+
+    def at(self, hour, minute=0):
+        return timezone.make_aware(datetime.combine(self.day, time(hour, minute)))
+
+    def test_shift_saves_build_bitmaps(self):
+        row = DoctorAvailability.objects.get(doctor=self.cardiologist, date=self.day)
+
+        # 10:00-12:00 on a 30 minute grid: bits 20 to 23
+        self.assertEqual(row.mask, 0b1111 << 20)
+        self.assertEqual(row.free_count, 4)
+        self.assertEqual(row.first_free_at, self.at(10))
+
+    @override_settings(AVAILABILITY_SLOT_MINUTES=15)
+    def test_short_slots_fit_the_bitmap(self):
+        AvailabilityService.refresh([self.cardiologist.id], [self.day])
+
+        row = DoctorAvailability.objects.get(doctor=self.cardiologist, date=self.day)
+        # 10:00-12:00 on a 15 minute grid: bits 40 to 47, past a 64-bit integer's sign bit at 23:45
+        self.assertEqual(row.mask, 0b11111111 << 40)
+        self.assertEqual(
+            list(AvailabilityService.slot_starts(row, not_before=self.at(11))),
+            [self.at(11), self.at(11, 15), self.at(11, 30), self.at(11, 45)]
+        )
+
+    def test_appointment_changes_update_the_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            appointment = Appointment.objects.create(
+                patient=self.patient, doctor=self.cardiologist, facility=self.facility,
+                scheduled_at=self.at(10), duration_minutes=60, status=Appointment.CONFIRMED
+            )
+        row = DoctorAvailability.objects.get(doctor=self.cardiologist, date=self.day)
+        self.assertEqual(row.mask, 0b1100 << 20)
+        self.assertEqual(row.first_free_at, self.at(11))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            appointment.status = Appointment.CANCELLED
+            appointment.save()
+        row.refresh_from_db()
+        self.assertEqual(row.free_count, 4)
+
+    def test_fully_booked_days_are_removed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Appointment.objects.create(
+                patient=self.patient, doctor=self.dermatologist, facility=self.far_facility,
+                scheduled_at=self.at(9), duration_minutes=60, status=Appointment.PENDING
+            )
+
+        self.assertFalse(DoctorAvailability.objects.filter(doctor=self.dermatologist, date=self.day).exists())
+        # The same shift next week is untouched
+        self.assertTrue(DoctorAvailability.objects.filter(doctor=self.dermatologist).exists())
+
+    def test_earliest_openings_across_doctors(self):
+        openings = AvailabilityService.earliest_openings(limit=3, not_before=self.at(0))
+
+        self.assertEqual(
+            [(o['doctor'], o['start']) for o in openings],
+            [(self.dermatologist, self.at(9)), (self.dermatologist, self.at(9, 30)),
+             (self.cardiologist, self.at(10))]
+        )
+
+    def test_earliest_openings_filters(self):
+        by_specialty = AvailabilityService.earliest_openings(specialty='cardio', not_before=self.at(0))
+        self.assertEqual({o['doctor'] for o in by_specialty}, {self.cardiologist})
+
+        nearby = AvailabilityService.earliest_openings(
+            latitude=5.60, longitude=-0.19, radius_km=20, not_before=self.at(0)
+        )
+        self.assertEqual({o['facility'] for o in nearby}, {self.facility})
+
+        # 90 minutes only fit at 10:00 and 10:30 in the 10:00-12:00 shift, not 9:00-10:00
+        long_visits = AvailabilityService.earliest_openings(limit=2, duration=90, not_before=self.at(0))
+        self.assertEqual([o['start'] for o in long_visits], [self.at(10), self.at(10, 30)])
+
+    def test_next_available_endpoint(self):
+        self.client.force_authenticate(user=self.patient)
+
+        response = self.client.get('/api/availability/next/', {'specialty': 'derm', 'limit': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['openings'][0]['doctor_id'], self.dermatologist.id)
+
+        response = self.client.get('/api/availability/next/', {'lat': 'x', 'lon': 1})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuild_command_fills_an_empty_index(self):
+        DoctorAvailability.objects.all().delete()
+
+        call_command('rebuild_availability_index', stdout=StringIO())
+
+        self.assertEqual(
+            set(DoctorAvailability.objects.values_list('doctor_id', flat=True)),
+            {self.cardiologist.id, self.dermatologist.id}
+        )
+
+    def test_migration_registers_the_daily_rebuild(self):
+        migration = importlib.import_module('api.migrations.0062_availability_index_schedule')
+        PeriodicTask.objects.filter(name=migration.TASK_NAME).delete()
+
+        migration.register(apps, None)
+        task = PeriodicTask.objects.get(name=migration.TASK_NAME)
+        self.assertEqual((task.task, task.crontab.hour, task.crontab.minute), (migration.TASK_PATH, '0', '5'))
+
+        # A schedule changed from the admin is kept
+        task.enabled = False
+        task.save()
+        migration.register(apps, None)
+        self.assertFalse(PeriodicTask.objects.get(name=migration.TASK_NAME).enabled)
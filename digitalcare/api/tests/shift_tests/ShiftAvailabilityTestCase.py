@@ -0,0 +1,130 @@
+# api/tests/shift_tests/ShiftAvailabilityTestCase.py
+
+from datetime import date, datetime, time, timedelta
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from ...models import User, Facility, Shift, Appointment
+from ...utils.shift_validator import ShiftValidator
+
+
+class ShiftAvailabilityTestCase(TestCase):
+    """Test the interval-based slot availability engine"""
+
+    # A Monday
+    DAY = date(2030, 1, 7)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.doctor_user = User.objects.create_user(
+            username='slots_doctor',
+            email='slots_doctor@example.com',
+            password='testpass123',
+            role=User.DOCTOR,
+            phone_number='+233200000072'
+        )
+        self.patient = User.objects.create_user(
+            username='slots_patient',
+            email='slots_patient@example.com',
+            password='testpass123',
+            role=User.ADULT,
+            phone_number='+233200000073'
+        )
+        self.doctor = self.doctor_user.doctorprofile
+        self.facility = Facility.objects.create(name='Slots Clinic', facility_type=Facility.CLINIC)
+        self.other_facility = Facility.objects.create(name='Other Clinic', facility_type=Facility.CLINIC)
+        Shift.objects.create(
+            doctor=self.doctor, facility=self.facility,
+            day_of_week=Shift.MONDAY, start_time=time(9, 0), end_time=time(12, 0)
+        )
+        Shift.objects.create(
+            doctor=self.doctor, facility=self.other_facility,
+            day_of_week=Shift.MONDAY, start_time=time(14, 0), end_time=time(16, 0)
+        )
+
+    def at(self, hour, minute=0, day=None):
+        return timezone.make_aware(datetime.combine(day or self.DAY, time(hour, minute)))
+
+    def book(self, start, minutes, facility=None, status_=Appointment.CONFIRMED):
+        return Appointment.objects.create(
+            patient=self.patient, doctor=self.doctor, facility=facility or self.facility,
+            scheduled_at=start, duration_minutes=minutes, status=status_
+        )
+
+    def test_subtract_intervals_and_aligned_slots(self):
+        busy = [(self.at(9, 40), self.at(10, 20)), (self.at(10, 0), self.at(10, 10)), (self.at(11, 50), self.at(13))]
+        free = ShiftValidator.subtract_intervals(self.at(9), self.at(12), busy)
+        self.assertEqual(free, [(self.at(9), self.at(9, 40)), (self.at(10, 20), self.at(11, 50))])
+
+        slots = list(ShiftValidator.iter_slots(self.at(9), free, timedelta(minutes=30)))
+        self.assertEqual(slots, [self.at(9), self.at(10, 30), self.at(11)])
+
+    def test_appointment_blocks_its_full_duration(self):
+        self.book(self.at(10), 60)
+        self.book(self.at(11), 30, status_=Appointment.CANCELLED)
+
+        slots = ShiftValidator.get_available_slots(self.doctor, self.facility, self.DAY)
+
+        self.assertEqual(slots, [self.at(9), self.at(9, 30), self.at(11), self.at(11, 30)])
+
+    def test_appointment_elsewhere_blocks_the_doctor(self):
+        # Booked at the first facility but running into the afternoon shift elsewhere
+        Shift.objects.create(
+            doctor=self.doctor, facility=self.facility,
+            day_of_week=Shift.MONDAY, start_time=time(13, 0), end_time=time(14, 30)
+        )
+        self.book(self.at(13, 30), 60)
+
+        slots = ShiftValidator.get_available_slots(self.doctor, self.other_facility, self.DAY)
+
+        self.assertEqual(slots, [self.at(14, 30), self.at(15), self.at(15, 30)])
+
+    def test_openings_over_several_days_use_two_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            openings = ShiftValidator.get_openings([self.doctor.id], self.DAY, days=14)
+
+        self.assertEqual(len(queries), 2)
+        # Two Mondays, 6 morning and 4 afternoon slots each
+        self.assertEqual(len(openings), 20)
+        self.assertEqual(openings[0]['start'], self.at(9))
+        self.assertEqual(openings[-1]['start'], self.at(15, 30, self.DAY + timedelta(days=7)))
+
+    def test_openings_limit_and_not_before(self):
+        openings = ShiftValidator.get_openings(
+            [self.doctor.id], self.DAY, days=14, not_before=self.at(11), limit=3
+        )
+
+        self.assertEqual([o['start'] for o in openings], [self.at(11), self.at(11, 30), self.at(14)])
+        self.assertEqual(openings[2]['facility_id'], self.other_facility.id)
+
+    def test_available_slots_endpoint(self):
+        self.book(self.at(9), 30)
+        self.client.force_authenticate(user=self.doctor_user)
+
+        response = self.client.get('/api/shifts/available_slots/', {
+            'doctor_id': self.doctor.id,
+            'facility_id': self.facility.id,
+            'date': self.DAY.isoformat(),
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['available_slots']), 5)
+
+    def test_patients_can_find_next_openings(self):
+        self.client.force_authenticate(user=self.patient)
+
+        response = self.client.get('/api/shifts/next_available/', {
+            'doctor_ids': str(self.doctor.id),
+            'from': self.DAY.isoformat(),
+            'days': 1,
+            'limit': 2,
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [o['start'] for o in response.data['openings']],
+            [self.at(9).isoformat(), self.at(9, 30).isoformat()]
+        )
@@ -0,0 +1,128 @@
+# api/tests/shift_tests/ShiftTemplateTestCase.py
+
+from datetime import time
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+from ...models import User, Shift
+from ...services import ShiftTemplateService
+
+
+class ShiftTemplateTestCase(TestCase):
+    """Test bulk rota loading, the sweep overlap check and the shift exclusion constraint"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            username='rota_admin',
+            email='rota_admin@example.com',
+            password='testpass123',
+            role=User.FACILITY_ADMIN,
+            phone_number='+233200000080'
+        )
+        self.facility = self.admin.facility
+        self.doctors = [
+            User.objects.create_user(
+                username=f'rota_doctor_{i}',
+                email=f'rota_doctor_{i}@example.com',
+                password='testpass123',
+                role=User.DOCTOR,
+                phone_number=f'+23320000008{i + 1}'
+            ).doctorprofile
+            for i in range(3)
+        ]
+        self.client.force_authenticate(user=self.admin)
+
+    def shift(self, start, end, day=Shift.MONDAY, doctor=None):
+        return Shift(
+            doctor=doctor or self.doctors[0], facility=self.facility,
+            day_of_week=day, start_time=time(start), end_time=time(end)
+        )
+
+    def test_sweep_finds_overlaps_hidden_behind_long_shifts(self):
+        long_shift = self.shift(8, 18)
+        overlaps = ShiftTemplateService.find_overlaps([
+            self.shift(12, 13), long_shift, self.shift(10, 11),
+            self.shift(10, 11, day=Shift.TUESDAY),
+            self.shift(10, 11, doctor=self.doctors[1]),
+            self.shift(18, 19),
+        ])
+
+        self.assertEqual(len(overlaps), 2)
+        self.assertTrue(all(first is long_shift for first, _ in overlaps))
+
+    def test_bulk_rota_is_saved_in_a_few_queries(self):
+        payload = {
+            'facility': self.facility.id,
+            'patterns': [
+                {'doctor': doctor.id, 'rule': 'weekdays', 'start_time': '08:00', 'end_time': '12:00'}
+                for doctor in self.doctors
+            ] + [
+                {'doctor': self.doctors[0].id, 'days': [5], 'start_time': '09:00', 'end_time': '11:00'},
+            ],
+            'exceptions': [
+                {'day_of_week': Shift.WEDNESDAY},
+                {'doctor': self.doctors[1].id, 'day_of_week': Shift.FRIDAY},
+            ],
+        }
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/shifts/bulk/', payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # 3 doctors x 4 days, minus one Friday, plus one Saturday
+        self.assertEqual(response.data['created'], 12)
+        self.assertEqual(Shift.objects.filter(facility=self.facility).count(), 12)
+        self.assertFalse(Shift.objects.filter(day_of_week=Shift.WEDNESDAY).exists())
+        self.assertLess(len(queries), 25)
+
+    def test_bulk_rota_rejects_overlaps_and_can_replace(self):
+        self.shift(10, 14).save()
+        payload = {
+            'facility': self.facility.id,
+            'patterns': [
+                {'doctor': self.doctors[0].id, 'days': [0], 'start_time': '08:00', 'end_time': '11:00'},
+            ],
+        }
+
+        response = self.client.post('/api/shifts/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Shift.objects.count(), 1)
+
+        response = self.client.post('/api/shifts/bulk/', {**payload, 'replace': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['replaced'], 1)
+        self.assertEqual(list(Shift.objects.values_list('start_time', flat=True)), [time(8)])
+
+    def test_bulk_rota_reactivates_inactive_shifts(self):
+        inactive = self.shift(9, 12)
+        inactive.is_active = False
+        inactive.save()
+
+        created, replaced = ShiftTemplateService.apply(
+            self.facility, [self.shift(9, 13), self.shift(9, 13, day=Shift.TUESDAY)]
+        )
+
+        self.assertEqual((len(created), replaced), (2, 0))
+        inactive.refresh_from_db()
+        self.assertTrue(inactive.is_active)
+        self.assertEqual(inactive.end_time, time(13))
+        self.assertEqual(Shift.objects.count(), 2)
+
+    def test_database_rejects_overlapping_shifts(self):
+        self.shift(9, 12).save()
+
+        with self.assertRaises(ValidationError):
+            self.shift(11, 13).save()
+
+        # Other days and inactive shifts may overlap
+        self.shift(11, 13, day=Shift.TUESDAY).save()
+        inactive = self.shift(11, 13)
+        inactive.is_active = False
+        inactive.save()
+
+        with self.assertRaises(IntegrityError):
+            Shift.objects.bulk_create([self.shift(8, 10)])
@@ -0,0 +1,3 @@
+from .ShiftAvailabilityTestCase import *
+from .AvailabilityIndexTestCase import *
+from .ShiftTemplateTestCase import *
\ No newline at end of file
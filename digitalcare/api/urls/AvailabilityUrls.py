@@ -0,0 +1,7 @@
+# api/urls/AvailabilityUrls.py
+from django.urls import path
+from ..views import AvailabilityViews as availability_views
+
+urlpatterns = [
+    path('availability/next/', availability_views.next_available_appointments, name='next-available-appointments'),
+]
@@ -0,0 +1,9 @@
+# api/urls/CalendarUrls.py
+from django.urls import path
+from ..views import CalendarViews as calendar_views
+
+urlpatterns = [
+    path('calendar/', calendar_views.calendar_events, name='calendar-events'),
+    path('calendar/feed/', calendar_views.calendar_feed_url, name='calendar-feed-url'),
+    path('calendar.ics', calendar_views.calendar_ics, name='calendar-ics'),
+]
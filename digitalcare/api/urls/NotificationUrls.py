@@ -0,0 +1,12 @@
+# api/urls/NotificationUrls.py
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from ..views import NotificationInboxViewSet, NotificationBroadcastViewSet
+
+router = DefaultRouter()
+router.register(r'inbox', NotificationInboxViewSet, basename='notification-inbox')
+router.register(r'notification-broadcasts', NotificationBroadcastViewSet, basename='notification-broadcast')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -4,5 +4,7 @@ from ..views import ProviderSearch as provider_search
 
 urlpatterns = [
     path('providers/nearby/', provider_search.nearby_providers, name='nearby-providers'),
+    path('providers/nearby/all/', provider_search.nearby_search, name='nearby-search'),
+    path('pharmacies/stock/', provider_search.pharmacy_stock, name='pharmacy-stock'),
     path('patients/update-location/', provider_search.update_user_location, name='update-patient-location'),
 ]
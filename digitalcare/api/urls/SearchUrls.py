@@ -0,0 +1,7 @@
+# api/urls/SearchUrls.py
+from django.urls import path
+from ..views import SearchViews as search_views
+
+urlpatterns = [
+    path('search/', search_views.clinical_search, name='clinical-search'),
+]
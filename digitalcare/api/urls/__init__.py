@@ -7,6 +7,7 @@ from .FacilityUrls import urlpatterns as FacilityUrls
 from .AppointmentUrls import urlpatterns as AppointmentUrls
 from .SchedulerUrls import urlpatterns as SchedulerUrls
 from .ChatUrls import urlpatterns as ChatUrls
+from .NotificationUrls import urlpatterns as NotificationUrls
 from .ConsultationUrls import urlpatterns as ConsultationUrls
 from .VideoConsultationUrls import urlpatterns as VideoConsultationUrls
 from .DrugUrls import urlpatterns as DrugUrls
@@ -14,8 +15,11 @@ from .DrugUrls import urlpatterns as DrugUrls
 from .PrescriptionUrls import urlpatterns as PrescriptionUrls
 from .SymptomUrls import urlpatterns as SymptomUrls 
 from .ProviderSearchUrls import urlpatterns as ProviderSearchUrls
+from .SearchUrls import urlpatterns as SearchUrls
 from .AdminUserUrls import urlpatterns as AdminUserUrls
 from .ShiftUrls import urlpatterns as ShiftUrls
+from .AvailabilityUrls import urlpatterns as AvailabilityUrls
+from .CalendarUrls import urlpatterns as CalendarUrls
 
 
 from .CloudinaryTestUrls import urlpatterns as CloudinaryTestUrls
@@ -27,8 +31,10 @@ urlpatterns = (
     + FacilityUrls 
     + AppointmentUrls 
     + ChatUrls
+    + NotificationUrls
     + ConsultationUrls + VideoConsultationUrls
     + DrugUrls
     + PrescriptionUrls
-    + SymptomUrls + ProviderSearchUrls + AdminUserUrls +ShiftUrls + HealthCardUrls + SchedulerUrls + CloudinaryTestUrls
+    + SearchUrls
+    + SymptomUrls + ProviderSearchUrls + AdminUserUrls +ShiftUrls + AvailabilityUrls + CalendarUrls + HealthCardUrls + SchedulerUrls + CloudinaryTestUrls
 )
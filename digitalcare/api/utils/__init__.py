@@ -1,2 +1,8 @@
 from .expiry_utils import default_expiry
-from .shift_validator import ShiftValidator
\ No newline at end of file
+from .shift_validator import ShiftValidator
+from .typing_throttle import TypingThrottle
+from .attachment_storage import AttachmentStorage, get_attachment_provider
+from .timezone_utils import validate_timezone, get_zone
+from .geohash_utils import geohash_encode, geohash_bounds, geohash_neighbours
+from .ball_tree import BallTree
+from .geocoding_utils import normalize_address, get_geocoder
\ No newline at end of file
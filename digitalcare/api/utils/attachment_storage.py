@@ -0,0 +1,173 @@
+import mimetypes
+import time
+import cloudinary
+import cloudinary.api
+import cloudinary.utils
+from cloudinary_storage import app_settings as cloudinary_settings
+from cloudinary_storage.storage import RawMediaCloudinaryStorage
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, Storage, default_storage
+from django.utils.deconstruct import deconstructible
+from django.utils.module_loading import import_string
+
+
+class CloudinaryUploadProvider:
+    """
+    Signed direct uploads: the client POSTs the file to Cloudinary with the
+    returned fields, so the bytes never pass through our workers. Images
+    are uploaded as image resources, named without their extension; any
+    other file is a raw resource, whose public id keeps the extension.
+    """
+
+    def __init__(self):
+        self.storage = default_storage
+        self.raw_storage = RawMediaCloudinaryStorage()
+        self.config = cloudinary.config()
+
+    @staticmethod
+    def resource_type(content_type):
+        return 'image' if content_type.startswith('image/') else 'raw'
+
+    def storage_name(self, path, content_type):
+        if self.resource_type(content_type) == 'raw':
+            return path
+        # MediaCloudinaryStorage names are public ids, without the extension
+        return path.rsplit('.', 1)[0]
+
+    def storage_for(self, name):
+        """Only raw public ids carry an extension"""
+        basename = name.rsplit('/', 1)[-1]
+        return self.raw_storage if '.' in basename else self.storage
+
+    def upload_instructions(self, name, content_type, ttl):
+        prefix = cloudinary_settings.PREFIX.strip('/')
+        folder, public_id = f"{prefix}/{name}".lstrip('/').rsplit('/', 1)
+        params = {
+            'timestamp': int(time.time()),
+            'folder': folder,
+            'public_id': public_id,
+            'tags': getattr(settings, 'CLOUDINARY_STORAGE', {}).get('MEDIA_TAG', 'media'),
+        }
+        params['signature'] = cloudinary.utils.api_sign_request(params, self.config.api_secret)
+        params['api_key'] = self.config.api_key
+
+        return {
+            'method': 'POST',
+            'url': cloudinary.utils.cloudinary_api_url('upload', resource_type=self.resource_type(content_type)),
+            'fields': params,
+            'file_field': 'file',
+        }
+
+    def exists(self, name):
+        return self.storage_for(name).exists(name)
+
+    def metadata(self, name):
+        """Size and content type of the stored resource, as Cloudinary reports them"""
+        storage = self.storage_for(name)
+        resource = cloudinary.api.resource(storage._prepend_prefix(name), resource_type=storage.RESOURCE_TYPE)
+        extension = resource.get('format') or name.rsplit('.', 1)[-1]
+        return {
+            'size': resource['bytes'],
+            'content_type': mimetypes.guess_type(f'file.{extension}')[0],
+        }
+
+    def open(self, name):
+        return self.storage_for(name).open(name)
+
+    def delete(self, name):
+        return self.storage_for(name).delete(name)
+
+    def save(self, name, content):
+        return self.storage.save(name, content)
+
+
+class FileSystemUploadProvider:
+    """
+    Local stand-in for development and tests: files are written straight
+    into CHAT_ATTACHMENT_ROOT (e.g. by an nginx WebDAV PUT location).
+    """
+
+    def __init__(self):
+        self.storage = FileSystemStorage(
+            location=getattr(settings, 'CHAT_ATTACHMENT_ROOT', settings.MEDIA_ROOT)
+        )
+
+    def storage_name(self, path, content_type):
+        return path
+
+    def storage_for(self, name):
+        return self.storage
+
+    def upload_instructions(self, name, content_type, ttl):
+        return {
+            'method': 'PUT',
+            'url': self.storage.url(name),
+            'fields': {},
+            'headers': {'Content-Type': content_type},
+        }
+
+    def exists(self, name):
+        return self.storage.exists(name)
+
+    def metadata(self, name):
+        return {
+            'size': self.storage.size(name),
+            'content_type': mimetypes.guess_type(name)[0],
+        }
+
+    def open(self, name):
+        return self.storage.open(name)
+
+    def delete(self, name):
+        return self.storage.delete(name)
+
+    def save(self, name, content):
+        return self.storage.save(name, content)
+
+
+def get_attachment_provider():
+    """Instantiate the provider configured in CHAT_ATTACHMENT_PROVIDER"""
+    path = getattr(
+        settings, 'CHAT_ATTACHMENT_PROVIDER',
+        'api.utils.attachment_storage.CloudinaryUploadProvider'
+    )
+    return import_string(path)()
+
+
+@deconstructible
+class AttachmentStorage(Storage):
+    """
+    Storage for Message.attachment and its renditions. Resolves the provider
+    on every call, so CHAT_ATTACHMENT_PROVIDER can change without migrations.
+    Stored names are read through the provider's storage for their resource
+    type; new files (the JPEG renditions) go to its default storage.
+    """
+
+    @property
+    def backend(self):
+        return get_attachment_provider().storage
+
+    def stored(self, name):
+        return get_attachment_provider().storage_for(name)
+
+    def _open(self, name, mode='rb'):
+        return self.stored(name).open(name, mode)
+
+    def _save(self, name, content):
+        return self.backend.save(name, content)
+
+    def get_available_name(self, name, max_length=None):
+        return self.backend.get_available_name(name, max_length=max_length)
+
+    def delete(self, name):
+        return self.stored(name).delete(name)
+
+    def exists(self, name):
+        return self.stored(name).exists(name)
+
+    def size(self, name):
+        return self.stored(name).size(name)
+
+    def url(self, name):
+        return self.stored(name).url(name)
+
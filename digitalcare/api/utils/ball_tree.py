@@ -0,0 +1,89 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EARTH_RADIUS_KM = 6371
+
+
+def unit_vectors(lat, lon):
+    """(n, 3) points on the unit sphere for latitude/longitude arrays in degrees"""
+    phi, lam = np.radians(lat), np.radians(lon)
+    return np.column_stack((np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)))
+
+
+def chord_for_km(distance_km):
+    """Straight-line distance on the unit sphere matching a great-circle distance"""
+    return 2 * math.sin(min(distance_km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def km_for_chord(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2, 1.0))
+
+
+class BallTree:
+    """
+    Static ball tree over points on the unit sphere. Chord length grows
+    with great-circle (haversine) distance, so a chord radius query
+    returns exactly the points within a haversine radius.
+
+    Nodes are stored in flat arrays: every node owns the slice
+    order[start:end] of the points, sorted so that children own
+    contiguous halves.
+    """
+
+    def __init__(self, points, leaf_size=32):
+        if np is None:
+            raise ImportError("BallTree needs numpy")
+        self.points = np.asarray(points, dtype=np.float64)
+        self.leaf_size = leaf_size
+        self.order = np.arange(len(self.points))
+        starts, ends, centers, radii, children = [], [], [], [], []
+
+        def build(start, end):
+            node = len(starts)
+            members = self.points[self.order[start:end]]
+            center = members.mean(axis=0) if end > start else np.zeros(3)
+            starts.append(start)
+            ends.append(end)
+            centers.append(center)
+            radii.append(np.sqrt(((members - center) ** 2).sum(axis=1)).max() if end > start else 0.0)
+            children.append((-1, -1))
+
+            if end - start > leaf_size:
+                # Split at the median of the widest dimension
+                axis = int(np.argmax(members.max(axis=0) - members.min(axis=0)))
+                middle = (end - start) // 2
+                split = np.argpartition(members[:, axis], middle)
+                self.order[start:end] = self.order[start:end][split]
+                children[node] = (build(start, start + middle), build(start + middle, end))
+            return node
+
+        build(0, len(self.points))
+        self.starts, self.ends = np.array(starts), np.array(ends)
+        self.centers, self.radii = np.array(centers), np.array(radii)
+        self.children = children
+
+    def query_radius(self, point, radius):
+        """Indices of the points within `radius` (chord length) of `point`"""
+        point = np.asarray(point, dtype=np.float64)
+        found = []
+        stack = [0] if len(self.points) else []
+        while stack:
+            node = stack.pop()
+            gap = np.sqrt(((self.centers[node] - point) ** 2).sum())
+            if gap - self.radii[node] > radius:
+                continue
+            members = self.order[self.starts[node]:self.ends[node]]
+            if gap + self.radii[node] <= radius:
+                found.append(members)
+                continue
+            left, right = self.children[node]
+            if left < 0:
+                distances = np.sqrt(((self.points[members] - point) ** 2).sum(axis=1))
+                found.append(members[distances <= radius])
+            else:
+                stack.extend((left, right))
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
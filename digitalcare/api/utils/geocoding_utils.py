@@ -0,0 +1,89 @@
+import csv
+import json
+import re
+import urllib.parse
+import urllib.request
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+def normalize_address(address):
+    """
+    Cache key form of an address: lower case, punctuation dropped, runs of
+    spaces collapsed and empty comma-separated parts removed, so
+    "12 Oxford St.,  Osu , Accra" and "12 oxford st, osu, accra" match.
+    """
+    parts = []
+    for part in (address or '').lower().split(','):
+        part = ' '.join(re.sub(r"[^\w\s'-]", ' ', part).split())
+        if part:
+            parts.append(part)
+    return ', '.join(parts)
+
+
+class GazetteerGeocoder:
+    """
+    Offline geocoder for development and tests: looks addresses up in the
+    file at GEOCODING_GAZETTEER_PATH, either a CSV with address, latitude
+    and longitude columns or a JSON object of address -> [latitude, longitude].
+    """
+
+    name = 'gazetteer'
+
+    def __init__(self):
+        self.places = self.load(getattr(settings, 'GEOCODING_GAZETTEER_PATH', ''))
+
+    @staticmethod
+    def load(path):
+        if not path:
+            return {}
+        with open(path, newline='', encoding='utf-8') as handle:
+            if path.endswith('.json'):
+                rows = json.load(handle).items()
+            else:
+                rows = ((row['address'], (row['latitude'], row['longitude'])) for row in csv.DictReader(handle))
+            return {
+                normalize_address(address): (float(latitude), float(longitude))
+                for address, (latitude, longitude) in rows
+            }
+
+    def geocode(self, address):
+        """(latitude, longitude), or None when the address is unknown"""
+        return self.places.get(normalize_address(address))
+
+
+class NominatimGeocoder:
+    """
+    OpenStreetMap Nominatim search API. Its usage policy allows one request
+    per second with an identifying User-Agent (GEOCODING_USER_AGENT), which
+    is why callers go through GeocodingService and its address cache.
+    """
+
+    name = 'nominatim'
+
+    def __init__(self):
+        self.url = getattr(settings, 'GEOCODING_URL', 'https://nominatim.openstreetmap.org/search')
+        self.user_agent = getattr(settings, 'GEOCODING_USER_AGENT', 'digitalcare')
+        self.country_codes = getattr(settings, 'GEOCODING_COUNTRY_CODES', '')
+        self.timeout = getattr(settings, 'GEOCODING_TIMEOUT', 5)
+
+    def geocode(self, address):
+        """(latitude, longitude), or None when nothing matches; raises OSError on network errors"""
+        params = {'q': address, 'format': 'jsonv2', 'limit': 1}
+        if self.country_codes:
+            params['countrycodes'] = self.country_codes
+        request = urllib.request.Request(
+            f"{self.url}?{urllib.parse.urlencode(params)}",
+            headers={'User-Agent': self.user_agent},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            results = json.load(response)
+        if not results:
+            return None
+        return float(results[0]['lat']), float(results[0]['lon'])
+
+
+def get_geocoder():
+    """Instantiate the geocoder configured in GEOCODING_PROVIDER"""
+    path = getattr(settings, 'GEOCODING_PROVIDER', 'api.utils.geocoding_utils.NominatimGeocoder')
+    return import_string(path)()
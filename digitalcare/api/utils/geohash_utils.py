@@ -0,0 +1,58 @@
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def geohash_encode(lat, lon, precision=5):
+    """Geohash of (lat, lon) with `precision` characters"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits = value = 0
+    even = True
+    while len(chars) < precision:
+        target, ranges = (lon, lon_range) if even else (lat, lat_range)
+        middle = (ranges[0] + ranges[1]) / 2
+        value <<= 1
+        if target >= middle:
+            value |= 1
+            ranges[0] = middle
+        else:
+            ranges[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = value = 0
+    return ''.join(chars)
+
+
+def geohash_bounds(geohash):
+    """(min_lat, max_lat, min_lon, max_lon) of a geohash cell"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            ranges = lon_range if even else lat_range
+            middle = (ranges[0] + ranges[1]) / 2
+            if value >> shift & 1:
+                ranges[0] = middle
+            else:
+                ranges[1] = middle
+            even = not even
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+
+def geohash_neighbours(geohash):
+    """The cell itself and the (up to) 8 cells around it"""
+    min_lat, max_lat, min_lon, max_lon = geohash_bounds(geohash)
+    height, width = max_lat - min_lat, max_lon - min_lon
+    center_lat, center_lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+
+    cells = set()
+    for dlat in (-1, 0, 1):
+        lat = center_lat + dlat * height
+        if not -90 < lat < 90:
+            continue
+        for dlon in (-1, 0, 1):
+            lon = (center_lon + dlon * width + 180) % 360 - 180
+            cells.add(geohash_encode(lat, lon, len(geohash)))
+    return cells
@@ -7,6 +7,9 @@ class ShiftValidator:
     Utility class to validate appointment bookings against doctor shifts
     """
     
+    # Appointments in these states occupy the doctor's time
+    BLOCKING_STATUSES = ['pending', 'confirmed']
+    
     @staticmethod
     def is_appointment_within_shift(scheduled_at, duration_minutes, doctor, facility):
         """
@@ -74,42 +77,131 @@ class ShiftValidator:
         Returns:
             list of datetime objects representing available slots
         """
-        from ..models import Shift
-        from ..models import Appointment
+        openings = ShiftValidator.get_openings(
+            [doctor.id], date, days=1, slot_duration=slot_duration, facility=facility
+        )
+        return [opening['start'] for opening in openings]
+    
+    @staticmethod
+    def get_openings(doctor_ids, start_date, days=1, slot_duration=30, facility=None,
+                     not_before=None, limit=None, align_to_day=False):
+        """
+        Free slots for several doctors over several days, in two queries
+        (shifts, booked appointments) and an in-memory interval sweep.
+        
+        A slot is free when it fits in an active shift and does not overlap
+        any pending/confirmed appointment of the doctor, at any facility,
+        for that appointment's full duration_minutes.
+        
+        Args:
+            doctor_ids: iterable of DoctorProfile ids
+            start_date: datetime.date - First day to search
+            days: int - Number of days to search
+            slot_duration: int - Duration of each slot in minutes
+            facility: Facility or None for all the doctors' facilities
+            not_before: datetime - Skip slots starting earlier (e.g. now)
+            limit: int - Stop after this many openings
+            align_to_day: bool - Align slots to midnight instead of the shift start
+            
+        Returns:
+            list of {'doctor_id', 'facility_id', 'start', 'end'} dicts sorted by start
+        """
+        from ..models import Shift, Appointment
         
-        day_of_week = date.weekday()
+        doctor_ids = list(doctor_ids)
+        dates = [start_date + timedelta(days=offset) for offset in range(days)]
+        if not doctor_ids or not dates or slot_duration <= 0:
+            return []
         
         shifts = Shift.objects.filter(
-            doctor=doctor,
-            facility=facility,
-            day_of_week=day_of_week,
+            doctor_id__in=doctor_ids,
+            day_of_week__in={date.weekday() for date in dates},
             is_active=True
         )
-        
-        if not shifts.exists():
+        if facility is not None:
+            shifts = shifts.filter(facility=facility)
+        shifts_by_day = {}
+        for shift in shifts.values_list('doctor_id', 'facility_id', 'day_of_week', 'start_time', 'end_time'):
+            shifts_by_day.setdefault(shift[2], []).append(shift)
+        if not shifts_by_day:
             return []
         
-        available_slots = []
+        tz = timezone.get_current_timezone()
+        window_start = timezone.make_aware(datetime.combine(dates[0], datetime.min.time()), tz)
+        window_end = window_start + timedelta(days=days)
         
-        for shift in shifts:
-            current_time = datetime.combine(date, shift.start_time)
-            end_time = datetime.combine(date, shift.end_time)
-            
-            while current_time + timedelta(minutes=slot_duration) <= end_time:
-                # Check if slot is already booked
-                slot_end = current_time + timedelta(minutes=slot_duration)
-                
-                conflicting_appointments = Appointment.objects.filter(
-                    doctor=doctor,
-                    facility=facility,
-                    scheduled_at__lt=slot_end,
-                    scheduled_at__gte=current_time,
-                    status__in=['pending', 'confirmed']
-                )
-                
-                if not conflicting_appointments.exists():
-                    available_slots.append(current_time)
+        # Appointments starting the day before can still run into the window
+        busy = {}
+        appointments = Appointment.objects.filter(
+            doctor_id__in=doctor_ids,
+            status__in=ShiftValidator.BLOCKING_STATUSES,
+            scheduled_at__gte=window_start - timedelta(days=1),
+            scheduled_at__lt=window_end
+        ).values_list('doctor_id', 'scheduled_at', 'duration_minutes')
+        for doctor_id, scheduled_at, duration in appointments:
+            end = scheduled_at + timedelta(minutes=duration)
+            if end > window_start:
+                busy.setdefault(doctor_id, []).append((scheduled_at, end))
+        for intervals in busy.values():
+            intervals.sort()
+        
+        step = timedelta(minutes=slot_duration)
+        openings = []
+        for date in dates:
+            midnight = timezone.make_aware(datetime.combine(date, datetime.min.time()), tz)
+            for doctor_id, facility_id, _, start_time, end_time in shifts_by_day.get(date.weekday(), []):
+                shift_start = timezone.make_aware(datetime.combine(date, start_time), tz)
+                shift_end = timezone.make_aware(datetime.combine(date, end_time), tz)
+                free = ShiftValidator.subtract_intervals(shift_start, shift_end, busy.get(doctor_id, []))
                 
-                current_time += timedelta(minutes=slot_duration)
+                origin = midnight if align_to_day else shift_start
+                for slot in ShiftValidator.iter_slots(origin, free, step):
+                    if not_before and slot < not_before:
+                        continue
+                    openings.append({
+                        'doctor_id': doctor_id,
+                        'facility_id': facility_id,
+                        'start': slot,
+                        'end': slot + step,
+                    })
+            
+            # Days are processed in order, so once enough are found we can stop
+            if limit and len(openings) >= limit:
+                break
         
-        return available_slots
+        openings.sort(key=lambda opening: (opening['start'], opening['doctor_id']))
+        return openings[:limit] if limit else openings
+    
+    @staticmethod
+    def subtract_intervals(start, end, busy):
+        """
+        Free pieces of [start, end) once the busy intervals are removed.
+        busy must be sorted by start; intervals may overlap each other.
+        """
+        free = []
+        cursor = start
+        for busy_start, busy_end in busy:
+            if busy_start >= end:
+                break
+            if busy_end <= cursor:
+                continue
+            if busy_start > cursor:
+                free.append((cursor, busy_start))
+            cursor = busy_end
+            if cursor >= end:
+                break
+        if cursor < end:
+            free.append((cursor, end))
+        return free
+    
+    @staticmethod
+    def iter_slots(origin, free, step):
+        """Slots of length step, aligned to origin, that fit in the free pieces"""
+        slot = origin
+        for free_start, free_end in free:
+            if slot < free_start:
+                # Jump to the first aligned slot at or after free_start
+                slot = origin + -(-(free_start - origin) // step) * step
+            while slot + step <= free_end:
+                yield slot
+                slot += step
@@ -0,0 +1,111 @@
+import asyncio
+from django.conf import settings
+
+
+class TypingThrottle:
+    """
+    Server-side throttle for "is typing" events of one user in one chat room.
+
+    Clients emit a typing frame on every keystroke; this class makes sure only
+    state changes reach the channel layer, at most once per interval:
+
+    - leading edge: the first change after a quiet period is published at once
+    - trailing edge: the latest state seen inside the window is published when
+      the window closes, if it differs from what was last published
+    - expiry: if no typing frame arrives for `expiry` seconds while the user is
+      marked as typing, a stop event is published automatically
+
+    Args:
+        publish: async callable receiving the boolean typing state to broadcast
+        interval: minimum seconds between two published events
+        expiry: seconds without typing frames before typing is cleared
+    """
+
+    def __init__(self, publish, interval=None, expiry=None):
+        self.publish = publish
+        self.interval = (
+            interval if interval is not None
+            else getattr(settings, 'CHAT_TYPING_THROTTLE_SECONDS', 2.0)
+        )
+        self.expiry = (
+            expiry if expiry is not None
+            else getattr(settings, 'CHAT_TYPING_EXPIRY_SECONDS', 6.0)
+        )
+
+        self.is_typing = False  # last published state
+        self._last_sent_at = None
+        self._pending = None
+        self._trailing_task = None
+        self._expiry_task = None
+
+    async def update(self, is_typing):
+        """Handle a typing frame coming from the client"""
+        is_typing = bool(is_typing)
+
+        if is_typing:
+            self._expiry_task = self._reschedule(self._expiry_task, self.expiry, self._expire)
+        else:
+            self._cancel(self._expiry_task)
+            self._expiry_task = None
+
+        loop = asyncio.get_running_loop()
+        elapsed = None if self._last_sent_at is None else loop.time() - self._last_sent_at
+
+        if elapsed is None or elapsed >= self.interval:
+            # Leading edge
+            self._pending = None
+            if is_typing != self.is_typing:
+                await self._send(is_typing)
+            return
+
+        # Inside the window: remember the latest state for the trailing edge
+        self._pending = is_typing
+        if self._trailing_task is None or self._trailing_task.done():
+            self._trailing_task = asyncio.ensure_future(
+                self._flush_after(self.interval - elapsed)
+            )
+
+    async def clear(self):
+        """
+        Drop pending events and publish a stop immediately if the user is
+        currently shown as typing (message sent, socket closed, ...)
+        """
+        self._cancel(self._trailing_task)
+        self._cancel(self._expiry_task)
+        self._trailing_task = None
+        self._expiry_task = None
+        self._pending = None
+
+        if self.is_typing:
+            await self._send(False)
+
+    async def _send(self, is_typing):
+        self.is_typing = is_typing
+        self._last_sent_at = asyncio.get_running_loop().time()
+        await self.publish(is_typing)
+
+    async def _flush_after(self, delay):
+        await asyncio.sleep(delay)
+        pending, self._pending = self._pending, None
+        if pending is not None and pending != self.is_typing:
+            await self._send(pending)
+
+    async def _expire(self):
+        self._expiry_task = None
+        self._pending = None
+        if self.is_typing:
+            await self._send(False)
+
+    def _reschedule(self, task, delay, callback):
+        self._cancel(task)
+
+        async def runner():
+            await asyncio.sleep(delay)
+            await callback()
+
+        return asyncio.ensure_future(runner())
+
+    @staticmethod
+    def _cancel(task):
+        if task is not None and not task.done():
+            task.cancel()
@@ -4,6 +4,7 @@ from rest_framework.decorators import action
 from ..permissions import IsAdminUser
 from rest_framework.views import APIView
 from ..serializers import AppointmentReminderSerializer, DoctorAppointmentReminderSerializer
+from ..services import AppointmentReminderService
 from ..task_schedulers import (
     set_appointment_reminder_schedule,
     get_appointment_reminder_schedule,
@@ -33,6 +34,7 @@ class AppointmentReminderViewSet(viewsets.ViewSet):
                 period=data['period'],
                 enabled=data.get('enabled', True),
                 reminder_window_hours=data.get('reminder_window_hours', 24),
+                shards=data.get('shards'),
             )
             return Response(
                 {'detail': 'Patient appointment reminder scheduled successfully'},
@@ -55,6 +57,17 @@ class AppointmentReminderViewSet(viewsets.ViewSet):
         except SchedulerError as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['get'])
+    def last_run(self, request):
+        """Metrics of the latest sharded patient reminder run"""
+        metrics = AppointmentReminderService.last_run()
+        if not metrics:
+            return Response(
+                {'detail': 'No sharded reminder run recorded yet'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(metrics, status=status.HTTP_200_OK)
+
     @action(detail=False, methods=['post'])
     def set_doctor_reminder(self, request):
         """Set doctor appointment reminder schedule"""
@@ -1,5 +1,9 @@
 # api/views/appointment_views.py
+from datetime import datetime, time, timedelta
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
@@ -20,13 +24,43 @@ class AppointmentViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.is_superuser or user.role == "admin":
-            return Appointment.objects.all()
+            queryset = Appointment.objects.all()
         elif user.role == "facility_admin":
-            return Appointment.objects.filter(facility__admin=user)
+            queryset = Appointment.objects.filter(facility__admin=user)
         elif user.role == "doctor":
-            return Appointment.objects.filter(doctor__user=user)
+            queryset = Appointment.objects.filter(doctor__user=user)
         else:
-            return Appointment.objects.filter(patient=user)
+            queryset = Appointment.objects.filter(patient=user)
+        return self.filter_range(queryset).select_related("patient", "doctor", "facility")
+
+    def filter_range(self, queryset):
+        # Optional ?from=&to= (ISO dates or datetimes) and ?status= filters
+        params = self.request.query_params
+        start = params.get("from")
+        end = params.get("to")
+        if start:
+            queryset = queryset.filter(scheduled_at__gte=self.parse_bound(start))
+        if end:
+            bound = self.parse_bound(end)
+            if len(end) == 10:
+                # A bare date includes the whole day
+                bound += timedelta(days=1)
+            queryset = queryset.filter(scheduled_at__lt=bound)
+        if params.get("status"):
+            queryset = queryset.filter(status__in=params["status"].split(","))
+        return queryset
+
+    @staticmethod
+    def parse_bound(value):
+        try:
+            parsed = parse_datetime(value)
+            if parsed is None and parse_date(value):
+                parsed = datetime.combine(parse_date(value), time.min)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({"detail": f"Invalid date: {value}"})
+        return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
 
     # Doctor actions: confirm or cancel
     @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated, AppointmentPermissions])
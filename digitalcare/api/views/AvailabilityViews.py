@@ -0,0 +1,67 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from ..services import AvailabilityService
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def next_available_appointments(request):
+    """
+    Earliest open appointment slots across all doctors, from the
+    availability index.
+
+    Query params:
+        specialty: doctor specialty (partial match)
+        facility_id: only this facility
+        lat, lon, radius: only clinics within radius km (default 10)
+        duration: minutes needed (default one index slot)
+        limit: number of openings (default 10, max 50)
+    """
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 50)
+        duration = int(request.GET['duration']) if request.GET.get('duration') else None
+        facility_id = int(request.GET['facility_id']) if request.GET.get('facility_id') else None
+        latitude = float(request.GET['lat']) if request.GET.get('lat') else None
+        longitude = float(request.GET['lon']) if request.GET.get('lon') else None
+        radius_km = float(request.GET.get('radius', 10))
+    except ValueError:
+        return Response(
+            {'error': 'limit, duration, facility_id, lat, lon and radius must be numbers.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if (latitude is None) != (longitude is None):
+        return Response(
+            {'error': 'lat and lon must be given together.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if duration is not None and duration <= 0:
+        return Response({'error': 'duration must be positive.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    openings = AvailabilityService.earliest_openings(
+        limit=limit,
+        specialty=request.GET.get('specialty') or None,
+        facility_id=facility_id,
+        latitude=latitude,
+        longitude=longitude,
+        radius_km=radius_km,
+        duration=duration,
+    )
+
+    return Response({
+        'count': len(openings),
+        'openings': [
+            {
+                'doctor_id': opening['doctor'].id,
+                'doctor': f"Dr. {opening['doctor'].first_name} {opening['doctor'].last_name}",
+                'specialty': opening['doctor'].specialty,
+                'facility_id': opening['facility'].id,
+                'facility': opening['facility'].name,
+                'start': opening['start'].isoformat(),
+                'end': opening['end'].isoformat(),
+            }
+            for opening in openings
+        ]
+    })
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from ..models import DoctorProfile, Facility
+from ..services import CalendarService
+
+
+def calendar_scope(params, user):
+    """
+    (doctor, facility, start_date, end_date, error_response) from query params:
+    doctor_id or facility_id, from / to (YYYY-MM-DD, inclusive).
+    """
+    doctor = facility = None
+    try:
+        today = timezone.localdate()
+        start_date = datetime.strptime(params['from'], '%Y-%m-%d').date() if params.get('from') else today
+        end_date = (
+            datetime.strptime(params['to'], '%Y-%m-%d').date() if params.get('to')
+            else start_date + timedelta(days=6)
+        )
+        if params.get('doctor_id'):
+            doctor = DoctorProfile.objects.filter(id=int(params['doctor_id'])).first()
+        elif params.get('facility_id'):
+            facility = Facility.objects.filter(id=int(params['facility_id'])).first()
+        elif hasattr(user, 'doctorprofile'):
+            doctor = user.doctorprofile
+    except ValueError:
+        error = Response(
+            {'error': 'from and to must be YYYY-MM-DD; doctor_id and facility_id must be integers.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+        return None, None, None, None, error
+
+    if end_date < start_date or (end_date - start_date).days >= CalendarService.MAX_RANGE_DAYS:
+        error = Response(
+            {'error': f'to must be after from and at most {CalendarService.MAX_RANGE_DAYS} days later.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+        return None, None, None, None, error
+
+    if doctor is None and facility is None:
+        error = Response({'error': 'Doctor or facility not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return None, None, None, None, error
+
+    if not CalendarService.can_view(user, doctor, facility):
+        error = Response(
+            {'error': 'You do not have access to this calendar.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+        return None, None, None, None, error
+
+    return doctor, facility, start_date, end_date, None
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def calendar_events(request):
+    """
+    Appointments and shift occurrences of a doctor or facility.
+
+    Query params:
+        doctor_id or facility_id (default: the requesting doctor)
+        from, to: inclusive dates, YYYY-MM-DD (default: the next 7 days)
+    Honours If-None-Match with the returned ETag.
+    """
+    doctor, facility, start_date, end_date, error = calendar_scope(request.GET, request.user)
+    if error:
+        return error
+
+    etag = CalendarService.etag(start_date, end_date, doctor, facility)
+    not_modified = get_conditional_response(request, etag=f'"{etag}"')
+    if not_modified is not None:
+        return not_modified
+
+    events = CalendarService.events(start_date, end_date, doctor, facility)
+    response = Response({
+        'from': start_date.isoformat(),
+        'to': end_date.isoformat(),
+        'doctor_id': doctor.id if doctor else None,
+        'facility_id': facility.id if facility else None,
+        'events': events,
+    })
+    response['ETag'] = f'"{etag}"'
+    return response
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def calendar_feed_url(request):
+    """
+    GET: subscription URL of the .ics feed for the same doctor_id /
+    facility_id params. DELETE: revoke every feed URL of the user.
+    """
+    if request.method == 'DELETE':
+        CalendarService.revoke_feed_tokens(request.user)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    doctor, facility, _, _, error = calendar_scope(request.GET, request.user)
+    if error:
+        return error
+
+    token = CalendarService.feed_token(request.user, doctor, facility)
+    return Response({
+        'url': request.build_absolute_uri(f"{reverse('calendar-ics')}?token={token}"),
+        'expires_in': CalendarService.feed_max_age(),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def calendar_ics(request):
+    """
+    iCalendar export, streamed. Authenticated with a JWT or with a feed
+    token from calendar/feed/ (for calendar apps). Defaults to the past
+    week and the next 60 days. Honours If-None-Match.
+    """
+    params = request.GET.copy()
+    user = request.user
+    if params.get('token'):
+        try:
+            user, data = CalendarService.read_feed_token(params['token'])
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
+        params['doctor_id'] = data['doctor'] or ''
+        params['facility_id'] = data['facility'] or ''
+    elif not user.is_authenticated:
+        return Response({'error': 'Authentication required.'}, status=status.HTTP_401_UNAUTHORIZED)
+
+    today = timezone.localdate()
+    params.setdefault('from', (today - timedelta(days=7)).isoformat())
+    params.setdefault('to', (today + timedelta(days=60)).isoformat())
+
+    doctor, facility, start_date, end_date, error = calendar_scope(params, user)
+    if error:
+        return error
+
+    etag = CalendarService.etag(start_date, end_date, doctor, facility)
+    not_modified = get_conditional_response(request, etag=f'"{etag}"')
+    if not_modified is not None:
+        return not_modified
+
+    response = StreamingHttpResponse(
+        CalendarService.ics_stream(start_date, end_date, doctor, facility),
+        content_type='text/calendar; charset=utf-8'
+    )
+    response['ETag'] = f'"{etag}"'
+    response['Content-Disposition'] = 'attachment; filename="schedule.ics"'
+    return response
@@ -10,8 +10,9 @@ from ..models import (User, ChatRoom, Message, ChatNotification)
 from ..serializers import (
     ChatRoomListSerializer, ChatRoomDetailSerializer, CreateChatRoomSerializer,
     MessageSerializer, CreateMessageSerializer, ChatNotificationSerializer,
-    ChatUserSerializer
+    ChatUserSerializer, AttachmentTicketSerializer, ConfirmAttachmentSerializer
 )
+from ..services import ChatAttachmentService, ChatArchiveService
 
 
 class ChatRoomViewSet(viewsets.ModelViewSet):
@@ -24,9 +25,13 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
-        return ChatRoom.objects.filter(
+        queryset = ChatRoom.objects.filter(
             Q(patient=user) | Q(doctor=user)
-        ).select_related('patient', 'doctor').prefetch_related('messages')
+        ).select_related('patient', 'doctor', 'archive').prefetch_related('messages')
+        if self.action == 'list':
+            # The list reads the archive summary, never the message blob
+            queryset = queryset.defer('archive__payload')
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -112,6 +117,12 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
+        if chat_room.status == ChatRoom.ARCHIVED:
+            return Response(
+                {'error': 'This chat is archived and must be restored first.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
         chat_room.status = 'closed'
         chat_room.save()
         
@@ -135,6 +146,26 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
         
         return Response({'message': 'Chat closed successfully.'})
     
+    @action(detail=True, methods=['post'])
+    def restore_chat(self, request, pk=None):
+        """Move an archived chat's messages back into the message table"""
+        chat_room = self.get_object()
+        
+        if request.user not in [chat_room.patient, chat_room.doctor]:
+            return Response(
+                {'error': 'You are not authorized to restore this chat.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        if chat_room.status != ChatRoom.ARCHIVED:
+            return Response(
+                {'error': 'Only archived chats can be restored.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        restored = ChatArchiveService.restore_room(chat_room.id)
+        return Response({'message': 'Chat restored successfully.', 'restored_messages': restored})
+    
     
 
 # Add this to your MessageViewSet in chat_views.py
@@ -175,6 +206,14 @@ class MessageViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_403_FORBIDDEN
                 )
             
+            # Archived rooms have no hot rows; rehydrate from cold storage
+            if chat_room.status == ChatRoom.ARCHIVED:
+                messages = ChatArchiveService.archived_messages(chat_room)
+                page = self.paginate_queryset(messages)
+                if page is not None:
+                    return self.get_paginated_response(MessageSerializer(page, many=True).data)
+                return Response(MessageSerializer(messages, many=True).data)
+            
             # Auto-mark unread messages as read (excluding user's own messages)
             unread_messages = chat_room.messages.filter(
                 is_read=False
@@ -197,11 +236,84 @@ class MessageViewSet(viewsets.ModelViewSet):
     
     def create(self, request, *args, **kwargs):
         """Send a new message"""
-        chat_room_id = self.kwargs.get('chat_room_pk')
-        chat_room = get_object_or_404(ChatRoom, id=chat_room_id)
+        chat_room = get_object_or_404(ChatRoom, id=self.kwargs.get('chat_room_pk'))
+        error = self.get_send_error(request.user, chat_room)
+        if error:
+            return error
+        
+        serializer = self.get_serializer(
+            data=request.data, 
+            context={'request': request, 'chat_room': chat_room}
+        )
+        
+        if serializer.is_valid():
+            message = serializer.save()
+            self.notify_other_participant(request.user, chat_room, message)
+            
+            return Response(
+                MessageSerializer(message).data,
+                status=status.HTTP_201_CREATED
+            )
         
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['post'])
+    def attachment_ticket(self, request, chat_room_pk=None):
+        """
+        Step 1 of a direct upload: returns a signed ticket and the storage
+        upload instructions. The file itself never goes through this server.
+        """
+        chat_room = get_object_or_404(ChatRoom, id=chat_room_pk)
+        error = self.get_send_error(request.user, chat_room)
+        if error:
+            return error
+        
+        serializer = AttachmentTicketSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            ticket = ChatAttachmentService.issue_ticket(
+                request.user, chat_room, **serializer.validated_data
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(ticket, status=status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['post'])
+    def confirm_attachment(self, request, chat_room_pk=None):
+        """Step 2: the upload finished, create the message for it"""
+        chat_room = get_object_or_404(ChatRoom, id=chat_room_pk)
+        error = self.get_send_error(request.user, chat_room)
+        if error:
+            return error
+        
+        serializer = ConfirmAttachmentSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            message, created = ChatAttachmentService.confirm(
+                serializer.validated_data['ticket'],
+                request.user,
+                chat_room,
+                serializer.validated_data['content']
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not created:
+            # Retried confirmation: the other participant was already told
+            return Response(MessageSerializer(message).data, status=status.HTTP_200_OK)
+        
+        self.notify_other_participant(request.user, chat_room, message)
+        return Response(MessageSerializer(message).data, status=status.HTTP_201_CREATED)
+    
+    def get_send_error(self, user, chat_room):
+        """Error response if the user may not post in this chat, else None"""
         # Verify user is participant
-        if request.user not in [chat_room.patient, chat_room.doctor]:
+        if user not in [chat_room.patient, chat_room.doctor]:
             return Response(
                 {'error': 'You are not authorized to send messages in this chat.'},
                 status=status.HTTP_403_FORBIDDEN
@@ -215,38 +327,23 @@ class MessageViewSet(viewsets.ModelViewSet):
             )
         
         # For patients, check if doctor has accepted
-        if (request.user == chat_room.patient and 
-            not chat_room.doctor_accepted):
+        if user == chat_room.patient and not chat_room.doctor_accepted:
             return Response(
                 {'error': 'Please wait for the doctor to accept your chat request.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        serializer = self.get_serializer(
-            data=request.data, 
-            context={'request': request, 'chat_room': chat_room}
+        return None
+    
+    def notify_other_participant(self, user, chat_room, message):
+        other_user = chat_room.get_other_participant(user)
+        ChatNotification.objects.create(
+            user=other_user,
+            chat_room=chat_room,
+            message=message,
+            notification_type='new_message',
+            title=f'New message from {user.username}',
+            content=(message.content or message.attachment_name or '')[:100]
         )
-        
-        if serializer.is_valid():
-            message = serializer.save()
-            
-            # Create notification for other participant
-            other_user = chat_room.get_other_participant(request.user)
-            ChatNotification.objects.create(
-                user=other_user,
-                chat_room=chat_room,
-                message=message,
-                notification_type='new_message',
-                title=f'New message from {request.user.username}',
-                content=message.content[:100]
-            )
-            
-            return Response(
-                MessageSerializer(message).data,
-                status=status.HTTP_201_CREATED
-            )
-        
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class AvailableDoctorsView(viewsets.ReadOnlyModelViewSet):
     """
@@ -277,7 +374,7 @@ class ChatNotificationViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         return ChatNotification.objects.filter(
             user=self.request.user
-        ).order_by('-created_at')
+        ).select_related('chat_room__patient', 'chat_room__doctor').order_by('-created_at')
     
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):
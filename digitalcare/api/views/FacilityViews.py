@@ -1,5 +1,6 @@
 # api/views/facility_views.py
 
+import math
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -7,7 +8,7 @@ from rest_framework.permissions import IsAuthenticated
 from ..models import Facility
 from ..serializers import FacilitySerializer
 from ..permissions import IsFacilityAdminOfOwnFacility
-from math import radians, cos, sin, asin, sqrt
+from ..services import LocationService
 
 class FacilityViewSet(viewsets.ModelViewSet):
     queryset = Facility.objects.all()
@@ -25,6 +26,15 @@ class FacilityViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def nearby(self, request):
+        """
+        The approved facilities nearest to the patient, nearest first.
+
+        Query params:
+            type: facility type (default clinic)
+            limit: results per page (default 10, max 100)
+            radius: optional maximum distance in km
+            cursor: next_cursor of the previous page
+        """
         user = request.user
 
         # Determine patient's profile latitude and longitude
@@ -39,28 +49,33 @@ class FacilityViewSet(viewsets.ModelViewSet):
         if not profile or profile.latitude is None or profile.longitude is None:
             return Response({"detail": "Patient location not set."}, status=400)
 
-        user_lat = profile.latitude
-        user_lon = profile.longitude
-        radius_km = float(request.query_params.get("radius", 10))  # default 10 km
+        facility_type = request.query_params.get("type", Facility.CLINIC)
+        if facility_type not in dict(Facility.TYPE_CHOICES):
+            return Response({"detail": "Unknown facility type."}, status=400)
 
-        def haversine(lat1, lon1, lat2, lon2):
-            # convert decimal degrees to radians
-            lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-            # haversine formula
-            dlat = lat2 - lat1
-            dlon = lon2 - lon1
-            a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-            c = 2 * asin(sqrt(a))
-            km = 6371 * c
-            return km
+        try:
+            # Optional: the k nearest are returned however far they are without it
+            radius_km = request.query_params.get("radius")
+            radius_km = float(radius_km) if radius_km else None
+            if radius_km is not None and not (math.isfinite(radius_km) and radius_km > 0):
+                raise ValueError
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), 100)
+            cursor = request.query_params.get("cursor")
+            after = LocationService.decode_cursor(cursor, float, int) if cursor else None
+            if after is not None and not math.isfinite(after[0]):
+                raise ValueError
+        except ValueError:
+            return Response({"detail": "Invalid radius, limit or cursor."}, status=400)
 
-        nearby_facilities = []
-        for facility in Facility.objects.filter(facility_type='clinic', status='Approved'):
-            if facility.latitude is None or facility.longitude is None:
-                continue
-            distance = haversine(user_lat, user_lon, facility.latitude, facility.longitude)
-            if distance <= radius_km:
-                nearby_facilities.append(facility)
+        facilities = LocationService.get_nearest_facilities(
+            profile.latitude, profile.longitude, limit + 1, facility_type, after, radius_km
+        )
+        next_cursor = None
+        if len(facilities) > limit:
+            facilities = facilities[:limit]
+            next_cursor = LocationService.encode_cursor(facilities[-1].distance_km, facilities[-1].id)
 
-        serializer = self.get_serializer(nearby_facilities, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        results = self.get_serializer(facilities, many=True).data
+        for facility, data in zip(facilities, results):
+            data["distance_km"] = round(facility.distance_km, 3)
+        return Response({"results": results, "next_cursor": next_cursor})
\ No newline at end of file
@@ -0,0 +1,106 @@
+from django.conf import settings
+from rest_framework import viewsets, status, permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from ..models import Notification
+from ..permissions import IsAdminUser
+from ..serializers import (
+    NotificationSerializer, NotificationMarkReadSerializer, NotificationBroadcastSerializer
+)
+from ..services import NotificationService
+
+
+class NotificationInboxViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    The current user's unified inbox: notifications and chat notifications,
+    newest first, each row tagged with its source.
+    Params: ?unread=true, ?type=APPOINTMENT, ?limit=20, ?cursor=<next_cursor>
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = NotificationSerializer
+
+    def get_queryset(self):
+        return Notification.objects.filter(recipient=self.request.user)
+
+    def list(self, request):
+        page_size = getattr(settings, 'NOTIFICATION_PAGE_SIZE', 20)
+        try:
+            limit = min(max(int(request.query_params.get('limit', page_size)), 1), 100)
+            results, next_cursor = NotificationService.inbox(
+                request.user.id,
+                limit=limit,
+                cursor=request.query_params.get('cursor') or None,
+                unread=request.query_params.get('unread') in ('true', '1'),
+                notification_type=request.query_params.get('type') or None,
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'results': results, 'next_cursor': next_cursor})
+
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        count = NotificationService.unread_counts([request.user.id])[request.user.id]
+        return Response({'count': count})
+
+    @action(detail=False, methods=['post'])
+    def mark_read(self, request):
+        """
+        Body: {"ids": [1, 2]} or {"up_to": 42} to mark everything up to the
+        newest notification the client has displayed; chat_ids and
+        chat_up_to do the same for chat notifications.
+        """
+        serializer = NotificationMarkReadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        updated = NotificationService.mark_read(
+            request.user.id,
+            ids=serializer.validated_data.get('ids'),
+            up_to=serializer.validated_data.get('up_to'),
+            chat_ids=serializer.validated_data.get('chat_ids'),
+            chat_up_to=serializer.validated_data.get('chat_up_to'),
+        )
+        return Response({'updated': updated})
+
+
+class NotificationBroadcastViewSet(viewsets.ViewSet):
+    """
+    Admin fan-out of one notification to many users.
+    Recipients are split into chunks and handled by one Celery task per chunk.
+    """
+    permission_classes = [IsAdminUser]
+
+    def create(self, request):
+        serializer = NotificationBroadcastSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+
+        if data.get('user_ids'):
+            user_ids = list(dict.fromkeys(data['user_ids']))
+            tasks = NotificationService.enqueue([
+                {
+                    'recipient_id': user_id,
+                    'message': data['message'],
+                    'notification_type': data['notification_type'],
+                    'priority': data['priority'],
+                    'metadata': data['metadata'],
+                }
+                for user_id in user_ids
+            ])
+            recipients = len(user_ids)
+        else:
+            recipients, tasks = NotificationService.broadcast(
+                data['message'],
+                roles=data.get('roles'),
+                facility_id=data.get('facility_id'),
+                notification_type=data['notification_type'],
+                priority=data['priority'],
+                metadata=data['metadata'],
+            )
+
+        return Response(
+            {'detail': 'Notification queued', 'recipients': recipients, 'tasks': tasks},
+            status=status.HTTP_202_ACCEPTED
+        )
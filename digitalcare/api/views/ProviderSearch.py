@@ -3,16 +3,12 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
-from ..services import LocationService
-from ..models import StudentProfile, AdultProfile, VisitorProfile, DoctorProfile
+from ..services import LocationService, NearbyCacheService, PharmacyStockService
+from ..models import StudentProfile, AdultProfile, VisitorProfile, DoctorProfile, PrescriptionItem
 from ..serializers import FacilitySerializer, DoctorProfileSerializer, LabTechProfileSerializer, PharmacistProfileSerializer
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def nearby_providers(request):
-    user = request.user
-
-    # Identify the patient's profile
+def patient_location(user):
+    """(latitude, longitude, None) of a patient, or (None, None, error Response)"""
     if user.role == 'student':
         patient_profile = get_object_or_404(StudentProfile, user=user)
     elif user.role == 'adult':
@@ -20,59 +16,159 @@ def nearby_providers(request):
     elif user.role == 'visitor':
         patient_profile = get_object_or_404(VisitorProfile, user=user)
     else:
-        return Response(
+        return None, None, Response(
             {'error': 'Only patients can search for healthcare providers.'},
             status=status.HTTP_403_FORBIDDEN
         )
 
     # Ensure patient location exists
     if not patient_profile.latitude or not patient_profile.longitude:
-        return Response(
+        return None, None, Response(
             {'error': 'Location not set. Please update your location in profile settings.'},
             status=status.HTTP_400_BAD_REQUEST
         )
+    return patient_profile.latitude, patient_profile.longitude, None
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def nearby_providers(request):
+    lat, lon, error = patient_location(request.user)
+    if error:
+        return error
 
-    # Query parameters
+    # Query parameters (results are cached per geohash cell, see NearbyCacheService)
     radius_km = float(request.GET.get('radius', 10))
     provider_type = request.GET.get('type', 'both').lower()
     specialty = request.GET.get('specialty', None)
 
     response_data = {}
-    lat, lon = patient_profile.latitude, patient_profile.longitude
 
     # --- Facilities ---
     if provider_type in ['both', 'clinic', 'pharmacy', 'laboratory']:
         if provider_type == 'both':
-            clinics = LocationService.get_nearby_facilities(lat, lon, radius_km, 'clinic')
-            pharmacies = LocationService.get_nearby_facilities(lat, lon, radius_km, 'pharmacy')
-            laboratories = LocationService.get_nearby_facilities(lat, lon, radius_km, 'laboratory')
+            clinics = NearbyCacheService.nearby('clinic', lat, lon, radius_km)
+            pharmacies = NearbyCacheService.nearby('pharmacy', lat, lon, radius_km)
+            laboratories = NearbyCacheService.nearby('laboratory', lat, lon, radius_km)
 
             response_data['clinics'] = FacilitySerializer(clinics, many=True).data
             response_data['pharmacies'] = FacilitySerializer(pharmacies, many=True).data
             response_data['laboratories'] = FacilitySerializer(laboratories, many=True).data
         else:
-            facilities = LocationService.get_nearby_facilities(lat, lon, radius_km, provider_type)
+            facilities = NearbyCacheService.nearby(provider_type, lat, lon, radius_km)
             plural_map = {'clinic': 'clinics', 'pharmacy': 'pharmacies', 'laboratory': 'laboratories'}
             key = plural_map.get(provider_type, f"{provider_type}s")
             response_data[key] = FacilitySerializer(facilities, many=True).data
 
     # --- Doctors (only for clinics or both) ---
     if provider_type in ['both', 'clinic']:
-        doctors = LocationService.get_nearby_doctors(lat, lon, radius_km, specialty)
+        doctors = NearbyCacheService.nearby('doctor', lat, lon, radius_km, specialty)
         response_data['doctors'] = DoctorProfileSerializer(doctors, many=True).data
 
     # --- Pharmacists ---
     if provider_type in ['both', 'pharmacy']:
-        pharmacists = LocationService.get_nearby_pharmacists(lat, lon, radius_km)
+        pharmacists = NearbyCacheService.nearby('pharmacist', lat, lon, radius_km)
         response_data['pharmacists'] = PharmacistProfileSerializer(pharmacists, many=True).data
 
     # --- Laboratory Technicians ---
     if provider_type in ['both', 'laboratory']:
-        lab_techs = LocationService.get_nearby_lab_techs(lat, lon, radius_km)
+        lab_techs = NearbyCacheService.nearby('lab_tech', lat, lon, radius_km)
         response_data['lab_technicians'] = LabTechProfileSerializer(lab_techs, many=True).data
 
     return Response(response_data, status=status.HTTP_200_OK)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def nearby_search(request):
+    """
+    Facilities and providers of all types around the patient in one
+    distance-sorted list.
+
+    Query params:
+        radius: km (default 10)
+        type: both, clinic, pharmacy or laboratory (default both)
+        specialty: doctor specialty filter
+        limit: results per page (default 20, max 100)
+        cursor: next_cursor of the previous page
+    """
+    lat, lon, error = patient_location(request.user)
+    if error:
+        return error
+
+    provider_type = request.GET.get('type', 'both').lower()
+    if provider_type != 'both' and provider_type not in LocationService.TYPE_KINDS:
+        return Response(
+            {'error': 'type must be one of both, clinic, pharmacy, laboratory.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        radius_km = float(request.GET.get('radius', 10))
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
+    except ValueError:
+        return Response({'error': 'radius and limit must be numbers.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        results, next_cursor = LocationService.search_all(
+            lat, lon, radius_km, provider_type,
+            specialty=request.GET.get('specialty') or None,
+            limit=limit,
+            cursor=request.GET.get('cursor') or None,
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({'results': results, 'next_cursor': next_cursor}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def pharmacy_stock(request):
+    """
+    Pharmacies around the patient that have the drugs in stock.
+
+    Query params:
+        drug: comma-separated drug ids
+        prescription: id of one of the patient's prescriptions, for all its drugs
+        radius: km (default 10)
+        sort: distance or price (default distance)
+        limit: max results (default 20, max 100)
+    """
+    lat, lon, error = patient_location(request.user)
+    if error:
+        return error
+
+    sort = request.GET.get('sort', 'distance').lower()
+    if sort not in PharmacyStockService.SORTS:
+        return Response({'error': 'sort must be distance or price.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        radius_km = float(request.GET.get('radius', 10))
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
+        drug_ids = [int(part) for part in request.GET.get('drug', '').split(',') if part.strip()]
+        prescription_id = int(request.GET['prescription']) if request.GET.get('prescription') else None
+    except ValueError:
+        return Response(
+            {'error': 'radius, limit, drug and prescription must be numbers.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if prescription_id is not None:
+        drug_ids += PrescriptionItem.objects.filter(
+            prescription_id=prescription_id,
+            prescription__patient=request.user,
+            drug__isnull=False,
+        ).values_list('drug_id', flat=True)
+    if not drug_ids:
+        return Response(
+            {'error': 'Give drug ids or a prescription with drugs.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    results = PharmacyStockService.search(drug_ids, lat, lon, radius_km, sort, limit)
+    return Response({'results': results}, status=status.HTTP_200_OK)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def update_user_location(request):
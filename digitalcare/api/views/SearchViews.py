@@ -0,0 +1,40 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from ..services import SearchService
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def clinical_search(request):
+    """
+    Full-text search across the records the user may see.
+
+    Query params:
+        q: search text (web search syntax: "quoted phrases", -exclusions, or)
+        scope: comma separated subset of messages,consultations,prescriptions
+        limit: results per scope (default SEARCH_RESULT_LIMIT, max 100)
+    """
+    text = request.GET.get('q', '').strip()
+    if len(text) < 2:
+        return Response(
+            {'error': 'Search text must be at least 2 characters.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    scopes = [scope.strip() for scope in request.GET.get('scope', '').split(',') if scope.strip()]
+    unknown = set(scopes) - set(SearchService.SCOPES)
+    if unknown:
+        return Response(
+            {'error': f"Unknown scope(s): {', '.join(sorted(unknown))}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        limit = int(request.GET.get('limit', SearchService.default_limit()))
+    except ValueError:
+        return Response({'error': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = SearchService.search(request.user, text, scopes or None, max(limit, 1))
+    return Response({'query': text, 'results': results})
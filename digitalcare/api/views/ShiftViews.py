@@ -2,8 +2,11 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from ..models import Shift
-from ..serializers import ShiftSerializer
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
+from ..models import Shift, DoctorProfile, Facility
+from ..serializers import ShiftSerializer, ShiftTemplateSerializer
+from ..services import ShiftTemplateService
 from ..permissions import IsOwnerDoctorOrFacilityAdmin
 from ..utils import ShiftValidator
 from datetime import datetime
@@ -47,6 +50,29 @@ class ShiftViewSet(viewsets.ModelViewSet):
             serializer.save()
         
     
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Create a facility's weekly rota in one request
+        Body: facility, patterns [{doctor, days and/or rule, start_time, end_time}],
+        exceptions [{doctor (optional), day_of_week}], replace (bool)
+        """
+        serializer = ShiftTemplateSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        shifts = ShiftTemplateService.expand(data['facility'], data['patterns'], data.get('exceptions', []))
+        try:
+            created, replaced = ShiftTemplateService.apply(data['facility'], shifts, replace=data['replace'])
+        except DjangoValidationError as e:
+            return Response({"error": e.messages}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            "created": len(created),
+            "replaced": replaced,
+            "shift_ids": [shift.id for shift in created],
+        }, status=status.HTTP_201_CREATED)
+    
     @action(detail=False, methods=['get'])
     def available_slots(self, request):
         """
@@ -56,7 +82,6 @@ class ShiftViewSet(viewsets.ModelViewSet):
         doctor_id = request.query_params.get('doctor_id')
         facility_id = request.query_params.get('facility_id')
         date_str = request.query_params.get('date')
-        duration = int(request.query_params.get('duration', 30))
         
         if not all([doctor_id, facility_id, date_str]):
             return Response(
@@ -65,12 +90,10 @@ class ShiftViewSet(viewsets.ModelViewSet):
             )
         
         try:
-            from ..profile_models import DoctorProfile
-            from ..facility_models import Facility
-            
             doctor = DoctorProfile.objects.get(id=doctor_id)
             facility = Facility.objects.get(id=facility_id)
             date = datetime.strptime(date_str, '%Y-%m-%d').date()
+            duration = int(request.query_params.get('duration', 30))
             
             slots = ShiftValidator.get_available_slots(doctor, facility, date, duration)
             
@@ -85,4 +108,62 @@ class ShiftViewSet(viewsets.ModelViewSet):
             return Response(
                 {"error": str(e)},
                 status=status.HTTP_400_BAD_REQUEST
-            )
\ No newline at end of file
+            )
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def next_available(self, request):
+        """
+        Earliest open slots across doctors and days
+        Query params: doctor_ids (comma separated) and/or facility_id,
+        from (YYYY-MM-DD, default today), days (default 7, max 31),
+        duration (default 30), limit (default 10, max 100)
+        """
+        try:
+            doctor_ids = [int(value) for value in request.query_params.get('doctor_ids', '').split(',') if value]
+            facility_id = request.query_params.get('facility_id')
+            from_str = request.query_params.get('from')
+            start_date = (
+                datetime.strptime(from_str, '%Y-%m-%d').date() if from_str
+                else timezone.localdate()
+            )
+            days = min(int(request.query_params.get('days', 7)), 31)
+            duration = int(request.query_params.get('duration', 30))
+            limit = min(int(request.query_params.get('limit', 10)), 100)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not doctor_ids and not facility_id:
+            return Response(
+                {"error": "doctor_ids or facility_id is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        facility = None
+        if facility_id:
+            facility = Facility.objects.filter(id=facility_id).first()
+            if facility is None:
+                return Response({"error": "Facility not found"}, status=status.HTTP_404_NOT_FOUND)
+            if not doctor_ids:
+                doctor_ids = list(
+                    Shift.objects.filter(facility=facility, is_active=True, doctor__isnull=False)
+                    .values_list('doctor_id', flat=True).distinct()
+                )
+        
+        openings = ShiftValidator.get_openings(
+            doctor_ids, start_date, days=days, slot_duration=duration,
+            facility=facility, not_before=timezone.now(), limit=limit
+        )
+        
+        return Response({
+            "from": start_date.isoformat(),
+            "days": days,
+            "openings": [
+                {
+                    "doctor_id": opening['doctor_id'],
+                    "facility_id": opening['facility_id'],
+                    "start": opening['start'].isoformat(),
+                    "end": opening['end'].isoformat(),
+                }
+                for opening in openings
+            ]
+        })
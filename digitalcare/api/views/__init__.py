@@ -8,16 +8,20 @@ from .AppointmentViews import *
 from .AppointmentReminderViews import *
 
 from .ChatViews import *
+from .NotificationViews import *
 from .ConsultationViews import *
 from .DrugViews import DrugViewSet, PharmacyInventoryViewSet
 from .PrescriptionViews import PrescriptionViewSet, PrescriptionItemViewSet
 from .PrescriptionPDFView import *
 from .SymptomViews import *
 from .ProviderSearch import *
+from .SearchViews import *
 from .VideoConsultationViews import *
 
 from .AdminUserViews import *
 from .ShiftViews import *
+from .AvailabilityViews import *
+from .CalendarViews import *
 
 from .CloudinaryTestView import *
 from .TestFileUploadView import *
\ No newline at end of file
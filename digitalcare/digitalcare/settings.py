@@ -121,6 +121,18 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Shared cache on the same Redis: the search caches' generation counters and
+# the task coalescing keys must be seen by every web and Celery process.
+# Without REDIS_URL (local runs) each process falls back to its own LocMemCache.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+            'OPTIONS': {'ssl_cert_reqs': None} if os.environ['REDIS_URL'].startswith('rediss://') else {},
+        },
+    }
+
 # Maximum file upload size (5MB)
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880
@@ -326,6 +338,92 @@ TWILIO_API_KEY_SECRET = os.environ.get("TWILIO_API_KEY_SECRET")
 TWILIO_TOKEN_TTL = int(os.environ.get("TWILIO_TOKEN_TTL", 3600))
 
 
+# Chat typing indicators: at most one typing event per user per room every
+# CHAT_TYPING_THROTTLE_SECONDS, cleared after CHAT_TYPING_EXPIRY_SECONDS of silence
+CHAT_TYPING_THROTTLE_SECONDS = float(os.environ.get("CHAT_TYPING_THROTTLE_SECONDS", 2))
+CHAT_TYPING_EXPIRY_SECONDS = float(os.environ.get("CHAT_TYPING_EXPIRY_SECONDS", 6))
+
+# Maximum number of chat rooms one ws/gateway/ socket may subscribe to
+CHAT_GATEWAY_MAX_ROOMS = int(os.environ.get("CHAT_GATEWAY_MAX_ROOMS", 100))
+# ChatRoom.last_message_at is written after commit; with a Redis URL the writes
+# are coalesced to one per room per CHAT_ROOM_ACTIVITY_INTERVAL seconds
+CHAT_ROOM_ACTIVITY_INTERVAL = int(os.environ.get("CHAT_ROOM_ACTIVITY_INTERVAL", 1))
+CHAT_ROOM_ACTIVITY_REDIS_URL = os.environ.get("CHAT_ROOM_ACTIVITY_REDIS_URL")
+# Closed rooms idle for CHAT_ARCHIVE_AFTER_DAYS are compacted into ChatArchive
+CHAT_ARCHIVE_AFTER_DAYS = int(os.environ.get("CHAT_ARCHIVE_AFTER_DAYS", 30))
+CHAT_ARCHIVE_BATCH_ROOMS = int(os.environ.get("CHAT_ARCHIVE_BATCH_ROOMS", 100))
+# Chat attachments are uploaded straight to storage with a signed ticket;
+# FileSystemUploadProvider is the local/test stand-in for Cloudinary
+CHAT_ATTACHMENT_PROVIDER = os.environ.get(
+    "CHAT_ATTACHMENT_PROVIDER", "api.utils.attachment_storage.CloudinaryUploadProvider"
+)
+CHAT_ATTACHMENT_MAX_SIZE = int(os.environ.get("CHAT_ATTACHMENT_MAX_SIZE", 25 * 1024 * 1024))
+CHAT_ATTACHMENT_TICKET_TTL = int(os.environ.get("CHAT_ATTACHMENT_TICKET_TTL", 900))
+CHAT_THUMBNAIL_SIZE = int(os.environ.get("CHAT_THUMBNAIL_SIZE", 320))
+CHAT_PREVIEW_SIZE = int(os.environ.get("CHAT_PREVIEW_SIZE", 1280))
+
+# Notifications are inserted and pushed in chunks of NOTIFICATION_BATCH_SIZE;
+# reconnecting sockets replay at most NOTIFICATION_REPLAY_LIMIT missed rows
+NOTIFICATION_BATCH_SIZE = int(os.environ.get("NOTIFICATION_BATCH_SIZE", 500))
+NOTIFICATION_REPLAY_LIMIT = int(os.environ.get("NOTIFICATION_REPLAY_LIMIT", 100))
+# Recipients per Celery task for reminder and broadcast fan-out
+NOTIFICATION_FANOUT_CHUNK_SIZE = int(os.environ.get("NOTIFICATION_FANOUT_CHUNK_SIZE", 2000))
+# Inbox page size and retention: read rows are purged after NOTIFICATION_RETENTION_DAYS,
+# unread ones after NOTIFICATION_UNREAD_RETENTION_DAYS
+NOTIFICATION_PAGE_SIZE = int(os.environ.get("NOTIFICATION_PAGE_SIZE", 20))
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get("NOTIFICATION_RETENTION_DAYS", 90))
+NOTIFICATION_UNREAD_RETENTION_DAYS = int(os.environ.get("NOTIFICATION_UNREAD_RETENTION_DAYS", 365))
+NOTIFICATION_PURGE_BATCH_SIZE = int(os.environ.get("NOTIFICATION_PURGE_BATCH_SIZE", 5000))
+# Appointment reminder kinds to send (any of 24h, 2h, 15m) and appointments per batch
+APPOINTMENT_REMINDER_KINDS = os.environ.get("APPOINTMENT_REMINDER_KINDS", "24h,2h,15m").split(",")
+APPOINTMENT_REMINDER_BATCH_SIZE = int(os.environ.get("APPOINTMENT_REMINDER_BATCH_SIZE", 500))
+# Parallel time shards per reminder kind for the scheduled reminder run (1 = inline)
+APPOINTMENT_REMINDER_SHARDS = int(os.environ.get("APPOINTMENT_REMINDER_SHARDS", 4))
+# Days of sharded run metrics (ReminderRun) to keep
+APPOINTMENT_REMINDER_RUN_RETENTION_DAYS = int(os.environ.get("APPOINTMENT_REMINDER_RUN_RETENTION_DAYS", 30))
+# Local hour at which doctors get their daily appointment summary
+DOCTOR_SUMMARY_HOUR = int(os.environ.get("DOCTOR_SUMMARY_HOUR", 7))
+
+# Nearby provider search cache: geohash precision of a cell (6 is about 1.2 x 0.6 km),
+# radius buckets in km (larger radii are not cached) and entry lifetime in seconds
+NEARBY_CACHE_PRECISION = int(os.environ.get("NEARBY_CACHE_PRECISION", 6))
+NEARBY_RADIUS_BUCKETS = [1, 2, 5, 10, 20, 50]
+NEARBY_CACHE_TIMEOUT = int(os.environ.get("NEARBY_CACHE_TIMEOUT", 600))
+# First search radius of k-nearest queries; it grows 4x per round until k are found
+NEAREST_INITIAL_RADIUS_KM = float(os.environ.get("NEAREST_INITIAL_RADIUS_KM", 5))
+# In-process ball tree of provider locations (needs numpy); radius searches ask it for candidate ids
+PROVIDER_INDEX_ENABLED = int(os.environ.get("PROVIDER_INDEX_ENABLED", 0)) == 1
+# Seconds before a process rebuilds its provider index; changes reach other processes
+# sooner only through a shared cache (REDIS_URL)
+PROVIDER_INDEX_MAX_AGE = int(os.environ.get("PROVIDER_INDEX_MAX_AGE", 600))
+# Address geocoding; GazetteerGeocoder reads GEOCODING_GAZETTEER_PATH offline (development/tests).
+# Nominatim allows 1 request per second from an identified client, a limit shared by every worker through
+# the cache (REDIS_URL); misses are retried after GEOCODING_RETRY_DAYS
+GEOCODING_PROVIDER = os.environ.get("GEOCODING_PROVIDER", "api.utils.geocoding_utils.NominatimGeocoder")
+GEOCODING_GAZETTEER_PATH = os.environ.get("GEOCODING_GAZETTEER_PATH", "")
+GEOCODING_USER_AGENT = os.environ.get("GEOCODING_USER_AGENT", "digitalcare")
+GEOCODING_COUNTRY_CODES = os.environ.get("GEOCODING_COUNTRY_CODES", "gh")
+GEOCODING_RATE_LIMIT = float(os.environ.get("GEOCODING_RATE_LIMIT", 1))
+GEOCODING_BATCH_SIZE = int(os.environ.get("GEOCODING_BATCH_SIZE", 500))
+GEOCODING_RETRY_DAYS = int(os.environ.get("GEOCODING_RETRY_DAYS", 30))
+# Drugs searched PHARMACY_STOCK_HOT_THRESHOLD times within PHARMACY_STOCK_HOT_WINDOW seconds
+# have their in-stock pharmacy list cached
+PHARMACY_STOCK_HOT_THRESHOLD = int(os.environ.get("PHARMACY_STOCK_HOT_THRESHOLD", 10))
+PHARMACY_STOCK_HOT_WINDOW = int(os.environ.get("PHARMACY_STOCK_HOT_WINDOW", 300))
+PHARMACY_STOCK_CACHE_TIMEOUT = int(os.environ.get("PHARMACY_STOCK_CACHE_TIMEOUT", 600))
+
+# Results per scope for GET /api/search/ (full-text search)
+SEARCH_RESULT_LIMIT = int(os.environ.get("SEARCH_RESULT_LIMIT", 20))
+
+# Doctor availability index: free slots on an AVAILABILITY_SLOT_MINUTES grid
+# (5 minutes or more) for the next AVAILABILITY_HORIZON_DAYS days
+AVAILABILITY_SLOT_MINUTES = int(os.environ.get("AVAILABILITY_SLOT_MINUTES", 30))
+AVAILABILITY_HORIZON_DAYS = int(os.environ.get("AVAILABILITY_HORIZON_DAYS", 28))
+
+# Seconds a calendar feed URL (GET /api/calendar/feed/) stays valid
+CALENDAR_FEED_TOKEN_MAX_AGE = int(os.environ.get("CALENDAR_FEED_TOKEN_MAX_AGE", 180 * 24 * 3600))
+
+
 DJANGO_CELERY_BEAT_TZ_AWARE = False
 CELERY_TIMEZONE = 'UTC'
 
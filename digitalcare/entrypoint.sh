@@ -6,6 +6,10 @@ set -e
 echo "Applying database migrations..."
 python manage.py migrate --noinput
 
+# Fill the doctor availability index; the daily task keeps it rolling
+echo "Rebuilding the availability index..."
+python manage.py rebuild_availability_index
+
 # Collect static files
 echo "Collecting static files..."
 python manage.py collectstatic --noinput --clear